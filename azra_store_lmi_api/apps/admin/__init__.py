@@ -1,3 +1,9 @@
 """This module initializes the admin package and imports necessary components."""
 
+from azra_store_lmi_api.apps.admin.views.geo import geo_router as geo_router
 from azra_store_lmi_api.apps.admin.views.saas_admin import saas_admin_router as saas_admin_router
+from azra_store_lmi_api.apps.admin.views.store import store_router as store_router
+from azra_store_lmi_api.apps.admin.views.store_calendar import (
+    store_calendar_router as store_calendar_router,
+)
+from azra_store_lmi_api.apps.admin.views.store_tree import store_tree_router as store_tree_router
@@ -0,0 +1,114 @@
+"""Module for the autocomplete of city names.
+
+Cities are searched in the prefix index of the reference data snapshot, see ``CityNameIndex``,
+without a database round trip. Until the snapshot of the process is loaded, or if
+CITY_AUTOCOMPLETE_IN_MEMORY is false, they are searched in the database instead, with the same
+folding and ranking, through the trigram index on the folded city names.
+
+Classes:
+    CityMatch: A city matching an autocomplete query.
+
+Functions:
+    search_cities: Returns the cities matching a prefix, best match first.
+"""
+
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.apps.admin.models import City, State
+from azra_store_lmi_api.apps.admin.reference_data import ReferenceData, reference_data
+from azra_store_lmi_api.config.settings import settings
+from azra_store_lmi_api.core.folding import fold, fold_sql
+
+
+class CityMatch(NamedTuple):
+    """A city matching an autocomplete query.
+
+    Attributes:
+        id (int): The id of the city.
+        name (str): The name of the city.
+        state_id (int): The id of the state of the city.
+        state_name (str): The name of the state.
+        country_id (int): The id of the country of the state.
+    """
+
+    id: int
+    name: str
+    state_id: int
+    state_name: str
+    country_id: int
+
+
+def _search_snapshot(
+    snapshot: ReferenceData,
+    query: str,
+    limit: int,
+    state_id: Optional[int],
+    country_id: Optional[int],
+) -> List[CityMatch]:
+    """Search the cities in the prefix index of a snapshot."""
+    matches = []
+    for city_id in snapshot.city_names.search(query, limit, state_id, country_id):
+        city = snapshot.city(city_id)
+        state = snapshot.state(city.state_id)
+        matches.append(CityMatch(city.id, city.name, state.id, state.name, state.country_id))
+    return matches
+
+
+async def _search_database(
+    session: AsyncSession,
+    query: str,
+    limit: int,
+    state_id: Optional[int],
+    country_id: Optional[int],
+) -> List[CityMatch]:
+    """Search the cities in the database."""
+    prefix = fold(query)
+    if not prefix:
+        return []
+    folded_name = fold_sql(City.name)
+    # The folded prefix has no LIKE wildcards, they are folded to spaces.
+    starts_with = folded_name.like(f"{prefix}%")
+    statement = (
+        select(City.id, City.name, City.state_id, State.name, State.country_id)
+        .join(City.state)
+        .where(or_(starts_with, folded_name.like(f"% {prefix}%")))
+        .order_by(starts_with.desc(), folded_name, City.id)
+        .limit(limit)
+    )
+    if state_id is not None:
+        statement = statement.where(City.state_id == state_id)
+    if country_id is not None:
+        statement = statement.where(State.country_id == country_id)
+    result = await session.execute(statement)
+    return [CityMatch(*row) for row in result.all()]
+
+
+async def search_cities(
+    session: AsyncSession,
+    query: str,
+    limit: int,
+    state_id: Optional[int] = None,
+    country_id: Optional[int] = None,
+) -> List[CityMatch]:
+    """Returns the cities matching a prefix, best match first.
+
+    The cities whose name starts with the prefix come first, then those with a later word
+    starting with it, each sorted by folded name. Matching ignores case, accents and punctuation.
+
+    Args:
+        session (AsyncSession): The database session, used if the snapshot is not loaded.
+        query (str): The prefix typed by the user.
+        limit (int): The maximum number of cities to return.
+        state_id (Optional[int]): Only the cities of this state.
+        country_id (Optional[int]): Only the cities of this country.
+
+    Returns:
+        List[CityMatch]: The matching cities.
+    """
+    snapshot = reference_data.snapshot
+    if settings.CITY_AUTOCOMPLETE_IN_MEMORY and snapshot is not None:
+        return _search_snapshot(snapshot, query, limit, state_id, country_id)
+    return await _search_database(session, query, limit, state_id, country_id)
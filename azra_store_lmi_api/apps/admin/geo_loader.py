@@ -0,0 +1,233 @@
+"""Module for loading the countries, states and cities from the world cities dataset.
+
+The source is a directory with ``countries.csv``, ``states.csv`` and ``cities.csv`` in the format
+of the countries-states-cities database (https://github.com/dr5hn/countries-states-cities-database),
+optionally gzipped. Every file is streamed into a temporary staging table with ``COPY``, then
+merged into its table with one set based statement:
+
+- New rows are inserted, and rows whose columns changed are updated. Unchanged rows are not
+  written, so reloading the same dataset is idempotent and only touches what changed.
+- Soft deleted rows present in the dataset are restored.
+- With ``prune``, rows missing from the dataset are soft deleted.
+
+The three tables are loaded in one transaction, and every process reloads its reference data
+snapshot once it is committed.
+
+Classes:
+    GeoDataset: A reference table and the dataset file it is loaded from.
+    LoadResult: The number of rows changed in a table by a load.
+
+Functions:
+    load_geo_data: Loads the countries, states and cities from a dataset directory.
+
+Attributes:
+    GEO_DATASETS: The datasets, in load order.
+"""
+
+import csv
+import gzip
+import time
+from pathlib import Path
+from typing import IO, Any, Callable, Iterator, List, NamedTuple, Tuple, Type
+
+from sqlalchemy import Integer, String, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.apps.admin.models import City, Country, State
+from azra_store_lmi_api.apps.admin.reference_data import publish_change
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.models import BaseModalWithSoftDelete
+
+
+class GeoDataset(NamedTuple):
+    """A reference table and the dataset file it is loaded from.
+
+    Attributes:
+        model (Type[BaseModalWithSoftDelete]): The model of the table.
+        file_name (str): The name of the CSV file, without extension.
+        columns (Tuple[str, ...]): The columns loaded from the file, starting with the id. The
+            CSV columns have the same names.
+    """
+
+    model: Type[BaseModalWithSoftDelete]
+    file_name: str
+    columns: Tuple[str, ...]
+
+    @property
+    def table(self) -> str:
+        """str: The name of the table."""
+        return self.model.__tablename__
+
+    def converters(self) -> List[Callable[[str], Any]]:
+        """Returns the functions converting the CSV values of the columns.
+
+        Missing integers become 0, and strings are truncated to the length of their column.
+
+        Returns:
+            List[Callable[[str], Any]]: The converter of every column.
+        """
+        converters = []
+        for name in self.columns:
+            column_type = self.model.__table__.c[name].type
+            if isinstance(column_type, Integer):
+                converters.append(lambda value: int(value) if value else 0)
+            elif isinstance(column_type, String) and column_type.length:
+                converters.append(lambda value, length=column_type.length: value[:length])
+            else:
+                converters.append(str)
+        return converters
+
+
+class LoadResult(NamedTuple):
+    """The number of rows changed in a table by a load.
+
+    Attributes:
+        table (str): The name of the table.
+        source_rows (int): The number of rows in the dataset file.
+        upserted (int): The number of rows inserted, updated or restored.
+        pruned (int): The number of rows soft deleted because they are missing from the dataset.
+    """
+
+    table: str
+    source_rows: int
+    upserted: int
+    pruned: int
+
+
+GEO_DATASETS: List[GeoDataset] = [
+    GeoDataset(
+        Country,
+        "countries",
+        (
+            "id",
+            "name",
+            "numeric_code",
+            "phone_code",
+            "capital",
+            "currency",
+            "currency_name",
+            "currency_symbol",
+            "region",
+            "region_id",
+            "subregion",
+            "subregion_id",
+        ),
+    ),
+    GeoDataset(State, "states", ("id", "country_id", "name", "state_code", "type")),
+    GeoDataset(City, "cities", ("id", "state_id", "name")),
+]
+
+
+def _open_dataset(directory: Path, file_name: str) -> IO[str]:
+    """Open the CSV file of a dataset, gzipped or not."""
+    path = directory / f"{file_name}.csv"
+    if path.exists():
+        return path.open(newline="", encoding="utf-8")
+    return gzip.open(path.with_suffix(".csv.gz"), "rt", newline="", encoding="utf-8")
+
+
+def _read_rows(directory: Path, dataset: GeoDataset) -> Iterator[Tuple[Any, ...]]:
+    """Stream the rows of a dataset file."""
+    converters = dataset.converters()
+    with _open_dataset(directory, dataset.file_name) as file:
+        reader = csv.reader(file)
+        header = next(reader)
+        positions = [header.index(column) for column in dataset.columns]
+        for record in reader:
+            yield tuple(
+                convert(record[position]) for convert, position in zip(converters, positions)
+            )
+
+
+async def _copy_to_staging(
+    session: AsyncSession, dataset: GeoDataset, rows: Iterator[Tuple[Any, ...]]
+) -> int:
+    """Create the staging table of a dataset and copy its rows into it.
+
+    Returns:
+        int: The number of copied rows.
+    """
+    staging = f"staging_{dataset.table}"
+    columns = ", ".join(dataset.columns)
+    await session.execute(
+        text(
+            f"CREATE TEMPORARY TABLE {staging} ON COMMIT DROP AS "
+            f"SELECT {columns} FROM {dataset.table} WITH NO DATA"
+        )
+    )
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    count = 0
+    async with raw_connection.driver_connection.cursor() as cursor:
+        async with cursor.copy(f"COPY {staging} ({columns}) FROM STDIN") as copy:
+            for row in rows:
+                await copy.write_row(row)
+                count += 1
+    await session.execute(text(f"ANALYZE {staging}"))
+    return count
+
+
+async def _merge(session: AsyncSession, dataset: GeoDataset, prune: bool) -> Tuple[int, int]:
+    """Merge the staging table of a dataset into its table.
+
+    Returns:
+        Tuple[int, int]: The number of upserted rows and of pruned rows.
+    """
+    staging = f"staging_{dataset.table}"
+    columns = ", ".join(dataset.columns)
+    values = dataset.columns[1:]
+    assignments = ", ".join(f"{column} = EXCLUDED.{column}" for column in values)
+    current = ", ".join(f"{dataset.table}.{column}" for column in values)
+    excluded = ", ".join(f"EXCLUDED.{column}" for column in values)
+    upserted = await session.execute(
+        text(
+            f"INSERT INTO {dataset.table} ({columns}) SELECT {columns} FROM {staging} "
+            f"ON CONFLICT (id) DO UPDATE SET {assignments}, updated_at = now(), deleted_at = NULL "
+            f"WHERE ({current}) IS DISTINCT FROM ({excluded}) "
+            f"OR {dataset.table}.deleted_at IS NOT NULL"
+        )
+    )
+    pruned = 0
+    if prune:
+        result = await session.execute(
+            text(
+                f"UPDATE {dataset.table} SET deleted_at = now(), updated_at = now() "
+                f"WHERE deleted_at IS NULL AND NOT EXISTS "
+                f"(SELECT 1 FROM {staging} WHERE {staging}.id = {dataset.table}.id)"
+            )
+        )
+        pruned = result.rowcount
+    return upserted.rowcount, pruned
+
+
+async def load_geo_data(
+    session: AsyncSession, directory: Path, prune: bool = False
+) -> List[LoadResult]:
+    """Load the countries, states and cities from a dataset directory, in one transaction.
+
+    Args:
+        session (AsyncSession): The database session, committed once every table is loaded.
+        directory (Path): The directory of the dataset files.
+        prune (bool): Whether to soft delete the rows missing from the dataset.
+
+    Returns:
+        List[LoadResult]: The number of rows changed in every table.
+    """
+    results = []
+    for dataset in GEO_DATASETS:
+        started = time.perf_counter()
+        source_rows = await _copy_to_staging(session, dataset, _read_rows(directory, dataset))
+        upserted, pruned = await _merge(session, dataset, prune)
+        results.append(LoadResult(dataset.table, source_rows, upserted, pruned))
+        logger.info(
+            "Loaded %s %s in %.2fs: %s upserted, %s pruned.",
+            source_rows,
+            dataset.table,
+            time.perf_counter() - started,
+            upserted,
+            pruned,
+        )
+    await session.commit()
+    if any(result.upserted or result.pruned for result in results):
+        await publish_change()
+    return results
@@ -7,3 +7,4 @@ from azra_store_lmi_api.apps.admin.models.saas_admin import SAASAdmin as SAASAdm
 from azra_store_lmi_api.apps.admin.models.state import State as State
 from azra_store_lmi_api.apps.admin.models.store import Store as Store
 from azra_store_lmi_api.apps.admin.models.store import StoreContactDetail as StoreContactDetail
+from azra_store_lmi_api.apps.admin.models.store import StoreDetail as StoreDetail
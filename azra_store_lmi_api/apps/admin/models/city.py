@@ -1,16 +1,26 @@
 """This module contains the City model."""
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import ForeignKey, Integer, String
+from sqlalchemy import DDL, ForeignKey, Index, Integer, String, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from azra_store_lmi_api.core.folding import fold_sql
 from azra_store_lmi_api.models import BaseModalWithSoftDelete
 
 if TYPE_CHECKING:
     from azra_store_lmi_api.apps.admin.models import State
 
 
+def _has_pg_trgm(ddl: Any, target: Any, bind: Any, **kwargs: Any) -> bool:
+    """Whether the pg_trgm extension can be installed in the database."""
+    return bind is not None and bool(
+        bind.exec_driver_sql(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+        ).scalar()
+    )
+
+
 class City(BaseModalWithSoftDelete):
     """Represents a city in the database.
 
@@ -32,7 +42,28 @@ class City(BaseModalWithSoftDelete):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
-    state_id: Mapped[int] = mapped_column(Integer, ForeignKey("states.id"))
+    state_id: Mapped[int] = mapped_column(Integer, ForeignKey("states.id"), index=True)
     state: Mapped["State"] = relationship(back_populates="cities")
 
     name: Mapped[str] = mapped_column(String(100), nullable=False)
+
+    # Serves the city autocomplete from the database when the reference data snapshot is not
+    # loaded. It is only created where pg_trgm is available, and migrations must create the
+    # extension first.
+    __table_args__ = (
+        Index(
+            "ix_cities_folded_name_trgm",
+            fold_sql(name.column).label("folded_name"),
+            postgresql_using="gin",
+            postgresql_ops={"folded_name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql", callable_=_has_pg_trgm),
+    )
+
+
+event.listen(
+    City.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(
+        dialect="postgresql", callable_=_has_pg_trgm
+    ),
+)
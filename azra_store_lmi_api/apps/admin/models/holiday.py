@@ -2,7 +2,7 @@
 
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import Date, ForeignKey, Integer, String, Time
+from sqlalchemy import Date, ForeignKey, Index, Integer, String, Time
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from azra_store_lmi_api.core.utils import BaseEnum
@@ -52,6 +52,9 @@ class Holiday(BaseModalWithSoftDelete):
 
     store: Mapped["Store"] = relationship(back_populates="store_holidays")
 
+    # Serve the compilation of the holidays of a month, see ``store_calendar``.
+    __table_args__ = (Index("ix_holidays_date", date),)
+
 
 class HolidayType(BaseEnum):
     """Enumeration representing different types of holidays.
@@ -3,9 +3,10 @@
 from typing import TYPE_CHECKING, Optional
 
 from sqlalchemy import Boolean, DateTime, Integer, String
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from azra_store_lmi_api.apps.admin.tasks.saas_admin import send_saas_admin_credentials
+from azra_store_lmi_api.config.outbox import enqueue
 from azra_store_lmi_api.core.security import AuthenticationMixin
 from azra_store_lmi_api.models import BaseModalWithSoftDelete
 
@@ -72,16 +73,22 @@ class SAASAdmin(BaseModalWithSoftDelete, AuthenticationMixin):
         """
         self.hash_password = self.get_hash_password(password)
 
-    async def send_admin_credential(self, plain_password: str):
+    async def send_admin_credential(self, session: AsyncSession):
         """Asynchronously send admin credentials to the user.
 
-        This method triggers a background task to send the admin's username,
-        email, and plain text password to the user.
+        This method adds the background task sending the admin's username, email, and a new
+        password to the outbox of the session, so it is dispatched only once the admin has been
+        committed. Only the id of the admin is written to the outbox, the password is generated
+        by the task when the email is sent.
 
         Args:
-            plain_password (str): The plain text password to be sent to the admin.
+            session (AsyncSession): The session holding the admin being created.
 
         Note:
-            This method uses a delay mechanism, suggesting it's part of a task queue system.
+            The task is dispatched to the task queue by the outbox relay.
         """
-        send_saas_admin_credentials.delay(self.username, self.email, plain_password)
+        # Imported here, the task module imports this model.
+        from azra_store_lmi_api.apps.admin.tasks.saas_admin import send_saas_admin_credentials
+
+        await session.flush()
+        await enqueue(session, send_saas_admin_credentials, self.id)
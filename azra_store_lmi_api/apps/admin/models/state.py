@@ -37,7 +37,7 @@ class State(BaseModalWithSoftDelete):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
 
-    country_id: Mapped[int] = mapped_column(Integer, ForeignKey("countries.id"))
+    country_id: Mapped[int] = mapped_column(Integer, ForeignKey("countries.id"), index=True)
     country: Mapped["Country"] = relationship(back_populates="states")
 
     name: Mapped[str] = mapped_column(String(100), nullable=False)
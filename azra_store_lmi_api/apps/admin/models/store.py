@@ -1,11 +1,10 @@
 """This module contains the Store model along with StoreDetail and StoreContactDetail models."""
 
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, Any, List, Optional
 
-from sqlalchemy import ARRAY, Boolean, ForeignKey, Integer, String, Text
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import Boolean, Double, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy.sql import expression
 
 from azra_store_lmi_api.core.utils import BaseEnum, ULIDGenerator
 from azra_store_lmi_api.models import BaseModalWithSoftDelete
@@ -13,6 +12,14 @@ from azra_store_lmi_api.models import BaseModalWithSoftDelete
 if TYPE_CHECKING:
     from azra_store_lmi_api.apps.admin.models import City, Country, Holiday, SAASAdmin, State
 
+# Separates the ids of the stores in the materialized path of a store.
+PATH_SEPARATOR = "."
+
+
+def _root_path(context: Any) -> str:
+    """The path of a new store, a root until it is given a parent."""
+    return context.get_current_parameters()["id"]
+
 
 class Store(BaseModalWithSoftDelete):
     """Represents a store in the database.
@@ -29,6 +36,9 @@ class Store(BaseModalWithSoftDelete):
         unique_indentifier (str): The unique identifier of the store.
         is_main_store (bool): Indicates if the store is the main store.
         status (int): The status of the store.
+        path (str): The materialized path of the store in its chain, the ids of its ancestors
+            and its own, from the root, separated by PATH_SEPARATOR. It is maintained from
+            StoreDetail.parent_store_id by ``store_tree.move_store``.
 
         store_holidays (List[Holiday]): The relationship to the Holiday model.
         store_detail (StoreDetail): The relationship to the StoreDetail model.
@@ -39,9 +49,7 @@ class Store(BaseModalWithSoftDelete):
 
     __tablename__ = "stores"
 
-    id: Mapped[str] = mapped_column(
-        String, primary_key=True, default=expression.FunctionElement(ULIDGenerator.generate)
-    )
+    id: Mapped[str] = mapped_column(String, primary_key=True, default=ULIDGenerator.generate)
 
     created_by_id: Mapped[int] = mapped_column(Integer, ForeignKey("saas_admins.id"))
     created_by: Mapped["SAASAdmin"] = relationship(back_populates="stores")
@@ -50,12 +58,19 @@ class Store(BaseModalWithSoftDelete):
     unique_indentifier: Mapped[Optional[str]] = mapped_column(String, unique=True)
     is_main_store: Mapped[bool] = mapped_column(Boolean, default=False)
     status: Mapped[int] = mapped_column(Integer)
+    path: Mapped[str] = mapped_column(String, default=_root_path)
 
     store_holidays: Mapped[List["Holiday"]] = relationship(back_populates="store")
     store_detail: Mapped["StoreDetail"] = relationship(
         back_populates="store", foreign_keys="[StoreDetail.store_id]"
     )
 
+    # Selects the descendants of a store by the prefix of their path, with LIKE 'path.%', whatever
+    # the collation of the database.
+    __table_args__ = (
+        Index("ix_stores_path", path, postgresql_ops={"path": "varchar_pattern_ops"}),
+    )
+
 
 class StoreDetail(BaseModalWithSoftDelete):
     """Represents the details of a store in the database.
@@ -80,6 +95,8 @@ class StoreDetail(BaseModalWithSoftDelete):
         slogan (Optional[str]): The slogan of the store.
         address (Optional[str]): The address of the store.
         postal_code (Optional[str]): The postal code of the store.
+        latitude (Optional[float]): The latitude of the store, in degrees.
+        longitude (Optional[float]): The longitude of the store, in degrees.
         logo (str): The logo of the store.
         cover_image (str): The cover image of the store.
         gst (Optional[str]): The GST number of the store.
@@ -117,6 +134,8 @@ class StoreDetail(BaseModalWithSoftDelete):
     slogan: Mapped[Optional[str]] = mapped_column(String(length=100))
     address: Mapped[str] = mapped_column(String(length=255))
     postal_code: Mapped[str] = mapped_column(String(length=10))
+    latitude: Mapped[Optional[float]] = mapped_column(Double)
+    longitude: Mapped[Optional[float]] = mapped_column(Double)
     logo: Mapped[str] = mapped_column(String)
     cover_iamge: Mapped[str] = mapped_column(String)
     gst: Mapped[Optional[str]] = mapped_column(String(20))
@@ -132,6 +151,13 @@ class StoreDetail(BaseModalWithSoftDelete):
         back_populates="store_detail"
     )
 
+    # Serve the service filters of the store search, which match the arrays with the @> and &&
+    # operators, see ``store_search``.
+    __table_args__ = (
+        Index("ix_store_details_services", services, postgresql_using="gin"),
+        Index("ix_store_details_sub_services", sub_services, postgresql_using="gin"),
+    )
+
 
 class StoreContactDetail(BaseModalWithSoftDelete):
     """Represents the contact details of a store in the database.
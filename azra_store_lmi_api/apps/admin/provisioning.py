@@ -0,0 +1,239 @@
+"""Module for provisioning the schema of a new store.
+
+A store is created in the CREATING status by the API, which registers its schema in the tenant
+registry and adds the ``provision_store`` task to the outbox, then responds at once. On the
+provisioning queue, the task:
+
+1. Clones the template schema, kept at head by the tenant migrations, into the schema of the
+   store read from the registry, which stamps it at the revision of the template.
+2. If the template is not at head, holds an object the clone does not support, or the schema
+   exists from a previous attempt, creates the schema and applies the tenant migrations to it
+   instead, by running ``alembic upgrade head`` for the schema in a subprocess, so the
+   migrations never block the event loop of the worker.
+   The migrations record the revision of the schema in the registry.
+3. Runs the seeders registered with ``tenant_seeder`` in the schema.
+4. Flips the store and its tenant to ACTIVE, in the transaction of the seeds, or to FAILED if a
+   step failed. A cloned schema is created in that transaction too.
+
+Every step can run again on a partially provisioned schema, so a failed store is provisioned
+again by setting it back to CREATING and enqueueing a new attempt with ``enqueue_provisioning``.
+The ``requeue_stuck_stores`` job does so for the stores left in CREATING by a worker which died.
+
+Usage:
+    @tenant_seeder
+    async def seed_price_list(session: AsyncSession, store: Store) -> None:
+        session.add_all(default_price_list())
+
+Classes:
+    ProvisioningError: Raised when the migrations of a schema fail.
+
+Functions:
+    tenant_seeder: Registers a function seeding the default rows of a new store schema.
+    clone_template: Clones the template schema into the schema of a store.
+    create_schema: Creates the schema of a store.
+    migrate_schema: Applies the tenant migrations to a schema.
+    seed_schema: Runs the registered seeders in the schema of a store.
+    provision: Provisions the schema of a store and updates its status.
+
+Attributes:
+    tenant_seeders: The registered seeders, in registration order.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional
+
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.apps.admin.models import Store
+from azra_store_lmi_api.apps.admin.models.store import StoreStatusEnum
+from azra_store_lmi_api.config.database import get_db_context
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.config.settings import settings
+from azra_store_lmi_api.config.tenancy import Tenant, TenantStatusEnum, set_tenant_revision
+from azra_store_lmi_api.config.tenancy.template import CloneError, clone_schema, schema_revision
+from azra_store_lmi_api.config.tenant_migrations import head_revision
+
+TenantSeeder = Callable[[AsyncSession, Store], Awaitable[None]]
+
+# The directory of alembic.ini, which alembic resolves the migrations from.
+_PROJECT_ROOT = Path(__file__).resolve().parents[3]
+
+tenant_seeders: List[TenantSeeder] = []
+
+
+class ProvisioningError(Exception):
+    """Raised when the migrations of a schema fail."""
+
+
+def tenant_seeder(func: TenantSeeder) -> TenantSeeder:
+    """Register a function seeding the default rows of a new store schema.
+
+    Seeders run in registration order, in the transaction activating the store, with the search
+    path set to the schema of the store. They must add their rows only if they are missing.
+
+    Args:
+        func (TenantSeeder): The seeder, called with the session and the store.
+
+    Returns:
+        TenantSeeder: The seeder, unchanged.
+    """
+    tenant_seeders.append(func)
+    return func
+
+
+async def clone_template(session: AsyncSession, schema: str) -> bool:
+    """Clone the template schema into the schema of a store, if the template is at head.
+
+    Args:
+        session (AsyncSession): The database session, committed by the caller.
+        schema (str): The name of the schema, which is not created if it already exists.
+
+    Returns:
+        bool: Whether the schema was cloned, if not it must be migrated. It is not cloned if the
+        template holds an object which cannot be cloned, see ``CloneError``.
+    """
+    if await session.scalar(text("SELECT to_regnamespace(:schema)"), {"schema": f'"{schema}"'}):
+        return False
+    template = settings.TENANT_TEMPLATE_SCHEMA
+    revision = await schema_revision(session, template)
+    head = await asyncio.to_thread(head_revision)
+    if revision is None or revision != head:
+        logger.warning(
+            "The %s schema is at %s instead of %s, replaying the migrations of %s.",
+            template,
+            revision,
+            head,
+            schema,
+        )
+        return False
+    try:
+        # The savepoint reverts the search path set by the clone if it raises.
+        async with session.begin_nested():
+            await clone_schema(session, template, schema)
+    except CloneError as exception:
+        logger.warning(
+            "Unable to clone %s, replaying the migrations of %s: %s", template, schema, exception
+        )
+        return False
+    await session.execute(set_tenant_revision(schema, revision))
+    return True
+
+
+async def create_schema(session: AsyncSession, schema: str) -> None:
+    """Create the schema of a store, if it does not exist.
+
+    Args:
+        session (AsyncSession): The database session, committed by the caller.
+        schema (str): The name of the schema, validated by ``StoreRequest``.
+    """
+    await session.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
+
+
+async def migrate_schema(schema: str) -> None:
+    """Apply the tenant migrations to a schema, in an alembic subprocess.
+
+    Args:
+        schema (str): The name of the schema.
+
+    Raises:
+        ProvisioningError: If the migrations fail or take longer than
+            STORE_PROVISIONING_MIGRATION_TIMEOUT seconds.
+    """
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-m",
+        "alembic",
+        "-x",
+        f"tenant={schema}",
+        "upgrade",
+        "head",
+        cwd=_PROJECT_ROOT,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+    )
+    try:
+        output, _ = await asyncio.wait_for(
+            process.communicate(), timeout=settings.STORE_PROVISIONING_MIGRATION_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        process.kill()
+        await process.wait()
+        raise ProvisioningError(f"The migrations of {schema} timed out.") from None
+    if process.returncode != 0:
+        raise ProvisioningError(
+            f"The migrations of {schema} exited with {process.returncode}:\n"
+            f"{output.decode(errors='replace')}"
+        )
+
+
+async def seed_schema(session: AsyncSession, store: Store, schema: str) -> None:
+    """Run the registered seeders in the schema of a store.
+
+    Args:
+        session (AsyncSession): The database session, in the transaction activating the store.
+        store (Store): The store being provisioned.
+        schema (str): The name of the schema of the store.
+    """
+    await session.execute(text(f'SET LOCAL search_path TO "{schema}", public'))
+    for seeder in tenant_seeders:
+        await seeder(session, store)
+    await session.execute(text("SET LOCAL search_path TO public"))
+
+
+async def _set_status(session: AsyncSession, store_id: str, status: StoreStatusEnum) -> bool:
+    """Set the status of a store still being created and of its tenant, and tell whether it was."""
+    result = await session.execute(
+        update(Store)
+        .where(Store.id == store_id, Store.status == StoreStatusEnum.CREATING.value)
+        .values(status=status.value)
+    )
+    if result.rowcount != 1:
+        return False
+    tenant_status = (
+        TenantStatusEnum.ACTIVE if status == StoreStatusEnum.ACTIVE else TenantStatusEnum.FAILED
+    )
+    await session.execute(
+        update(Tenant).where(Tenant.store_id == store_id).values(status=tenant_status.value)
+    )
+    return True
+
+
+async def provision(store_id: str) -> Optional[StoreStatusEnum]:
+    """Provision the schema of a store and update its status.
+
+    Args:
+        store_id (str): The id of the store, in the CREATING status.
+
+    Returns:
+        Optional[StoreStatusEnum]: The new status of the store, None if it was not being created.
+    """
+    async with get_db_context() as session:
+        schema = await session.scalar(
+            select(Tenant.schema_name)
+            .join(Store, Store.id == Tenant.store_id)
+            .where(Store.id == store_id, Store.status == StoreStatusEnum.CREATING.value)
+        )
+    if schema is None:
+        logger.info("Store %s is not being created, skipping its provisioning.", store_id)
+        return None
+    try:
+        async with get_db_context() as session:
+            if not await clone_template(session, schema):
+                await create_schema(session, schema)
+                await session.commit()
+                await migrate_schema(schema)
+            store = await session.get(Store, store_id)
+            await seed_schema(session, store, schema)
+            activated = await _set_status(session, store_id, StoreStatusEnum.ACTIVE)
+            await session.commit()
+    except Exception as exception:
+        logger.exception("Error occurred while provisioning store %s: %s", store_id, exception)
+        async with get_db_context() as session:
+            await _set_status(session, store_id, StoreStatusEnum.FAILED)
+            await session.commit()
+        return StoreStatusEnum.FAILED
+    logger.info("Store %s has been provisioned in schema %s.", store_id, schema)
+    return StoreStatusEnum.ACTIVE if activated else None
@@ -0,0 +1,524 @@
+"""Module for the in-process cache of the countries, states and cities.
+
+These reference tables are read on every store read and rarely change, so each process keeps them
+in memory as an immutable snapshot, and looks them up without a database round trip.
+
+Each table is stored by column, with the rows sorted by parent and name: ids and parent ids in
+integer arrays and the other columns in tuples. A row is found by id through an id to index map,
+and the children of a parent, such as the states of a country, are a contiguous range of indexes.
+Rows are returned as named tuples built on demand.
+
+City names are also indexed for autocomplete. Every city has a key for its folded name, see
+``fold``, and one for every later word of it, so ``"york"`` finds ``"New York"``. The keys are
+kept sorted, once for all cities and once per country and per state, so the cities starting with a
+prefix are found with a binary search, in logarithmic time whatever the number of matches.
+
+A version token is kept in Redis. After reference data is edited, ``publish_change`` increments
+it and publishes it on a channel. Every process listening to the channel loads a new snapshot and
+swaps it in, and a process checks the version again whenever it reconnects to Redis, so a change
+published while it was disconnected is not missed.
+
+Usage:
+    snapshot = await reference_data.get(session)
+    city = snapshot.city(store_detail.city_id)
+    states = snapshot.states_of(country_id)
+
+Classes:
+    CountryRow: A row of the countries table.
+    StateRow: A row of the states table.
+    CityRow: A row of the cities table.
+    ReferenceTable: An immutable table of reference rows.
+    CityNameIndex: An immutable prefix index of the city names.
+    ReferenceData: An immutable snapshot of the countries, states and cities.
+    ReferenceDataCache: Holds the snapshot of a process and keeps it up to date.
+
+Functions:
+    publish_change: Publishes a change of the reference data to every process.
+
+Attributes:
+    reference_data: The reference data cache of the process.
+"""
+
+import asyncio
+from array import array
+from bisect import bisect_left
+from itertools import groupby
+from typing import Any, Dict, Generic, List, NamedTuple, Optional, Sequence, Tuple, Type, TypeVar
+
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.apps.admin.models import City, Country, State
+from azra_store_lmi_api.config.database import get_db_context
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.config.redis import get_redis
+from azra_store_lmi_api.core.folding import fold
+
+VERSION_KEY = "reference_data:version"
+CHANNEL = "reference_data:changes"
+
+# Seconds to wait before subscribing again after the connection to Redis is lost.
+_RECONNECT_DELAY = 5
+
+
+class CountryRow(NamedTuple):
+    """A row of the countries table."""
+
+    id: int
+    name: str
+    numeric_code: str
+    phone_code: str
+    capital: str
+    currency: str
+    currency_name: str
+    currency_symbol: str
+    region: str
+    subregion: str
+
+
+class StateRow(NamedTuple):
+    """A row of the states table."""
+
+    id: int
+    country_id: int
+    name: str
+    state_code: str
+    type: str
+
+
+class CityRow(NamedTuple):
+    """A row of the cities table."""
+
+    id: int
+    state_id: int
+    name: str
+
+
+_Row = TypeVar("_Row", CountryRow, StateRow, CityRow)
+
+
+class ReferenceTable(Generic[_Row]):
+    """An immutable table of reference rows, stored by column.
+
+    The first field of a row is its id, and the second its parent id for tables with a parent.
+    The rows must be given sorted by parent id, so the children of a parent are contiguous.
+    """
+
+    __slots__ = ("_row_type", "_ids", "_parent_ids", "_columns", "_indexes", "_ranges")
+
+    def __init__(self, row_type: Type[_Row], rows: Sequence[Sequence[Any]], has_parent: bool):
+        """Initialize the table.
+
+        Args:
+            row_type (Type[_Row]): The named tuple type of the rows.
+            rows (Sequence[Sequence[Any]]): The rows, with their fields in the order of row_type.
+            has_parent (bool): Whether the second field of the rows is a parent id.
+        """
+        self._row_type = row_type
+        columns = list(zip(*rows)) or [()] * len(row_type._fields)
+        self._ids = array("q", columns[0])
+        self._parent_ids = array("q", columns[1]) if has_parent else None
+        self._columns = tuple(tuple(column) for column in columns[2 if has_parent else 1 :])
+        self._indexes: Dict[int, int] = {id_: index for index, id_ in enumerate(self._ids)}
+        self._ranges: Dict[int, Tuple[int, int]] = {}
+        if self._parent_ids is not None:
+            start = 0
+            for parent_id, children in groupby(self._parent_ids):
+                stop = start + sum(1 for _ in children)
+                self._ranges[parent_id] = (start, stop)
+                start = stop
+
+    def __len__(self) -> int:
+        """Returns the number of rows."""
+        return len(self._ids)
+
+    def __contains__(self, id_: int) -> bool:
+        """Whether the table has a row with the given id."""
+        return id_ in self._indexes
+
+    def _row(self, index: int) -> _Row:
+        """Returns the row at an index."""
+        fields = [self._ids[index]]
+        if self._parent_ids is not None:
+            fields.append(self._parent_ids[index])
+        fields.extend(column[index] for column in self._columns)
+        return self._row_type(*fields)
+
+    def get(self, id_: int) -> Optional[_Row]:
+        """Returns the row with the given id.
+
+        Args:
+            id_ (int): The id of the row.
+
+        Returns:
+            Optional[_Row]: The row, or None if there is no row with this id.
+        """
+        index = self._indexes.get(id_)
+        return None if index is None else self._row(index)
+
+    def parent_of(self, id_: int) -> Optional[int]:
+        """Returns the parent id of the row with the given id.
+
+        Args:
+            id_ (int): The id of the row.
+
+        Returns:
+            Optional[int]: The parent id, or None if there is no row with this id.
+        """
+        index = self._indexes.get(id_)
+        return None if index is None or self._parent_ids is None else self._parent_ids[index]
+
+    def children(self, parent_id: int) -> List[_Row]:
+        """Returns the rows of a parent, sorted by name.
+
+        Args:
+            parent_id (int): The id of the parent.
+
+        Returns:
+            List[_Row]: The rows.
+        """
+        start, stop = self._ranges.get(parent_id, (0, 0))
+        return [self._row(index) for index in range(start, stop)]
+
+    def all(self) -> List[_Row]:
+        """Returns every row, sorted by parent and name."""
+        return [self._row(index) for index in range(len(self._ids))]
+
+
+class _SortedKeys(NamedTuple):
+    """Sorted name keys and the ids of the cities they belong to."""
+
+    keys: List[str]
+    ids: array
+
+
+class _Scope(NamedTuple):
+    """The keys of the cities of a scope: every city, a country or a state."""
+
+    names: _SortedKeys
+    words: _SortedKeys
+
+
+class CityNameIndex:
+    """An immutable prefix index of the city names, for autocomplete.
+
+    Matches are ranked by tier, then alphabetically by folded name: the cities whose name starts
+    with the prefix come first, then those with a later word starting with it. Within a tier, the
+    exact match and shorter names come first.
+    """
+
+    __slots__ = ("_scopes", "_state_countries")
+
+    def __init__(self, cities: ReferenceTable[CityRow], states: ReferenceTable[StateRow]):
+        """Initialize the index.
+
+        Args:
+            cities (ReferenceTable[CityRow]): The cities to index.
+            states (ReferenceTable[StateRow]): The states of the cities.
+        """
+        self._state_countries = {state.id: state.country_id for state in states.all()}
+        everything = _Scope(_SortedKeys([], array("q")), _SortedKeys([], array("q")))
+        scopes: Dict[Optional[Tuple[str, int]], _Scope] = {None: everything}
+        # The scopes of every city, and the folded names, repeated across the dataset.
+        city_scopes: Dict[int, Tuple[_Scope, ...]] = {}
+        folded_names: Dict[str, str] = {}
+        names, words = [], []
+        for city in cities.all():
+            country_id = self._state_countries.get(city.state_id)
+            city_scopes[city.id] = tuple(
+                scopes.get(scope)
+                or scopes.setdefault(
+                    scope, _Scope(_SortedKeys([], array("q")), _SortedKeys([], array("q")))
+                )
+                for scope in (None, ("state", city.state_id), ("country", country_id))
+            )
+            folded = folded_names.get(city.name)
+            if folded is None:
+                folded = folded_names[city.name] = fold(city.name)
+            names.append((folded, city.id))
+            position = folded.find(" ")
+            while position != -1:
+                words.append((folded[position + 1 :], city.id))
+                position = folded.find(" ", position + 1)
+        names.sort()
+        words.sort()
+        for tier, entries in enumerate((names, words)):
+            for key, city_id in entries:
+                for scope in city_scopes[city_id]:
+                    sorted_keys = scope[tier]
+                    sorted_keys.keys.append(key)
+                    sorted_keys.ids.append(city_id)
+        self._scopes = scopes
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        state_id: Optional[int] = None,
+        country_id: Optional[int] = None,
+    ) -> List[int]:
+        """Returns the ids of the cities matching a prefix, best match first.
+
+        Args:
+            query (str): The prefix typed by the user, folded before matching.
+            limit (int): The maximum number of cities to return.
+            state_id (Optional[int]): Only the cities of this state.
+            country_id (Optional[int]): Only the cities of this country.
+
+        Returns:
+            List[int]: The ids of the matching cities.
+        """
+        prefix = fold(query)
+        if not prefix:
+            return []
+        if state_id is not None:
+            if country_id is not None and self._state_countries.get(state_id) != country_id:
+                return []
+            scope = self._scopes.get(("state", state_id))
+        elif country_id is not None:
+            scope = self._scopes.get(("country", country_id))
+        else:
+            scope = self._scopes.get(None)
+        ids: List[int] = []
+        if scope is None:
+            return ids
+        for sorted_keys in scope:
+            keys = sorted_keys.keys
+            index = bisect_left(keys, prefix)
+            while index < len(keys) and len(ids) < limit and keys[index].startswith(prefix):
+                city_id = sorted_keys.ids[index]
+                if city_id not in ids:
+                    ids.append(city_id)
+                index += 1
+        return ids
+
+
+class ReferenceData(NamedTuple):
+    """An immutable snapshot of the countries, states and cities.
+
+    Attributes:
+        version (str): The version token the snapshot was loaded for.
+        countries (ReferenceTable[CountryRow]): The countries, sorted by name.
+        states (ReferenceTable[StateRow]): The states, sorted by country and name.
+        cities (ReferenceTable[CityRow]): The cities, sorted by state and name.
+        city_names (CityNameIndex): The prefix index of the city names.
+    """
+
+    version: str
+    countries: ReferenceTable[CountryRow]
+    states: ReferenceTable[StateRow]
+    cities: ReferenceTable[CityRow]
+    city_names: CityNameIndex
+
+    def country(self, country_id: int) -> Optional[CountryRow]:
+        """Returns the country with the given id, if any."""
+        return self.countries.get(country_id)
+
+    def state(self, state_id: int) -> Optional[StateRow]:
+        """Returns the state with the given id, if any."""
+        return self.states.get(state_id)
+
+    def city(self, city_id: int) -> Optional[CityRow]:
+        """Returns the city with the given id, if any."""
+        return self.cities.get(city_id)
+
+    def states_of(self, country_id: int) -> List[StateRow]:
+        """Returns the states of a country, sorted by name."""
+        return self.states.children(country_id)
+
+    def cities_of(self, state_id: int) -> List[CityRow]:
+        """Returns the cities of a state, sorted by name."""
+        return self.cities.children(state_id)
+
+    def is_valid_location(self, country_id: int, state_id: int, city_id: int) -> bool:
+        """Whether a city belongs to a state, and the state to a country.
+
+        Args:
+            country_id (int): The id of the country.
+            state_id (int): The id of the state.
+            city_id (int): The id of the city.
+
+        Returns:
+            bool: True if the three ids exist and are consistent.
+        """
+        return (
+            self.cities.parent_of(city_id) == state_id
+            and self.states.parent_of(state_id) == country_id
+        )
+
+    @classmethod
+    async def load(cls, session: AsyncSession, version: str) -> "ReferenceData":
+        """Load a snapshot of the reference tables.
+
+        Args:
+            session (AsyncSession): The database session.
+            version (str): The version token read before loading.
+
+        Returns:
+            ReferenceData: The snapshot.
+        """
+        countries = await session.execute(
+            select(
+                Country.id,
+                Country.name,
+                Country.numeric_code,
+                Country.phone_code,
+                Country.capital,
+                Country.currency,
+                Country.currency_name,
+                Country.currency_symbol,
+                Country.region,
+                Country.subregion,
+            ).order_by(Country.name)
+        )
+        states = await session.execute(
+            select(State.id, State.country_id, State.name, State.state_code, State.type).order_by(
+                State.country_id, State.name
+            )
+        )
+        cities = await session.execute(
+            select(City.id, City.state_id, City.name).order_by(City.state_id, City.name)
+        )
+        state_table = ReferenceTable(StateRow, states.all(), has_parent=True)
+        city_table = ReferenceTable(CityRow, cities.all(), has_parent=True)
+        return cls(
+            version,
+            ReferenceTable(CountryRow, countries.all(), has_parent=False),
+            state_table,
+            city_table,
+            # Built in a thread, so requests are still served while a new snapshot is loaded.
+            await asyncio.to_thread(CityNameIndex, city_table, state_table),
+        )
+
+
+async def _get_version() -> str:
+    """Returns the current version token, "0" if Redis is unavailable or has none."""
+    try:
+        version = await get_redis().get(VERSION_KEY)
+    except RedisError as exception:
+        logger.warning("Unable to read the reference data version: %s", exception)
+        return "0"
+    return version.decode() if version else "0"
+
+
+async def publish_change() -> None:
+    """Publish a change of the reference data, so every process loads a new snapshot.
+
+    Call it once the transaction editing the countries, states or cities is committed.
+    """
+    try:
+        redis = get_redis()
+        version = await redis.incr(VERSION_KEY)
+        await redis.publish(CHANNEL, version)
+    except RedisError as exception:
+        logger.warning("Unable to publish the reference data change: %s", exception)
+
+
+class ReferenceDataCache:
+    """Holds the reference data snapshot of a process and keeps it up to date."""
+
+    def __init__(self):
+        """Initialize an empty cache, loaded on first use or by ``start``."""
+        self._snapshot: Optional[ReferenceData] = None
+        self._lock = asyncio.Lock()
+        self._listener: Optional[asyncio.Task] = None
+
+    @property
+    def snapshot(self) -> Optional[ReferenceData]:
+        """Optional[ReferenceData]: The current snapshot, None until it is loaded."""
+        return self._snapshot
+
+    async def get(self, session: Optional[AsyncSession] = None) -> ReferenceData:
+        """Returns the current snapshot, loading it on first use.
+
+        Args:
+            session (Optional[AsyncSession]): The session used if the snapshot must be loaded.
+                Defaults to a new session.
+
+        Returns:
+            ReferenceData: The snapshot.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = await self.reload(session, only_if_stale=True)
+        return snapshot
+
+    async def reload(
+        self, session: Optional[AsyncSession] = None, only_if_stale: bool = False
+    ) -> ReferenceData:
+        """Load a new snapshot and swap it in.
+
+        Args:
+            session (Optional[AsyncSession]): The session to load with. Defaults to a new session.
+            only_if_stale (bool): Whether to keep the snapshot if it has the current version.
+
+        Returns:
+            ReferenceData: The current snapshot.
+        """
+        async with self._lock:
+            version = await _get_version()
+            if only_if_stale and self._snapshot and self._snapshot.version == version:
+                return self._snapshot
+            if session is None:
+                async with get_db_context() as session:
+                    snapshot = await ReferenceData.load(session, version)
+            else:
+                snapshot = await ReferenceData.load(session, version)
+            self._snapshot = snapshot
+        logger.info(
+            "Loaded reference data version %s: %s countries, %s states, %s cities.",
+            version,
+            len(snapshot.countries),
+            len(snapshot.states),
+            len(snapshot.cities),
+        )
+        return snapshot
+
+    async def _listen(self) -> None:
+        """Reload the snapshot whenever a change is published, until cancelled."""
+        while True:
+            pubsub = get_redis().pubsub()
+            try:
+                await pubsub.subscribe(CHANNEL)
+                await self.reload(only_if_stale=True)
+                async for message in pubsub.listen():
+                    if message["type"] == "message" and (
+                        self._snapshot is None
+                        or self._snapshot.version != message["data"].decode()
+                    ):
+                        await self.reload(only_if_stale=True)
+            except RedisError as exception:
+                logger.warning("Reference data listener disconnected: %s", exception)
+            except Exception as exception:
+                logger.exception(
+                    "Error occurred while reloading the reference data: %s", exception
+                )
+            finally:
+                await pubsub.aclose()
+            await asyncio.sleep(_RECONNECT_DELAY)
+
+    async def start(self) -> None:
+        """Load the snapshot and start listening to the changes.
+
+        If the snapshot cannot be loaded, it is loaded on first use instead.
+        """
+        try:
+            await self.reload()
+        except Exception as exception:
+            logger.exception("Error occurred while loading the reference data: %s", exception)
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """Stop listening to the changes."""
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+reference_data = ReferenceDataCache()
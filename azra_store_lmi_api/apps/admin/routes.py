@@ -9,7 +9,13 @@ This module also configures CORS middleware for the application.
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from azra_store_lmi_api.apps.admin import saas_admin_router
+from azra_store_lmi_api.apps.admin import (
+    geo_router,
+    saas_admin_router,
+    store_calendar_router,
+    store_router,
+    store_tree_router,
+)
 
 admin_app = FastAPI(
     title="AZRA Bills Admin App",
@@ -29,3 +35,7 @@ admin_app.add_middleware(
 )
 
 admin_app.include_router(saas_admin_router)
+admin_app.include_router(geo_router)
+admin_app.include_router(store_router)
+admin_app.include_router(store_tree_router)
+admin_app.include_router(store_calendar_router)
@@ -0,0 +1,81 @@
+"""This module contains the country, state and city module schemas."""
+
+from pydantic import BaseModel, Field
+
+
+class ListCountry(BaseModel):
+    """Schema for listing countries.
+
+    Attributes:
+        id (int): The unique identifier of the country.
+        name (str): The name of the country.
+        numeric_code (str): The ISO 3166 numeric code of the country.
+        phone_code (str): The phone code of the country.
+        capital (str): The capital of the country.
+        currency (str): The ISO 4217 code of the currency.
+        currency_name (str): The name of the currency.
+        currency_symbol (str): The symbol of the currency.
+        region (str): The region of the country.
+        subregion (str): The subregion of the country.
+    """
+
+    id: int = Field(description="The unique identifier of the country")
+    name: str = Field(description="The name of the country")
+    numeric_code: str = Field(description="The ISO 3166 numeric code of the country")
+    phone_code: str = Field(description="The phone code of the country")
+    capital: str = Field(description="The capital of the country")
+    currency: str = Field(description="The ISO 4217 code of the currency")
+    currency_name: str = Field(description="The name of the currency")
+    currency_symbol: str = Field(description="The symbol of the currency")
+    region: str = Field(description="The region of the country")
+    subregion: str = Field(description="The subregion of the country")
+
+
+class ListState(BaseModel):
+    """Schema for listing states.
+
+    Attributes:
+        id (int): The unique identifier of the state.
+        country_id (int): The unique identifier of the country of the state.
+        name (str): The name of the state.
+        state_code (str): The code of the state.
+        type (str): The type of the state.
+    """
+
+    id: int = Field(description="The unique identifier of the state")
+    country_id: int = Field(description="The unique identifier of the country of the state")
+    name: str = Field(description="The name of the state")
+    state_code: str = Field(description="The code of the state")
+    type: str = Field(description="The type of the state")
+
+
+class ListCity(BaseModel):
+    """Schema for listing cities.
+
+    Attributes:
+        id (int): The unique identifier of the city.
+        state_id (int): The unique identifier of the state of the city.
+        name (str): The name of the city.
+    """
+
+    id: int = Field(description="The unique identifier of the city")
+    state_id: int = Field(description="The unique identifier of the state of the city")
+    name: str = Field(description="The name of the city")
+
+
+class AutocompleteCity(BaseModel):
+    """Schema for the cities matching an autocomplete query.
+
+    Attributes:
+        id (int): The unique identifier of the city.
+        name (str): The name of the city.
+        state_id (int): The unique identifier of the state of the city.
+        state_name (str): The name of the state of the city.
+        country_id (int): The unique identifier of the country of the city.
+    """
+
+    id: int = Field(description="The unique identifier of the city")
+    name: str = Field(description="The name of the city")
+    state_id: int = Field(description="The unique identifier of the state of the city")
+    state_name: str = Field(description="The name of the state of the city")
+    country_id: int = Field(description="The unique identifier of the country of the city")
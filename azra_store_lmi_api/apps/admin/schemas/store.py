@@ -0,0 +1,445 @@
+"""This module contains the store module schemas."""
+
+import datetime
+from typing import Annotated, Any, Dict, List, Literal, Optional
+
+from pydantic import (
+    AwareDatetime,
+    BaseModel,
+    BeforeValidator,
+    ConfigDict,
+    Field,
+    NaiveDatetime,
+    computed_field,
+    field_validator,
+    model_validator,
+)
+
+from azra_store_lmi_api.apps.admin.models.holiday import HolidayType
+from azra_store_lmi_api.apps.admin.models.store import (
+    PATH_SEPARATOR,
+    StoreServiceEnum,
+    StoreSubServiceEnum,
+)
+from azra_store_lmi_api.config.settings import settings
+
+# The unique identifier of a store names its schema, so it must be a valid unquoted identifier.
+SCHEMA_NAME_PATTERN = r"^[a-z][a-z0-9_]{2,62}$"
+RESERVED_SCHEMA_NAMES = {"public", "information_schema", settings.TENANT_TEMPLATE_SCHEMA}
+
+# The most stores and days the calendars are read for at once.
+MAX_CALENDAR_STORES = 1000
+MAX_CALENDAR_DAYS = 366
+
+# A service and a sub-service in a query string, parsed to an int before it is checked.
+ServiceQuery = Annotated[Literal[*StoreServiceEnum.values()], BeforeValidator(int)]
+SubServiceQuery = Annotated[Literal[*StoreSubServiceEnum.values()], BeforeValidator(int)]
+
+
+class StoreRequest(BaseModel):
+    """Schema for creating a new store.
+
+    Attributes:
+        name (str): The name of the store. Must be between 3 and 255 characters long.
+        unique_indentifier (str): The unique identifier of the store, also the name of its
+            schema. Must be 3 to 63 lower case letters, digits or underscores, starting with a
+            letter.
+        is_main_store (bool): Whether the store is the main store. Defaults to False.
+        created_by_id (int): The id of the SAAS Admin creating the store.
+    """
+
+    name: str = Field(min_length=3, max_length=255, description="The name of the store")
+    unique_indentifier: str = Field(
+        pattern=SCHEMA_NAME_PATTERN,
+        description="The unique identifier of the store, also the name of its schema",
+    )
+    is_main_store: bool = Field(default=False, description="Whether the store is the main store")
+    created_by_id: int = Field(description="The id of the SAAS Admin creating the store")
+
+    @field_validator("unique_indentifier")
+    @classmethod
+    def validate_unique_indentifier(cls, value: str) -> str:
+        """Validates that the unique identifier is not a reserved schema name.
+
+        Args:
+            value (str): The unique identifier to validate.
+
+        Returns:
+            str: The unique identifier.
+
+        Raises:
+            ValueError: If the unique identifier is a reserved schema name.
+        """
+        if value in RESERVED_SCHEMA_NAMES or value.startswith("pg_"):
+            raise ValueError(f"{value} is a reserved name.")
+        return value
+
+
+class StoreStatus(BaseModel):
+    """Schema for the provisioning status of a store.
+
+    Attributes:
+        id (str): The unique identifier of the store.
+        status (int): The status of the store, see StoreStatusEnum.
+        status_name (str): The name of the status.
+    """
+
+    id: str = Field(description="The unique identifier of the store")
+    status: int = Field(description="The status of the store")
+    status_name: str = Field(description="The name of the status of the store")
+
+
+class StoreLocation(BaseModel):
+    """Schema for the country, state or city of a store.
+
+    Attributes:
+        id (int): The unique identifier of the country, state or city.
+        name (str): The name of the country, state or city.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(description="The unique identifier of the country, state or city")
+    name: str = Field(description="The name of the country, state or city")
+
+
+class ParentStore(BaseModel):
+    """Schema for the parent of a store.
+
+    Attributes:
+        id (str): The unique identifier of the parent store.
+        name (str): The name of the parent store.
+        unique_indentifier (str): The unique identifier of the parent store, also its schema.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str = Field(description="The unique identifier of the parent store")
+    name: str = Field(description="The name of the parent store")
+    unique_indentifier: str = Field(description="The unique identifier of the parent store")
+
+
+class StoreContact(BaseModel):
+    """Schema for the contact details of a store.
+
+    Attributes:
+        id (int): The unique identifier of the contact details.
+        email (str): The email address of the store.
+        is_email_verified (bool): Whether the email address is verified.
+        phone_country_code (str): The country code of the phone number.
+        phone_number (str): The phone number of the store.
+        is_phone_number_verified (bool): Whether the phone number is verified.
+        alternate_email (Optional[str]): The alternate email address of the store.
+        alternate_phone_country_code (Optional[str]): The country code of the alternate phone
+            number.
+        alternate_phone_number (Optional[str]): The alternate phone number of the store.
+        social_links (Optional[Dict[str, Any]]): The social media links of the store.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(description="The unique identifier of the contact details")
+    email: str = Field(description="The email address of the store")
+    is_email_verified: bool = Field(description="Whether the email address is verified")
+    phone_country_code: str = Field(description="The country code of the phone number")
+    phone_number: str = Field(description="The phone number of the store")
+    is_phone_number_verified: bool = Field(description="Whether the phone number is verified")
+    alternate_email: Optional[str] = Field(description="The alternate email address")
+    alternate_phone_country_code: Optional[str] = Field(
+        description="The country code of the alternate phone number"
+    )
+    alternate_phone_number: Optional[str] = Field(description="The alternate phone number")
+    social_links: Optional[Dict[str, Any]] = Field(description="The social media links")
+
+
+class StoreDetails(BaseModel):
+    """Schema for the details of a store.
+
+    Attributes:
+        id (int): The unique identifier of the store details.
+        country (StoreLocation): The country of the store.
+        state (StoreLocation): The state of the store.
+        city (StoreLocation): The city of the store.
+        parent_store (Optional[ParentStore]): The parent of the store.
+        description (Optional[str]): The description of the store.
+        slogan (Optional[str]): The slogan of the store.
+        address (str): The address of the store.
+        postal_code (str): The postal code of the store.
+        latitude (Optional[float]): The latitude of the store, in degrees.
+        longitude (Optional[float]): The longitude of the store, in degrees.
+        logo (str): The logo of the store.
+        cover_image (str): The cover image of the store.
+        gst (Optional[str]): The GST number of the store.
+        tin (Optional[str]): The TIN number of the store.
+        services (List[int]): The services of the store, see StoreServiceEnum.
+        sub_services (List[int]): The sub-services of the store, see StoreSubServiceEnum.
+        has_online_booking (Optional[bool]): Whether the store has online booking.
+        has_delivery_service (Optional[bool]): Whether the store has a delivery service.
+        has_parking_facility (Optional[bool]): Whether the store has a parking facility.
+        has_wifi_facility (Optional[bool]): Whether the store has a WiFi facility.
+        contact_details (List[StoreContact]): The contact details of the store.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(description="The unique identifier of the store details")
+    country: StoreLocation = Field(description="The country of the store")
+    state: StoreLocation = Field(description="The state of the store")
+    city: StoreLocation = Field(description="The city of the store")
+    parent_store: Optional[ParentStore] = Field(description="The parent of the store")
+    description: Optional[str] = Field(description="The description of the store")
+    slogan: Optional[str] = Field(description="The slogan of the store")
+    address: str = Field(description="The address of the store")
+    postal_code: str = Field(description="The postal code of the store")
+    latitude: Optional[float] = Field(description="The latitude of the store, in degrees")
+    longitude: Optional[float] = Field(description="The longitude of the store, in degrees")
+    logo: str = Field(description="The logo of the store")
+    cover_image: str = Field(
+        validation_alias="cover_iamge", description="The cover image of the store"
+    )
+    gst: Optional[str] = Field(description="The GST number of the store")
+    tin: Optional[str] = Field(description="The TIN number of the store")
+    services: List[int] = Field(description="The services of the store")
+    sub_services: List[int] = Field(description="The sub-services of the store")
+    has_online_booking: Optional[bool] = Field(description="Whether it has online booking")
+    has_delivery_service: Optional[bool] = Field(description="Whether it has a delivery service")
+    has_parking_facility: Optional[bool] = Field(description="Whether it has a parking facility")
+    has_wifi_facility: Optional[bool] = Field(description="Whether it has a WiFi facility")
+    contact_details: List[StoreContact] = Field(description="The contact details of the store")
+
+
+class ListStore(BaseModel):
+    """Schema for listing stores, with their details.
+
+    Attributes:
+        id (str): The unique identifier of the store.
+        name (str): The name of the store.
+        unique_indentifier (str): The unique identifier of the store, also its schema.
+        is_main_store (bool): Whether the store is the main store.
+        status (int): The status of the store, see StoreStatusEnum.
+        created_at (AwareDatetime): The created_at datetime of the store.
+        store_detail (Optional[StoreDetails]): The details of the store, once they are filled.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str = Field(description="The unique identifier of the store")
+    name: str = Field(description="The name of the store")
+    unique_indentifier: str = Field(description="The unique identifier of the store")
+    is_main_store: bool = Field(description="Whether the store is the main store")
+    status: int = Field(description="The status of the store")
+    created_at: AwareDatetime = Field(description="The created_at datetime of the store")
+    store_detail: Optional[StoreDetails] = Field(description="The details of the store")
+
+
+class NearbyStore(BaseModel):
+    """Schema for a store found near a point.
+
+    Attributes:
+        distance (float): The great-circle distance from the point to the store, in kilometers.
+        store (ListStore): The store, with its details.
+    """
+
+    distance: float = Field(description="The distance to the store, in kilometers")
+    store: ListStore = Field(description="The store, with its details")
+
+
+class StoreNode(BaseModel):
+    """Schema for a store in its chain.
+
+    Attributes:
+        id (str): The unique identifier of the store.
+        name (str): The name of the store.
+        unique_indentifier (str): The unique identifier of the store, also its schema.
+        status (int): The status of the store, see StoreStatusEnum.
+        path (str): The ids of the ancestors of the store and its own, from the root.
+        parent_store_id (Optional[str]): The id of the parent of the store, None for a root.
+        depth (int): The depth of the store in its chain, 0 for a root.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str = Field(description="The unique identifier of the store")
+    name: str = Field(description="The name of the store")
+    unique_indentifier: str = Field(description="The unique identifier of the store")
+    status: int = Field(description="The status of the store")
+    path: str = Field(description="The ids of the ancestors of the store and its own")
+
+    @computed_field(description="The id of the parent of the store, None for a root")
+    @property
+    def parent_store_id(self) -> Optional[str]:
+        """Optional[str]: The id of the parent of the store, None for a root."""
+        ancestors = self.path.split(PATH_SEPARATOR)[:-1]
+        return ancestors[-1] if ancestors else None
+
+    @computed_field(description="The depth of the store in its chain, 0 for a root")
+    @property
+    def depth(self) -> int:
+        """int: The depth of the store in its chain, 0 for a root."""
+        return self.path.count(PATH_SEPARATOR)
+
+
+class StoreSubtree(BaseModel):
+    """Schema for the summary of the descendants of a store.
+
+    Attributes:
+        id (str): The unique identifier of the store.
+        descendants (int): The number of descendants of the store.
+        depth (int): The number of levels below the store, 0 if it has no descendants.
+        statuses (Dict[str, int]): The number of descendants in every status, by status name.
+    """
+
+    id: str = Field(description="The unique identifier of the store")
+    descendants: int = Field(description="The number of descendants of the store")
+    depth: int = Field(description="The number of levels below the store")
+    statuses: Dict[str, int] = Field(description="The number of descendants by status name")
+
+
+class StoreParentRequest(BaseModel):
+    """Schema for moving a store under a parent.
+
+    Attributes:
+        parent_store_id (Optional[str]): The id of the new parent, None to make the store a root.
+    """
+
+    parent_store_id: Optional[str] = Field(description="The id of the new parent of the store")
+
+
+class ChainHolidayRequest(BaseModel):
+    """Schema for adding a holiday to a store and all its descendants.
+
+    Attributes:
+        date (date): The date of the holiday.
+        type (int): The type of the holiday, see HolidayType.
+        reason (str): The reason for the holiday. Must be between 3 and 255 characters long.
+        from_time (Optional[time]): The start of a partial closure.
+        to_time (Optional[time]): The end of a partial closure, after from_time.
+        created_by_id (Optional[int]): The id of the user adding the holiday.
+    """
+
+    date: datetime.date = Field(description="The date of the holiday")
+    type: Literal[*HolidayType.values()] = Field(description="The type of the holiday")
+    reason: str = Field(min_length=3, max_length=255, description="The reason for the holiday")
+    from_time: Optional[datetime.time] = Field(
+        default=None, description="The start of a partial closure"
+    )
+    to_time: Optional[datetime.time] = Field(
+        default=None, description="The end of a partial closure"
+    )
+    created_by_id: Optional[int] = Field(default=None, description="The id of the user")
+
+    @model_validator(mode="after")
+    def validate_times(self) -> "ChainHolidayRequest":
+        """Validates that a partial closure has both times, the end after the start.
+
+        Returns:
+            ChainHolidayRequest: The request.
+
+        Raises:
+            ValueError: If only one time is given, or the end is not after the start.
+        """
+        if (self.from_time is None) != (self.to_time is None):
+            raise ValueError("from_time and to_time must be given together.")
+        if self.from_time is not None and self.to_time <= self.from_time:
+            raise ValueError("to_time must be after from_time.")
+        return self
+
+
+class ChainHolidayResult(BaseModel):
+    """Schema for the result of adding a holiday to a chain of stores.
+
+    Attributes:
+        stores (int): The number of stores the holiday was added to.
+    """
+
+    stores: int = Field(description="The number of stores the holiday was added to")
+
+
+class Closure(BaseModel):
+    """Schema for a closure of a store, by one or more holidays.
+
+    Attributes:
+        start (NaiveDatetime): The start of the closure, in the local time of the store.
+        end (NaiveDatetime): The end of the closure, excluded, in the local time of the store.
+    """
+
+    start: NaiveDatetime = Field(description="The start of the closure, in local time")
+    end: NaiveDatetime = Field(description="The end of the closure, excluded, in local time")
+
+
+class StoreClosures(BaseModel):
+    """Schema for the closures of a store.
+
+    Attributes:
+        store_id (str): The unique identifier of the store.
+        closures (List[Closure]): The closures of the store, sorted.
+    """
+
+    store_id: str = Field(description="The unique identifier of the store")
+    closures: List[Closure] = Field(description="The closures of the store, sorted")
+
+
+class StoreCalendarRequest(BaseModel):
+    """Schema for reading the calendars of stores over a range of dates.
+
+    Attributes:
+        store_ids (List[str]): The ids of the stores, at most MAX_CALENDAR_STORES.
+        start_date (date): The first day of the range.
+        end_date (date): The last day of the range, included, at most MAX_CALENDAR_DAYS days
+            after the first.
+    """
+
+    store_ids: List[str] = Field(
+        min_length=1, max_length=MAX_CALENDAR_STORES, description="The ids of the stores"
+    )
+    start_date: datetime.date = Field(description="The first day of the range")
+    end_date: datetime.date = Field(description="The last day of the range, included")
+
+    @model_validator(mode="after")
+    def validate_range(self) -> "StoreCalendarRequest":
+        """Validates that the range ends after it starts, and is not too long.
+
+        Returns:
+            StoreCalendarRequest: The request.
+
+        Raises:
+            ValueError: If the range ends before it starts, or spans more than MAX_CALENDAR_DAYS
+                days.
+        """
+        if self.end_date < self.start_date:
+            raise ValueError("end_date must not be before start_date.")
+        if (self.end_date - self.start_date).days >= MAX_CALENDAR_DAYS:
+            raise ValueError(f"The range must not span more than {MAX_CALENDAR_DAYS} days.")
+        return self
+
+
+class ClosedStores(BaseModel):
+    """Schema for the stores closed during a day.
+
+    Attributes:
+        date (date): The day.
+        all_stores (List[Closure]): The closures of every store during the day, by public
+            holidays.
+        stores (List[StoreClosures]): The stores closed during the day by their own holidays,
+            with their closures.
+    """
+
+    date: datetime.date = Field(description="The day")
+    all_stores: List[Closure] = Field(description="The closures of every store during the day")
+    stores: List[StoreClosures] = Field(description="The stores closed by their own holidays")
+
+
+class StoreOpening(BaseModel):
+    """Schema for whether a store is open at a time.
+
+    Attributes:
+        store_id (str): The unique identifier of the store.
+        at (NaiveDatetime): The time, in the local time of the store.
+        is_open (bool): Whether the store is open, that is not closed by a holiday.
+        closure (Optional[Closure]): The closure including the time, if the store is closed.
+    """
+
+    store_id: str = Field(description="The unique identifier of the store")
+    at: NaiveDatetime = Field(description="The time, in the local time of the store")
+    is_open: bool = Field(description="Whether the store is open")
+    closure: Optional[Closure] = Field(description="The closure including the time, if any")
@@ -0,0 +1,410 @@
+"""Module for the opening calendar of the stores, compiled from their holidays.
+
+A holiday closes a store for a day, or between its ``from_time`` and ``to_time``, in the local
+time of the store. A ``PUBLIC_HOLIDAY`` closes every store, whatever the store it was recorded
+for. Rather than querying the holidays for every question, such as whether a store is open at a
+time or which stores are closed on a day, the holidays of a month are compiled once into closures:
+intervals of seconds since the start of the calendar, sorted and merged, kept apart for the
+public holidays and for each store, with the stores closed on each day. Whether a store is open is
+then a binary search in its closures and in the public ones.
+
+Each process keeps the compiled months it reads, the least recently used dropped past
+STORE_CALENDAR_MONTHS. Every month has a version in Redis, read for all the months of a request in
+one round trip, and incremented by ``invalidate`` when holidays of the month are added or
+changed, so every process compiles it again. Holidays written outside this application are
+picked up within STORE_CALENDAR_TTL seconds, the age after which a month is compiled again
+whatever its version, as it is on every read if Redis is unavailable.
+
+Usage:
+    calendar = await store_calendar.get(session, start, end)
+    closure = calendar.closure_at(store_id, at)
+    await store_calendar.invalidate([holiday_date])
+
+Classes:
+    CalendarMonth: The closures of every store during a month.
+    StoreCalendar: The closures of the stores over a range of dates.
+    StoreCalendarCache: Holds the compiled months of a process and keeps them up to date.
+
+Functions:
+    to_seconds: Returns the seconds since the start of the calendar of a date and time.
+    to_datetime: Returns the date and time of seconds since the start of the calendar.
+
+Attributes:
+    store_calendar: The store calendar cache of the process.
+"""
+
+import asyncio
+import datetime
+import time
+from bisect import bisect_right
+from collections import OrderedDict, defaultdict
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.apps.admin.models import Holiday
+from azra_store_lmi_api.apps.admin.models.holiday import HolidayType
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.config.redis import get_redis
+from azra_store_lmi_api.config.settings import settings
+
+VERSIONS_KEY = "store_calendar:versions"
+
+SECONDS_PER_DAY = 24 * 60 * 60
+
+# The start and end of a closure, in seconds since the start of the calendar, the end excluded.
+Interval = Tuple[int, int]
+
+# The store id, date, type, start and end time of a holiday.
+_HolidayRow = Tuple[str, datetime.date, int, Optional[datetime.time], Optional[datetime.time]]
+
+
+def to_seconds(value: datetime.datetime) -> int:
+    """Returns the seconds since the start of the calendar of a date and time.
+
+    Args:
+        value (datetime.datetime): The date and time, in the local time of the store.
+
+    Returns:
+        int: The seconds since 0001-01-01 00:00.
+    """
+    return _day_start(value) + _time_seconds(value.time())
+
+
+def to_datetime(seconds: int) -> datetime.datetime:
+    """Returns the date and time of seconds since the start of the calendar.
+
+    Args:
+        seconds (int): The seconds since 0001-01-01 00:00.
+
+    Returns:
+        datetime.datetime: The date and time.
+    """
+    days, seconds = divmod(seconds, SECONDS_PER_DAY)
+    return datetime.datetime.fromordinal(days) + datetime.timedelta(seconds=seconds)
+
+
+def _day_start(day: datetime.date) -> int:
+    """Returns the seconds since the start of the calendar of the start of a day."""
+    return day.toordinal() * SECONDS_PER_DAY
+
+
+def _time_seconds(value: datetime.time) -> int:
+    """Returns the seconds since midnight of a time of the day."""
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+def _closure(
+    day: datetime.date, from_time: Optional[datetime.time], to_time: Optional[datetime.time]
+) -> Interval:
+    """Returns the closure of a holiday, the whole day unless it has a start or an end time."""
+    start = _day_start(day)
+    return (
+        start + (_time_seconds(from_time) if from_time else 0),
+        start + (_time_seconds(to_time) if to_time else SECONDS_PER_DAY),
+    )
+
+
+def _merge(intervals: Iterable[Interval]) -> List[Interval]:
+    """Returns intervals sorted, with the overlapping and adjacent ones merged."""
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _clip(intervals: Iterable[Interval], start: int, end: int) -> List[Interval]:
+    """Returns the parts of intervals between a start and an end."""
+    return [
+        (max(interval_start, start), min(interval_end, end))
+        for interval_start, interval_end in intervals
+        if interval_start < end and interval_end > start
+    ]
+
+
+def _month(day: datetime.date) -> datetime.date:
+    """Returns the first day of the month of a date."""
+    return day.replace(day=1)
+
+
+def _next_month(month: datetime.date) -> datetime.date:
+    """Returns the first day of the month after the month starting on a date."""
+    return (month + datetime.timedelta(days=32)).replace(day=1)
+
+
+def _months(start: datetime.date, end: datetime.date) -> List[datetime.date]:
+    """Returns the first day of the months between two dates, both included."""
+    months, month = [], _month(start)
+    while month <= end:
+        months.append(month)
+        month = _next_month(month)
+    return months
+
+
+class CalendarMonth:
+    """The closures of every store during a month, see the module docstring."""
+
+    __slots__ = ("month", "version", "compiled_at", "_public", "_stores", "_days")
+
+    def __init__(
+        self, month: datetime.date, version: Optional[int], holidays: Sequence[_HolidayRow]
+    ):
+        """Compile the holidays of a month.
+
+        Args:
+            month (datetime.date): The first day of the month.
+            version (Optional[int]): The version of the month the holidays were read for, None if
+                it is unknown.
+            holidays (Sequence[_HolidayRow]): The holidays of the month.
+        """
+        self.month = month
+        self.version = version
+        self.compiled_at = time.monotonic()
+        public: List[Interval] = []
+        stores: Dict[str, List[Interval]] = defaultdict(list)
+        for store_id, day, holiday_type, from_time, to_time in holidays:
+            closure = _closure(day, from_time, to_time)
+            if holiday_type == HolidayType.PUBLIC_HOLIDAY.value:
+                public.append(closure)
+            else:
+                stores[store_id].append(closure)
+        self._public = _merge(public)
+        self._stores = {store_id: _merge(closures) for store_id, closures in stores.items()}
+        # The stores closed on each day of the month, by their own holidays, by ordinal.
+        self._days: Dict[int, List[str]] = defaultdict(list)
+        for store_id, closures in self._stores.items():
+            for start, end in closures:
+                for day in range(start // SECONDS_PER_DAY, (end - 1) // SECONDS_PER_DAY + 1):
+                    if not self._days[day] or self._days[day][-1] != store_id:
+                        self._days[day].append(store_id)
+
+    @property
+    def public(self) -> List[Interval]:
+        """List[Interval]: The closures of every store, by public holidays."""
+        return self._public
+
+    def store(self, store_id: str) -> List[Interval]:
+        """Returns the closures of a store by its own holidays.
+
+        Args:
+            store_id (str): The id of the store.
+
+        Returns:
+            List[Interval]: The closures, sorted and merged.
+        """
+        return self._stores.get(store_id, [])
+
+    def closed_stores(self, day: datetime.date) -> List[str]:
+        """Returns the ids of the stores closed during a day by their own holidays.
+
+        Args:
+            day (datetime.date): A day of the month.
+
+        Returns:
+            List[str]: The ids of the stores.
+        """
+        return self._days.get(day.toordinal(), [])
+
+    def __len__(self) -> int:
+        """Returns the number of stores with holidays of their own during the month."""
+        return len(self._stores)
+
+
+class StoreCalendar:
+    """The closures of the stores over a range of dates, read from compiled months."""
+
+    __slots__ = ("start", "end", "_months")
+
+    def __init__(self, start: datetime.date, end: datetime.date, months: List[CalendarMonth]):
+        """Initialize the calendar.
+
+        Args:
+            start (datetime.date): The first day of the range.
+            end (datetime.date): The last day of the range, included.
+            months (List[CalendarMonth]): The compiled months of the range, in order.
+        """
+        self.start = start
+        self.end = end
+        self._months = months
+
+    def _bounds(self) -> Interval:
+        """Returns the start and end of the range, in seconds since the start of the calendar."""
+        return _day_start(self.start), _day_start(self.end) + SECONDS_PER_DAY
+
+    def public(self) -> List[Interval]:
+        """Returns the closures of every store during the range, by public holidays.
+
+        Returns:
+            List[Interval]: The closures, sorted and merged.
+        """
+        return _clip(_merge(c for month in self._months for c in month.public), *self._bounds())
+
+    def closures(self, store_id: str) -> List[Interval]:
+        """Returns the closures of a store during the range, by public and own holidays.
+
+        Args:
+            store_id (str): The id of the store.
+
+        Returns:
+            List[Interval]: The closures, sorted and merged.
+        """
+        return _clip(
+            _merge(
+                closure
+                for month in self._months
+                for closures in (month.public, month.store(store_id))
+                for closure in closures
+            ),
+            *self._bounds(),
+        )
+
+    def closure_at(self, store_id: str, at: datetime.datetime) -> Optional[Interval]:
+        """Returns the closure of a store at a time of the range, if it is closed.
+
+        Args:
+            store_id (str): The id of the store.
+            at (datetime.datetime): The time, in the local time of the store.
+
+        Returns:
+            Optional[Interval]: The closure including the time, None if the store is open.
+        """
+        second = to_seconds(at)
+        closures = self.closures(store_id)
+        index = bisect_right(closures, second, key=itemgetter(0))
+        return closures[index - 1] if index and closures[index - 1][1] > second else None
+
+    def closed_on(self, day: datetime.date) -> Dict[str, List[Interval]]:
+        """Returns the stores closed during a day by their own holidays, with their closures.
+
+        The closures of every store by public holidays are returned by ``public``.
+
+        Args:
+            day (datetime.date): A day of the range.
+
+        Returns:
+            Dict[str, List[Interval]]: The closures of the day, by store id.
+        """
+        start = _day_start(day)
+        closed: Dict[str, List[Interval]] = {}
+        for month in self._months:
+            if month.month == _month(day):
+                for store_id in month.closed_stores(day):
+                    closed[store_id] = _clip(month.store(store_id), start, start + SECONDS_PER_DAY)
+        return closed
+
+
+async def _get_versions(months: List[datetime.date]) -> List[Optional[int]]:
+    """Returns the versions of months, None for every month if Redis is unavailable."""
+    try:
+        versions = await get_redis().hmget(VERSIONS_KEY, [month.isoformat() for month in months])
+    except RedisError as exception:
+        logger.warning("Unable to read the store calendar versions: %s", exception)
+        return [None] * len(months)
+    return [int(version or 0) for version in versions]
+
+
+class StoreCalendarCache:
+    """Holds the compiled months of a process and keeps them up to date."""
+
+    def __init__(self, ttl: Optional[float] = None, size: Optional[int] = None):
+        """Initialize an empty cache.
+
+        Args:
+            ttl (Optional[float]): Seconds after which a month is compiled again whatever its
+                version. Defaults to STORE_CALENDAR_TTL.
+            size (Optional[int]): The number of months kept. Defaults to STORE_CALENDAR_MONTHS.
+        """
+        self.ttl = ttl if ttl is not None else settings.STORE_CALENDAR_TTL
+        self.size = size if size is not None else settings.STORE_CALENDAR_MONTHS
+        self._months: OrderedDict[datetime.date, CalendarMonth] = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    def _current(self, month: datetime.date, version: Optional[int]) -> Optional[CalendarMonth]:
+        """Returns the compiled month if it has the given version and is not too old."""
+        compiled = self._months.get(month)
+        if (
+            compiled is None
+            or version is None
+            or compiled.version != version
+            or time.monotonic() - compiled.compiled_at > self.ttl
+        ):
+            return None
+        self._months.move_to_end(month)
+        return compiled
+
+    async def get(
+        self, session: AsyncSession, start: datetime.date, end: datetime.date
+    ) -> StoreCalendar:
+        """Returns the calendar of a range of dates, compiling the months which are not current.
+
+        Args:
+            session (AsyncSession): The session used to read the holidays of a month.
+            start (datetime.date): The first day of the range.
+            end (datetime.date): The last day of the range, included.
+
+        Returns:
+            StoreCalendar: The calendar.
+        """
+        months = _months(start, end)
+        compiled = []
+        for month, version in zip(months, await _get_versions(months)):
+            calendar_month = self._current(month, version)
+            if calendar_month is None:
+                calendar_month = await self._compile(session, month, version)
+            compiled.append(calendar_month)
+        return StoreCalendar(start, end, compiled)
+
+    async def _compile(
+        self, session: AsyncSession, month: datetime.date, version: Optional[int]
+    ) -> CalendarMonth:
+        """Compile a month once per process, unless another request just did."""
+        async with self._lock:
+            calendar_month = self._current(month, version)
+            if calendar_month is not None:
+                return calendar_month
+            holidays = await session.execute(
+                select(
+                    Holiday.store_id,
+                    Holiday.date,
+                    Holiday.type,
+                    Holiday.from_time,
+                    Holiday.to_time,
+                ).where(Holiday.date >= month, Holiday.date < _next_month(month))
+            )
+            # Compiled in a thread, so requests are still served while a month is compiled.
+            calendar_month = await asyncio.to_thread(CalendarMonth, month, version, holidays.all())
+            if version is not None:
+                self._months[month] = calendar_month
+                self._months.move_to_end(month)
+                while len(self._months) > self.size:
+                    self._months.popitem(last=False)
+        return calendar_month
+
+    async def invalidate(self, dates: Iterable[datetime.date]) -> None:
+        """Invalidate the months of dates whose holidays were added or changed, in every process.
+
+        Call it once the transaction changing the holidays is committed.
+
+        Args:
+            dates (Iterable[datetime.date]): The dates of the holidays.
+        """
+        months = sorted({_month(day) for day in dates})
+        for month in months:
+            self._months.pop(month, None)
+        try:
+            async with get_redis().pipeline(transaction=False) as pipeline:
+                for month in months:
+                    pipeline.hincrby(VERSIONS_KEY, month.isoformat(), 1)
+                await pipeline.execute()
+        except RedisError as exception:
+            logger.warning("Unable to invalidate the store calendar: %s", exception)
+
+
+store_calendar = StoreCalendarCache()
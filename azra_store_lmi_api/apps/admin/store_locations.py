@@ -0,0 +1,347 @@
+"""Module for the in-process spatial index of the store locations.
+
+The nearby stores endpoint finds the stores closest to a point, within a radius or not, for every
+customer looking for a branch, so each process keeps the location of the active stores in memory
+as an immutable KD-tree, and searches it without a database round trip.
+
+Every location is stored as a point of the unit sphere, so the straight line distance between two
+points, the chord, grows with the great-circle distance between them, and the tree needs no
+special case for the poles or the antimeridian. The points are stored by column in arrays, sorted
+so that every node of the tree is a range of indexes whose median splits it on the axis of its
+largest spread. A search visits the nodes closest to the point first, and stops once the nodes
+left cannot hold a closer store than the ones found, so it reads a few dozen points out of tens
+of thousands. Services are filtered during the search, on bitmasks, see ``store_search``.
+
+Store details are not only written by this application, so the index is versioned by the number
+of stores with details and their last update, read from the database. Every process checks the
+version every STORE_LOCATIONS_REFRESH_INTERVAL seconds, and loads a new index in the background
+when it changed, while requests keep searching the previous one.
+
+Usage:
+    index = await store_locations.get(session)
+    nearest = index.nearest(latitude, longitude, limit=10, radius=5.0)
+
+Classes:
+    StoreDistance: A store found near a point, with its distance.
+    StoreLocationIndex: An immutable KD-tree of the store locations.
+    StoreLocationCache: Holds the index of a process and keeps it up to date.
+
+Attributes:
+    store_locations: The store location cache of the process.
+"""
+
+import asyncio
+import heapq
+import math
+from array import array
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.apps.admin.models import Store, StoreDetail
+from azra_store_lmi_api.apps.admin.models.store import StoreStatusEnum
+from azra_store_lmi_api.apps.admin.store_search import ServiceMatcher, service_mask
+from azra_store_lmi_api.config.database import get_db_context
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.config.settings import settings
+
+# The mean radius of the Earth, in kilometers.
+EARTH_RADIUS = 6371.0088
+
+# The number of points under which a node of the tree is not split, and is read point by point.
+_LEAF_SIZE = 8
+
+# The id, latitude, longitude, services and sub-services of an indexed store.
+_StoreRow = Tuple[str, float, float, Sequence[int], Sequence[int]]
+
+
+class StoreDistance(NamedTuple):
+    """A store found near a point.
+
+    Attributes:
+        store_id (str): The id of the store.
+        distance (float): The great-circle distance from the point to the store, in kilometers.
+    """
+
+    store_id: str
+    distance: float
+
+
+def _to_point(latitude: float, longitude: float) -> Tuple[float, float, float]:
+    """Returns the point of the unit sphere at a latitude and longitude, in degrees."""
+    latitude, longitude = math.radians(latitude), math.radians(longitude)
+    cos_latitude = math.cos(latitude)
+    return (
+        cos_latitude * math.cos(longitude),
+        cos_latitude * math.sin(longitude),
+        math.sin(latitude),
+    )
+
+
+def _squared_chord(distance: float) -> float:
+    """Returns the squared chord between two points at a great-circle distance, in kilometers."""
+    return (2 * math.sin(min(distance / EARTH_RADIUS, math.pi) / 2)) ** 2
+
+
+def _distance(squared_chord: float) -> float:
+    """Returns the great-circle distance, in kilometers, between two points at a squared chord."""
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(squared_chord) / 2))
+
+
+class StoreLocationIndex:
+    """An immutable KD-tree of the store locations, see the module docstring."""
+
+    __slots__ = ("version", "_ids", "_coordinates", "_axes", "_services", "_sub_services")
+
+    def __init__(self, version: str, stores: Sequence[_StoreRow]):
+        """Build the index.
+
+        Args:
+            version (str): The version token the index was loaded for.
+            stores (Sequence[_StoreRow]): The id, latitude, longitude, services and sub-services
+                of the stores.
+        """
+        self.version = version
+        points = [_to_point(latitude, longitude) for _, latitude, longitude, _, _ in stores]
+        columns = tuple(list(column) for column in zip(*points)) or ([], [], [])
+        order = list(range(len(stores)))
+        self._axes = bytearray(len(stores))
+        nodes = [(0, len(stores))]
+        while nodes:
+            low, high = nodes.pop()
+            if high - low <= _LEAF_SIZE:
+                continue
+            indexes = order[low:high]
+            spreads = []
+            for column in columns:
+                values = [column[index] for index in indexes]
+                spreads.append(max(values) - min(values))
+            axis = spreads.index(max(spreads))
+            order[low:high] = sorted(indexes, key=columns[axis].__getitem__)
+            middle = (low + high) // 2
+            self._axes[middle] = axis
+            nodes.append((low, middle))
+            nodes.append((middle + 1, high))
+        self._ids = tuple(stores[index][0] for index in order)
+        self._coordinates = tuple(
+            array("d", (column[index] for index in order)) for column in columns
+        )
+        self._services = array("q", (service_mask(stores[index][3]) for index in order))
+        self._sub_services = array(
+            "q", (service_mask(stores[index][4], sub_services=True) for index in order)
+        )
+
+    def __len__(self) -> int:
+        """Returns the number of stores."""
+        return len(self._ids)
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        limit: int,
+        radius: Optional[float] = None,
+        matcher: Optional[ServiceMatcher] = None,
+    ) -> List[StoreDistance]:
+        """Returns the stores nearest to a point, nearest first.
+
+        Args:
+            latitude (float): The latitude of the point, in degrees.
+            longitude (float): The longitude of the point, in degrees.
+            limit (int): The maximum number of stores to return.
+            radius (Optional[float]): The maximum distance of the stores, in kilometers.
+                Defaults to no maximum.
+            matcher (Optional[ServiceMatcher]): Only the stores matching it, see
+                ``store_search.service_matcher``.
+
+        Returns:
+            List[StoreDistance]: The stores, by distance then id.
+        """
+        xs, ys, zs = self._coordinates
+        query = _to_point(latitude, longitude)
+        query_x, query_y, query_z = query
+        # Every squared chord is at most 4, the squared diameter of the unit sphere.
+        maximum = 4.0 if radius is None else _squared_chord(radius)
+        # A max-heap of the nearest stores found, by negated squared chord.
+        found: List[Tuple[float, int]] = []
+        # A min-heap of the nodes to visit, by lower bound of the squared chord of their points.
+        nodes = [(0.0, 0, len(self._ids))]
+        while nodes:
+            bound, low, high = heapq.heappop(nodes)
+            if bound > maximum:
+                break
+            if high - low <= _LEAF_SIZE:
+                candidates = range(low, high)
+            else:
+                middle = (low + high) // 2
+                candidates = (middle,)
+                axis = self._axes[middle]
+                difference = query[axis] - self._coordinates[axis][middle]
+                near, far = (
+                    ((low, middle), (middle + 1, high))
+                    if difference < 0
+                    else ((middle + 1, high), (low, middle))
+                )
+                heapq.heappush(nodes, (bound, *near))
+                far_bound = max(bound, difference * difference)
+                if far_bound <= maximum:
+                    heapq.heappush(nodes, (far_bound, *far))
+            for index in candidates:
+                squared_chord = (
+                    (xs[index] - query_x) ** 2
+                    + (ys[index] - query_y) ** 2
+                    + (zs[index] - query_z) ** 2
+                )
+                if squared_chord > maximum or (
+                    matcher is not None
+                    and not matcher(self._services[index], self._sub_services[index])
+                ):
+                    continue
+                heapq.heappush(found, (-squared_chord, index))
+                if len(found) > limit:
+                    heapq.heappop(found)
+                if len(found) == limit:
+                    maximum = min(maximum, -found[0][0])
+        return sorted(
+            (StoreDistance(self._ids[index], _distance(-negated)) for negated, index in found),
+            key=lambda store: (store.distance, store.store_id),
+        )
+
+    @classmethod
+    async def load(cls, session: AsyncSession, version: str) -> "StoreLocationIndex":
+        """Load the index of the active stores with a location.
+
+        Args:
+            session (AsyncSession): The database session.
+            version (str): The version token read before loading.
+
+        Returns:
+            StoreLocationIndex: The index.
+        """
+        stores = await session.execute(
+            select(
+                Store.id,
+                StoreDetail.latitude,
+                StoreDetail.longitude,
+                StoreDetail.services,
+                StoreDetail.sub_services,
+            )
+            .join(StoreDetail, StoreDetail.store_id == Store.id)
+            .where(
+                Store.status == StoreStatusEnum.ACTIVE.value,
+                StoreDetail.latitude.is_not(None),
+                StoreDetail.longitude.is_not(None),
+            )
+        )
+        # Built in a thread, so requests are still served while a new index is loaded.
+        return await asyncio.to_thread(cls, version, stores.all())
+
+
+async def _get_version(session: AsyncSession) -> str:
+    """Returns the version token of the store locations: the number of stores with details, and
+    the last update of the stores and their details."""
+    count, updated_at = (
+        await session.execute(
+            select(
+                func.count(),
+                func.max(func.greatest(Store.updated_at, StoreDetail.updated_at)),
+            ).join(StoreDetail, StoreDetail.store_id == Store.id)
+        )
+    ).one()
+    return f"{count}:{updated_at.isoformat() if updated_at else ''}"
+
+
+class StoreLocationCache:
+    """Holds the store location index of a process and keeps it up to date."""
+
+    def __init__(self):
+        """Initialize an empty cache, loaded on first use or by ``start``."""
+        self._index: Optional[StoreLocationIndex] = None
+        self._lock = asyncio.Lock()
+        self._refresher: Optional[asyncio.Task] = None
+
+    @property
+    def index(self) -> Optional[StoreLocationIndex]:
+        """Optional[StoreLocationIndex]: The current index, None until it is loaded."""
+        return self._index
+
+    async def get(self, session: Optional[AsyncSession] = None) -> StoreLocationIndex:
+        """Returns the current index, loading it on first use.
+
+        Args:
+            session (Optional[AsyncSession]): The session used if the index must be loaded.
+                Defaults to a new session.
+
+        Returns:
+            StoreLocationIndex: The index.
+        """
+        index = self._index
+        if index is None:
+            index = await self.reload(session, only_if_stale=True)
+        return index
+
+    async def reload(
+        self, session: Optional[AsyncSession] = None, only_if_stale: bool = False
+    ) -> StoreLocationIndex:
+        """Load a new index and swap it in.
+
+        Args:
+            session (Optional[AsyncSession]): The session to load with. Defaults to a new session.
+            only_if_stale (bool): Whether to keep the index if it has the current version.
+
+        Returns:
+            StoreLocationIndex: The current index.
+        """
+        async with self._lock:
+            if session is None:
+                async with get_db_context() as session:
+                    index = await self._load(session, only_if_stale)
+            else:
+                index = await self._load(session, only_if_stale)
+        return index
+
+    async def _load(self, session: AsyncSession, only_if_stale: bool) -> StoreLocationIndex:
+        """Load a new index with a session unless it is current, and swap it in."""
+        version = await _get_version(session)
+        if only_if_stale and self._index and self._index.version == version:
+            return self._index
+        self._index = await StoreLocationIndex.load(session, version)
+        logger.info("Loaded store locations version %s: %s stores.", version, len(self._index))
+        return self._index
+
+    async def _refresh(self) -> None:
+        """Reload the index whenever its version changes, until cancelled."""
+        while True:
+            await asyncio.sleep(settings.STORE_LOCATIONS_REFRESH_INTERVAL)
+            try:
+                await self.reload(only_if_stale=True)
+            except Exception as exception:
+                logger.exception(
+                    "Error occurred while reloading the store locations: %s", exception
+                )
+
+    async def start(self) -> None:
+        """Load the index and start refreshing it.
+
+        If the index cannot be loaded, it is loaded on first use instead.
+        """
+        try:
+            await self.reload()
+        except Exception as exception:
+            logger.exception("Error occurred while loading the store locations: %s", exception)
+        if self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh())
+
+    async def stop(self) -> None:
+        """Stop refreshing the index."""
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+
+
+store_locations = StoreLocationCache()
@@ -0,0 +1,126 @@
+"""Module for filtering the stores by the services they offer.
+
+The services and sub-services of a store are ``ARRAY(Integer)`` columns of its details, holding
+``StoreServiceEnum`` and ``StoreSubServiceEnum`` values, each with a GIN index. A filter matches
+the stores offering all the requested values with the containment operator ``@>``, or any of them
+with the overlap operator ``&&``. Both are answered from the GIN index, which maps every value to
+the stores offering it, instead of unnesting the arrays of every store. A store offering
+``StoreServiceEnum.ALL`` matches any service filter.
+
+Stores held in memory, such as by the spatial index of ``store_locations``, are matched with the
+same rules by ``service_matcher``, on bitmasks of their services with one bit per enum member.
+
+Functions:
+    service_filters: Returns the conditions on the store details matching the requested services.
+    service_mask: Returns the bitmask of services or sub-services.
+    service_matcher: Returns a predicate on the bitmasks of a store matching the requested
+        services.
+"""
+
+from typing import Callable, Iterable, List, Optional, Sequence
+
+from sqlalchemy import ColumnElement, or_
+
+from azra_store_lmi_api.apps.admin.models import StoreDetail
+from azra_store_lmi_api.apps.admin.models.store import StoreServiceEnum, StoreSubServiceEnum
+
+# The bit of every service and sub-service in a bitmask, by value.
+_SERVICE_BITS = {value: 1 << bit for bit, value in enumerate(StoreServiceEnum.values())}
+_SUB_SERVICE_BITS = {value: 1 << bit for bit, value in enumerate(StoreSubServiceEnum.values())}
+
+# Whether a store matches, given the bitmasks of its services and of its sub-services.
+ServiceMatcher = Callable[[int, int], bool]
+
+
+def service_filters(
+    services: Sequence[int], sub_services: Sequence[int], match_all: bool = True
+) -> List[ColumnElement[bool]]:
+    """Returns the conditions on the store details matching the requested services.
+
+    Args:
+        services (Sequence[int]): The requested services, see StoreServiceEnum.
+        sub_services (Sequence[int]): The requested sub-services, see StoreSubServiceEnum.
+        match_all (bool): Whether a store must offer all the requested services and all the
+            requested sub-services, or at least one of each.
+
+    Returns:
+        List[ColumnElement[bool]]: The conditions on ``StoreDetail``, none if nothing is
+        requested.
+    """
+    conditions = []
+    every_service = [StoreServiceEnum.ALL.value]
+    if services:
+        services = sorted(set(services))
+        if match_all:
+            conditions.append(
+                or_(
+                    StoreDetail.services.contains(services),
+                    StoreDetail.services.contains(every_service),
+                )
+            )
+        else:
+            conditions.append(StoreDetail.services.overlap(services + every_service))
+    if sub_services:
+        sub_services = sorted(set(sub_services))
+        conditions.append(
+            StoreDetail.sub_services.contains(sub_services)
+            if match_all
+            else StoreDetail.sub_services.overlap(sub_services)
+        )
+    return conditions
+
+
+def service_mask(values: Iterable[int], sub_services: bool = False) -> int:
+    """Returns the bitmask of services or sub-services, ignoring unknown values.
+
+    Args:
+        values (Iterable[int]): The services, see StoreServiceEnum, or the sub-services, see
+            StoreSubServiceEnum.
+        sub_services (bool): Whether the values are sub-services.
+
+    Returns:
+        int: The bitmask, with the bit of every value set.
+    """
+    bits = _SUB_SERVICE_BITS if sub_services else _SERVICE_BITS
+    mask = 0
+    for value in values:
+        mask |= bits.get(value, 0)
+    return mask
+
+
+def service_matcher(
+    services: Sequence[int], sub_services: Sequence[int], match_all: bool = True
+) -> Optional[ServiceMatcher]:
+    """Returns a predicate on the bitmasks of a store, matching as ``service_filters`` does.
+
+    Args:
+        services (Sequence[int]): The requested services, see StoreServiceEnum.
+        sub_services (Sequence[int]): The requested sub-services, see StoreSubServiceEnum.
+        match_all (bool): Whether a store must offer all the requested services and all the
+            requested sub-services, or at least one of each.
+
+    Returns:
+        Optional[ServiceMatcher]: The predicate, called with the bitmasks of the services and of
+        the sub-services of a store, see ``service_mask``. None if nothing is requested.
+    """
+    if not services and not sub_services:
+        return None
+    every_service = _SERVICE_BITS[StoreServiceEnum.ALL.value]
+    requested = service_mask(services)
+    requested_sub = service_mask(sub_services, sub_services=True)
+    if match_all:
+
+        def matches(mask: int, sub_mask: int) -> bool:
+            return (mask & requested == requested or bool(mask & every_service)) and (
+                sub_mask & requested_sub == requested_sub
+            )
+
+    else:
+        any_service = requested | every_service
+
+        def matches(mask: int, sub_mask: int) -> bool:
+            return (not requested or bool(mask & any_service)) and (
+                not requested_sub or bool(sub_mask & requested_sub)
+            )
+
+    return matches
@@ -0,0 +1,267 @@
+"""Module for the chains of stores, the trees formed by ``StoreDetail.parent_store_id``.
+
+Every store has a materialized path, ``Store.path``: the ids of its ancestors and its own, from
+the root of its chain, joined by ``PATH_SEPARATOR``. The descendants of a store are the stores
+whose path starts with its path and the separator, selected by one range scan of the
+``ix_stores_path`` index however deep the chain is, and its ancestors are the ids in its path,
+read by primary key. Chain-wide operations resolve their targets the same way, so pushing a
+holiday to every branch of a chain is one ``INSERT ... SELECT`` over the index.
+
+The paths are maintained by ``move_store``, which sets the parent of a store and rewrites the
+paths of its whole subtree with one update. A parent set any other way leaves the paths stale:
+``stale_paths`` recomputes every path from the parent ids with a recursive CTE and returns those
+which differ, and ``repair_paths`` rewrites them, see the ``check_store_tree`` command.
+
+Classes:
+    StoreTreeError: Raised when a store cannot be moved under a parent.
+    StalePath: A store whose path differs from the one computed from the parent ids.
+
+Functions:
+    in_subtree: Returns the condition selecting the stores of a subtree.
+    depth: Returns the SQL expression of the depth of a store in its chain.
+    ancestor_ids: Returns the ids of the ancestors of a store, from the root.
+    move_store: Sets the parent of a store and rewrites the paths of its subtree.
+    stale_paths: Returns the stores whose path differs from the one computed from the parent ids.
+    repair_paths: Rewrites the stale paths.
+    push_holiday: Adds a holiday to every store of a subtree.
+"""
+
+from datetime import date, time
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import (
+    CTE,
+    ColumnElement,
+    and_,
+    func,
+    insert,
+    literal,
+    or_,
+    select,
+    text,
+    update,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.apps.admin.models import Holiday, Store, StoreDetail
+from azra_store_lmi_api.apps.admin.models.store import PATH_SEPARATOR
+
+# Serializes the moves of stores, so two moves never rewrite the same subtree from stale paths.
+_MOVE_LOCK_KEY = "store_tree"
+
+
+class StoreTreeError(Exception):
+    """Raised when a store cannot be moved under a parent."""
+
+
+class StalePath(NamedTuple):
+    """A store whose path differs from the one computed from the parent ids.
+
+    Attributes:
+        store_id (str): The id of the store.
+        path (str): The path of the store.
+        expected_path (Optional[str]): The path computed from the parent ids, None if the store
+            is in, or under, a cycle of parents.
+    """
+
+    store_id: str
+    path: str
+    expected_path: Optional[str]
+
+
+def in_subtree(path: str, include_self: bool = False) -> ColumnElement[bool]:
+    """Returns the condition selecting the descendants of the store with the given path.
+
+    Args:
+        path (str): The path of the store.
+        include_self (bool): Whether the store itself is selected too.
+
+    Returns:
+        ColumnElement[bool]: The condition on ``Store.path``, which uses the ``ix_stores_path``
+        index.
+    """
+    condition = Store.path.like(f"{path}{PATH_SEPARATOR}%")
+    return or_(Store.path == path, condition) if include_self else condition
+
+
+def depth(path: ColumnElement[str] = Store.path) -> ColumnElement[int]:
+    """Returns the SQL expression of the depth of a store in its chain, 0 for a root.
+
+    Args:
+        path (ColumnElement[str]): The path of the store. Defaults to ``Store.path``.
+
+    Returns:
+        ColumnElement[int]: The number of separators in the path.
+    """
+    return func.length(path) - func.length(func.replace(path, PATH_SEPARATOR, ""))
+
+
+def ancestor_ids(path: str) -> List[str]:
+    """Returns the ids of the ancestors of a store, from the root of its chain.
+
+    Args:
+        path (str): The path of the store.
+
+    Returns:
+        List[str]: The ids of the ancestors, without the store.
+    """
+    return path.split(PATH_SEPARATOR)[:-1]
+
+
+async def move_store(session: AsyncSession, store_id: str, parent_store_id: Optional[str]) -> str:
+    """Set the parent of a store and rewrite the paths of its subtree.
+
+    Args:
+        session (AsyncSession): The database session, committed by the caller.
+        store_id (str): The id of the store, which must have its details.
+        parent_store_id (Optional[str]): The id of the new parent, None to make it a root.
+
+    Returns:
+        str: The new path of the store.
+
+    Raises:
+        StoreTreeError: If the store has no details, the parent does not exist, or the parent is
+            the store or one of its descendants.
+    """
+    await session.execute(
+        text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": _MOVE_LOCK_KEY}
+    )
+    path = await session.scalar(select(Store.path).where(Store.id == store_id))
+    if parent_store_id is None:
+        new_path = store_id
+    else:
+        parent_path = await session.scalar(select(Store.path).where(Store.id == parent_store_id))
+        if parent_path is None:
+            raise StoreTreeError("Parent store not found.")
+        if parent_path == path or parent_path.startswith(f"{path}{PATH_SEPARATOR}"):
+            raise StoreTreeError("A store cannot be moved under itself or its descendants.")
+        new_path = f"{parent_path}{PATH_SEPARATOR}{store_id}"
+    result = await session.execute(
+        update(StoreDetail)
+        .where(StoreDetail.store_id == store_id, StoreDetail.deleted_at.is_(None))
+        .values(parent_store_id=parent_store_id)
+    )
+    if result.rowcount == 0:
+        raise StoreTreeError("Store details not found.")
+    if new_path != path:
+        # The descendants keep the part of their path below the store.
+        await session.execute(
+            update(Store)
+            .where(in_subtree(path, include_self=True))
+            .values(path=literal(new_path) + func.substr(Store.path, len(path) + 1))
+            .execution_options(synchronize_session=False)
+        )
+    return new_path
+
+
+def _computed_paths() -> CTE:
+    """Returns the recursive CTE of the paths of the stores computed from the parent ids."""
+    detail_of_store = and_(StoreDetail.store_id == Store.id, StoreDetail.deleted_at.is_(None))
+    tree = (
+        select(Store.id.label("id"), Store.id.label("path"))
+        .outerjoin(StoreDetail, detail_of_store)
+        .where(StoreDetail.parent_store_id.is_(None))
+        .cte("tree", recursive=True)
+    )
+    return tree.union_all(
+        select(
+            StoreDetail.store_id,
+            tree.c.path.concat(PATH_SEPARATOR).concat(StoreDetail.store_id),
+        )
+        .join(tree, StoreDetail.parent_store_id == tree.c.id)
+        .where(StoreDetail.deleted_at.is_(None))
+    )
+
+
+async def stale_paths(session: AsyncSession) -> List[StalePath]:
+    """Returns the stores whose path differs from the one computed from the parent ids.
+
+    Args:
+        session (AsyncSession): The database session.
+
+    Returns:
+        List[StalePath]: The stale paths, soft deleted stores included.
+    """
+    tree = _computed_paths()
+    result = await session.execute(
+        select(Store.id, Store.path, tree.c.path)
+        .outerjoin(tree, tree.c.id == Store.id)
+        .where(Store.path.is_distinct_from(tree.c.path))
+        .order_by(Store.id)
+        .execution_options(include_deleted=True)
+    )
+    return [StalePath(*row) for row in result]
+
+
+async def repair_paths(session: AsyncSession) -> int:
+    """Rewrite the stale paths with the paths computed from the parent ids.
+
+    The stores in, or under, a cycle of parents have no computed path and are left unchanged.
+
+    Args:
+        session (AsyncSession): The database session, committed by the caller.
+
+    Returns:
+        int: The number of paths rewritten.
+    """
+    await session.execute(
+        text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": _MOVE_LOCK_KEY}
+    )
+    tree = _computed_paths()
+    result = await session.execute(
+        update(Store)
+        .where(Store.id == tree.c.id, Store.path.is_distinct_from(tree.c.path))
+        .values(path=tree.c.path)
+        .execution_options(synchronize_session=False, include_deleted=True)
+    )
+    return result.rowcount
+
+
+async def push_holiday(
+    session: AsyncSession,
+    path: str,
+    holiday_date: date,
+    holiday_type: int,
+    reason: str,
+    from_time: Optional[time] = None,
+    to_time: Optional[time] = None,
+    created_by_id: Optional[int] = None,
+) -> int:
+    """Add a holiday to the store with the given path and to all its descendants.
+
+    The stores are selected and the holidays inserted by one statement.
+
+    Args:
+        session (AsyncSession): The database session, committed by the caller.
+        path (str): The path of the store.
+        holiday_date (date): The date of the holiday.
+        holiday_type (int): The type of the holiday, see HolidayType.
+        reason (str): The reason for the holiday.
+        from_time (Optional[time]): The start of a partial closure.
+        to_time (Optional[time]): The end of a partial closure.
+        created_by_id (Optional[int]): The id of the user adding the holiday.
+
+    Returns:
+        int: The number of stores the holiday was added to.
+    """
+    values: Dict[str, Any] = {
+        "created_by_id": created_by_id,
+        "date": holiday_date,
+        "type": holiday_type,
+        "reason": reason,
+        "from_time": from_time,
+        "to_time": to_time,
+    }
+    columns = Holiday.__table__.c
+    result = await session.execute(
+        insert(Holiday)
+        .from_select(
+            ["store_id", *values],
+            select(
+                Store.id,
+                *(literal(value, type_=columns[name].type) for name, value in values.items()),
+            ).where(in_subtree(path, include_self=True), Store.deleted_at.is_(None)),
+        )
+        .returning(Holiday.store_id)
+    )
+    return len(result.all())
@@ -0,0 +1,63 @@
+"""This module contains the periodic maintenance jobs of the admin app."""
+
+import datetime
+
+from celery.schedules import crontab
+from sqlalchemy import func, update
+
+from azra_store_lmi_api.apps.admin.models import Store
+from azra_store_lmi_api.apps.admin.models.saas_admin import SAASAdmin
+from azra_store_lmi_api.apps.admin.models.store import StoreStatusEnum
+from azra_store_lmi_api.apps.admin.tasks.provisioning import enqueue_provisioning
+from azra_store_lmi_api.config.database import get_db_context
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.config.scheduler import periodic_job
+from azra_store_lmi_api.config.settings import settings
+
+
+@periodic_job(crontab(minute="*/15"))
+async def clear_expired_otps() -> int:
+    """Clear the OTPs of the SaaS admins which have expired.
+
+    Returns:
+        int: The number of SaaS admins whose OTP was cleared.
+    """
+    async with get_db_context() as session:
+        result = await session.execute(
+            update(SAASAdmin)
+            .where(SAASAdmin.opt_expire_at < func.now())
+            .values(otp=None, opt_expire_at=None)
+        )
+        await session.commit()
+    return result.rowcount
+
+
+@periodic_job(crontab(minute="*/5"))
+async def requeue_stuck_stores() -> int:
+    """Enqueue a new provisioning attempt for the stores stuck in CREATING.
+
+    The provisioning queue acknowledges a message before running it, so the attempt of a worker
+    which died is lost and its store stays in CREATING. A store not updated for
+    STORE_PROVISIONING_STUCK_AFTER seconds is provisioned again, and touched so the next runs wait
+    for the new attempt.
+
+    Returns:
+        int: The number of stores enqueued again.
+    """
+    stuck_after = datetime.timedelta(seconds=settings.STORE_PROVISIONING_STUCK_AFTER)
+    async with get_db_context() as session:
+        result = await session.execute(
+            update(Store)
+            .where(
+                Store.status == StoreStatusEnum.CREATING.value,
+                Store.updated_at < func.now() - stuck_after,
+            )
+            .values(updated_at=func.now())
+            .returning(Store.id)
+        )
+        store_ids = result.scalars().all()
+        for store_id in store_ids:
+            logger.warning("Store %s is stuck in CREATING, provisioning it again.", store_id)
+            await enqueue_provisioning(session, store_id)
+        await session.commit()
+    return len(store_ids)
@@ -0,0 +1,52 @@
+"""This module contains the task provisioning the schema of a new store.
+
+It is routed to the provisioning queue, see the queues module.
+"""
+
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.apps.admin import provisioning
+from azra_store_lmi_api.config.celery.decorator import async_task
+from azra_store_lmi_api.config.outbox import OutboxMessage, enqueue
+from azra_store_lmi_api.core.utils import ULIDGenerator
+
+
+@async_task(idempotent=True)
+async def provision_store(store_id: str) -> Optional[int]:
+    """Provision the schema of a new store, then flip it to ACTIVE or FAILED.
+
+    The task runs at most once per attempt, see ``enqueue_provisioning``, and does nothing if the
+    store is no longer being created, so a redelivered message does not provision it twice.
+
+    Args:
+        store_id (str): The id of the store, in the CREATING status.
+
+    Returns:
+        Optional[int]: The new status of the store, None if it was not being created.
+    """
+    status = await provisioning.provision(store_id)
+    return status.value if status else None
+
+
+async def enqueue_provisioning(session: AsyncSession, store_id: str) -> OutboxMessage:
+    """Add an attempt to provision a store to the outbox of the session's current transaction.
+
+    Every attempt has an idempotency key of its own, so a store which failed, or is stuck in
+    CREATING because the worker running its attempt died, is provisioned again by a new attempt,
+    while the message of an attempt delivered twice runs once.
+
+    Args:
+        session (AsyncSession): The session holding the store, in the CREATING status.
+        store_id (str): The id of the store.
+
+    Returns:
+        OutboxMessage: The outbox message added to the session.
+    """
+    return await enqueue(
+        session,
+        provision_store,
+        store_id,
+        idempotency_key=f"{store_id}:{ULIDGenerator.generate()}",
+    )
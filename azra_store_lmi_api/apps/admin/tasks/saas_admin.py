@@ -3,42 +3,65 @@
 It includes functions for sending credentials to SaaS administrators via email.
 """
 
+from sqlalchemy import select
+
+from azra_store_lmi_api.apps.admin.models.saas_admin import SAASAdmin
 from azra_store_lmi_api.config.celery.decorator import async_task
+from azra_store_lmi_api.config.database import get_db_context
 from azra_store_lmi_api.config.logger.app import logger
 from azra_store_lmi_api.config.mailer import EmailMessage
+from azra_store_lmi_api.config.mailer.exceptions import MailDeliveryError, MailRateLimitError
+from azra_store_lmi_api.core.utils import generate_password
 
 
-@async_task()
-async def send_saas_admin_credentials(username: str, email: str, password: str):
+@async_task(
+    defer_on=(MailRateLimitError,),
+    idempotent=True,
+    autoretry_for=(MailDeliveryError, OSError),
+    retry_backoff=True,
+    retry_backoff_max=600,
+    retry_jitter=True,
+    max_retries=5,
+)
+async def send_saas_admin_credentials(saas_admin_id: int):
     """Send SaaS admin credentials via email.
 
     This asynchronous function sends an email containing the credentials
     (username, email, and password) to a newly created SaaS admin.
 
+    The password is generated here and only its hash is saved before the email is sent, so the
+    plain text password is never stored, not even in the message of the task. Every attempt
+    sends a new password, and the last email delivered holds the valid one.
+
+    The task runs at most once for the same admin, so a redelivered message does not send the
+    credentials twice. Delivery errors are retried with exponential backoff, up to 5 times.
+
     Args:
-        username (str): The username of the SaaS admin.
-        email (str): The email address of the SaaS admin.
-        password (str): The password for the SaaS admin account.
+        saas_admin_id (int): The id of the SaaS admin.
 
     Raises:
-        Exception: If there's an error while sending the email.
+        MailRateLimitError: If the send rate budget is exhausted, the task is then deferred.
+        MailDeliveryError: If the mail server fails to deliver the email, the task is then retried.
 
     Returns:
         None
 
     Logs:
+        - Warning: When the SaaS admin no longer exists.
         - Info: When the credentials are successfully sent.
-        - Exception: When an error occurs while sending the credentials.
     """
-    try:
-        message = EmailMessage(to=[email], subject="SAAS Admin Credentials")
-        message.set_content(
-            "plain",
-            f"See your credentials \nusername: {username}\nemail: {email}\npassword: {password}",
-        )
-        await message.send()
-        logger.info("SAAS Admin credentials send successfully.")
-    except Exception as exception:
-        logger.exception(
-            "Error occurred while sending SAAS Admin creadetials: \n%s", str(exception)
-        )
+    async with get_db_context() as session:
+        saas_admin = await session.scalar(select(SAASAdmin).where(SAASAdmin.id == saas_admin_id))
+        if saas_admin is None:
+            logger.warning("SAAS Admin %s not found, credentials not sent.", saas_admin_id)
+            return
+        username, email, password = saas_admin.username, saas_admin.email, generate_password()
+        saas_admin.password = password
+        await session.commit()
+    message = EmailMessage(to=[email], subject="SAAS Admin Credentials")
+    message.set_template(
+        "saas_admin_credentials",
+        {"username": username, "email": email, "password": password},
+    )
+    await message.send()
+    logger.info("SAAS Admin credentials send successfully.")
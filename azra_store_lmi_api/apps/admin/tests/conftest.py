@@ -15,6 +15,9 @@ from azra_store_lmi_api.core.dependencies import get_db_session
 from main import admin_app
 from main import app as main_app
 
+# Responses are read from the database, not from a cache left by another test.
+settings.CACHE_ENABLED = False
+
 if sys.platform == "win32":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
@@ -1,11 +1,26 @@
-"""This module contains the factory class for generating mock data for the SAASAdmin model.
+"""This module contains the factory classes for generating mock data for the admin models.
 
 It uses the BaseFactory class and polyfactory library to create realistic test data.
 """
 
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple, Type
 
-from azra_store_lmi_api.apps.admin.models.saas_admin import SAASAdmin
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.apps.admin.models import (
+    City,
+    Country,
+    SAASAdmin,
+    State,
+    Store,
+    StoreContactDetail,
+    StoreDetail,
+)
+from azra_store_lmi_api.apps.admin.models.store import (
+    StoreServiceEnum,
+    StoreStatusEnum,
+    StoreSubServiceEnum,
+)
 from azra_store_lmi_api.base_factory import BaseFactory
 
 
@@ -36,3 +51,214 @@ class SAASAdminFactory(BaseFactory):
             "opt_expire_at": cls.faker.future_datetime(),
             "is_active": cls.faker.boolean(),
         }
+
+
+class CountryFactory(BaseFactory):
+    """Factory class for generating mock Country instances."""
+
+    model = Country
+
+    @classmethod
+    def generate_mock_data(cls) -> Dict[str, Any]:
+        """Generate mock data for the Country model using the shared Faker instance.
+
+        Returns:
+            Dict[str, Any]: A dictionary containing mock data for Country fields.
+        """
+        return {
+            "name": cls.faker.country()[:100],
+            "numeric_code": cls.faker.numerify("###"),
+            "phone_code": cls.faker.numerify("##"),
+            "capital": cls.faker.city(),
+            "currency": cls.faker.currency_code(),
+            "currency_name": cls.faker.currency_name()[:50],
+            "currency_symbol": cls.faker.currency_symbol()[:5],
+            "region": cls.faker.word(),
+            "region_id": cls.faker.random_int(1, 6),
+            "subregion": cls.faker.word(),
+            "subregion_id": cls.faker.random_int(1, 22),
+        }
+
+
+class StateFactory(BaseFactory):
+    """Factory class for generating mock State instances, of an existing country."""
+
+    model = State
+
+    @classmethod
+    def generate_mock_data(cls) -> Dict[str, Any]:
+        """Generate mock data for the State model using the shared Faker instance.
+
+        Returns:
+            Dict[str, Any]: A dictionary containing mock data for State fields.
+        """
+        return {
+            "name": cls.faker.state(),
+            "state_code": cls.faker.state_abbr(),
+            "type": "state",
+        }
+
+
+class CityFactory(BaseFactory):
+    """Factory class for generating mock City instances, of an existing state."""
+
+    model = City
+
+    @classmethod
+    def generate_mock_data(cls) -> Dict[str, Any]:
+        """Generate mock data for the City model using the shared Faker instance.
+
+        Returns:
+            Dict[str, Any]: A dictionary containing mock data for City fields.
+        """
+        return {"name": cls.faker.city()}
+
+
+class StoreFactory(BaseFactory):
+    """Factory class for generating mock Store instances, created by an existing SAAS Admin."""
+
+    model = Store
+
+    @classmethod
+    def generate_mock_data(cls) -> Dict[str, Any]:
+        """Generate mock data for the Store model using the shared Faker instance.
+
+        Returns:
+            Dict[str, Any]: A dictionary containing mock data for Store fields.
+        """
+        return {
+            "name": cls.faker.company(),
+            "unique_indentifier": f"store_{cls.faker.unique.lexify('??????????').lower()}",
+            "is_main_store": False,
+            "status": StoreStatusEnum.ACTIVE.value,
+        }
+
+
+class StoreDetailFactory(BaseFactory):
+    """Factory class for generating mock StoreDetail instances, of an existing store and city."""
+
+    model = StoreDetail
+
+    @classmethod
+    def generate_mock_data(cls) -> Dict[str, Any]:
+        """Generate mock data for the StoreDetail model using the shared Faker instance.
+
+        Returns:
+            Dict[str, Any]: A dictionary containing mock data for StoreDetail fields.
+        """
+        return {
+            "description": cls.faker.sentence(),
+            "slogan": cls.faker.catch_phrase()[:100],
+            "address": cls.faker.street_address(),
+            "postal_code": cls.faker.numerify("######"),
+            "logo": cls.faker.image_url(),
+            "cover_iamge": cls.faker.image_url(),
+            "gst": cls.faker.bothify("##?????####?#Z#").upper(),
+            "services": [StoreServiceEnum.LAUNDRY.value],
+            "sub_services": [StoreSubServiceEnum.WASHING.value, StoreSubServiceEnum.IRON.value],
+            "has_online_booking": cls.faker.boolean(),
+            "has_delivery_service": cls.faker.boolean(),
+        }
+
+
+class StoreContactDetailFactory(BaseFactory):
+    """Factory class for generating mock StoreContactDetail instances, of existing details."""
+
+    model = StoreContactDetail
+
+    @classmethod
+    def generate_mock_data(cls) -> Dict[str, Any]:
+        """Generate mock data for the StoreContactDetail model using the shared Faker instance.
+
+        Returns:
+            Dict[str, Any]: A dictionary containing mock data for StoreContactDetail fields.
+        """
+        return {
+            "email": cls.faker.email(),
+            "phone_country_code": "+91",
+            "phone_number": cls.faker.numerify("##########"),
+            "social_links": {"instagram": cls.faker.url()},
+        }
+
+
+async def create_id(factory: Type[BaseFactory], session: AsyncSession, **kwargs: Any) -> Any:
+    """Create an instance with a factory and return its id, before a later commit expires it.
+
+    Args:
+        factory (Type[BaseFactory]): The factory of the model.
+        session (AsyncSession): The database session.
+        **kwargs: The fields of the instance, overriding the generated ones.
+
+    Returns:
+        Any: The id of the instance.
+    """
+    instance = await factory.create_async(session=session, refreshable=True, **kwargs)
+    return instance.id
+
+
+async def create_location(session: AsyncSession) -> Tuple[int, int, int]:
+    """Create a country, a state and a city, and return their ids.
+
+    Args:
+        session (AsyncSession): The database session.
+
+    Returns:
+        Tuple[int, int, int]: The ids of the country, the state and the city.
+    """
+    country_id = await create_id(CountryFactory, session)
+    state_id = await create_id(StateFactory, session, country_id=country_id)
+    city_id = await create_id(CityFactory, session, state_id=state_id)
+    return country_id, state_id, city_id
+
+
+async def create_stores(
+    session: AsyncSession,
+    count: int = 1,
+    created_by_id: Optional[int] = None,
+    details: Optional[Dict[str, Any]] = None,
+    location: Optional[Tuple[int, int, int]] = None,
+    contact_details: int = 0,
+    **kwargs: Any,
+) -> List[str]:
+    """Create stores, with their details if any, and return their ids.
+
+    Args:
+        session (AsyncSession): The database session.
+        count (int): The number of stores.
+        created_by_id (Optional[int]): The id of the SAAS Admin creating the stores, a new one
+            if not given.
+        details (Optional[Dict[str, Any]]): The fields of the details of the stores, overriding
+            the generated ones, the stores have no details if not given.
+        location (Optional[Tuple[int, int, int]]): The ids of the country, the state and the city
+            of the details, a new location if not given.
+        contact_details (int): The number of contact details of every store.
+        **kwargs: The fields of the stores, overriding the generated ones.
+
+    Returns:
+        List[str]: The ids of the stores.
+    """
+    if created_by_id is None:
+        created_by_id = await create_id(SAASAdminFactory, session)
+    if details is not None and location is None:
+        location = await create_location(session)
+    store_ids = []
+    for _ in range(count):
+        store_id = await create_id(StoreFactory, session, created_by_id=created_by_id, **kwargs)
+        store_ids.append(store_id)
+        if details is None:
+            continue
+        country_id, state_id, city_id = location
+        store_detail_id = await create_id(
+            StoreDetailFactory,
+            session,
+            store_id=store_id,
+            country_id=country_id,
+            state_id=state_id,
+            city_id=city_id,
+            **details,
+        )
+        if contact_details:
+            await StoreContactDetailFactory.create_batch_async(
+                session=session, count=contact_details, store_detail_id=store_detail_id
+            )
+    return store_ids
@@ -0,0 +1,174 @@
+"""This module contains unit tests for the country, state and city endpoints.
+
+It includes tests for listing the countries, states and cities with pagination, sorting and
+filtering, for the city autocomplete from memory and from the database, as well as error handling.
+"""
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.apps.admin.models import Country
+from azra_store_lmi_api.apps.admin.reference_data import ReferenceData, reference_data
+from azra_store_lmi_api.apps.admin.tests.factory import (
+    CityFactory,
+    CountryFactory,
+    StateFactory,
+    create_id,
+)
+from azra_store_lmi_api.config.settings import settings
+
+
+@pytest.mark.asyncio
+async def test_list_countries_success(db_session: AsyncSession, async_client: AsyncClient):
+    """Test successful listing of countries with pagination and sorting."""
+    await CountryFactory.create_batch_async(session=db_session, count=3)
+    total_countries = await db_session.scalar(select(func.count(Country.id)))
+
+    response = await async_client.get("/countries?sort_by=id&order_by=desc&page=1&size=2")
+    assert response.status_code == status.HTTP_200_OK
+    response_content = response.json()
+    assert response_content["total"] == total_countries
+    assert len(response_content["items"]) == 2
+    ids = [item["id"] for item in response_content["items"]]
+    assert ids == sorted(ids, reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_list_states_by_country(db_session: AsyncSession, async_client: AsyncClient):
+    """Test that listing states of a country returns only its states, sorted by name."""
+    country_id = await create_id(CountryFactory, db_session)
+    other_country_id = await create_id(CountryFactory, db_session)
+    await create_id(StateFactory, db_session, country_id=other_country_id)
+    state_ids = {
+        await create_id(StateFactory, db_session, country_id=country_id, name=name)
+        for name in ("Kerala", "Goa")
+    }
+
+    response = await async_client.get(f"/states?country_id={country_id}")
+    assert response.status_code == status.HTTP_200_OK
+    response_content = response.json()
+    assert response_content["total"] == 2
+    assert [item["name"] for item in response_content["items"]] == ["Goa", "Kerala"]
+    assert {item["id"] for item in response_content["items"]} == state_ids
+
+
+@pytest.mark.asyncio
+async def test_list_cities_by_state_and_country(
+    db_session: AsyncSession, async_client: AsyncClient
+):
+    """Test that listing cities of a state or of a country returns only their cities."""
+    country_id = await create_id(CountryFactory, db_session)
+    state_id = await create_id(StateFactory, db_session, country_id=country_id)
+    other_state_id = await create_id(StateFactory, db_session, country_id=country_id)
+    foreign_state_id = await create_id(
+        StateFactory, db_session, country_id=await create_id(CountryFactory, db_session)
+    )
+    city_id = await create_id(CityFactory, db_session, state_id=state_id)
+    other_city_id = await create_id(CityFactory, db_session, state_id=other_state_id)
+    await create_id(CityFactory, db_session, state_id=foreign_state_id)
+
+    response = await async_client.get(f"/cities?state_id={state_id}")
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["id"] for item in response.json()["items"]] == [city_id]
+
+    response = await async_client.get(f"/cities?country_id={country_id}&sort_by=id")
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["id"] for item in response.json()["items"]] == [city_id, other_city_id]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("route", ["/countries", "/states", "/cities"])
+async def test_list_param_errors(async_client: AsyncClient, route: str):
+    """Test that listing with an invalid sort field or page size returns a 422 response."""
+    response = await async_client.get(f"{route}?sort_by=code&size=999")
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert {error["loc"][-1] for error in response.json()["detail"]} == {"sort_by", "size"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "route, detail",
+    [
+        ("/countries", "Unable to list countries, please try again later."),
+        ("/states", "Unable to list states, please try again later."),
+        ("/cities", "Unable to list cities, please try again later."),
+    ],
+)
+async def test_list_server_error(async_client: AsyncClient, mocker, route: str, detail: str):
+    """Test server error response when listing fails."""
+    await mocker("azra_store_lmi_api.apps.admin.views.geo.paginate", side_effect=Exception)
+    response = await async_client.get(route)
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert response.json() == {"detail": detail}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("in_memory", [True, False])
+async def test_autocomplete_cities(
+    db_session: AsyncSession, async_client: AsyncClient, monkeypatch, in_memory: bool
+):
+    """Test that the autocomplete folds case and accents and ranks name matches first."""
+    country_id = await create_id(CountryFactory, db_session)
+    state_id = await create_id(StateFactory, db_session, country_id=country_id)
+    other_state_id = await create_id(StateFactory, db_session, country_id=country_id)
+    city_ids = {
+        name: await create_id(CityFactory, db_session, state_id=state_id, name=name)
+        for name in ("Zürich-Nord", "Bad Zurzach", "Zug", "Zürich", "Basel")
+    }
+    await create_id(CityFactory, db_session, state_id=other_state_id, name="Zuoz")
+    if in_memory:
+        monkeypatch.setattr(
+            reference_data, "_snapshot", await ReferenceData.load(db_session, "test")
+        )
+    else:
+        monkeypatch.setattr(settings, "CITY_AUTOCOMPLETE_IN_MEMORY", False)
+
+    response = await async_client.get(
+        f"/cities/autocomplete?q=ZU&country_id={country_id}&state_id={state_id}"
+    )
+    assert response.status_code == status.HTTP_200_OK
+    response_content = response.json()
+    assert [item["name"] for item in response_content] == [
+        "Zug",
+        "Zürich",
+        "Zürich-Nord",
+        "Bad Zurzach",
+    ]
+    assert response_content[0]["id"] == city_ids["Zug"]
+    assert {(item["state_id"], item["country_id"]) for item in response_content} == {
+        (state_id, country_id)
+    }
+
+    response = await async_client.get(
+        f"/cities/autocomplete?q=zurich n&country_id={country_id}&limit=1"
+    )
+    assert [item["id"] for item in response.json()] == [city_ids["Zürich-Nord"]]
+
+    response = await async_client.get(f"/cities/autocomplete?q=zu&country_id={country_id}")
+    assert len(response.json()) == 5
+
+    response = await async_client.get(
+        f"/cities/autocomplete?q=zu&state_id={other_state_id}"
+        f"&country_id={await create_id(CountryFactory, db_session)}"
+    )
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_cities_param_errors(async_client: AsyncClient):
+    """Test that an empty query or a limit out of range returns a 422 response."""
+    response = await async_client.get("/cities/autocomplete?q=&limit=0")
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert {error["loc"][-1] for error in response.json()["detail"]} == {"q", "limit"}
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_cities_server_error(async_client: AsyncClient, mocker):
+    """Test server error response when searching fails."""
+    await mocker("azra_store_lmi_api.apps.admin.views.geo.search_cities", side_effect=Exception)
+    response = await async_client.get("/cities/autocomplete?q=zu")
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert response.json() == {"detail": "Unable to search cities, please try again later."}
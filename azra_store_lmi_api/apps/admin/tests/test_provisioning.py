@@ -0,0 +1,214 @@
+"""This module contains unit tests for the provisioning of store schemas.
+
+It includes tests for provisioning a store by replaying the migrations, for the FAILED status of a
+store whose provisioning failed, for replaying the migrations when the template cannot be cloned,
+for skipping a store no longer being created, for the idempotency key of every provisioning
+attempt, and for enqueueing the stores stuck in CREATING again.
+"""
+
+import datetime
+import inspect
+import uuid
+from typing import List, Tuple
+
+import pytest
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.apps.admin import provisioning
+from azra_store_lmi_api.apps.admin.models import Store
+from azra_store_lmi_api.apps.admin.models.store import StoreStatusEnum
+from azra_store_lmi_api.apps.admin.tasks.maintenance import requeue_stuck_stores
+from azra_store_lmi_api.apps.admin.tasks.provisioning import (
+    enqueue_provisioning,
+    provision_store,
+)
+from azra_store_lmi_api.apps.admin.tests.factory import create_stores
+from azra_store_lmi_api.config.celery.idempotency import IDEMPOTENCY_HEADER
+from azra_store_lmi_api.config.outbox import OutboxMessage
+from azra_store_lmi_api.config.settings import settings
+from azra_store_lmi_api.config.tenancy import Tenant, TenantStatusEnum, register_tenant
+
+
+async def _create_store(
+    db_session: AsyncSession, status: StoreStatusEnum = StoreStatusEnum.CREATING
+) -> Tuple[str, str]:
+    """Create a store with its tenant, and return its id and the name of its schema."""
+    (store_id,) = await create_stores(db_session, status=status.value)
+    schema = await db_session.scalar(select(Store.unique_indentifier).where(Store.id == store_id))
+    register_tenant(db_session, store_id, schema)
+    await db_session.commit()
+    return store_id, schema
+
+
+async def _statuses(db_session: AsyncSession, store_id: str) -> Tuple[int, int]:
+    """Returns the status of a store and the status of its tenant."""
+    row = await db_session.execute(
+        select(Store.status, Tenant.status)
+        .join(Tenant, Tenant.store_id == Store.id)
+        .where(Store.id == store_id)
+    )
+    return tuple(row.one())
+
+
+@pytest.fixture
+def migrations(monkeypatch) -> List[str]:
+    """Replay the migrations instead of cloning the template, and record the migrated schemas."""
+    migrated = []
+
+    async def clone_template(session, schema):
+        return False
+
+    async def migrate_schema(schema):
+        migrated.append(schema)
+
+    monkeypatch.setattr(provisioning, "clone_template", clone_template)
+    monkeypatch.setattr(provisioning, "migrate_schema", migrate_schema)
+    return migrated
+
+
+@pytest.mark.asyncio
+async def test_provision(db_session: AsyncSession, db_context, migrations, monkeypatch):
+    """Test that a store is provisioned by creating and migrating its schema, then seeding it,
+    and that the store and its tenant are flipped to ACTIVE."""
+    store_id, schema = await _create_store(db_session)
+    seeded = []
+
+    async def seeder(session, store):
+        seeded.append((store.id, await session.scalar(text("SELECT current_schema()"))))
+
+    monkeypatch.setattr(provisioning, "tenant_seeders", [seeder])
+    try:
+        assert await provisioning.provision(store_id) == StoreStatusEnum.ACTIVE
+        assert await db_session.scalar(
+            text("SELECT to_regnamespace(:schema)"), {"schema": f'"{schema}"'}
+        )
+    finally:
+        await db_session.execute(text(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE'))
+        await db_session.commit()
+
+    assert migrations == [schema]
+    assert seeded == [(store_id, schema)]
+    assert await _statuses(db_session, store_id) == (
+        StoreStatusEnum.ACTIVE.value,
+        TenantStatusEnum.ACTIVE.value,
+    )
+
+
+@pytest.mark.asyncio
+async def test_provision_failed(db_session: AsyncSession, db_context, migrations, monkeypatch):
+    """Test that a store whose migrations fail is flipped to FAILED with its tenant, and that it
+    is provisioned again once set back to CREATING."""
+    store_id, schema = await _create_store(db_session)
+    failures = [provisioning.ProvisioningError(f"The migrations of {schema} timed out.")]
+
+    async def migrate_schema(schema):
+        if failures:
+            raise failures.pop()
+
+    monkeypatch.setattr(provisioning, "migrate_schema", migrate_schema)
+    try:
+        assert await provisioning.provision(store_id) == StoreStatusEnum.FAILED
+        assert await _statuses(db_session, store_id) == (
+            StoreStatusEnum.FAILED.value,
+            TenantStatusEnum.FAILED.value,
+        )
+
+        await db_session.execute(
+            update(Store).where(Store.id == store_id).values(status=StoreStatusEnum.CREATING.value)
+        )
+        await db_session.commit()
+        assert await provisioning.provision(store_id) == StoreStatusEnum.ACTIVE
+    finally:
+        await db_session.execute(text(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE'))
+        await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_clone_template_unsupported(db_session: AsyncSession, monkeypatch):
+    """Test that a template at head holding an object which cannot be cloned is not cloned, and
+    that the session is left as it was, so the migrations are replayed instead."""
+    template, schema = (f"template_{uuid.uuid4().hex[:8]}", f"store_{uuid.uuid4().hex[:8]}")
+    await db_session.execute(text(f'CREATE SCHEMA "{template}"'))
+    await db_session.execute(
+        text(f'CREATE TABLE "{template}".alembic_version (version_num varchar(32) NOT NULL)')
+    )
+    await db_session.execute(text(f"INSERT INTO \"{template}\".alembic_version VALUES ('0001')"))
+    await db_session.execute(text(f'CREATE DOMAIN "{template}".positive AS integer'))
+    await db_session.commit()
+    monkeypatch.setattr(settings, "TENANT_TEMPLATE_SCHEMA", template)
+    monkeypatch.setattr(provisioning, "head_revision", lambda: "0001")
+    try:
+        search_path = await db_session.scalar(text("SELECT current_setting('search_path')"))
+        assert await provisioning.clone_template(db_session, schema) is False
+        assert await db_session.scalar(text("SELECT current_setting('search_path')")) == (
+            search_path
+        )
+        await provisioning.create_schema(db_session, schema)
+        await db_session.commit()
+        assert await db_session.scalar(
+            text("SELECT to_regnamespace(:schema)"), {"schema": f'"{schema}"'}
+        )
+    finally:
+        await db_session.rollback()
+        for name in (template, schema):
+            await db_session.execute(text(f'DROP SCHEMA IF EXISTS "{name}" CASCADE'))
+        await db_session.commit()
+
+
+@pytest.mark.asyncio
+async def test_provision_not_creating(db_session: AsyncSession, db_context, migrations):
+    """Test that a store no longer being created is not provisioned again."""
+    store_id, _ = await _create_store(db_session, StoreStatusEnum.ACTIVE)
+
+    assert await provisioning.provision(store_id) is None
+    assert await provisioning.provision("unknown") is None
+    assert migrations == []
+
+
+@pytest.mark.asyncio
+async def test_enqueue_provisioning(db_session: AsyncSession):
+    """Test that every provisioning attempt of a store has an idempotency key of its own, so a
+    failed attempt does not prevent the next one."""
+    store_id, _ = await _create_store(db_session)
+
+    first = await enqueue_provisioning(db_session, store_id)
+    second = await enqueue_provisioning(db_session, store_id)
+    await db_session.flush()
+
+    assert first.task_name == second.task_name == provision_store.name
+    assert first.args == second.args == [store_id]
+    keys = {message.options["headers"][IDEMPOTENCY_HEADER] for message in (first, second)}
+    assert len(keys) == 2
+    assert all(key.startswith(f"{store_id}:") for key in keys)
+    await db_session.rollback()
+
+
+@pytest.mark.asyncio
+async def test_requeue_stuck_stores(db_session: AsyncSession, db_context):
+    """Test that the stores in CREATING which were not updated for a while are enqueued again,
+    once, and that the stores still being provisioned and the other stores are not."""
+    stuck_id, _ = await _create_store(db_session)
+    recent_id, _ = await _create_store(db_session)
+    active_id, _ = await _create_store(db_session, StoreStatusEnum.ACTIVE)
+    long_ago = datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=1)
+    await db_session.execute(
+        update(Store).where(Store.id.in_([stuck_id, active_id])).values(updated_at=long_ago)
+    )
+    await db_session.commit()
+    run = inspect.unwrap(requeue_stuck_stores.run)
+
+    assert await run() >= 1
+    assert await run() == 0
+
+    enqueued = set(
+        await db_session.scalars(
+            select(OutboxMessage.args[0].astext).where(
+                OutboxMessage.task_name == provision_store.name,
+                OutboxMessage.args[0].astext.in_([stuck_id, recent_id, active_id]),
+            )
+        )
+    )
+    assert enqueued == {stuck_id}
+    updated_at = await db_session.scalar(select(Store.updated_at).where(Store.id == stuck_id))
+    assert updated_at > long_ago
@@ -0,0 +1,175 @@
+"""This module contains unit tests for the in-process cache of the countries, states and cities.
+
+It includes tests for the reference tables, loading a snapshot of the reference data, loading a
+new snapshot when a change is published, subscribing again and catching up with the changes
+missed after the connection to Redis is lost, and starting and stopping the listener with the
+application.
+"""
+
+import asyncio
+from typing import Callable, Dict
+
+import pytest
+from fakeredis import FakeAsyncRedis
+from redis.exceptions import ConnectionError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.apps.admin import reference_data as reference_data_module
+from azra_store_lmi_api.apps.admin.reference_data import (
+    VERSION_KEY,
+    ReferenceDataCache,
+    ReferenceTable,
+    StateRow,
+    publish_change,
+    reference_data,
+)
+from azra_store_lmi_api.apps.admin.store_locations import store_locations
+from azra_store_lmi_api.apps.admin.tests.factory import (
+    CityFactory,
+    CountryFactory,
+    StateFactory,
+    create_id,
+)
+from main import app, lifespan
+
+
+async def _create_locations(db_session: AsyncSession) -> Dict[str, int]:
+    """Create a country with two states, and a city in the first one, and return their ids."""
+    country = await create_id(CountryFactory, db_session)
+    state = await create_id(StateFactory, db_session, country_id=country, name="Kerala")
+    other_state = await create_id(StateFactory, db_session, country_id=country, name="Goa")
+    city = await create_id(CityFactory, db_session, state_id=state, name="Kochi")
+    return {"country": country, "state": state, "other_state": other_state, "city": city}
+
+
+async def _wait_for(condition: Callable[[], bool]) -> None:
+    """Wait until a condition holds, failing after a second."""
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("Condition not met in time.")
+
+
+def test_reference_table():
+    """Test that rows are found by id and by parent, sorted as given, in an immutable table."""
+    states = ReferenceTable(
+        StateRow,
+        [
+            (3, 1, "Goa", "GA", "state"),
+            (1, 1, "Kerala", "KL", "state"),
+            (2, 2, "Ohio", "OH", "state"),
+        ],
+        has_parent=True,
+    )
+
+    assert len(states) == 3
+    assert 1 in states and 4 not in states
+    assert states.get(2) == StateRow(2, 2, "Ohio", "OH", "state")
+    assert states.get(4) is None
+    assert (states.parent_of(3), states.parent_of(4)) == (1, None)
+    assert [state.name for state in states.children(1)] == ["Goa", "Kerala"]
+    assert states.children(5) == []
+    assert len(ReferenceTable(StateRow, [], has_parent=True).all()) == 0
+
+
+@pytest.mark.asyncio
+async def test_snapshot_loaded(db_session: AsyncSession):
+    """Test that a snapshot holds the countries, states and cities with their hierarchy, and is
+    kept while its version is current."""
+    ids = await _create_locations(db_session)
+    cache = ReferenceDataCache()
+
+    snapshot = await cache.get(db_session)
+
+    assert snapshot.version == "0"
+    assert snapshot.city(ids["city"]).name == "Kochi"
+    assert snapshot.state(ids["state"]).country_id == ids["country"]
+    assert [state.name for state in snapshot.states_of(ids["country"])] == ["Goa", "Kerala"]
+    assert [city.id for city in snapshot.cities_of(ids["state"])] == [ids["city"]]
+    assert snapshot.is_valid_location(ids["country"], ids["state"], ids["city"])
+    assert not snapshot.is_valid_location(ids["country"], ids["other_state"], ids["city"])
+    assert ids["city"] in snapshot.city_names.search("koc", 10, country_id=ids["country"])
+    assert await cache.get() is snapshot
+    assert await cache.reload(db_session, only_if_stale=True) is snapshot
+    assert await cache.reload(db_session) is not snapshot
+
+
+@pytest.mark.asyncio
+async def test_reload_on_published_change(
+    db_session: AsyncSession, fake_redis: FakeAsyncRedis, db_context
+):
+    """Test that every process listening loads a new snapshot once a change is published."""
+    ids = await _create_locations(db_session)
+    cache = ReferenceDataCache()
+    await cache.start()
+    assert cache.snapshot.version == "0"
+
+    city = await create_id(CityFactory, db_session, state_id=ids["state"], name="Kannur")
+    assert cache.snapshot.city(city) is None
+    await publish_change()
+
+    await _wait_for(lambda: cache.snapshot.version == "1")
+    assert cache.snapshot.city(city).name == "Kannur"
+    await cache.stop()
+    assert cache._listener is None
+
+
+@pytest.mark.asyncio
+async def test_listener_reconnects(
+    db_session: AsyncSession, fake_redis: FakeAsyncRedis, db_context, monkeypatch
+):
+    """Test that the listener subscribes again once the connection to Redis is lost, and loads
+    the change published while it was disconnected."""
+    monkeypatch.setattr(reference_data_module, "_RECONNECT_DELAY", 0)
+    subscribe = fake_redis.pubsub
+    subscriptions = []
+
+    class DroppedPubSub:
+        """A subscription whose connection is lost while a change is published."""
+
+        def __init__(self):
+            self.pubsub = subscribe()
+
+        async def subscribe(self, channel: str) -> None:
+            await self.pubsub.subscribe(channel)
+
+        async def listen(self):
+            await fake_redis.incr(VERSION_KEY)
+            raise ConnectionError("Connection lost")
+            yield
+
+        async def aclose(self) -> None:
+            await self.pubsub.aclose()
+
+    def pubsub():
+        subscriptions.append(DroppedPubSub() if not subscriptions else subscribe())
+        return subscriptions[-1]
+
+    monkeypatch.setattr(fake_redis, "pubsub", pubsub)
+    await _create_locations(db_session)
+    cache = ReferenceDataCache()
+    await cache.start()
+
+    await _wait_for(lambda: cache.snapshot.version == "1")
+    assert len(subscriptions) == 2
+    await publish_change()
+    await _wait_for(lambda: cache.snapshot.version == "2")
+    await cache.stop()
+
+
+@pytest.mark.asyncio
+async def test_lifespan(db_session: AsyncSession, fake_redis: FakeAsyncRedis, db_context):
+    """Test that the reference data is loaded and listened to while the application runs, and
+    that the listener is stopped with the application."""
+    ids = await _create_locations(db_session)
+
+    async with lifespan(app):
+        listener = reference_data._listener
+        assert reference_data.snapshot.city(ids["city"]).name == "Kochi"
+        assert not listener.done()
+        assert store_locations._refresher is not None
+
+    assert listener.cancelled()
+    assert reference_data._listener is None
+    assert store_locations._refresher is None
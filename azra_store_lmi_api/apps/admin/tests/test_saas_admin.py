@@ -5,6 +5,7 @@ well as error handling for various scenarios. These tests ensure the proper func
 Admin API endpoints and related business logic.
 """
 
+import inspect
 from unittest.mock import Mock
 
 import pytest
@@ -15,7 +16,9 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from azra_store_lmi_api.apps.admin.models import SAASAdmin
+from azra_store_lmi_api.apps.admin.tasks.saas_admin import send_saas_admin_credentials
 from azra_store_lmi_api.apps.admin.tests.factory import SAASAdminFactory
+from azra_store_lmi_api.config.outbox import OutboxMessage
 from azra_store_lmi_api.core.enums import OrderByType
 from azra_store_lmi_api.test_utils import (
     assert_database_has,
@@ -48,6 +51,29 @@ async def test_list_success(db_session: AsyncSession, async_client: AsyncClient,
     assert response_content["size"] == 10
 
 
+@pytest.mark.asyncio
+async def test_list_not_modified(db_session: AsyncSession, async_client: AsyncClient):
+    """Test that listing SAAS admins with a current weak ETag returns a 304 response, and that a
+    new SAAS admin changes the ETag."""
+    await SAASAdminFactory.create_async(session=db_session)
+    url = f"{BASE_ROUTE}?sort_by=id&page=1&size=10&order_by=asc"
+    response = await async_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    etag = response.headers["etag"]
+    assert etag.startswith('W/"')
+    assert "last-modified" in response.headers
+
+    response = await async_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    await SAASAdminFactory.create_async(session=db_session)
+    response = await async_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["etag"] != etag
+
+
 list_param_errors_parameters = [
     pytest.param(
         {
@@ -161,7 +187,11 @@ create_success_params = [
 async def test_create_succcess(
     db_session: AsyncSession, async_client: AsyncClient, faker: Faker, body: dict, monkeypatch
 ):
-    """Test successful creation of a SAAS Admin."""
+    """Test successful creation of a SAAS Admin.
+
+    The credentials email is written to the outbox with the admin instead of being sent to the
+    broker during the request, with the id of the admin and not its password.
+    """
     mock_send_saas_admin_credentials = Mock()
     monkeypatch.setattr(
         "azra_store_lmi_api.apps.admin.tasks.saas_admin.send_saas_admin_credentials.delay",
@@ -171,7 +201,17 @@ async def test_create_succcess(
     assert response.status_code == status.HTTP_201_CREATED
     assert response.json() == {"detail": "SAAS Admin has been created successfully."}
     await assert_database_has(db_session, SAASAdmin, [SAASAdmin.id], body)
-    assert mock_send_saas_admin_credentials.assert_called_once
+    mock_send_saas_admin_credentials.assert_not_called()
+    saas_admin_id = await db_session.scalar(
+        select(SAASAdmin.id).where(SAASAdmin.email == body["email"])
+    )
+    outbox_message = await db_session.scalar(
+        select(OutboxMessage).where(
+            OutboxMessage.task_name == send_saas_admin_credentials.name,
+            OutboxMessage.args[0].as_integer() == saas_admin_id,
+        )
+    )
+    assert (outbox_message.args, outbox_message.kwargs) == ([saas_admin_id], {})
 
 
 create_validation_errors = [
@@ -414,6 +454,30 @@ async def test_create_server_error(async_client: AsyncClient, mocker, body: dict
     assert response.json() == {"detail": "Unable to create SAAS Admin, please try again later."}
 
 
+@pytest.mark.asyncio
+async def test_send_credentials(db_session: AsyncSession, db_context, monkeypatch):
+    """Test that the credentials task sends a new password to the admin and saves its hash, and
+    that it sends nothing for an admin which no longer exists."""
+    saas_admin = await SAASAdminFactory.create_async(session=db_session, refreshable=True)
+    send_credentials = inspect.unwrap(send_saas_admin_credentials.run)
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    monkeypatch.setattr("azra_store_lmi_api.config.mailer.EmailMessage.send", send)
+    await send_credentials(saas_admin.id)
+
+    (message,) = sent
+    assert message.to == [saas_admin.email]
+    password = message.content["plain"].split("password: ")[1].split()[0]
+    await db_session.refresh(saas_admin)
+    assert saas_admin.verify_password(password)
+
+    await send_credentials(0)
+    assert len(sent) == 1
+
+
 @pytest.mark.asyncio
 async def test_get_success(db_session: AsyncSession, async_client: AsyncClient):
     """Test that retrieving a SAAS Admin by ID returns a 200 response with the SAAS Admin details.
@@ -437,6 +501,45 @@ async def test_get_success(db_session: AsyncSession, async_client: AsyncClient):
     }
 
 
+@pytest.mark.asyncio
+async def test_get_not_modified(db_session: AsyncSession, async_client: AsyncClient):
+    """Test that retrieving a SAAS Admin with a current strong ETag or modification date returns
+    a 304 response, and that updating the SAAS Admin changes the ETag."""
+    saas_admin: SAASAdmin = await SAASAdminFactory.create_async(
+        session=db_session, refreshable=True
+    )
+    url = f"{BASE_ROUTE}/{saas_admin.id}"
+    response = await async_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    etag, last_modified = response.headers["etag"], response.headers["last-modified"]
+    assert not etag.startswith("W/")
+
+    response = await async_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.content == b""
+    response = await async_client.get(url, headers={"If-Modified-Since": last_modified})
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    response = await async_client.get(
+        url, headers={"If-None-Match": '"other"', "If-Modified-Since": last_modified}
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    response = await async_client.put(
+        url,
+        json={
+            "username": saas_admin.username,
+            "first_name": faker_.first_name(),
+            "last_name": saas_admin.last_name,
+            "email": saas_admin.email,
+            "phone_number": saas_admin.phone_number,
+        },
+    )
+    assert response.status_code == status.HTTP_200_OK
+    response = await async_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["etag"] != etag
+
+
 @pytest.mark.asyncio
 async def test_get_not_fount_error(
     async_client: AsyncClient,
@@ -0,0 +1,413 @@
+"""This module contains unit tests for the store endpoints.
+
+It includes tests for creating a store, which is provisioned in the background, for polling its
+provisioning status, for listing and retrieving the stores with their details in a constant
+number of queries, for searching them by their services, and for listing the stores nearest to a
+point, as well as validation and error handling.
+"""
+
+import math
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.apps.admin.models import Store
+from azra_store_lmi_api.apps.admin.models.store import (
+    StoreServiceEnum,
+    StoreStatusEnum,
+    StoreSubServiceEnum,
+)
+from azra_store_lmi_api.apps.admin.store_locations import EARTH_RADIUS, store_locations
+from azra_store_lmi_api.apps.admin.tasks.provisioning import provision_store
+from azra_store_lmi_api.apps.admin.tests.factory import (
+    SAASAdminFactory,
+    create_id,
+    create_location,
+    create_stores,
+)
+from azra_store_lmi_api.config.outbox import OutboxMessage
+from azra_store_lmi_api.config.tenancy import Tenant, TenantStatusEnum
+from azra_store_lmi_api.conftest import async_test_engine
+from azra_store_lmi_api.test_utils import generate_error_response, parse_validation_field
+
+BASE_ROUTE = "/stores"
+
+
+@contextmanager
+def _count_queries() -> Iterator[List[str]]:
+    """Collect the statements run on the test database."""
+    statements = []
+
+    def collect(connection, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_test_engine.sync_engine, "before_cursor_execute", collect)
+    try:
+        yield statements
+    finally:
+        event.remove(async_test_engine.sync_engine, "before_cursor_execute", collect)
+
+
+@pytest.mark.asyncio
+async def test_create_accepted(db_session: AsyncSession, async_client: AsyncClient):
+    """Test that creating a store answers 202 with the store in CREATING, that its schema is
+    registered, and that the provisioning task is written to the outbox instead of running during
+    the request."""
+    body = {
+        "name": "Main Street Laundry",
+        "unique_indentifier": "main_street",
+        "created_by_id": await create_id(SAASAdminFactory, db_session),
+    }
+    response = await async_client.post(BASE_ROUTE, json=body)
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    response_content = response.json()
+    store_id = response_content["id"]
+    assert response_content == {
+        "id": store_id,
+        "status": StoreStatusEnum.CREATING.value,
+        "status_name": StoreStatusEnum.CREATING.name,
+    }
+    assert response.headers["location"].endswith(f"{BASE_ROUTE}/{store_id}/status")
+    assert response.headers["retry-after"] == "2"
+
+    store = await db_session.scalar(select(Store).where(Store.id == store_id))
+    assert store.status == StoreStatusEnum.CREATING.value
+    assert store.unique_indentifier == body["unique_indentifier"]
+    tenant = await db_session.get(Tenant, store_id)
+    assert (tenant.schema_name, tenant.revision, tenant.status, tenant.shard) == (
+        body["unique_indentifier"],
+        None,
+        TenantStatusEnum.PROVISIONING.value,
+        "default",
+    )
+    outbox_args = await db_session.scalar(
+        select(OutboxMessage.args).where(
+            OutboxMessage.task_name == provision_store.name,
+            OutboxMessage.args[0].astext == store_id,
+        )
+    )
+    assert outbox_args == [store_id]
+
+    response = await async_client.get(f"{BASE_ROUTE}/{store_id}/status")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["status"] == StoreStatusEnum.CREATING.value
+    assert response.headers["retry-after"] == "2"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "body, field, message",
+    [
+        ({"unique_indentifier": "Main-Street"}, "unique_indentifier", None),
+        (
+            {"unique_indentifier": "public"},
+            "unique_indentifier",
+            "Value error, public is a reserved name.",
+        ),
+        ({"name": "ab"}, "name", None),
+    ],
+)
+async def test_create_validation_errors(
+    async_client: AsyncClient, body: dict, field: str, message: str
+):
+    """Test that creating a store with an invalid name or unique identifier returns a 422."""
+    body = {"name": "Main Street", "unique_indentifier": "main_street", "created_by_id": 1} | body
+    response = await async_client.post(BASE_ROUTE, json=body)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    errors = response.json()["detail"]
+    assert [error["loc"][-1] for error in errors] == [field]
+    if message:
+        assert errors[0]["msg"] == message
+
+
+@pytest.mark.asyncio
+async def test_create_already_exists_error(db_session: AsyncSession, async_client: AsyncClient):
+    """Test that creating a store with an existing unique identifier, or by an unknown SAAS Admin,
+    returns a 422 with an appropriate error."""
+    created_by_id = await create_id(SAASAdminFactory, db_session)
+    await create_stores(db_session, created_by_id=created_by_id, unique_indentifier="taken")
+    body = {"name": "Main Street", "unique_indentifier": "taken", "created_by_id": created_by_id}
+    response = await async_client.post(BASE_ROUTE, json=body)
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert parse_validation_field(response.json()) == generate_error_response(
+        [
+            {
+                "field": "unique_indentifier",
+                "type": "value_error",
+                "msg": "Value error, taken Store already exists.",
+            }
+        ]
+    )
+
+    response = await async_client.post(
+        BASE_ROUTE, json=body | {"unique_indentifier": "free", "created_by_id": 0}
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert parse_validation_field(response.json()) == generate_error_response(
+        [
+            {
+                "field": "created_by_id",
+                "type": "value_error",
+                "msg": "Value error, SAAS Admin not found.",
+            }
+        ]
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_server_error(db_session: AsyncSession, async_client: AsyncClient, mocker):
+    """Test that creating a store with a server error returns a 500 response."""
+    body = {
+        "name": "Main Street",
+        "unique_indentifier": "broken",
+        "created_by_id": await create_id(SAASAdminFactory, db_session),
+    }
+    await mocker(
+        "azra_store_lmi_api.apps.admin.views.store.enqueue_provisioning", side_effect=Exception
+    )
+    response = await async_client.post(BASE_ROUTE, json=body)
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert response.json() == {"detail": "Unable to create Store, please try again later."}
+    assert (
+        await db_session.scalar(select(Store).where(Store.unique_indentifier == "broken")) is None
+    )
+    assert await db_session.scalar(select(Tenant).where(Tenant.schema_name == "broken")) is None
+
+
+@pytest.mark.asyncio
+async def test_get_status_success(db_session: AsyncSession, async_client: AsyncClient):
+    """Test that the status of a provisioned store is returned without a Retry-After header."""
+    (store_id,) = await create_stores(db_session, status=StoreStatusEnum.FAILED.value)
+    response = await async_client.get(f"{BASE_ROUTE}/{store_id}/status")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "id": store_id,
+        "status": StoreStatusEnum.FAILED.value,
+        "status_name": StoreStatusEnum.FAILED.name,
+    }
+    assert "retry-after" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_get_status_not_found_error(async_client: AsyncClient):
+    """Test that the status of an unknown store returns a 404 response."""
+    response = await async_client.get(f"{BASE_ROUTE}/unknown/status")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json() == {"detail": "Store not found."}
+
+
+@pytest.mark.asyncio
+async def test_get_status_server_error(async_client: AsyncClient, mocker):
+    """Test that getting the status of a store with a server error returns a 500 response."""
+    await mocker("azra_store_lmi_api.apps.admin.views.store.select", side_effect=Exception)
+    response = await async_client.get(f"{BASE_ROUTE}/unknown/status")
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert response.json() == {"detail": "Unable to get Store status, please try again later."}
+
+
+@pytest.mark.asyncio
+async def test_list_constant_queries(db_session: AsyncSession, async_client: AsyncClient):
+    """Test that the stores are listed with their details, and that a page of 2 stores and a page
+    of 12 stores are loaded in the same number of queries."""
+    created_by_id = await create_id(SAASAdminFactory, db_session)
+    location = await create_location(db_session)
+    (parent_store_id,) = await create_stores(
+        db_session, 1, created_by_id, {}, location, contact_details=2
+    )
+    await create_stores(
+        db_session,
+        11,
+        created_by_id,
+        {"parent_store_id": parent_store_id},
+        location,
+        contact_details=2,
+    )
+
+    with _count_queries() as small_page:
+        response = await async_client.get(f"{BASE_ROUTE}?sort_by=created_at&order_by=desc&size=2")
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()["items"]) == 2
+
+    with _count_queries() as large_page:
+        response = await async_client.get(f"{BASE_ROUTE}?sort_by=created_at&order_by=desc&size=12")
+    assert response.status_code == status.HTTP_200_OK
+    items = response.json()["items"]
+    assert len(items) == 12
+    assert len(large_page) == len(small_page)
+
+    country_id, state_id, city_id = location
+    for item in items:
+        store_detail = item["store_detail"]
+        assert store_detail["country"]["id"] == country_id
+        assert store_detail["state"]["id"] == state_id
+        assert store_detail["city"]["id"] == city_id
+        assert len(store_detail["contact_details"]) == 2
+    assert items[-1]["id"] == parent_store_id
+    assert items[-1]["store_detail"]["parent_store"] is None
+    assert {item["store_detail"]["parent_store"]["id"] for item in items[:-1]} == {parent_store_id}
+
+
+@pytest.mark.asyncio
+async def test_get_success(db_session: AsyncSession, async_client: AsyncClient):
+    """Test that a store is retrieved with its details, in the queries of a list page."""
+    location = await create_location(db_session)
+    (store_id,) = await create_stores(db_session, details={}, location=location, contact_details=2)
+
+    with _count_queries() as statements:
+        response = await async_client.get(f"{BASE_ROUTE}/{store_id}")
+    assert response.status_code == status.HTTP_200_OK
+    assert len(statements) == 3
+    response_content = response.json()
+    assert response_content["id"] == store_id
+    store_detail = response_content["store_detail"]
+    assert [store_detail["country"]["id"], store_detail["state"]["id"]] == list(location[:2])
+    assert store_detail["cover_image"].startswith("http")
+    assert len(store_detail["contact_details"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_get_without_details(db_session: AsyncSession, async_client: AsyncClient):
+    """Test that a store whose details are not filled is retrieved without them."""
+    (store_id,) = await create_stores(db_session)
+    response = await async_client.get(f"{BASE_ROUTE}/{store_id}")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["store_detail"] is None
+
+
+@pytest.mark.asyncio
+async def test_get_not_found_error(async_client: AsyncClient):
+    """Test that retrieving an unknown store returns a 404 response."""
+    response = await async_client.get(f"{BASE_ROUTE}/unknown")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json() == {"detail": "Store not found."}
+
+
+@pytest.mark.asyncio
+async def test_list_server_error(async_client: AsyncClient, mocker):
+    """Test that listing the stores with a server error returns a 500 response."""
+    await mocker("azra_store_lmi_api.apps.admin.views.store.paginate", side_effect=Exception)
+    response = await async_client.get(BASE_ROUTE)
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert response.json() == {"detail": "Unable to list Stores, please try again later."}
+
+
+@pytest.mark.asyncio
+async def test_search_by_services(db_session: AsyncSession, async_client: AsyncClient):
+    """Test that the stores are searched by their services and sub-services, matching all or any
+    of them, and that a store offering all services matches any service."""
+    created_by_id = await create_id(SAASAdminFactory, db_session)
+    location = await create_location(db_session)
+    cut_piece, cutting, labeling, sorting = (
+        StoreServiceEnum.CUT_PIECE_CENTER.value,
+        StoreSubServiceEnum.FABRIC_CUTTING.value,
+        StoreSubServiceEnum.CUSTOM_LABELING.value,
+        StoreSubServiceEnum.FABRIC_SORTING.value,
+    )
+    offers = {
+        "both": ([cut_piece], [cutting, labeling]),
+        "cutting": ([cut_piece], [cutting]),
+        "everything": ([StoreServiceEnum.ALL.value], [cutting, labeling, sorting]),
+        "retail": ([StoreServiceEnum.SELLING_RETAIL.value], [sorting]),
+    }
+    store_ids = {}
+    for name, (services, sub_services) in offers.items():
+        details = {"services": services, "sub_services": sub_services}
+        (store_ids[name],) = await create_stores(db_session, 1, created_by_id, details, location)
+
+    async def search(query: str) -> set:
+        response = await async_client.get(f"{BASE_ROUTE}/search?size=100&{query}")
+        assert response.status_code == status.HTTP_200_OK
+        ids = {item["id"] for item in response.json()["items"]}
+        return {name for name, store_id in store_ids.items() if store_id in ids}
+
+    query = f"services={cut_piece}&sub_services={cutting}&sub_services={labeling}"
+    assert await search(query) == {"both", "everything"}
+    assert await search(f"{query}&match=any") == {"both", "cutting", "everything"}
+    assert await search(f"sub_services={sorting}") == {"everything", "retail"}
+
+    response = await async_client.get(f"{BASE_ROUTE}/search?services=15")
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+def _haversine(latitude: float, longitude: float, other: Tuple[float, float]) -> float:
+    """Returns the great-circle distance between two points, in kilometers."""
+    phi, other_phi = math.radians(latitude), math.radians(other[0])
+    delta_lambda = math.radians(other[1] - longitude)
+    return (
+        2
+        * EARTH_RADIUS
+        * math.asin(
+            math.sqrt(
+                math.sin((other_phi - phi) / 2) ** 2
+                + math.cos(phi) * math.cos(other_phi) * math.sin(delta_lambda / 2) ** 2
+            )
+        )
+    )
+
+
+@pytest.mark.asyncio
+async def test_list_nearby(db_session: AsyncSession, async_client: AsyncClient):
+    """Test that the stores nearest to a point are listed nearest first, across the
+    antimeridian, within a radius and by service, and that a store deactivated since the index
+    was loaded is left out."""
+    created_by_id = await create_id(SAASAdminFactory, db_session)
+    location = await create_location(db_session)
+    origin = (70.0, 179.99)
+    coordinates = {
+        "next_door": (70.0, 179.995),
+        "across": (70.0, -179.99),
+        "north": (70.02, 179.99),
+        "far": (70.2, 179.99),
+    }
+    store_ids = {}
+    for name, (latitude, longitude) in coordinates.items():
+        service = StoreServiceEnum.SELLING_RETAIL if name == "north" else StoreServiceEnum.LAUNDRY
+        details = {"latitude": latitude, "longitude": longitude, "services": [service.value]}
+        (store_ids[name],) = await create_stores(db_session, 1, created_by_id, details, location)
+    names = {store_id: name for name, store_id in store_ids.items()}
+    await store_locations.reload(db_session)
+
+    async def nearby(query: str) -> List[str]:
+        response = await async_client.get(
+            f"{BASE_ROUTE}/nearby?latitude={origin[0]}&longitude={origin[1]}&{query}"
+        )
+        assert response.status_code == status.HTTP_200_OK
+        for item in response.json():
+            expected = _haversine(*origin, coordinates[names[item["store"]["id"]]])
+            assert item["distance"] == pytest.approx(expected, abs=0.001)
+        return [names[item["store"]["id"]] for item in response.json()]
+
+    assert await nearby("limit=3") == ["next_door", "across", "north"]
+    assert await nearby("radius=1") == ["next_door", "across"]
+    assert await nearby(f"services={StoreServiceEnum.SELLING_RETAIL.value}&limit=1") == ["north"]
+
+    await db_session.execute(
+        update(Store)
+        .where(Store.id == store_ids["next_door"])
+        .values(status=StoreStatusEnum.SUSPENDED.value)
+    )
+    await db_session.commit()
+    assert await nearby("radius=1") == ["across"]
+    index = await store_locations.reload(db_session, only_if_stale=True)
+    assert store_ids["next_door"] not in {
+        store.store_id for store in index.nearest(*origin, limit=len(index))
+    }
+
+    response = await async_client.get(f"{BASE_ROUTE}/nearby?latitude=91&longitude=0")
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_list_nearby_server_error(async_client: AsyncClient, mocker):
+    """Test that listing the nearby stores with a server error returns a 500 response."""
+    await mocker(
+        "azra_store_lmi_api.apps.admin.views.store.store_locations.get", side_effect=Exception
+    )
+    response = await async_client.get(f"{BASE_ROUTE}/nearby?latitude=0&longitude=0")
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert response.json() == {"detail": "Unable to list nearby Stores, please try again later."}
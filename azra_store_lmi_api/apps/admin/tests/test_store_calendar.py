@@ -0,0 +1,214 @@
+"""This module contains unit tests for the store calendar endpoints.
+
+It includes tests for reading the closures of many stores, listing the stores closed on a day, and
+checking whether a store is open at a time, with public holidays closing every store, as well as
+the invalidation of the calendar when holidays are added, validation and error handling.
+"""
+
+import datetime
+from typing import List, Optional
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.apps.admin.models import Holiday
+from azra_store_lmi_api.apps.admin.models.holiday import HolidayType
+from azra_store_lmi_api.apps.admin.schemas.store import MAX_CALENDAR_STORES
+from azra_store_lmi_api.apps.admin.store_calendar import store_calendar
+from azra_store_lmi_api.apps.admin.tests.factory import create_stores
+
+BASE_ROUTE = "/stores"
+
+
+async def _add_holiday(
+    db_session: AsyncSession,
+    store_id: str,
+    date: datetime.date,
+    holiday_type: HolidayType = HolidayType.STORE_HOLIDAY,
+    from_time: Optional[datetime.time] = None,
+    to_time: Optional[datetime.time] = None,
+) -> None:
+    """Add a holiday to a store, and invalidate its month in the store calendar."""
+    db_session.add(
+        Holiday(
+            store_id=store_id,
+            date=date,
+            type=holiday_type.value,
+            reason="Holiday",
+            from_time=from_time,
+            to_time=to_time,
+        )
+    )
+    await db_session.commit()
+    await store_calendar.invalidate([date])
+
+
+async def _create_calendar(db_session: AsyncSession) -> List[str]:
+    """Create two stores with holidays in January 2027, and return their ids.
+
+    The first store is closed on the 25th, the second from 14:00 to 18:00 on the 20th, and every
+    store is closed on the 26th by a public holiday recorded for the second store.
+    """
+    a, b = await create_stores(db_session, 2)
+    await _add_holiday(db_session, a, datetime.date(2027, 1, 25))
+    await _add_holiday(
+        db_session,
+        b,
+        datetime.date(2027, 1, 20),
+        from_time=datetime.time(14),
+        to_time=datetime.time(18),
+    )
+    await _add_holiday(db_session, b, datetime.date(2027, 1, 26), HolidayType.PUBLIC_HOLIDAY)
+    return [a, b]
+
+
+@pytest.mark.asyncio
+async def test_get_calendars(db_session: AsyncSession, async_client: AsyncClient):
+    """Test that the closures of stores merge their own holidays with the public holidays, and
+    are clipped to the range."""
+    a, b = await _create_calendar(db_session)
+    public = {"start": "2027-01-26T00:00:00", "end": "2027-01-27T00:00:00"}
+
+    response = await async_client.post(
+        f"{BASE_ROUTE}/calendar",
+        json={
+            "store_ids": [a, b, "unknown"],
+            "start_date": "2027-01-01",
+            "end_date": "2027-01-31",
+        },
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == [
+        {
+            "store_id": a,
+            "closures": [{"start": "2027-01-25T00:00:00", "end": "2027-01-27T00:00:00"}],
+        },
+        {
+            "store_id": b,
+            "closures": [{"start": "2027-01-20T14:00:00", "end": "2027-01-20T18:00:00"}, public],
+        },
+        {"store_id": "unknown", "closures": [public]},
+    ]
+
+    response = await async_client.post(
+        f"{BASE_ROUTE}/calendar",
+        json={"store_ids": [a], "start_date": "2027-01-26", "end_date": "2027-02-10"},
+    )
+    assert response.json() == [{"store_id": a, "closures": [public]}]
+
+
+@pytest.mark.asyncio
+async def test_list_closed(db_session: AsyncSession, async_client: AsyncClient):
+    """Test that the stores closed on a day by their own holidays are listed apart from the
+    public holidays."""
+    a, b = await _create_calendar(db_session)
+
+    response = await async_client.get(f"{BASE_ROUTE}/calendar/closed?date=2027-01-20")
+    assert response.status_code == status.HTTP_200_OK
+    content = response.json()
+    assert content["all_stores"] == []
+    assert {
+        "store_id": b,
+        "closures": [{"start": "2027-01-20T14:00:00", "end": "2027-01-20T18:00:00"}],
+    } in content["stores"]
+    assert a not in {store["store_id"] for store in content["stores"]}
+
+    response = await async_client.get(f"{BASE_ROUTE}/calendar/closed?date=2027-01-26")
+    content = response.json()
+    assert content["all_stores"] == [
+        {"start": "2027-01-26T00:00:00", "end": "2027-01-27T00:00:00"}
+    ]
+    assert not {a, b} & {store["store_id"] for store in content["stores"]}
+
+
+@pytest.mark.asyncio
+async def test_is_open(db_session: AsyncSession, async_client: AsyncClient):
+    """Test that a store is closed during its own and public holidays, and open otherwise."""
+    _, b = await _create_calendar(db_session)
+
+    response = await async_client.get(f"{BASE_ROUTE}/{b}/open?at=2027-01-20T15:30:00")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "store_id": b,
+        "at": "2027-01-20T15:30:00",
+        "is_open": False,
+        "closure": {"start": "2027-01-20T14:00:00", "end": "2027-01-20T18:00:00"},
+    }
+
+    response = await async_client.get(f"{BASE_ROUTE}/{b}/open?at=2027-01-20T18:00:00")
+    assert response.json()["is_open"] is True
+    assert response.json()["closure"] is None
+
+    response = await async_client.get(f"{BASE_ROUTE}/{b}/open?at=2027-01-26T09:00:00")
+    assert response.json()["is_open"] is False
+
+
+@pytest.mark.asyncio
+async def test_is_open_not_found(async_client: AsyncClient):
+    """Test that checking whether an unknown store is open returns a 404 response."""
+    response = await async_client.get(f"{BASE_ROUTE}/unknown/open?at=2027-01-20T15:30:00")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json() == {"detail": "Store not found."}
+
+
+@pytest.mark.asyncio
+async def test_calendar_validation_errors(async_client: AsyncClient):
+    """Test that invalid ranges, stores and times return a 422 response."""
+    for body in (
+        {"store_ids": ["a"], "start_date": "2027-01-31", "end_date": "2027-01-01"},
+        {"store_ids": ["a"], "start_date": "2027-01-01", "end_date": "2028-01-02"},
+        {"store_ids": [], "start_date": "2027-01-01", "end_date": "2027-01-31"},
+        {
+            "store_ids": [str(index) for index in range(MAX_CALENDAR_STORES + 1)],
+            "start_date": "2027-01-01",
+            "end_date": "2027-01-31",
+        },
+    ):
+        response = await async_client.post(f"{BASE_ROUTE}/calendar", json=body)
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    response = await async_client.get(f"{BASE_ROUTE}/unknown/open?at=2027-01-20T15:30:00%2B05:30")
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    response = await async_client.get(f"{BASE_ROUTE}/calendar/closed")
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_chain_holiday_invalidates_calendar(
+    db_session: AsyncSession, async_client: AsyncClient
+):
+    """Test that a holiday added to a chain of stores is in the calendar once added."""
+    (store_id,) = await create_stores(db_session, 1)
+    body = {"store_ids": [store_id], "start_date": "2027-03-01", "end_date": "2027-03-31"}
+    response = await async_client.post(f"{BASE_ROUTE}/calendar", json=body)
+    assert response.json() == [{"store_id": store_id, "closures": []}]
+
+    response = await async_client.post(
+        f"{BASE_ROUTE}/{store_id}/chain-holidays",
+        json={"date": "2027-03-08", "type": HolidayType.STORE_HOLIDAY.value, "reason": "Closed"},
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    response = await async_client.post(f"{BASE_ROUTE}/calendar", json=body)
+    assert response.json() == [
+        {
+            "store_id": store_id,
+            "closures": [{"start": "2027-03-08T00:00:00", "end": "2027-03-09T00:00:00"}],
+        }
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_calendars_server_error(async_client: AsyncClient, mocker):
+    """Test that reading store calendars with a server error returns a 500 response."""
+    await mocker(
+        "azra_store_lmi_api.apps.admin.views.store_calendar.store_calendar.get",
+        side_effect=Exception,
+    )
+    response = await async_client.post(
+        f"{BASE_ROUTE}/calendar",
+        json={"store_ids": ["a"], "start_date": "2027-01-01", "end_date": "2027-01-31"},
+    )
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert response.json() == {"detail": "Unable to get Store calendars, please try again later."}
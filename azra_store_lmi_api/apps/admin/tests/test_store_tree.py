@@ -0,0 +1,224 @@
+"""This module contains unit tests for the store chain endpoints.
+
+It includes tests for moving stores in their chain, listing the descendants and ancestors of a
+store, summarizing its subtree, adding a holiday to a whole chain, and checking the paths against
+the parent stores, as well as validation and error handling.
+"""
+
+from typing import List
+
+import pytest
+from fastapi import status
+from httpx import AsyncClient
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.apps.admin.models import Holiday, Store, StoreDetail
+from azra_store_lmi_api.apps.admin.models.holiday import HolidayType
+from azra_store_lmi_api.apps.admin.models.store import StoreStatusEnum
+from azra_store_lmi_api.apps.admin.store_tree import repair_paths, stale_paths
+from azra_store_lmi_api.apps.admin.tests.factory import create_stores
+
+BASE_ROUTE = "/stores"
+
+
+async def _move(async_client: AsyncClient, store_id: str, parent_store_id: str) -> dict:
+    """Move a store under a parent, and return the response content."""
+    response = await async_client.put(
+        f"{BASE_ROUTE}/{store_id}/parent", json={"parent_store_id": parent_store_id}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    return response.json()
+
+
+async def _create_chain(db_session: AsyncSession, async_client: AsyncClient) -> List[str]:
+    """Create the chain root > (a > (a1, a2), b), and return the ids root, a, a1, a2, b."""
+    root, a, a1, a2, b = await create_stores(db_session, 5, details={})
+    for store_id, parent_store_id in ((a, root), (b, root), (a1, a), (a2, a)):
+        await _move(async_client, store_id, parent_store_id)
+    return [root, a, a1, a2, b]
+
+
+@pytest.mark.asyncio
+async def test_move_rewrites_subtree(db_session: AsyncSession, async_client: AsyncClient):
+    """Test that moving a store rewrites its path and the paths of its descendants, and that
+    its details point to the new parent."""
+    root, a, a1, a2, b = await _create_chain(db_session, async_client)
+
+    content = await _move(async_client, a, b)
+    assert content["path"] == f"{root}.{b}.{a}"
+    assert (content["parent_store_id"], content["depth"]) == (b, 2)
+    paths = dict(
+        (
+            await db_session.execute(select(Store.id, Store.path).where(Store.id.in_([a1, a2])))
+        ).all()
+    )
+    assert paths == {a1: f"{root}.{b}.{a}.{a1}", a2: f"{root}.{b}.{a}.{a2}"}
+    parent_store_id = await db_session.scalar(
+        select(StoreDetail.parent_store_id).where(StoreDetail.store_id == a)
+    )
+    assert parent_store_id == b
+
+    content = await _move(async_client, a, None)
+    assert (content["path"], content["parent_store_id"], content["depth"]) == (a, None, 0)
+    response = await async_client.get(f"{BASE_ROUTE}/{a}/descendants")
+    assert [item["path"] for item in response.json()["items"]] == [f"{a}.{a1}", f"{a}.{a2}"]
+
+
+@pytest.mark.asyncio
+async def test_move_validation_errors(db_session: AsyncSession, async_client: AsyncClient):
+    """Test that a store cannot be moved under itself, a descendant, an unknown parent, or
+    without its details, and that an unknown store returns a 404 response."""
+    root, a, a1, _, _ = await _create_chain(db_session, async_client)
+    (without_details,) = await create_stores(db_session)
+
+    cases = [
+        (root, a1, "A store cannot be moved under itself or its descendants."),
+        (a, a, "A store cannot be moved under itself or its descendants."),
+        (a, "unknown", "Parent store not found."),
+        (without_details, root, "Store details not found."),
+    ]
+    for store_id, parent_store_id, message in cases:
+        response = await async_client.put(
+            f"{BASE_ROUTE}/{store_id}/parent", json={"parent_store_id": parent_store_id}
+        )
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        error = response.json()["detail"][0]
+        assert (error["loc"], error["ctx"]["error"]) == (["body", "parent_store_id"], message)
+    assert await db_session.scalar(select(Store.path).where(Store.id == a1)) == f"{root}.{a}.{a1}"
+
+    response = await async_client.put(
+        f"{BASE_ROUTE}/unknown/parent", json={"parent_store_id": root}
+    )
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert response.json() == {"detail": "Store not found."}
+
+
+@pytest.mark.asyncio
+async def test_list_descendants(db_session: AsyncSession, async_client: AsyncClient):
+    """Test that the descendants of a store are listed in depth first order, down to a depth."""
+    root, a, a1, a2, b = await _create_chain(db_session, async_client)
+
+    response = await async_client.get(f"{BASE_ROUTE}/{root}/descendants")
+    assert response.status_code == status.HTTP_200_OK
+    response_content = response.json()
+    assert response_content["total"] == 4
+    paths = {a: f"{root}.{a}", a1: f"{root}.{a}.{a1}", a2: f"{root}.{a}.{a2}", b: f"{root}.{b}"}
+    assert [item["id"] for item in response_content["items"]] == sorted(paths, key=paths.get)
+    assert {item["id"]: item["parent_store_id"] for item in response_content["items"]} == {
+        a: root,
+        b: root,
+        a1: a,
+        a2: a,
+    }
+
+    response = await async_client.get(f"{BASE_ROUTE}/{root}/descendants?max_depth=1")
+    assert {item["id"] for item in response.json()["items"]} == {a, b}
+
+    response = await async_client.get(f"{BASE_ROUTE}/{a1}/descendants")
+    assert response.json()["total"] == 0
+
+    response = await async_client.get(f"{BASE_ROUTE}/unknown/descendants")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_list_ancestors(db_session: AsyncSession, async_client: AsyncClient):
+    """Test that the ancestors of a store are listed from the root of its chain."""
+    root, a, a1, _, _ = await _create_chain(db_session, async_client)
+
+    response = await async_client.get(f"{BASE_ROUTE}/{a1}/ancestors")
+    assert response.status_code == status.HTTP_200_OK
+    assert [item["id"] for item in response.json()] == [root, a]
+    assert [item["depth"] for item in response.json()] == [0, 1]
+
+    response = await async_client.get(f"{BASE_ROUTE}/{root}/ancestors")
+    assert response.json() == []
+
+    response = await async_client.get(f"{BASE_ROUTE}/unknown/ancestors")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_summarize_subtree(db_session: AsyncSession, async_client: AsyncClient):
+    """Test that the descendants of a store are counted by status, with their depth."""
+    root, _, a1, _, _ = await _create_chain(db_session, async_client)
+    await db_session.execute(
+        update(Store).where(Store.id == a1).values(status=StoreStatusEnum.SUSPENDED.value)
+    )
+    await db_session.commit()
+
+    response = await async_client.get(f"{BASE_ROUTE}/{root}/subtree")
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "id": root,
+        "descendants": 4,
+        "depth": 2,
+        "statuses": {StoreStatusEnum.ACTIVE.name: 3, StoreStatusEnum.SUSPENDED.name: 1},
+    }
+
+    response = await async_client.get(f"{BASE_ROUTE}/{a1}/subtree")
+    assert response.json() == {"id": a1, "descendants": 0, "depth": 0, "statuses": {}}
+
+
+@pytest.mark.asyncio
+async def test_add_chain_holiday(db_session: AsyncSession, async_client: AsyncClient):
+    """Test that a holiday is added to a store and all its descendants, and only to them."""
+    _, a, a1, a2, b = await _create_chain(db_session, async_client)
+    body = {
+        "date": "2026-12-25",
+        "type": HolidayType.STORE_HOLIDAY.value,
+        "reason": "Christmas",
+        "from_time": "14:00:00",
+        "to_time": "18:00:00",
+    }
+
+    response = await async_client.post(f"{BASE_ROUTE}/{a}/chain-holidays", json=body)
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json() == {"stores": 3}
+    holidays = (
+        await db_session.execute(
+            select(Holiday.store_id, Holiday.reason, func.to_char(Holiday.from_time, "HH24:MI"))
+            .where(Holiday.store_id.in_([a, a1, a2, b]))
+            .order_by(Holiday.store_id)
+        )
+    ).all()
+    assert holidays == [(store_id, "Christmas", "14:00") for store_id in sorted([a, a1, a2])]
+
+    response = await async_client.post(
+        f"{BASE_ROUTE}/{a}/chain-holidays", json=body | {"to_time": "10:00:00"}
+    )
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_stale_paths_repaired(db_session: AsyncSession, async_client: AsyncClient):
+    """Test that a parent set without moving the store is found by the consistency check, and
+    that repairing rewrites the paths of the store and its descendants."""
+    root, a, a1, a2, b = await _create_chain(db_session, async_client)
+    await db_session.execute(
+        update(StoreDetail).where(StoreDetail.store_id == a).values(parent_store_id=b)
+    )
+    await db_session.commit()
+
+    stale = {path.store_id: path for path in await stale_paths(db_session)}
+    assert stale[a].expected_path == f"{root}.{b}.{a}"
+    assert stale[a1].expected_path == f"{root}.{b}.{a}.{a1}"
+    assert stale[a2].path == f"{root}.{a}.{a2}"
+
+    assert await repair_paths(db_session) >= 3
+    await db_session.commit()
+    assert not {path.store_id for path in await stale_paths(db_session)} & {root, a, a1, a2, b}
+    response = await async_client.get(f"{BASE_ROUTE}/{b}/descendants")
+    assert {item["id"] for item in response.json()["items"]} == {a, a1, a2}
+
+
+@pytest.mark.asyncio
+async def test_list_descendants_server_error(async_client: AsyncClient, mocker):
+    """Test that listing the descendants of a store with a server error returns a 500 response."""
+    await mocker("azra_store_lmi_api.apps.admin.views.store_tree.select", side_effect=Exception)
+    response = await async_client.get(f"{BASE_ROUTE}/unknown/descendants")
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert response.json() == {
+        "detail": "Unable to list Store descendants, please try again later."
+    }
@@ -0,0 +1,301 @@
+"""Geographic Reference Data Module.
+
+This module provides API endpoints for reading the countries, states and cities, which are loaded
+from the world cities dataset by the ``load_geo_data`` command.
+
+The module defines a FastAPI router with the following endpoints:
+- GET /countries: List the countries with pagination and sorting
+- GET /states: List the states with pagination and sorting, optionally of a country
+- GET /cities: List the cities with pagination and sorting, optionally of a state or a country
+- GET /cities/autocomplete: Search the cities by name prefix, optionally of a state or a country
+"""
+
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi_pagination import Page
+from fastapi_pagination.ext.sqlalchemy import paginate
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+
+from azra_store_lmi_api.apps.admin.city_autocomplete import search_cities
+from azra_store_lmi_api.apps.admin.models import City, Country, State
+from azra_store_lmi_api.apps.admin.schemas.geo import (
+    AutocompleteCity,
+    ListCity,
+    ListCountry,
+    ListState,
+)
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.core.dependencies import get_db_session, paginator_query_params
+from azra_store_lmi_api.core.exceptions import InternalServerErrorException
+from azra_store_lmi_api.core.utils import CustomParams
+
+geo_router = APIRouter(tags=["geo"])
+
+
+def _list_responses(example: dict, detail: str) -> dict:
+    """Returns the sample responses of a list endpoint."""
+    return {
+        status.HTTP_200_OK: {
+            "description": "Successful response",
+            "content": {
+                "application/json": {
+                    "example": {"items": [example], "total": 1, "page": 1, "size": 10, "pages": 1}
+                }
+            },
+        },
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {"description": "Validation error"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            "description": "Internal server error",
+            "content": {"application/json": {"example": {"detail": detail}}},
+        },
+    }
+
+
+# Contains the list of sample response for all apis
+RESPONSES = {
+    "COUNTRIES": _list_responses(
+        {
+            "id": 101,
+            "name": "India",
+            "numeric_code": "356",
+            "phone_code": "91",
+            "capital": "New Delhi",
+            "currency": "INR",
+            "currency_name": "Indian rupee",
+            "currency_symbol": "₹",
+            "region": "Asia",
+            "subregion": "Southern Asia",
+        },
+        "Unable to list countries, please try again later.",
+    ),
+    "STATES": _list_responses(
+        {"id": 4028, "country_id": 101, "name": "Kerala", "state_code": "KL", "type": "state"},
+        "Unable to list states, please try again later.",
+    ),
+    "CITIES": _list_responses(
+        {"id": 131517, "state_id": 4028, "name": "Kochi"},
+        "Unable to list cities, please try again later.",
+    ),
+    "AUTOCOMPLETE_CITIES": {
+        status.HTTP_200_OK: {
+            "description": "Successful response",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "id": 131517,
+                            "name": "Kochi",
+                            "state_id": 4028,
+                            "state_name": "Kerala",
+                            "country_id": 101,
+                        }
+                    ]
+                }
+            },
+        },
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {"description": "Validation error"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            "description": "Internal server error",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Unable to search cities, please try again later."}
+                }
+            },
+        },
+    },
+}
+
+
+@geo_router.get(
+    "/countries",
+    response_model=Page[ListCountry],
+    name="List Countries",
+    responses=RESPONSES["COUNTRIES"],
+)
+async def list_countries(
+    request: Request,
+    sort_by: Literal["id", "name"] = "name",
+    paginator: dict = Depends(paginator_query_params),
+    async_session: AsyncSession = Depends(get_db_session),
+):
+    """List the countries with pagination and sorting.
+
+    Args:
+        request (Request): The FastAPI request object.
+        sort_by (Literal["id", "name"]): The field to sort the results by. Defaults to name.
+        paginator (dict): A dictionary containing pagination parameters.
+            Obtained from the paginator_query_params dependency.
+        async_session (AsyncSession): The asynchronous database session.
+
+    Returns:
+        Page: A Page object containing the paginated list of countries.
+
+    Raises:
+        InternalServerErrorException: If an error occurs while retrieving the list.
+    """
+    try:
+        query = (
+            select(Country)
+            .options(load_only(*(getattr(Country, field) for field in ListCountry.model_fields)))
+            .order_by(paginator["order_by"](getattr(Country, sort_by)), Country.id)
+        )
+        return await paginate(
+            async_session,
+            query,
+            params=CustomParams(page=paginator["page"], size=paginator["size"]),
+        )
+    except Exception as exception:
+        logger.exception("Error occurred while listing countries: %s", exception)
+        raise InternalServerErrorException(
+            "Unable to list countries, please try again later."
+        ) from exception
+
+
+@geo_router.get(
+    "/states",
+    response_model=Page[ListState],
+    name="List States",
+    responses=RESPONSES["STATES"],
+)
+async def list_states(
+    request: Request,
+    country_id: Optional[int] = Query(default=None, description="Only the states of a country"),
+    sort_by: Literal["id", "name"] = "name",
+    paginator: dict = Depends(paginator_query_params),
+    async_session: AsyncSession = Depends(get_db_session),
+):
+    """List the states with pagination and sorting, optionally of a country.
+
+    Args:
+        request (Request): The FastAPI request object.
+        country_id (Optional[int]): The country to list the states of.
+        sort_by (Literal["id", "name"]): The field to sort the results by. Defaults to name.
+        paginator (dict): A dictionary containing pagination parameters.
+            Obtained from the paginator_query_params dependency.
+        async_session (AsyncSession): The asynchronous database session.
+
+    Returns:
+        Page: A Page object containing the paginated list of states.
+
+    Raises:
+        InternalServerErrorException: If an error occurs while retrieving the list.
+    """
+    try:
+        query = (
+            select(State)
+            .options(load_only(*(getattr(State, field) for field in ListState.model_fields)))
+            .order_by(paginator["order_by"](getattr(State, sort_by)), State.id)
+        )
+        if country_id is not None:
+            query = query.where(State.country_id == country_id)
+        return await paginate(
+            async_session,
+            query,
+            params=CustomParams(page=paginator["page"], size=paginator["size"]),
+        )
+    except Exception as exception:
+        logger.exception("Error occurred while listing states: %s", exception)
+        raise InternalServerErrorException(
+            "Unable to list states, please try again later."
+        ) from exception
+
+
+@geo_router.get(
+    "/cities",
+    response_model=Page[ListCity],
+    name="List Cities",
+    responses=RESPONSES["CITIES"],
+)
+async def list_cities(
+    request: Request,
+    state_id: Optional[int] = Query(default=None, description="Only the cities of a state"),
+    country_id: Optional[int] = Query(default=None, description="Only the cities of a country"),
+    sort_by: Literal["id", "name"] = "name",
+    paginator: dict = Depends(paginator_query_params),
+    async_session: AsyncSession = Depends(get_db_session),
+):
+    """List the cities with pagination and sorting, optionally of a state or a country.
+
+    Args:
+        request (Request): The FastAPI request object.
+        state_id (Optional[int]): The state to list the cities of.
+        country_id (Optional[int]): The country to list the cities of.
+        sort_by (Literal["id", "name"]): The field to sort the results by. Defaults to name.
+        paginator (dict): A dictionary containing pagination parameters.
+            Obtained from the paginator_query_params dependency.
+        async_session (AsyncSession): The asynchronous database session.
+
+    Returns:
+        Page: A Page object containing the paginated list of cities.
+
+    Raises:
+        InternalServerErrorException: If an error occurs while retrieving the list.
+    """
+    try:
+        query = (
+            select(City)
+            .options(load_only(*(getattr(City, field) for field in ListCity.model_fields)))
+            .order_by(paginator["order_by"](getattr(City, sort_by)), City.id)
+        )
+        if state_id is not None:
+            query = query.where(City.state_id == state_id)
+        if country_id is not None:
+            query = query.where(
+                City.state_id.in_(select(State.id).where(State.country_id == country_id))
+            )
+        return await paginate(
+            async_session,
+            query,
+            params=CustomParams(page=paginator["page"], size=paginator["size"]),
+        )
+    except Exception as exception:
+        logger.exception("Error occurred while listing cities: %s", exception)
+        raise InternalServerErrorException(
+            "Unable to list cities, please try again later."
+        ) from exception
+
+
+@geo_router.get(
+    "/cities/autocomplete",
+    response_model=List[AutocompleteCity],
+    name="Autocomplete Cities",
+    responses=RESPONSES["AUTOCOMPLETE_CITIES"],
+)
+async def autocomplete_cities(
+    request: Request,
+    q: str = Query(min_length=1, max_length=100, description="The beginning of the city name"),
+    state_id: Optional[int] = Query(default=None, description="Only the cities of a state"),
+    country_id: Optional[int] = Query(default=None, description="Only the cities of a country"),
+    limit: int = Query(default=10, ge=1, le=50, description="The number of cities to return"),
+    async_session: AsyncSession = Depends(get_db_session),
+):
+    """Search the cities by name prefix, optionally of a state or a country.
+
+    Matching ignores case, accents and punctuation. The cities whose name starts with the query
+    come first, then those with a later word starting with it.
+
+    Args:
+        request (Request): The FastAPI request object.
+        q (str): The beginning of the city name, or of one of its words.
+        state_id (Optional[int]): The state to search the cities of.
+        country_id (Optional[int]): The country to search the cities of.
+        limit (int): The maximum number of cities to return. Defaults to 10.
+        async_session (AsyncSession): The asynchronous database session.
+
+    Returns:
+        List[AutocompleteCity]: The matching cities, best match first.
+
+    Raises:
+        InternalServerErrorException: If an error occurs while searching the cities.
+    """
+    try:
+        matches = await search_cities(async_session, q, limit, state_id, country_id)
+        return [AutocompleteCity(**match._asdict()) for match in matches]
+    except Exception as exception:
+        logger.exception("Error occurred while searching cities: %s", exception)
+        raise InternalServerErrorException(
+            "Unable to search cities, please try again later."
+        ) from exception
@@ -13,17 +13,23 @@ The module defines a FastAPI router with the following endpoints:
 
 It uses SQLAlchemy for database operations and Pydantic for request/response modeling.
 The module also includes comprehensive error handling and logging.
+
+The detail and list responses are served from a read-through cache, which every change to the
+SAAS Admins invalidates before it responds. They carry ETag and Last-Modified headers derived
+from updated_at, and conditional requests for an unchanged response are answered with 304 Not
+Modified, from the validator alone.
 """
 
 # Rest of the file content follows...
 
-from typing import Literal
+from datetime import datetime
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, Request, status
+from fastapi import APIRouter, Depends, Request, Response, status
 from fastapi.responses import JSONResponse
 from fastapi_pagination import Page
 from fastapi_pagination.ext.sqlalchemy import paginate
-from sqlalchemy import and_, exists, select
+from sqlalchemy import and_, exists, func, select
 from sqlalchemy import update as sqlalchemy_update
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -31,7 +37,9 @@ from sqlalchemy.orm import load_only
 
 from azra_store_lmi_api.apps.admin.models.saas_admin import SAASAdmin
 from azra_store_lmi_api.apps.admin.schemas.saas_admin import ListSaaSAdmin, SAASAdminRequest
+from azra_store_lmi_api.config.cache import ReadThroughCache
 from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.core.conditional import Validator, is_not_modified, not_modified_response
 from azra_store_lmi_api.core.dependencies import get_db_session, paginator_query_params
 from azra_store_lmi_api.core.exceptions import (
     CustomPydanticValidationError,
@@ -45,6 +53,8 @@ saas_admin_router = APIRouter(
     tags=["saas_admin"],
 )
 
+saas_admin_cache = ReadThroughCache("saas_admins")
+
 # Contains the list of sample response for all apis
 RESPONSES = {
     "LIST": {
@@ -655,6 +665,7 @@ RESPONSES = {
 )
 async def list(
     request: Request,
+    response: Response,
     sort_by: Literal["id", "email"],
     paginator: dict = Depends(paginator_query_params),
     async_session: AsyncSession = Depends(get_db_session),
@@ -664,20 +675,34 @@ async def list(
     This function retrieves a paginated list of SAAS Admins from the database,
     with optional sorting by id or email.
 
+    The response carries a weak ETag derived from the number of SAAS Admins and the time the
+    last of them was updated. A request which already has it is answered with 304 Not Modified.
+
     Args:
         request (Request): The FastAPI request object.
+        response (Response): The response, on which the ETag headers are set.
         sort_by (Literal["id", "email"]): The field to sort the results by.
         paginator (dict): A dictionary containing pagination parameters.
             Obtained from the paginator_query_params dependency.
         async_session (AsyncSession): The asynchronous database session.
 
     Returns:
-        Page: A Page object containing the paginated list of SAAS Admins.
+        dict: The page of SAAS Admins, served from the cache when possible, or an empty 304
+        response.
 
     Raises:
         InternalServerErrorException: If an error occurs while retrieving the list.
     """
-    try:
+
+    async def load_validator() -> List:
+        count, updated_at = (
+            await async_session.execute(
+                select(func.count(SAASAdmin.id), func.max(SAASAdmin.updated_at))
+            )
+        ).one()
+        return [count, updated_at.isoformat() if updated_at else None]
+
+    async def load_page() -> dict:
         query = (
             select(SAASAdmin)
             .options(
@@ -693,12 +718,26 @@ async def list(
             )
             .order_by(paginator["order_by"](sort_by))
         )
-
-        return await paginate(
+        page = await paginate(
             async_session,
             query,
             params=CustomParams(page=paginator["page"], size=paginator["size"]),
+            transformer=lambda items: [ListSaaSAdmin(**item.__dict__) for item in items],
+        )
+        return page.model_dump(mode="json")
+
+    try:
+        count, updated_at = await saas_admin_cache.get_or_load("validator:list", load_validator)
+        validator = Validator.weak(count, updated_at and datetime.fromisoformat(updated_at))
+        if is_not_modified(request, validator):
+            return not_modified_response(validator)
+        page = await saas_admin_cache.get_or_load(
+            f"list:{paginator['page']}:{paginator['size']}:{sort_by}:"
+            f"{paginator['order_by'].__name__}",
+            load_page,
         )
+        response.headers.update(validator.headers)
+        return page
     except Exception as exception:
         logger.exception("Error occurred while listing saas admins: %s", exception)
         raise InternalServerErrorException(
@@ -748,12 +787,14 @@ async def create(
         )
         if saas_admin:
             raise IntegrityError(statement=None, params=None, orig=Exception())
+        # The password sent to the admin is generated by the credentials task, this one is never
+        # shared and only keeps the account locked until then.
         saas_admin_dict = saas_admin_request.model_dump() | {"password": generate_password()}
         saas_admin_data = SAASAdmin(**saas_admin_dict)
         async_session.add(saas_admin_data)
+        await saas_admin_data.send_admin_credential(async_session)
         await async_session.commit()
-        await async_session.refresh(saas_admin_data)
-        await saas_admin_data.send_admin_credential(saas_admin_dict["password"])
+        await saas_admin_cache.invalidate()
         return JSONResponse(
             {"detail": "SAAS Admin has been created successfully."},
             status_code=status.HTTP_201_CREATED,
@@ -792,7 +833,10 @@ async def create(
     },
 )
 async def get(
-    request: Request, saas_admin_id: int, async_session: AsyncSession = Depends(get_db_session)
+    request: Request,
+    response: Response,
+    saas_admin_id: int,
+    async_session: AsyncSession = Depends(get_db_session),
 ):
     """Retrieve details of a specific SAAS Admin.
 
@@ -800,14 +844,19 @@ async def get(
     It queries the database to retrieve specific fields of the SAAS Admin entity
     and returns them in a structured format.
 
+    The response carries a strong ETag derived from the time the SAAS Admin was last updated.
+    A request which already has it is answered with 304 Not Modified.
+
     Args:
         request (Request): The incoming HTTP request object.
+        response (Response): The response, on which the ETag headers are set.
         saas_admin_id (int): The unique identifier of the SAAS Admin to retrieve.
         async_session (AsyncSession): The asynchronous database session,
         injected by FastAPI's dependency system.
 
     Returns:
-        ListSaaSAdmin: An object containing the details of the requested SAAS Admin
+        ListSaaSAdmin: An object containing the details of the requested SAAS Admin, or an
+        empty 304 response.
 
     Raises:
         HTTPNotFoundError: If no SAAS Admin is found with the provided ID.
@@ -816,9 +865,17 @@ async def get(
 
     Note:
         This function uses SQLAlchemy's select statement with load_only to optimize
-        the database query by fetching only the required fields.
+        the database query by fetching only the required fields. The details are served
+        from the cache when possible, a missing SAAS Admin is not cached.
     """
-    try:
+
+    async def load_validator() -> Optional[str]:
+        updated_at = await async_session.scalar(
+            select(SAASAdmin.updated_at).where(SAASAdmin.id == saas_admin_id)
+        )
+        return updated_at.isoformat() if updated_at else None
+
+    async def load_saas_admin() -> Optional[dict]:
         saas_admin = await async_session.scalar(
             select(SAASAdmin)
             .options(
@@ -835,8 +892,23 @@ async def get(
             .where(SAASAdmin.id == saas_admin_id)
         )
         if not saas_admin:
+            return None
+        return ListSaaSAdmin(**saas_admin.__dict__).model_dump(mode="json")
+
+    try:
+        updated_at = await saas_admin_cache.get_or_load(
+            f"validator:{saas_admin_id}", load_validator
+        )
+        if updated_at is None:
+            return HTTPNotFoundError("SAAS Admin not found.")
+        validator = Validator.strong(str(saas_admin_id), datetime.fromisoformat(updated_at))
+        if is_not_modified(request, validator):
+            return not_modified_response(validator)
+        saas_admin = await saas_admin_cache.get_or_load(f"detail:{saas_admin_id}", load_saas_admin)
+        if saas_admin is None:
             return HTTPNotFoundError("SAAS Admin not found.")
-        return ListSaaSAdmin(**saas_admin.__dict__)
+        response.headers.update(validator.headers)
+        return ListSaaSAdmin(**saas_admin)
     except Exception as exception:
         logger.exception("Error Occurred while getting saas admin details: %s", exception)
         raise InternalServerErrorException(
@@ -912,6 +984,7 @@ async def update(
             .values(**saas_admin_request.model_dump())
         )
         await async_session.commit()
+        await saas_admin_cache.invalidate()
         return JSONResponse(
             {"detail": f"{saas_admin_username} SAAS Admin has been updated successfully."},
             status_code=status.HTTP_200_OK,
@@ -977,6 +1050,7 @@ async def delete(
         username = saas_admin.username
         saas_admin.delete()
         await async_session.commit()
+        await saas_admin_cache.invalidate()
         return JSONResponse(
             {"detail": f"{username} SAAS Admin has been deleted successfully."},
             status_code=status.HTTP_200_OK,
@@ -0,0 +1,676 @@
+"""Store Management Module.
+
+This module provides API endpoints for creating stores, following their provisioning and reading
+them with their details.
+
+The module defines a FastAPI router with the following endpoints:
+- GET /stores: List the stores with their details, with pagination and sorting
+- GET /stores/search: Search the stores by the services they offer
+- GET /stores/nearby: List the active stores nearest to a point
+- POST /stores: Create a new store, provisioned in the background
+- GET /stores/{store_id}: Retrieve a store with its details
+- GET /stores/{store_id}/status: Retrieve the provisioning status of a store
+
+Creating a store never waits for its schema: the store is inserted in the CREATING status, with
+its schema in the tenant registry and the ``provision_store`` task in the outbox, and the request
+is answered with 202 Accepted and the URL of the status endpoint. The task creates and migrates
+the schema on the provisioning queue, then flips the store to ACTIVE or FAILED, which clients
+poll for.
+
+The list and the detail load the store aggregate, the store with its details, their country,
+state, city, parent store and contact details, in the same fixed number of queries whatever the
+number of stores, see ``STORE_AGGREGATE_OPTIONS``. The search filters them by their services
+through the GIN indexes of the service arrays, see ``store_search``. The nearby stores are found
+in the in-process KD-tree of the store locations, see ``store_locations``, then loaded the same
+way.
+"""
+
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from fastapi.responses import JSONResponse
+from fastapi_pagination import Page
+from fastapi_pagination.ext.sqlalchemy import paginate
+from sqlalchemy import exists, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload, selectinload
+
+from azra_store_lmi_api.apps.admin.models import SAASAdmin, Store, StoreDetail
+from azra_store_lmi_api.apps.admin.models.store import StoreStatusEnum
+from azra_store_lmi_api.apps.admin.schemas.store import (
+    ListStore,
+    NearbyStore,
+    ServiceQuery,
+    StoreRequest,
+    StoreStatus,
+    SubServiceQuery,
+)
+from azra_store_lmi_api.apps.admin.store_locations import store_locations
+from azra_store_lmi_api.apps.admin.store_search import service_filters, service_matcher
+from azra_store_lmi_api.apps.admin.tasks.provisioning import enqueue_provisioning
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.config.settings import settings
+from azra_store_lmi_api.config.tenancy import register_tenant
+from azra_store_lmi_api.core.dependencies import get_db_session, paginator_query_params
+from azra_store_lmi_api.core.exceptions import (
+    CustomPydanticValidationError,
+    HTTPNotFoundError,
+    InternalServerErrorException,
+)
+from azra_store_lmi_api.core.utils import CustomParams
+
+store_router = APIRouter(
+    prefix="/stores",
+    tags=["store"],
+)
+
+# The loader strategies of the store aggregate, which issue the same three queries whatever the
+# number of stores: the stores, then their details and their contact details, each selected by
+# the keys of their parents in one query. The details and contact details are one-to-many, and
+# joining them would repeat the stores and break the pagination. The country, state, city and
+# parent store of the details are many-to-one, so they are joined to the query of the details.
+# Any other relationship raises instead of lazily loading row by row.
+_store_detail = selectinload(Store.store_detail)
+STORE_AGGREGATE_OPTIONS = (
+    _store_detail.joinedload(StoreDetail.country),
+    _store_detail.joinedload(StoreDetail.state),
+    _store_detail.joinedload(StoreDetail.city),
+    _store_detail.joinedload(StoreDetail.parent_store).raiseload("*"),
+    _store_detail.selectinload(StoreDetail.contact_details).raiseload("*"),
+    _store_detail.raiseload("*"),
+    raiseload("*"),
+)
+
+_STORE_EXAMPLE = {
+    "id": "01JD2M4V7R9QX8ZK3T5W6Y1B0C",
+    "name": "Main Street Laundry",
+    "unique_indentifier": "main_street",
+    "is_main_store": True,
+    "status": StoreStatusEnum.ACTIVE.value,
+    "created_at": "2024-11-20T10:15:30.123456+00:00",
+    "store_detail": {
+        "id": 1,
+        "country": {"id": 101, "name": "India"},
+        "state": {"id": 4028, "name": "Kerala"},
+        "city": {"id": 131517, "name": "Kochi"},
+        "parent_store": None,
+        "description": "Laundry and dry cleaning.",
+        "slogan": "Fresh every day",
+        "address": "12 Main Street",
+        "postal_code": "682001",
+        "latitude": 9.9312,
+        "longitude": 76.2673,
+        "logo": "https://cdn.example.com/logo.png",
+        "cover_image": "https://cdn.example.com/cover.png",
+        "gst": "32AAAAA0000A1Z5",
+        "tin": None,
+        "services": [20],
+        "sub_services": [10, 20, 30],
+        "has_online_booking": True,
+        "has_delivery_service": True,
+        "has_parking_facility": False,
+        "has_wifi_facility": False,
+        "contact_details": [
+            {
+                "id": 1,
+                "email": "main_street@example.com",
+                "is_email_verified": True,
+                "phone_country_code": "+91",
+                "phone_number": "9876543210",
+                "is_phone_number_verified": True,
+                "alternate_email": None,
+                "alternate_phone_country_code": None,
+                "alternate_phone_number": None,
+                "social_links": {"instagram": "https://instagram.com/main_street"},
+            }
+        ],
+    },
+}
+
+# Contains the list of sample response for all apis
+RESPONSES = {
+    "LIST": {
+        status.HTTP_200_OK: {
+            "description": "Successful response",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "items": [_STORE_EXAMPLE],
+                        "total": 1,
+                        "page": 1,
+                        "size": 10,
+                        "pages": 1,
+                    }
+                }
+            },
+        },
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {"description": "Validation error"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            "description": "Internal server error",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Unable to list Stores, please try again later."}
+                }
+            },
+        },
+    },
+    "SEARCH": {
+        status.HTTP_200_OK: {
+            "description": "Successful response",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "items": [_STORE_EXAMPLE],
+                        "total": 1,
+                        "page": 1,
+                        "size": 10,
+                        "pages": 1,
+                    }
+                }
+            },
+        },
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {"description": "Validation error"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            "description": "Internal server error",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Unable to search Stores, please try again later."}
+                }
+            },
+        },
+    },
+    "NEARBY": {
+        status.HTTP_200_OK: {
+            "description": "Successful response",
+            "content": {
+                "application/json": {"example": [{"distance": 1.42, "store": _STORE_EXAMPLE}]}
+            },
+        },
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {"description": "Validation error"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            "description": "Internal server error",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Unable to list nearby Stores, please try again later."}
+                }
+            },
+        },
+    },
+    "DETAIL": {
+        status.HTTP_200_OK: {
+            "description": "Successful response",
+            "content": {"application/json": {"example": _STORE_EXAMPLE}},
+        },
+        status.HTTP_404_NOT_FOUND: {
+            "description": "Store not found",
+            "content": {"application/json": {"example": {"detail": "Store not found."}}},
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            "description": "Internal server error",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Unable to get Store details, please try again later."}
+                }
+            },
+        },
+    },
+    "CREATE": {
+        status.HTTP_202_ACCEPTED: {
+            "description": "Store created, its schema is being provisioned",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "id": "01JD2M4V7R9QX8ZK3T5W6Y1B0C",
+                        "status": StoreStatusEnum.CREATING.value,
+                        "status_name": StoreStatusEnum.CREATING.name,
+                    }
+                }
+            },
+        },
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {
+            "description": "Validation error",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": [
+                            {
+                                "type": "value_error",
+                                "loc": ["body", "unique_indentifier"],
+                                "msg": "Value error, main_street Store already exists.",
+                                "input": "main_street",
+                                "ctx": {"error": "main_street Store already exists."},
+                            }
+                        ]
+                    }
+                }
+            },
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            "description": "Internal server error",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Unable to create Store, please try again later."}
+                }
+            },
+        },
+    },
+    "STATUS": {
+        status.HTTP_200_OK: {
+            "description": "Successful response",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "id": "01JD2M4V7R9QX8ZK3T5W6Y1B0C",
+                        "status": StoreStatusEnum.ACTIVE.value,
+                        "status_name": StoreStatusEnum.ACTIVE.name,
+                    }
+                }
+            },
+        },
+        status.HTTP_404_NOT_FOUND: {
+            "description": "Store not found",
+            "content": {"application/json": {"example": {"detail": "Store not found."}}},
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {
+            "description": "Internal server error",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Unable to get Store status, please try again later."}
+                }
+            },
+        },
+    },
+}
+
+
+def _status_response(store_id: str, store_status: int) -> StoreStatus:
+    """Returns the status schema of a store."""
+    return StoreStatus(
+        id=store_id,
+        status=store_status,
+        status_name=StoreStatusEnum.get_name_by_value(store_status),
+    )
+
+
+@store_router.get(
+    "",
+    name="List Stores",
+    response_model=Page[ListStore],
+    responses=RESPONSES["LIST"],
+)
+async def list_stores(
+    request: Request,
+    sort_by: Literal["name", "created_at"] = "created_at",
+    paginator: dict = Depends(paginator_query_params),
+    async_session: AsyncSession = Depends(get_db_session),
+):
+    """List the stores with their details, with pagination and sorting.
+
+    The page is loaded with its details, their country, state, city, parent store and contact
+    details in a fixed number of queries, whatever its size, see ``STORE_AGGREGATE_OPTIONS``.
+
+    Args:
+        request (Request): The FastAPI request object.
+        sort_by (Literal["name", "created_at"]): The field to sort the results by. Defaults to
+            created_at.
+        paginator (dict): A dictionary containing pagination parameters.
+            Obtained from the paginator_query_params dependency.
+        async_session (AsyncSession): The asynchronous database session.
+
+    Returns:
+        Page: A Page object containing the paginated list of stores.
+
+    Raises:
+        InternalServerErrorException: If an error occurs while retrieving the list.
+    """
+    try:
+        query = (
+            select(Store)
+            .options(*STORE_AGGREGATE_OPTIONS)
+            .order_by(paginator["order_by"](getattr(Store, sort_by)), Store.id)
+        )
+        return await paginate(
+            async_session,
+            query,
+            params=CustomParams(page=paginator["page"], size=paginator["size"]),
+        )
+    except Exception as exception:
+        logger.exception("Error occurred while listing stores: %s", exception)
+        raise InternalServerErrorException(
+            "Unable to list Stores, please try again later."
+        ) from exception
+
+
+@store_router.get(
+    "/search",
+    name="Search Stores",
+    response_model=Page[ListStore],
+    responses=RESPONSES["SEARCH"],
+)
+async def search(
+    request: Request,
+    services: List[ServiceQuery] = Query(
+        default=[], description="The services the stores must offer"
+    ),
+    sub_services: List[SubServiceQuery] = Query(
+        default=[], description="The sub-services the stores must offer"
+    ),
+    match: Literal["all", "any"] = Query(
+        default="all", description="Whether the stores must offer all or any of the services"
+    ),
+    sort_by: Literal["name", "created_at"] = "created_at",
+    paginator: dict = Depends(paginator_query_params),
+    async_session: AsyncSession = Depends(get_db_session),
+):
+    """Search the stores with their details by the services they offer.
+
+    For example, the laundry stores offering dry cleaning and home delivery are searched with
+    ``?services=20&sub_services=30&sub_services=150``. The filters are answered from the GIN
+    indexes of the service arrays, see ``store_search``.
+
+    Args:
+        request (Request): The FastAPI request object.
+        services (List[int]): The services the stores must offer, see StoreServiceEnum. A store
+            offering all services matches any of them.
+        sub_services (List[int]): The sub-services the stores must offer, see
+            StoreSubServiceEnum.
+        match (Literal["all", "any"]): Whether the stores must offer all the services and all the
+            sub-services, or at least one of each. Defaults to all.
+        sort_by (Literal["name", "created_at"]): The field to sort the results by. Defaults to
+            created_at.
+        paginator (dict): A dictionary containing pagination parameters.
+            Obtained from the paginator_query_params dependency.
+        async_session (AsyncSession): The asynchronous database session.
+
+    Returns:
+        Page: A Page object containing the paginated list of matching stores.
+
+    Raises:
+        InternalServerErrorException: If an error occurs while searching the stores.
+    """
+    try:
+        query = (
+            select(Store)
+            .join(StoreDetail, StoreDetail.store_id == Store.id)
+            .where(*service_filters(services, sub_services, match_all=match == "all"))
+            .options(*STORE_AGGREGATE_OPTIONS)
+            .order_by(paginator["order_by"](getattr(Store, sort_by)), Store.id)
+        )
+        return await paginate(
+            async_session,
+            query,
+            params=CustomParams(page=paginator["page"], size=paginator["size"]),
+        )
+    except Exception as exception:
+        logger.exception("Error occurred while searching stores: %s", exception)
+        raise InternalServerErrorException(
+            "Unable to search Stores, please try again later."
+        ) from exception
+
+
+@store_router.get(
+    "/nearby",
+    name="List Nearby Stores",
+    response_model=List[NearbyStore],
+    responses=RESPONSES["NEARBY"],
+)
+async def list_nearby(
+    request: Request,
+    latitude: float = Query(ge=-90, le=90, description="The latitude of the point, in degrees"),
+    longitude: float = Query(
+        ge=-180, le=180, description="The longitude of the point, in degrees"
+    ),
+    radius: Optional[float] = Query(
+        default=None, gt=0, description="The maximum distance of the stores, in kilometers"
+    ),
+    limit: int = Query(default=10, ge=1, le=100, description="The number of stores to return"),
+    services: List[ServiceQuery] = Query(
+        default=[], description="The services the stores must offer"
+    ),
+    sub_services: List[SubServiceQuery] = Query(
+        default=[], description="The sub-services the stores must offer"
+    ),
+    match: Literal["all", "any"] = Query(
+        default="all", description="Whether the stores must offer all or any of the services"
+    ),
+    async_session: AsyncSession = Depends(get_db_session),
+):
+    """List the active stores nearest to a point, with their details and distance.
+
+    Without a radius, the ``limit`` nearest stores are returned wherever they are. With a radius,
+    only the stores within it, so ``?latitude=9.93&longitude=76.27&radius=5&limit=100`` lists the
+    stores within 5 km, nearest first. The stores are found in the in-process index of the store
+    locations, refreshed every STORE_LOCATIONS_REFRESH_INTERVAL seconds, see
+    ``store_locations``, and only the stores found are read from the database.
+
+    Args:
+        request (Request): The FastAPI request object.
+        latitude (float): The latitude of the point, in degrees.
+        longitude (float): The longitude of the point, in degrees.
+        radius (Optional[float]): The maximum distance of the stores, in kilometers. Defaults to
+            no maximum.
+        limit (int): The maximum number of stores to return. Defaults to 10.
+        services (List[int]): The services the stores must offer, see StoreServiceEnum. A store
+            offering all services matches any of them.
+        sub_services (List[int]): The sub-services the stores must offer, see
+            StoreSubServiceEnum.
+        match (Literal["all", "any"]): Whether the stores must offer all the services and all the
+            sub-services, or at least one of each. Defaults to all.
+        async_session (AsyncSession): The asynchronous database session.
+
+    Returns:
+        List[NearbyStore]: The stores, nearest first.
+
+    Raises:
+        InternalServerErrorException: If an error occurs while listing the stores.
+    """
+    try:
+        index = await store_locations.get(async_session)
+        nearest = index.nearest(
+            latitude,
+            longitude,
+            limit,
+            radius,
+            service_matcher(services, sub_services, match_all=match == "all"),
+        )
+        if not nearest:
+            return []
+        # The index may lag behind the database, so the stores deleted or deactivated since it
+        # was loaded are left out.
+        stores = {
+            store.id: store
+            for store in await async_session.scalars(
+                select(Store)
+                .where(
+                    Store.id.in_([store.store_id for store in nearest]),
+                    Store.status == StoreStatusEnum.ACTIVE.value,
+                )
+                .options(*STORE_AGGREGATE_OPTIONS)
+            )
+        }
+        return [
+            NearbyStore(
+                distance=round(store.distance, 3),
+                store=ListStore.model_validate(stores[store.store_id]),
+            )
+            for store in nearest
+            if store.store_id in stores
+        ]
+    except Exception as exception:
+        logger.exception("Error occurred while listing nearby stores: %s", exception)
+        raise InternalServerErrorException(
+            "Unable to list nearby Stores, please try again later."
+        ) from exception
+
+
+@store_router.post(
+    "",
+    name="Create Store",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=StoreStatus,
+    responses=RESPONSES["CREATE"],
+)
+async def create(
+    request: Request,
+    store_request: StoreRequest,
+    async_session: AsyncSession = Depends(get_db_session),
+):
+    """Create a new store, whose schema is provisioned in the background.
+
+    The store is inserted in the CREATING status, together with its schema in the tenant registry
+    and the task provisioning it, and the request is answered without waiting for the task.
+
+    Args:
+        request (Request): The incoming request object.
+        store_request (StoreRequest): The request model containing the store details.
+        async_session (AsyncSession): The database session for async operations.
+
+    Returns:
+        JSONResponse: The status of the store, with the URL of the status endpoint in the
+        Location header.
+
+    Raises:
+        CustomPydanticValidationError: If the SAAS Admin does not exist, or a store with the given
+            unique identifier already exists.
+        InternalServerErrorException: If an unexpected error occurs during the creation process.
+    """
+    try:
+        if not await async_session.scalar(
+            select(exists().where(SAASAdmin.id == store_request.created_by_id))
+        ):
+            return CustomPydanticValidationError(
+                [
+                    {
+                        "field": "created_by_id",
+                        "message": "SAAS Admin not found.",
+                        "value": store_request.created_by_id,
+                    }
+                ]
+            )
+        if await async_session.scalar(
+            select(
+                exists().where(Store.unique_indentifier == store_request.unique_indentifier)
+            ).execution_options(include_deleted=True)
+        ):
+            raise IntegrityError(statement=None, params=None, orig=Exception())
+        store = Store(**store_request.model_dump(), status=StoreStatusEnum.CREATING.value)
+        async_session.add(store)
+        await async_session.flush()
+        store_id = store.id
+        register_tenant(async_session, store_id, store_request.unique_indentifier)
+        await enqueue_provisioning(async_session, store_id)
+        await async_session.commit()
+        return JSONResponse(
+            _status_response(store_id, StoreStatusEnum.CREATING.value).model_dump(),
+            status_code=status.HTTP_202_ACCEPTED,
+            headers={
+                "Location": str(request.url_for("Get Store Status", store_id=store_id)),
+                "Retry-After": str(settings.STORE_STATUS_RETRY_AFTER),
+            },
+        )
+    except IntegrityError:
+        await async_session.rollback()
+        return CustomPydanticValidationError(
+            [
+                {
+                    "field": "unique_indentifier",
+                    "message": f"{store_request.unique_indentifier} Store already exists.",
+                    "value": store_request.unique_indentifier,
+                }
+            ]
+        )
+    except Exception as exception:
+        await async_session.rollback()
+        logger.exception(
+            "Error occurred while creating the store!\n%s\nRequest Data:\n%s",
+            exception,
+            store_request.model_dump(),
+        )
+        raise InternalServerErrorException(
+            "Unable to create Store, please try again later."
+        ) from exception
+
+
+@store_router.get(
+    "/{store_id}",
+    name="Get Store",
+    response_model=ListStore,
+    responses=RESPONSES["DETAIL"],
+)
+async def get(
+    request: Request,
+    store_id: str,
+    async_session: AsyncSession = Depends(get_db_session),
+):
+    """Retrieve a store with its details.
+
+    Args:
+        request (Request): The incoming HTTP request object.
+        store_id (str): The unique identifier of the store.
+        async_session (AsyncSession): The asynchronous database session.
+
+    Returns:
+        ListStore: The store, with its details, their country, state, city, parent store and
+        contact details.
+
+    Raises:
+        HTTPNotFoundError: If no store is found with the provided ID.
+        InternalServerErrorException: If there's an unexpected error during the database query.
+    """
+    try:
+        store = await async_session.scalar(
+            select(Store).options(*STORE_AGGREGATE_OPTIONS).where(Store.id == store_id)
+        )
+        if store is None:
+            return HTTPNotFoundError("Store not found.")
+        return ListStore.model_validate(store)
+    except Exception as exception:
+        logger.exception("Error Occurred while getting store details: %s", exception)
+        raise InternalServerErrorException(
+            "Unable to get Store details, please try again later."
+        ) from exception
+
+
+@store_router.get(
+    "/{store_id}/status",
+    name="Get Store Status",
+    response_model=StoreStatus,
+    responses=RESPONSES["STATUS"],
+)
+async def get_status(
+    request: Request,
+    response: Response,
+    store_id: str,
+    async_session: AsyncSession = Depends(get_db_session),
+):
+    """Retrieve the provisioning status of a store.
+
+    Only the status column is read, by primary key, so clients can poll it while the store is
+    being created. Until then, the Retry-After header tells them when to poll again.
+
+    Args:
+        request (Request): The incoming HTTP request object.
+        response (Response): The response, on which the Retry-After header is set.
+        store_id (str): The unique identifier of the store.
+        async_session (AsyncSession): The asynchronous database session.
+
+    Returns:
+        StoreStatus: The status of the store.
+
+    Raises:
+        HTTPNotFoundError: If no store is found with the provided ID.
+        InternalServerErrorException: If there's an unexpected error during the database query.
+    """
+    try:
+        store_status = await async_session.scalar(select(Store.status).where(Store.id == store_id))
+        if store_status is None:
+            return HTTPNotFoundError("Store not found.")
+        if store_status == StoreStatusEnum.CREATING.value:
+            response.headers["Retry-After"] = str(settings.STORE_STATUS_RETRY_AFTER)
+        return _status_response(store_id, store_status)
+    except Exception as exception:
+        logger.exception("Error Occurred while getting store status: %s", exception)
+        raise InternalServerErrorException(
+            "Unable to get Store status, please try again later."
+        ) from exception
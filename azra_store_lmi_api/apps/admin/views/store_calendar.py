@@ -0,0 +1,261 @@
+"""Store Calendar Module.
+
+This module provides API endpoints for reading when stores are closed by their holidays.
+
+The module defines a FastAPI router with the following endpoints:
+- POST /stores/calendar: Read the closures of many stores over a range of dates
+- GET /stores/calendar/closed: List the stores closed during a day
+- GET /stores/{store_id}/open: Check whether a store is open at a time
+
+The holidays are not queried by these endpoints: they are read from the holidays of every month
+compiled once into closures, kept by each process and invalidated when holidays change, see
+``store_calendar``. Times are in the local time of the stores, as the holidays are.
+"""
+
+import datetime
+from typing import List
+
+from fastapi import APIRouter, Depends, Query, Request, status
+from pydantic import NaiveDatetime
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.apps.admin.models import Store
+from azra_store_lmi_api.apps.admin.schemas.store import (
+    ClosedStores,
+    Closure,
+    StoreCalendarRequest,
+    StoreClosures,
+    StoreOpening,
+)
+from azra_store_lmi_api.apps.admin.store_calendar import Interval, store_calendar, to_datetime
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.core.dependencies import get_db_session
+from azra_store_lmi_api.core.exceptions import HTTPNotFoundError, InternalServerErrorException
+
+store_calendar_router = APIRouter(
+    prefix="/stores",
+    tags=["store"],
+)
+
+_CLOSURES_EXAMPLE = [
+    {"start": "2026-12-24T14:00:00", "end": "2026-12-24T18:00:00"},
+    {"start": "2026-12-25T00:00:00", "end": "2026-12-27T00:00:00"},
+]
+
+
+def _server_error(detail: str) -> dict:
+    """Returns the sample response of an internal server error."""
+    return {
+        "description": "Internal server error",
+        "content": {"application/json": {"example": {"detail": detail}}},
+    }
+
+
+# Contains the list of sample response for all apis
+RESPONSES = {
+    "CALENDAR": {
+        status.HTTP_200_OK: {
+            "description": "Successful response",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {"store_id": "01JD2M4V7R9QX8ZK3T5W6Y1B0C", "closures": _CLOSURES_EXAMPLE}
+                    ]
+                }
+            },
+        },
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {"description": "Validation error"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: _server_error(
+            "Unable to get Store calendars, please try again later."
+        ),
+    },
+    "CLOSED": {
+        status.HTTP_200_OK: {
+            "description": "Successful response",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "date": "2026-12-24",
+                        "all_stores": [],
+                        "stores": [
+                            {
+                                "store_id": "01JD2M4V7R9QX8ZK3T5W6Y1B0C",
+                                "closures": _CLOSURES_EXAMPLE[:1],
+                            }
+                        ],
+                    }
+                }
+            },
+        },
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {"description": "Validation error"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: _server_error(
+            "Unable to list closed Stores, please try again later."
+        ),
+    },
+    "OPEN": {
+        status.HTTP_200_OK: {
+            "description": "Successful response",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "store_id": "01JD2M4V7R9QX8ZK3T5W6Y1B0C",
+                        "at": "2026-12-24T15:30:00",
+                        "is_open": False,
+                        "closure": _CLOSURES_EXAMPLE[0],
+                    }
+                }
+            },
+        },
+        status.HTTP_404_NOT_FOUND: {
+            "description": "Store not found",
+            "content": {"application/json": {"example": {"detail": "Store not found."}}},
+        },
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {"description": "Validation error"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: _server_error(
+            "Unable to check if the Store is open, please try again later."
+        ),
+    },
+}
+
+
+def _closures(intervals: List[Interval]) -> List[Closure]:
+    """Returns the schemas of closure intervals."""
+    return [Closure(start=to_datetime(start), end=to_datetime(end)) for start, end in intervals]
+
+
+@store_calendar_router.post(
+    "/calendar",
+    name="Get Store Calendars",
+    response_model=List[StoreClosures],
+    responses=RESPONSES["CALENDAR"],
+)
+async def get_calendars(
+    request: Request,
+    calendar_request: StoreCalendarRequest,
+    async_session: AsyncSession = Depends(get_db_session),
+):
+    """Read the closures of many stores over a range of dates.
+
+    The closures of a store merge its own holidays with the public holidays, which close every
+    store, and consecutive or overlapping closures are returned as one. The stores are not
+    checked to exist, an unknown store has the public holidays only.
+
+    Args:
+        request (Request): The incoming request object.
+        calendar_request (StoreCalendarRequest): The request model containing the stores and
+            the range of dates.
+        async_session (AsyncSession): The database session for async operations.
+
+    Returns:
+        List[StoreClosures]: The closures of every store, in the order of the request.
+
+    Raises:
+        InternalServerErrorException: If an unexpected error occurs while reading the calendars.
+    """
+    try:
+        calendar = await store_calendar.get(
+            async_session, calendar_request.start_date, calendar_request.end_date
+        )
+        return [
+            StoreClosures(store_id=store_id, closures=_closures(calendar.closures(store_id)))
+            for store_id in dict.fromkeys(calendar_request.store_ids)
+        ]
+    except Exception as exception:
+        logger.exception(
+            "Error occurred while reading store calendars!\n%s\nRequest Data:\n%s",
+            exception,
+            calendar_request.model_dump(),
+        )
+        raise InternalServerErrorException(
+            "Unable to get Store calendars, please try again later."
+        ) from exception
+
+
+@store_calendar_router.get(
+    "/calendar/closed",
+    name="List Closed Stores",
+    response_model=ClosedStores,
+    responses=RESPONSES["CLOSED"],
+)
+async def list_closed(
+    request: Request,
+    date: datetime.date = Query(description="The day"),
+    async_session: AsyncSession = Depends(get_db_session),
+):
+    """List the stores closed during a day, for the whole day or part of it.
+
+    The public holidays of the day close every store, so they are returned once, apart from the
+    stores closed by their own holidays.
+
+    Args:
+        request (Request): The FastAPI request object.
+        date (datetime.date): The day.
+        async_session (AsyncSession): The asynchronous database session.
+
+    Returns:
+        ClosedStores: The closures of every store, and the stores closed by their own holidays.
+
+    Raises:
+        InternalServerErrorException: If an error occurs while listing the stores.
+    """
+    try:
+        calendar = await store_calendar.get(async_session, date, date)
+        return ClosedStores(
+            date=date,
+            all_stores=_closures(calendar.public()),
+            stores=[
+                StoreClosures(store_id=store_id, closures=_closures(closures))
+                for store_id, closures in sorted(calendar.closed_on(date).items())
+            ],
+        )
+    except Exception as exception:
+        logger.exception("Error occurred while listing closed stores: %s", exception)
+        raise InternalServerErrorException(
+            "Unable to list closed Stores, please try again later."
+        ) from exception
+
+
+@store_calendar_router.get(
+    "/{store_id}/open",
+    name="Check Store Open",
+    response_model=StoreOpening,
+    responses=RESPONSES["OPEN"],
+)
+async def is_open(
+    request: Request,
+    store_id: str,
+    at: NaiveDatetime = Query(description="The time, in the local time of the store"),
+    async_session: AsyncSession = Depends(get_db_session),
+):
+    """Check whether a store is open at a time, that is not closed by a holiday.
+
+    Args:
+        request (Request): The FastAPI request object.
+        store_id (str): The unique identifier of the store.
+        at (NaiveDatetime): The time, in the local time of the store, without a time zone.
+        async_session (AsyncSession): The asynchronous database session.
+
+    Returns:
+        StoreOpening: Whether the store is open, with the closure including the time if not.
+
+    Raises:
+        HTTPNotFoundError: If no store is found with the provided ID.
+        InternalServerErrorException: If an error occurs while checking the store.
+    """
+    try:
+        if not await async_session.scalar(select(exists().where(Store.id == store_id))):
+            return HTTPNotFoundError("Store not found.")
+        calendar = await store_calendar.get(async_session, at.date(), at.date())
+        closure = calendar.closure_at(store_id, at)
+        return StoreOpening(
+            store_id=store_id,
+            at=at,
+            is_open=closure is None,
+            closure=_closures([closure])[0] if closure else None,
+        )
+    except Exception as exception:
+        logger.exception("Error occurred while checking if the store is open: %s", exception)
+        raise InternalServerErrorException(
+            "Unable to check if the Store is open, please try again later."
+        ) from exception
@@ -0,0 +1,470 @@
+"""Store Chain Module.
+
+This module provides API endpoints for reading and changing the chains of stores, the trees
+formed by the parent store of their details.
+
+The module defines a FastAPI router with the following endpoints:
+- GET /stores/{store_id}/descendants: List the descendants of a store, in depth first order
+- GET /stores/{store_id}/ancestors: List the ancestors of a store, from the root of its chain
+- GET /stores/{store_id}/subtree: Summarize the descendants of a store by status and depth
+- PUT /stores/{store_id}/parent: Move a store, with its descendants, under another parent
+- POST /stores/{store_id}/chain-holidays: Add a holiday to a store and all its descendants
+
+The stores are selected by their materialized path, with one indexed query whatever the depth of
+the chain, see ``store_tree``.
+"""
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, Request, status
+from fastapi_pagination import Page
+from fastapi_pagination.ext.sqlalchemy import paginate
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
+
+from azra_store_lmi_api.apps.admin.models import Store
+from azra_store_lmi_api.apps.admin.models.store import PATH_SEPARATOR, StoreStatusEnum
+from azra_store_lmi_api.apps.admin.schemas.store import (
+    ChainHolidayRequest,
+    ChainHolidayResult,
+    StoreNode,
+    StoreParentRequest,
+    StoreSubtree,
+)
+from azra_store_lmi_api.apps.admin.store_calendar import store_calendar
+from azra_store_lmi_api.apps.admin.store_tree import (
+    StoreTreeError,
+    ancestor_ids,
+    depth,
+    in_subtree,
+    move_store,
+    push_holiday,
+)
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.core.dependencies import get_db_session, paginator_query_params
+from azra_store_lmi_api.core.exceptions import (
+    CustomPydanticValidationError,
+    HTTPNotFoundError,
+    InternalServerErrorException,
+)
+from azra_store_lmi_api.core.utils import CustomParams
+
+store_tree_router = APIRouter(
+    prefix="/stores",
+    tags=["store"],
+)
+
+_NODE_COLUMNS = load_only(Store.id, Store.name, Store.unique_indentifier, Store.status, Store.path)
+
+_NODE_EXAMPLE = {
+    "id": "01JD2M9K4F7T2B8N6R3W5X1Y0Z",
+    "name": "Main Street Laundry, Kochi",
+    "unique_indentifier": "main_street_kochi",
+    "status": StoreStatusEnum.ACTIVE.value,
+    "path": "01JD2M4V7R9QX8ZK3T5W6Y1B0C.01JD2M9K4F7T2B8N6R3W5X1Y0Z",
+    "parent_store_id": "01JD2M4V7R9QX8ZK3T5W6Y1B0C",
+    "depth": 1,
+}
+
+_NOT_FOUND = {
+    "description": "Store not found",
+    "content": {"application/json": {"example": {"detail": "Store not found."}}},
+}
+
+
+def _server_error(detail: str) -> dict:
+    """Returns the sample response of an internal server error."""
+    return {
+        "description": "Internal server error",
+        "content": {"application/json": {"example": {"detail": detail}}},
+    }
+
+
+# Contains the list of sample response for all apis
+RESPONSES = {
+    "DESCENDANTS": {
+        status.HTTP_200_OK: {
+            "description": "Successful response",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "items": [_NODE_EXAMPLE],
+                        "total": 1,
+                        "page": 1,
+                        "size": 10,
+                        "pages": 1,
+                    }
+                }
+            },
+        },
+        status.HTTP_404_NOT_FOUND: _NOT_FOUND,
+        status.HTTP_500_INTERNAL_SERVER_ERROR: _server_error(
+            "Unable to list Store descendants, please try again later."
+        ),
+    },
+    "ANCESTORS": {
+        status.HTTP_200_OK: {
+            "description": "Successful response",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "id": "01JD2M4V7R9QX8ZK3T5W6Y1B0C",
+                            "name": "Main Street Laundry",
+                            "unique_indentifier": "main_street",
+                            "status": StoreStatusEnum.ACTIVE.value,
+                            "path": "01JD2M4V7R9QX8ZK3T5W6Y1B0C",
+                            "parent_store_id": None,
+                            "depth": 0,
+                        }
+                    ]
+                }
+            },
+        },
+        status.HTTP_404_NOT_FOUND: _NOT_FOUND,
+        status.HTTP_500_INTERNAL_SERVER_ERROR: _server_error(
+            "Unable to list Store ancestors, please try again later."
+        ),
+    },
+    "SUBTREE": {
+        status.HTTP_200_OK: {
+            "description": "Successful response",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "id": "01JD2M4V7R9QX8ZK3T5W6Y1B0C",
+                        "descendants": 12,
+                        "depth": 2,
+                        "statuses": {"ACTIVE": 11, "CREATING": 1},
+                    }
+                }
+            },
+        },
+        status.HTTP_404_NOT_FOUND: _NOT_FOUND,
+        status.HTTP_500_INTERNAL_SERVER_ERROR: _server_error(
+            "Unable to summarize Store descendants, please try again later."
+        ),
+    },
+    "PARENT": {
+        status.HTTP_200_OK: {
+            "description": "Store moved",
+            "content": {"application/json": {"example": _NODE_EXAMPLE}},
+        },
+        status.HTTP_404_NOT_FOUND: _NOT_FOUND,
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {
+            "description": "Validation error",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "detail": [
+                            {
+                                "type": "value_error",
+                                "loc": ["body", "parent_store_id"],
+                                "msg": "Value error, A store cannot be moved under itself or its "
+                                "descendants.",
+                                "input": "01JD2M9K4F7T2B8N6R3W5X1Y0Z",
+                                "ctx": {
+                                    "error": "A store cannot be moved under itself or its "
+                                    "descendants."
+                                },
+                            }
+                        ]
+                    }
+                }
+            },
+        },
+        status.HTTP_500_INTERNAL_SERVER_ERROR: _server_error(
+            "Unable to move Store, please try again later."
+        ),
+    },
+    "CHAIN_HOLIDAYS": {
+        status.HTTP_201_CREATED: {
+            "description": "Holiday added to the chain",
+            "content": {"application/json": {"example": {"stores": 12}}},
+        },
+        status.HTTP_404_NOT_FOUND: _NOT_FOUND,
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {"description": "Validation error"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: _server_error(
+            "Unable to add the holiday, please try again later."
+        ),
+    },
+}
+
+
+async def _store_path(async_session: AsyncSession, store_id: str) -> Optional[str]:
+    """Returns the path of a store, None if it does not exist."""
+    return await async_session.scalar(select(Store.path).where(Store.id == store_id))
+
+
+@store_tree_router.get(
+    "/{store_id}/descendants",
+    name="List Store Descendants",
+    response_model=Page[StoreNode],
+    responses=RESPONSES["DESCENDANTS"],
+)
+async def list_descendants(
+    request: Request,
+    store_id: str,
+    max_depth: Optional[int] = Query(
+        default=None, ge=1, description="The number of levels below the store to list"
+    ),
+    paginator: dict = Depends(paginator_query_params),
+    async_session: AsyncSession = Depends(get_db_session),
+):
+    """List the descendants of a store, in depth first order.
+
+    Args:
+        request (Request): The FastAPI request object.
+        store_id (str): The unique identifier of the store.
+        max_depth (Optional[int]): The number of levels below the store to list, all if None.
+        paginator (dict): A dictionary containing pagination parameters.
+            Obtained from the paginator_query_params dependency. The order is ignored, the
+            descendants are sorted by path.
+        async_session (AsyncSession): The asynchronous database session.
+
+    Returns:
+        Page: A Page object containing the paginated list of descendants.
+
+    Raises:
+        HTTPNotFoundError: If no store is found with the provided ID.
+        InternalServerErrorException: If an error occurs while retrieving the list.
+    """
+    try:
+        path = await _store_path(async_session, store_id)
+        if path is None:
+            return HTTPNotFoundError("Store not found.")
+        query = select(Store).options(_NODE_COLUMNS).where(in_subtree(path))
+        if max_depth is not None:
+            query = query.where(depth() <= path.count(PATH_SEPARATOR) + max_depth)
+        return await paginate(
+            async_session,
+            query.order_by(Store.path),
+            params=CustomParams(page=paginator["page"], size=paginator["size"]),
+        )
+    except Exception as exception:
+        logger.exception("Error occurred while listing store descendants: %s", exception)
+        raise InternalServerErrorException(
+            "Unable to list Store descendants, please try again later."
+        ) from exception
+
+
+@store_tree_router.get(
+    "/{store_id}/ancestors",
+    name="List Store Ancestors",
+    response_model=List[StoreNode],
+    responses=RESPONSES["ANCESTORS"],
+)
+async def list_ancestors(
+    request: Request,
+    store_id: str,
+    async_session: AsyncSession = Depends(get_db_session),
+):
+    """List the ancestors of a store, from the root of its chain to its parent.
+
+    Args:
+        request (Request): The FastAPI request object.
+        store_id (str): The unique identifier of the store.
+        async_session (AsyncSession): The asynchronous database session.
+
+    Returns:
+        List[StoreNode]: The ancestors of the store, empty for a root.
+
+    Raises:
+        HTTPNotFoundError: If no store is found with the provided ID.
+        InternalServerErrorException: If an error occurs while retrieving the list.
+    """
+    try:
+        path = await _store_path(async_session, store_id)
+        if path is None:
+            return HTTPNotFoundError("Store not found.")
+        ancestors = await async_session.scalars(
+            select(Store)
+            .options(_NODE_COLUMNS)
+            .where(Store.id.in_(ancestor_ids(path)))
+            .order_by(func.length(Store.path))
+        )
+        return [StoreNode.model_validate(ancestor) for ancestor in ancestors]
+    except Exception as exception:
+        logger.exception("Error occurred while listing store ancestors: %s", exception)
+        raise InternalServerErrorException(
+            "Unable to list Store ancestors, please try again later."
+        ) from exception
+
+
+@store_tree_router.get(
+    "/{store_id}/subtree",
+    name="Summarize Store Subtree",
+    response_model=StoreSubtree,
+    responses=RESPONSES["SUBTREE"],
+)
+async def summarize_subtree(
+    request: Request,
+    store_id: str,
+    async_session: AsyncSession = Depends(get_db_session),
+):
+    """Summarize the descendants of a store, by status and depth, with one aggregate query.
+
+    Args:
+        request (Request): The FastAPI request object.
+        store_id (str): The unique identifier of the store.
+        async_session (AsyncSession): The asynchronous database session.
+
+    Returns:
+        StoreSubtree: The number of descendants, by status, and the number of levels below the
+        store.
+
+    Raises:
+        HTTPNotFoundError: If no store is found with the provided ID.
+        InternalServerErrorException: If an error occurs while summarizing the descendants.
+    """
+    try:
+        path = await _store_path(async_session, store_id)
+        if path is None:
+            return HTTPNotFoundError("Store not found.")
+        rows = (
+            await async_session.execute(
+                select(Store.status, func.count(), func.max(depth()))
+                .where(in_subtree(path))
+                .group_by(Store.status)
+            )
+        ).all()
+        return StoreSubtree(
+            id=store_id,
+            descendants=sum(count for _, count, _ in rows),
+            depth=max((level for _, _, level in rows), default=path.count(PATH_SEPARATOR))
+            - path.count(PATH_SEPARATOR),
+            statuses={
+                StoreStatusEnum.get_name_by_value(store_status): count
+                for store_status, count, _ in rows
+            },
+        )
+    except Exception as exception:
+        logger.exception("Error occurred while summarizing store descendants: %s", exception)
+        raise InternalServerErrorException(
+            "Unable to summarize Store descendants, please try again later."
+        ) from exception
+
+
+@store_tree_router.put(
+    "/{store_id}/parent",
+    name="Move Store",
+    response_model=StoreNode,
+    responses=RESPONSES["PARENT"],
+)
+async def move(
+    request: Request,
+    store_id: str,
+    parent_request: StoreParentRequest,
+    async_session: AsyncSession = Depends(get_db_session),
+):
+    """Move a store, with its descendants, under another parent, or make it a root.
+
+    The parent of its details is set and the paths of the store and its descendants are
+    rewritten, in one transaction.
+
+    Args:
+        request (Request): The incoming request object.
+        store_id (str): The unique identifier of the store.
+        parent_request (StoreParentRequest): The request model containing the new parent.
+        async_session (AsyncSession): The database session for async operations.
+
+    Returns:
+        StoreNode: The store, at its new path.
+
+    Raises:
+        HTTPNotFoundError: If no store is found with the provided ID.
+        CustomPydanticValidationError: If the store has no details, the parent does not exist,
+            or the parent is the store or one of its descendants.
+        InternalServerErrorException: If an unexpected error occurs while moving the store.
+    """
+    try:
+        if await _store_path(async_session, store_id) is None:
+            return HTTPNotFoundError("Store not found.")
+        await move_store(async_session, store_id, parent_request.parent_store_id)
+        await async_session.commit()
+        store = await async_session.scalar(
+            select(Store).options(_NODE_COLUMNS).where(Store.id == store_id)
+        )
+        return StoreNode.model_validate(store)
+    except StoreTreeError as error:
+        await async_session.rollback()
+        return CustomPydanticValidationError(
+            [
+                {
+                    "field": "parent_store_id",
+                    "message": str(error),
+                    "value": parent_request.parent_store_id,
+                }
+            ]
+        )
+    except Exception as exception:
+        await async_session.rollback()
+        logger.exception(
+            "Error occurred while moving the store!\n%s\nRequest Data:\n%s",
+            exception,
+            parent_request.model_dump(),
+        )
+        raise InternalServerErrorException(
+            "Unable to move Store, please try again later."
+        ) from exception
+
+
+@store_tree_router.post(
+    "/{store_id}/chain-holidays",
+    name="Add Chain Holiday",
+    status_code=status.HTTP_201_CREATED,
+    response_model=ChainHolidayResult,
+    responses=RESPONSES["CHAIN_HOLIDAYS"],
+)
+async def add_chain_holiday(
+    request: Request,
+    store_id: str,
+    holiday_request: ChainHolidayRequest,
+    async_session: AsyncSession = Depends(get_db_session),
+):
+    """Add a holiday to a store and all its descendants.
+
+    The stores are resolved and the holidays inserted by one statement, over the path index. The
+    month of the holiday is then invalidated in the store calendar of every process.
+
+    Args:
+        request (Request): The incoming request object.
+        store_id (str): The unique identifier of the store at the top of the chain.
+        holiday_request (ChainHolidayRequest): The request model containing the holiday.
+        async_session (AsyncSession): The database session for async operations.
+
+    Returns:
+        ChainHolidayResult: The number of stores the holiday was added to.
+
+    Raises:
+        HTTPNotFoundError: If no store is found with the provided ID.
+        InternalServerErrorException: If an unexpected error occurs while adding the holiday.
+    """
+    try:
+        path = await _store_path(async_session, store_id)
+        if path is None:
+            return HTTPNotFoundError("Store not found.")
+        stores = await push_holiday(
+            async_session,
+            path,
+            holiday_date=holiday_request.date,
+            holiday_type=holiday_request.type,
+            reason=holiday_request.reason,
+            from_time=holiday_request.from_time,
+            to_time=holiday_request.to_time,
+            created_by_id=holiday_request.created_by_id,
+        )
+        await async_session.commit()
+        await store_calendar.invalidate([holiday_request.date])
+        return ChainHolidayResult(stores=stores)
+    except Exception as exception:
+        await async_session.rollback()
+        logger.exception(
+            "Error occurred while adding the chain holiday!\n%s\nRequest Data:\n%s",
+            exception,
+            holiday_request.model_dump(),
+        )
+        raise InternalServerErrorException(
+            "Unable to add the holiday, please try again later."
+        ) from exception
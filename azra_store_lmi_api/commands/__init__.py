@@ -0,0 +1,4 @@
+"""This package contains the command line entry points of the AZRA Store LMI API.
+
+Run a command with ``python -m azra_store_lmi_api.commands.<command> --help``.
+"""
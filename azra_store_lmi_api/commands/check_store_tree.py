@@ -0,0 +1,40 @@
+"""Check the materialized paths of the stores against the parent stores of their details.
+
+Recomputes every path from the parent ids with a recursive query, and prints the stores whose path
+differs. With --repair, rewrites them. Stores in a cycle of parents have no computed path and are
+never repaired. Exits with 1 if a path is stale and not repaired.
+
+Usage:
+    python -m azra_store_lmi_api.commands.check_store_tree --repair
+"""
+
+import argparse
+import asyncio
+import sys
+
+from azra_store_lmi_api.apps.admin.store_tree import repair_paths, stale_paths
+from azra_store_lmi_api.config.database import async_engine, get_db_context
+
+
+async def main(repair: bool) -> int:
+    """Print the stale paths, repair them if asked, and return the exit status."""
+    try:
+        async with get_db_context() as session:
+            stale = await stale_paths(session)
+            for store in stale:
+                print(f"{store.store_id}: {store.path} != {store.expected_path or '(cycle)'}")
+            repaired = 0
+            if repair and stale:
+                repaired = await repair_paths(session)
+                await session.commit()
+    finally:
+        await async_engine.dispose()
+    print(f"{len(stale)} stale paths, {repaired} repaired.")
+    return 1 if len(stale) > repaired else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repair", action="store_true", help="Rewrite the stale paths")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.repair)))
@@ -0,0 +1,39 @@
+"""Load the countries, states and cities from the world cities dataset.
+
+Download countries.csv, states.csv and cities.csv from
+https://github.com/dr5hn/countries-states-cities-database/tree/master/csv into a directory, then:
+
+Usage:
+    python -m azra_store_lmi_api.commands.load_geo_data path/to/dataset --prune
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+
+from azra_store_lmi_api.apps.admin.geo_loader import load_geo_data
+from azra_store_lmi_api.config.database import async_engine, get_db_context
+
+
+async def main(directory: Path, prune: bool) -> None:
+    """Load the dataset and print the number of rows changed in every table."""
+    try:
+        async with get_db_context() as session:
+            results = await load_geo_data(session, directory, prune=prune)
+    finally:
+        await async_engine.dispose()
+    for result in results:
+        print(
+            f"{result.table}: {result.source_rows} rows, {result.upserted} upserted, "
+            f"{result.pruned} pruned"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("directory", type=Path, help="The directory of the dataset CSV files")
+    parser.add_argument(
+        "--prune", action="store_true", help="Soft delete the rows missing from the dataset"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.directory, args.prune))
@@ -0,0 +1,47 @@
+"""Upgrade the store schemas to head, several at a time.
+
+Exits with 1 if a schema could not be migrated after its retries.
+
+Usage:
+    python -m azra_store_lmi_api.commands.migrate_tenants --concurrency 8 --resume
+"""
+
+import argparse
+import sys
+import time
+from typing import List, Optional
+
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.config.settings import settings
+from azra_store_lmi_api.config.tenant_migrations import FAILED, run, summarize
+
+
+def main(
+    concurrency: int,
+    retries: int,
+    retry_delay: float,
+    resume: bool,
+    schemas: Optional[List[str]],
+) -> int:
+    """Migrate the schemas, log the summary and return the exit status."""
+    started = time.perf_counter()
+    results, skipped = run(concurrency, retries, retry_delay, resume=resume, schemas=schemas)
+    summarize(results, skipped, time.perf_counter() - started)
+    return 1 if any(result.status == FAILED for result in results) else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=settings.TENANT_MIGRATION_CONCURRENCY)
+    parser.add_argument("--retries", type=int, default=settings.TENANT_MIGRATION_RETRIES)
+    parser.add_argument("--retry-delay", type=float, default=settings.TENANT_MIGRATION_RETRY_DELAY)
+    parser.add_argument("--resume", action="store_true", help="Skip the schemas already at head")
+    parser.add_argument(
+        "--schema",
+        action="append",
+        dest="schemas",
+        help="Only migrate this schema, registered or not, repeatable",
+    )
+    args = parser.parse_args()
+    logger.info("Tenant migrations started.")
+    sys.exit(main(args.concurrency, args.retries, args.retry_delay, args.resume, args.schemas))
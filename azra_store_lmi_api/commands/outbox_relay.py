@@ -0,0 +1,44 @@
+"""Dispatch the outbox messages to Celery.
+
+Usage:
+    python -m azra_store_lmi_api.commands.outbox_relay --batch-size 100 --poll-interval 1
+    python -m azra_store_lmi_api.commands.outbox_relay --retry-failed --once
+"""
+
+import argparse
+import asyncio
+import signal
+
+from azra_store_lmi_api.config.database import async_engine, get_db_context
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.config.outbox.relay import retry_failed, run_relay
+from azra_store_lmi_api.config.settings import settings
+
+
+async def main(batch_size: int, poll_interval: float, once: bool, retry: bool) -> None:
+    """Run the relay until it receives SIGINT or SIGTERM, retrying the failed messages first."""
+    if retry:
+        async with get_db_context() as session:
+            logger.info("%s failed outbox messages retried.", await retry_failed(session))
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop_event.set)
+    logger.info("Outbox relay started.")
+    try:
+        await run_relay(batch_size, poll_interval, once=once, stop_event=stop_event)
+    finally:
+        await async_engine.dispose()
+    logger.info("Outbox relay stopped.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=settings.OUTBOX_BATCH_SIZE)
+    parser.add_argument("--poll-interval", type=float, default=settings.OUTBOX_POLL_INTERVAL)
+    parser.add_argument("--once", action="store_true", help="Exit once the outbox is drained")
+    parser.add_argument(
+        "--retry-failed", action="store_true", help="Dispatch the failed messages again"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size, args.poll_interval, args.once, args.retry_failed))
@@ -0,0 +1,185 @@
+"""Module for the read-through cache of API responses.
+
+Entries are serialized with msgpack and stored in Redis under a namespace, such as
+``saas_admins``. A namespace is invalidated as a whole by incrementing its version, which is part
+of every key: entries of the previous version are never read again and expire with their TTL, and
+a load which started before the invalidation cannot store a stale entry under the new version.
+
+Stampedes are prevented in two ways:
+
+- Single flight: on a miss, concurrent requests of a process share one load, and the processes
+  share one load through a lock in Redis, the others waiting for its entry.
+- Early refresh: an entry is refreshed before it expires, with a probability growing as its
+  expiry approaches and with the time its load took, while the other requests keep reading it.
+
+If Redis is unavailable, or CACHE_ENABLED is false, values are loaded on every call.
+
+Usage:
+    saas_admin_cache = ReadThroughCache("saas_admins")
+
+    data = await saas_admin_cache.get_or_load(f"detail:{saas_admin_id}", load_saas_admin)
+    await saas_admin_cache.invalidate()
+
+Classes:
+    ReadThroughCache: A namespace of cached values loaded on a miss.
+"""
+
+import asyncio
+import math
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from weakref import WeakKeyDictionary
+
+import msgpack
+from redis.exceptions import RedisError
+
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.config.redis import get_redis
+from azra_store_lmi_api.config.settings import settings
+
+Loader = Callable[[], Awaitable[Optional[Any]]]
+
+# Interval at which a request polls for the entry being loaded by another process.
+_WAIT_INTERVAL = 0.02
+
+
+class ReadThroughCache:
+    """A namespace of cached values, loaded on a miss.
+
+    Attributes:
+        namespace (str): The prefix of the keys of the namespace.
+        ttl (int): Seconds an entry is kept.
+        early_refresh (float): How early entries are refreshed before they expire, 0 disables it.
+        lock_timeout (float): Seconds a load holds the lock of its key.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: Optional[int] = None,
+        early_refresh: Optional[float] = None,
+        lock_timeout: Optional[float] = None,
+    ):
+        """Initialize the cache of a namespace.
+
+        Args:
+            namespace (str): The prefix of the keys of the namespace.
+            ttl (Optional[int]): Seconds an entry is kept. Defaults to CACHE_TTL.
+            early_refresh (Optional[float]): How early entries are refreshed before they expire.
+                Defaults to CACHE_EARLY_REFRESH.
+            lock_timeout (Optional[float]): Seconds a load holds the lock of its key.
+                Defaults to CACHE_LOCK_TIMEOUT.
+        """
+        self.namespace = namespace
+        self.ttl = ttl if ttl is not None else settings.CACHE_TTL
+        self.early_refresh = (
+            early_refresh if early_refresh is not None else settings.CACHE_EARLY_REFRESH
+        )
+        self.lock_timeout = (
+            lock_timeout if lock_timeout is not None else settings.CACHE_LOCK_TIMEOUT
+        )
+        self._version_key = f"cache:{namespace}:version"
+        self._flights: WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]] = (
+            WeakKeyDictionary()
+        )
+
+    async def get_or_load(self, key: str, loader: Loader) -> Optional[Any]:
+        """Returns the cached value of a key, loading and storing it on a miss.
+
+        Args:
+            key (str): The key of the value in the namespace.
+            loader (Loader): Loads the value, which must be serializable with msgpack.
+                None is returned without being cached.
+
+        Returns:
+            Optional[Any]: The value.
+        """
+        if not settings.CACHE_ENABLED:
+            return await loader()
+        try:
+            redis = get_redis()
+            version = int(await redis.get(self._version_key) or 0)
+            cache_key = f"cache:{self.namespace}:{version}:{key}"
+            entry = await redis.get(cache_key)
+        except RedisError as exception:
+            logger.warning("Cache unavailable, loading %s:%s: %s", self.namespace, key, exception)
+            return await loader()
+        if entry is None:
+            return await self._single_flight(cache_key, loader)
+        value, load_time, expires_at = msgpack.unpackb(entry)
+        if self._should_refresh(load_time, expires_at) and await self._lock(cache_key):
+            return await self._load(cache_key, loader)
+        return value
+
+    async def invalidate(self) -> None:
+        """Invalidate every entry of the namespace."""
+        if not settings.CACHE_ENABLED:
+            return
+        try:
+            await get_redis().incr(self._version_key)
+        except RedisError as exception:
+            logger.warning("Unable to invalidate the %s cache: %s", self.namespace, exception)
+
+    def _should_refresh(self, load_time: float, expires_at: float) -> bool:
+        """Whether to refresh an entry before it expires, see the module docstring."""
+        if self.early_refresh <= 0:
+            return False
+        return (
+            time.time() - load_time * self.early_refresh * math.log(random.random()) >= expires_at
+        )
+
+    async def _single_flight(self, cache_key: str, loader: Loader) -> Optional[Any]:
+        """Load a missing entry once per process, and once across processes."""
+        flights = self._flights.setdefault(asyncio.get_running_loop(), {})
+        flight = flights.get(cache_key)
+        if flight is None:
+            flight = asyncio.ensure_future(self._load_missing(cache_key, loader))
+            flights[cache_key] = flight
+            flight.add_done_callback(lambda _: flights.pop(cache_key, None))
+        return await asyncio.shield(flight)
+
+    async def _load_missing(self, cache_key: str, loader: Loader) -> Optional[Any]:
+        """Load a missing entry, or wait for the process holding its lock to store it."""
+        if await self._lock(cache_key):
+            return await self._load(cache_key, loader)
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(_WAIT_INTERVAL)
+            try:
+                entry = await get_redis().get(cache_key)
+            except RedisError:
+                break
+            if entry is not None:
+                return msgpack.unpackb(entry)[0]
+        return await loader()
+
+    async def _lock(self, cache_key: str) -> bool:
+        """Take the lock of a key for a load, failing open if Redis is unavailable."""
+        try:
+            return bool(
+                await get_redis().set(
+                    f"{cache_key}:lock", 1, nx=True, px=int(self.lock_timeout * 1000)
+                )
+            )
+        except RedisError:
+            return True
+
+    async def _load(self, cache_key: str, loader: Loader) -> Optional[Any]:
+        """Load a value, store it and release the lock of its key."""
+        started = time.perf_counter()
+        try:
+            value = await loader()
+            if value is not None:
+                entry = msgpack.packb(
+                    [value, time.perf_counter() - started, time.time() + self.ttl]
+                )
+                await get_redis().set(cache_key, entry, ex=self.ttl)
+        except RedisError as exception:
+            logger.warning("Unable to store %s: %s", cache_key, exception)
+        finally:
+            try:
+                await get_redis().delete(f"{cache_key}:lock")
+            except RedisError:
+                pass
+        return value
@@ -8,7 +8,8 @@ The main components of this module include:
 1. Importing necessary modules (Celery and settings)
 2. Creating a Celery instance
 3. Configuring the broker URL and connection retry settings
-4. Setting up automatic task discovery
+4. Routing tasks to named queues with priorities, see the queues module
+5. Setting up automatic task discovery
 
 Usage:
     Import the 'celery' instance from this module to use in other parts of the application
@@ -20,6 +21,14 @@ Returns:
 
 from celery import Celery
 
+from azra_store_lmi_api.config.celery.queues import (
+    DEFAULT_PRIORITY,
+    DEFAULT_QUEUE,
+    LOW_PRIORITY,
+    TASK_QUEUES,
+    TASK_ROUTES,
+    QueueAnnotation,
+)
 from azra_store_lmi_api.config.settings import settings
 
 celery = Celery(__name__)
@@ -27,8 +36,29 @@ celery = Celery(__name__)
 
 celery.conf.broker_url = settings.CELERY_BROKER_URL
 celery.conf.broker_connection_retry_on_startup = True
+celery.conf.broker_transport_options = {
+    # Emulate message priorities on Redis and consume the queues of a worker in -Q order.
+    "priority_steps": list(range(LOW_PRIORITY + 1)),
+    "sep": ":",
+    "queue_order_strategy": "priority",
+    # Tasks with acks_late are redelivered if they are not acknowledged within this delay.
+    "visibility_timeout": settings.CELERY_VISIBILITY_TIMEOUT,
+}
+
+celery.conf.task_queues = TASK_QUEUES
+celery.conf.task_default_queue = DEFAULT_QUEUE
+celery.conf.task_default_priority = DEFAULT_PRIORITY
+celery.conf.task_routes = TASK_ROUTES
+celery.conf.task_annotations = [QueueAnnotation()]
+celery.conf.worker_prefetch_multiplier = settings.CELERY_WORKER_PREFETCH_MULTIPLIER
 
 
 celery.autodiscover_tasks(
-    ["azra_store_lmi_api.apps.admin.tasks"]
+    [
+        "azra_store_lmi_api.apps.admin.tasks",
+        "azra_store_lmi_api.apps.admin.tasks.maintenance",
+        "azra_store_lmi_api.apps.admin.tasks.provisioning",
+        "azra_store_lmi_api.config.mailer",
+        "azra_store_lmi_api.config.scheduler",
+    ]
 )  # point the app background module in list
@@ -1,27 +1,44 @@
 """Module contains decorator for running async tasks in Celery."""
 
+import uuid
 from functools import wraps
-from typing import Any, Callable, Coroutine, ParamSpec, TypeVar
+from typing import Any, Callable, Coroutine, Optional, ParamSpec, Tuple, Type, TypeVar
 
 from asgiref import sync
 from celery import Task
 
+from azra_store_lmi_api.config.celery import idempotency
 from azra_store_lmi_api.config.celery.app import celery
+from azra_store_lmi_api.config.celery.runtime import worker_runtime
+from azra_store_lmi_api.config.logger.app import logger
 
 _P = ParamSpec("_P")
 _R = TypeVar("_R")
 
 
-def async_task(*args: Any, **kwargs: Any):
+def async_task(
+    *args: Any,
+    defer_on: Tuple[Type[Exception], ...] = (),
+    idempotent: bool = False,
+    **kwargs: Any,
+):
     """A decorator that converts an asynchronous function into a Celery task.
 
     This decorator allows you to easily transform asynchronous functions into
     Celery tasks, enabling them to be executed asynchronously within a Celery
-    worker.
+    worker. In a prefork worker process, the coroutine runs on the event loop of the
+    worker runtime, so async resources are shared by every task of the process. Elsewhere
+    it runs in a new event loop with ``AsyncToSync``.
 
     Args:
         *args: Variable length argument list to be passed to the Celery task.
-        **kwargs: Arbitrary keyword arguments to be passed to the Celery task.
+        defer_on (Tuple[Type[Exception], ...]): Exceptions on which the task is enqueued again
+            instead of failing, after the ``retry_after`` seconds of the exception if it has one.
+            Deferring does not count as a retry of the task.
+        idempotent (bool): Whether to run the task at most once per idempotency key, see the
+            idempotency module. Defaults to False.
+        **kwargs: Arbitrary keyword arguments to be passed to the Celery task, such as
+            ``autoretry_for`` and ``retry_backoff`` to retry failures with exponential backoff.
 
     Returns:
         Callable: A decorator function that wraps the original asynchronous
@@ -29,12 +46,44 @@ def async_task(*args: Any, **kwargs: Any):
     """
 
     def _decorator(func: Callable[_P, Coroutine[Any, Any, _R]]) -> Task:
-        sync_call = sync.AsyncToSync(func)
+        async def _run(
+            key: Optional[str], task_id: str, *args: _P.args, **kwargs: _P.kwargs
+        ) -> Optional[_R]:
+            if key is None:
+                return await func(*args, **kwargs)
+            if not await idempotency.claim(key, task_id):
+                logger.info("Task %s skipped, %s already ran or is running.", func.__name__, key)
+                return None
+            try:
+                result = await func(*args, **kwargs)
+            except BaseException:
+                await idempotency.release(key, task_id)
+                raise
+            await idempotency.complete(key)
+            return result
+
+        sync_call = sync.AsyncToSync(_run)
 
         @celery.task(*args, **kwargs)
         @wraps(func)
         def _decorated(*args: _P.args, **kwargs: _P.kwargs) -> _R:
-            return sync_call(*args, **kwargs)
+            explicit_key = getattr(_decorated.request, idempotency.IDEMPOTENCY_HEADER, None)
+            key = None
+            if idempotent:
+                key = idempotency.get_idempotency_key(_decorated.name, args, kwargs, explicit_key)
+            # A task called directly has no message, its call is claimed under an id of its own.
+            task_id = _decorated.request.id or uuid.uuid4().hex
+            try:
+                if worker_runtime.running:
+                    return worker_runtime.run(_run(key, task_id, *args, **kwargs))
+                return sync_call(key, task_id, *args, **kwargs)
+            except defer_on as exception:
+                countdown = getattr(exception, "retry_after", None)
+                headers = {idempotency.IDEMPOTENCY_HEADER: explicit_key} if explicit_key else None
+                _decorated.apply_async(
+                    args=args, kwargs=kwargs, countdown=countdown, headers=headers
+                )
+                logger.info("Task %s deferred by %ss: %s", _decorated.name, countdown, exception)
 
         return _decorated
 
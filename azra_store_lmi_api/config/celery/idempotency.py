@@ -0,0 +1,140 @@
+"""Module for running Celery tasks at most once per idempotency key.
+
+A task is delivered again if its worker dies before acknowledging it, and an API call retried by a
+client can enqueue the same task twice. For tasks declared with ``async_task(idempotent=True)``,
+every execution first claims the idempotency key of the call in Redis:
+
+- If the key is free, it is claimed with the id of the task message while the task runs, then
+  marked as done for ``CELERY_IDEMPOTENCY_TTL`` seconds once it succeeds.
+- If the key is claimed with the id of the same message, the message was delivered again because
+  its worker died, and the key is claimed again so the task runs.
+- If the key is done, or claimed by another message, the task returns without running.
+- If the task fails, the key is released so it can be retried.
+
+A claim expires after ``CELERY_IDEMPOTENCY_LOCK_TTL`` seconds, and never before the
+``CELERY_VISIBILITY_TIMEOUT`` after which the broker delivers an unacknowledged message again, so
+a duplicate message cannot run while the first one is still running.
+
+The key is derived from the task name and arguments, or passed explicitly in the
+``idempotency_key`` header of the message:
+
+    send_saas_admin_credentials.apply_async(args, headers={IDEMPOTENCY_HEADER: request_id})
+
+If Redis is unavailable, tasks run without deduplication.
+
+Functions:
+    get_idempotency_key: Returns the Redis key of a task call.
+    claim: Claims an idempotency key for a task message.
+    complete: Marks an idempotency key as done.
+    release: Releases the idempotency key of a task message after a failed execution.
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Optional, Tuple
+
+from redis.exceptions import RedisError
+
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.config.redis import get_redis
+from azra_store_lmi_api.config.settings import settings
+
+IDEMPOTENCY_HEADER = "idempotency_key"
+
+_RUNNING = "running"
+_DONE = "done"
+
+# Claims a free key, or a key claimed by the same message, in one atomic round trip.
+CLAIM_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if current and current ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return 1
+"""
+
+# Deletes a key only if it is still claimed by the message releasing it.
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def _claim_value(task_id: str) -> str:
+    """Returns the value of a key claimed by a task message."""
+    return f"{_RUNNING}:{task_id}"
+
+
+def get_idempotency_key(
+    task_name: str,
+    args: Tuple[Any, ...],
+    kwargs: Dict[str, Any],
+    idempotency_key: Optional[str] = None,
+) -> str:
+    """Returns the Redis key of a task call.
+
+    Args:
+        task_name (str): The registered name of the task.
+        args (Tuple[Any, ...]): The positional arguments of the call.
+        kwargs (Dict[str, Any]): The keyword arguments of the call.
+        idempotency_key (Optional[str]): The key passed with the message, if any.
+            Defaults to a hash of the arguments.
+
+    Returns:
+        str: The Redis key.
+    """
+    if idempotency_key is None:
+        payload = json.dumps([args, kwargs], sort_keys=True, default=str)
+        idempotency_key = hashlib.sha256(payload.encode()).hexdigest()
+    return f"celery:idempotency:{task_name}:{idempotency_key}"
+
+
+async def claim(key: str, task_id: str) -> bool:
+    """Claim an idempotency key for a task message.
+
+    Args:
+        key (str): The Redis key of the task call.
+        task_id (str): The id of the task message, which is the same when it is delivered again.
+
+    Returns:
+        bool: True if the task should run, False if it already ran or another message is running
+        it.
+    """
+    lock_ttl = max(settings.CELERY_IDEMPOTENCY_LOCK_TTL, settings.CELERY_VISIBILITY_TIMEOUT)
+    try:
+        claimed = await get_redis().eval(CLAIM_SCRIPT, 1, key, _claim_value(task_id), lock_ttl)
+    except RedisError as exception:
+        logger.warning("Idempotency check unavailable, running %s: %s", key, exception)
+        return True
+    return bool(claimed)
+
+
+async def complete(key: str) -> None:
+    """Mark an idempotency key as done, so duplicate executions return without running.
+
+    Args:
+        key (str): The Redis key of the task call.
+    """
+    try:
+        await get_redis().set(key, _DONE, ex=settings.CELERY_IDEMPOTENCY_TTL)
+    except RedisError as exception:
+        logger.warning("Unable to mark %s as done: %s", key, exception)
+
+
+async def release(key: str, task_id: str) -> None:
+    """Release the idempotency key of a task message after a failed execution, so the task can
+    run again.
+
+    The key is left alone if it is no longer claimed by the message.
+
+    Args:
+        key (str): The Redis key of the task call.
+        task_id (str): The id of the task message which claimed the key.
+    """
+    try:
+        await get_redis().eval(RELEASE_SCRIPT, 1, key, _claim_value(task_id))
+    except RedisError as exception:
+        logger.warning("Unable to release %s: %s", key, exception)
@@ -0,0 +1,148 @@
+"""Module declaring the Celery queues, the routing of tasks to them and their worker profiles.
+
+Tasks are routed to named queues so a bulk run never delays time sensitive emails:
+
+- ``transactional_mail``: credentials, OTP and other emails a user is waiting for.
+- ``bulk_mail``: batches of emails, such as store reminders.
+- ``reports``: report generation.
+- ``provisioning``: creation and migration of store schemas.
+
+Tasks which are not routed stay on the default ``celery`` queue. Within a queue, messages are
+consumed by priority. With the Redis broker, 0 is the highest priority and 9 the lowest.
+
+Each queue has a worker profile in Settings: the prefetch multiplier and concurrency of the workers
+consuming it, and whether its tasks are acknowledged after they run (``acks_late``), so a task is
+redelivered if its worker dies. A worker started with ``-Q <queue>`` uses the profile of the first
+queue it consumes, unless ``--concurrency`` or ``--prefetch-multiplier`` are given.
+
+Classes:
+    QueueProfile: The worker settings of a queue.
+    QueueAnnotation: Applies the acks_late setting of its queue to every task.
+
+Attributes:
+    QUEUE_PROFILES: The worker profile of every queue.
+    TASK_ROUTES: The queue and priority of the tasks, by task name pattern.
+    TASK_QUEUES: The kombu queues declared by the application.
+"""
+
+from typing import Any, Dict, List, NamedTuple, Optional, Union
+
+from celery.app.routes import MapRoute
+from celery.signals import celeryd_init
+from kombu import Queue
+
+from azra_store_lmi_api.config.settings import settings
+
+DEFAULT_QUEUE = "celery"
+
+# Priorities of the Redis broker, where a lower number is consumed first.
+HIGH_PRIORITY = 0
+DEFAULT_PRIORITY = 5
+LOW_PRIORITY = 9
+
+
+class QueueProfile(NamedTuple):
+    """The worker settings of a queue.
+
+    Attributes:
+        concurrency (int): The number of worker processes consuming the queue.
+        prefetch_multiplier (int): The number of messages reserved per worker process.
+        acks_late (bool): Whether tasks are acknowledged after they run instead of before.
+    """
+
+    concurrency: int
+    prefetch_multiplier: int
+    acks_late: bool
+
+
+QUEUE_PROFILES: Dict[str, QueueProfile] = {
+    "transactional_mail": QueueProfile(
+        concurrency=settings.CELERY_TRANSACTIONAL_MAIL_CONCURRENCY,
+        prefetch_multiplier=settings.CELERY_TRANSACTIONAL_MAIL_PREFETCH_MULTIPLIER,
+        acks_late=settings.CELERY_TRANSACTIONAL_MAIL_ACKS_LATE,
+    ),
+    "bulk_mail": QueueProfile(
+        concurrency=settings.CELERY_BULK_MAIL_CONCURRENCY,
+        prefetch_multiplier=settings.CELERY_BULK_MAIL_PREFETCH_MULTIPLIER,
+        acks_late=settings.CELERY_BULK_MAIL_ACKS_LATE,
+    ),
+    "reports": QueueProfile(
+        concurrency=settings.CELERY_REPORTS_CONCURRENCY,
+        prefetch_multiplier=settings.CELERY_REPORTS_PREFETCH_MULTIPLIER,
+        acks_late=settings.CELERY_REPORTS_ACKS_LATE,
+    ),
+    "provisioning": QueueProfile(
+        concurrency=settings.CELERY_PROVISIONING_CONCURRENCY,
+        prefetch_multiplier=settings.CELERY_PROVISIONING_PREFETCH_MULTIPLIER,
+        acks_late=settings.CELERY_PROVISIONING_ACKS_LATE,
+    ),
+}
+
+TASK_ROUTES: Dict[str, Dict[str, Any]] = {
+    "azra_store_lmi_api.apps.admin.tasks.saas_admin.*": {
+        "queue": "transactional_mail",
+        "priority": HIGH_PRIORITY,
+    },
+    "azra_store_lmi_api.config.mailer.tasks.*": {
+        "queue": "bulk_mail",
+        "priority": DEFAULT_PRIORITY,
+    },
+    "*.reports.*": {"queue": "reports", "priority": DEFAULT_PRIORITY},
+    "*.provisioning.*": {"queue": "provisioning", "priority": DEFAULT_PRIORITY},
+}
+
+TASK_QUEUES: List[Queue] = [
+    Queue(name, routing_key=name, queue_arguments={"x-max-priority": LOW_PRIORITY})
+    for name in [DEFAULT_QUEUE, *QUEUE_PROFILES]
+]
+
+
+def get_task_queue(task_name: str) -> str:
+    """Returns the queue a task is routed to.
+
+    Args:
+        task_name (str): The registered name of the task.
+
+    Returns:
+        str: The name of the queue.
+    """
+    route = MapRoute(TASK_ROUTES)(task_name)
+    return route["queue"] if route else DEFAULT_QUEUE
+
+
+class QueueAnnotation:
+    """Applies the acks_late setting of the queue a task is routed to, to the task."""
+
+    def annotate(self, task: Any) -> Optional[Dict[str, Any]]:
+        """Returns the attributes set on a task when it is bound to the application.
+
+        Args:
+            task (Any): The task being bound.
+
+        Returns:
+            Optional[Dict[str, Any]]: The attributes of the task, if it is routed to a queue.
+        """
+        profile = QUEUE_PROFILES.get(get_task_queue(task.name))
+        if profile is None:
+            return None
+        return {"acks_late": profile.acks_late, "reject_on_worker_lost": profile.acks_late}
+
+
+@celeryd_init.connect
+def apply_queue_profile(conf: Any, options: Dict[str, Any], **kwargs: Any) -> None:
+    """Configure a starting worker with the profile of the first queue it consumes.
+
+    Args:
+        conf (Any): The configuration of the Celery application.
+        options (Dict[str, Any]): The command line options of the worker.
+    """
+    queues: Union[str, List[str], None] = options.get("queues")
+    if isinstance(queues, str):
+        queues = queues.split(",")
+    profile = QUEUE_PROFILES.get(queues[0].strip()) if queues else None
+    if profile is None:
+        return
+    if not options.get("concurrency"):
+        conf.worker_concurrency = profile.concurrency
+    if not options.get("prefetch_multiplier"):
+        conf.worker_prefetch_multiplier = profile.prefetch_multiplier
@@ -0,0 +1,126 @@
+"""Module providing the event loop shared by the async tasks of a Celery worker process.
+
+``AsyncToSync`` runs every call in an event loop of its own, so the async resources created by a
+task, such as database connections, SMTP connections or Redis clients, cannot be reused by the next
+task and are opened again for every task. The WorkerRuntime class instead runs one event loop for
+the whole life of a worker process in a background thread, and async tasks are submitted to it.
+The database engine, the SMTP connection pools and the Redis client are then created once per
+worker process and closed when it shuts down.
+
+The runtime is started on ``worker_process_init``, which is sent to the child processes of the
+prefork pool. Other pools and direct calls outside of a worker keep using ``AsyncToSync``.
+
+Classes:
+    WorkerRuntime: An event loop running in a background thread of the worker process.
+
+Attributes:
+    worker_runtime: The runtime of the current worker process.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Coroutine, Optional, TypeVar
+
+from celery.signals import worker_process_init, worker_process_shutdown
+
+from azra_store_lmi_api.config.database import async_engine
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.config.mailer.pool import close_smtp_pools
+from azra_store_lmi_api.config.redis import close_redis
+
+_R = TypeVar("_R")
+
+
+class WorkerRuntime:
+    """An event loop running in a background thread for the whole life of a worker process.
+
+    Attributes:
+        loop (Optional[asyncio.AbstractEventLoop]): The event loop, while the runtime is running.
+    """
+
+    def __init__(self):
+        """Initialize a stopped runtime."""
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the runtime accepts coroutines.
+
+        Returns:
+            bool: True if the event loop is running.
+        """
+        return self.loop is not None and self.loop.is_running()
+
+    def start(self) -> None:
+        """Start the event loop in a background thread, if it is not already running."""
+        if self.running:
+            return
+        self.loop = asyncio.new_event_loop()
+        started = threading.Event()
+        self.loop.call_soon(started.set)
+        self._thread = threading.Thread(
+            target=self.loop.run_forever, name="celery-async-runtime", daemon=True
+        )
+        self._thread.start()
+        started.wait()
+
+    def submit(self, coroutine: Coroutine[Any, Any, _R]) -> "Future[_R]":
+        """Schedule a coroutine on the event loop.
+
+        Args:
+            coroutine (Coroutine[Any, Any, _R]): The coroutine to run.
+
+        Returns:
+            Future[_R]: The future of the coroutine result.
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+
+    def run(self, coroutine: Coroutine[Any, Any, _R]) -> _R:
+        """Run a coroutine on the event loop and wait for its result.
+
+        Args:
+            coroutine (Coroutine[Any, Any, _R]): The coroutine to run.
+
+        Returns:
+            _R: The result of the coroutine.
+        """
+        return self.submit(coroutine).result()
+
+    async def _close_resources(self) -> None:
+        """Close the async resources created on the event loop."""
+        await close_smtp_pools()
+        await close_redis()
+        await async_engine.dispose()
+
+    def stop(self) -> None:
+        """Close the async resources, then stop the event loop and its thread."""
+        if not self.running:
+            return
+        try:
+            self.run(self._close_resources())
+        except Exception as exception:
+            logger.exception("Error occurred while closing the worker resources: \n%s", exception)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+        self.loop = None
+        self._thread = None
+
+
+worker_runtime = WorkerRuntime()
+
+
+@worker_process_init.connect
+def start_worker_runtime(**kwargs: Any) -> None:
+    """Start the event loop of a worker child process."""
+    # Connections inherited from the parent process must not be used by the child.
+    async_engine.sync_engine.dispose(close=False)
+    worker_runtime.start()
+
+
+@worker_process_shutdown.connect
+def stop_worker_runtime(**kwargs: Any) -> None:
+    """Close the resources and stop the event loop of a worker child process."""
+    worker_runtime.stop()
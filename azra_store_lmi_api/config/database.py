@@ -4,20 +4,18 @@ Provides core database functionality including:
 - Async SQLAlchemy engine and session setup
 - Custom naming conventions for database constraints
 - Base model with timestamp tracking
-- Schema management utilities
 
 Key Components:
 - AsyncSession: Configured session maker for async database operations
 - Base: SQLAlchemy declarative base with naming conventions
 - BaseModal: Abstract base class with created_at and updated_at fields
-- set_tenant_schema: Utility for dynamic schema switching
 - get_db_context: Context manager for getting the session
 """
 
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
-from sqlalchemy import MetaData, text
+from sqlalchemy import MetaData
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 
@@ -37,16 +35,6 @@ naming_convention = {
 Base = declarative_base(metadata=MetaData(naming_convention=naming_convention))
 
 
-async def set_tenant_schema(session: AsyncSession, *, schema: str):
-    """Asynchronously checks if a given schema exists in the database session.
-
-    Args:
-        session (AsyncSession): The database session.
-        schema (str): The name of the schema to check.
-    """
-    await session.execute(text(f"SET search_path TO {schema}"))
-
-
 @asynccontextmanager
 async def get_db_context() -> AsyncGenerator[AsyncSession, None]:
     """Asynchronous context manager for database session handling.
@@ -18,6 +18,19 @@ Usage:
     message.set_content('plain', 'This is a test email.')
     asyncio.run(message.send())
 
+    # Render the plain text and HTML parts from templates/emails/<name>.txt and .html
+    message.set_template('saas_admin_credentials', {'username': 'admin', ...})
+
+    # Send many emails over a single SMTP session
+    asyncio.run(EmailMessage.send_many([message, other_message], chunk_size=100))
+
+    # Beyond MAIL_RATE_LIMIT emails per second, send raises MailRateLimitError and send_many
+    # returns the remaining messages as deferred, tasks use async_task(defer_on=...) to wait.
+
+    # With MAIL_TRANSPORT=spool, messages are appended to MAIL_SPOOL_PATH instead of sent
+    from azra_store_lmi_api.config.mailer.spool import SpoolReader
+    SpoolReader().count('recipient@example.com')
+
 Note:
     Ensure proper configuration of email settings in the application
     before using this module.
@@ -1,11 +1,11 @@
 """Module for sending emails asynchronously using different mailers.
 
 This module provides an asynchronous class EmailMessage for sending emails using different
-mailers, such as SMTP and log. It supports various email configurations including
+mailers, such as SMTP, log and spool. It supports various email configurations including
 attachments, CC, and BCC recipients.
 
 Classes:
-    EmailMessage: Asynchronous class for composing and sending emails.
+    EmailMessage: Asynchronous class for composing and sending emails, one at a time or in batches.
 
 Functions:
     None
@@ -15,10 +15,13 @@ Attributes:
 """
 
 import os
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
+from azra_store_lmi_api.config.mailer.base import BaseMail, BatchResult
 from azra_store_lmi_api.config.mailer.log_mail import LogMail
 from azra_store_lmi_api.config.mailer.smtp import SMTPMail
+from azra_store_lmi_api.config.mailer.spool import SpoolMail
+from azra_store_lmi_api.config.mailer.templates import email_templates
 from azra_store_lmi_api.config.settings import settings
 
 
@@ -87,6 +90,17 @@ class EmailMessage:
         """
         self.content[content_type] = content
 
+    def set_template(self, template_name: str, context: Optional[Dict[str, Any]] = None) -> None:
+        """Sets the content of every type available for a template, rendered from one context.
+
+        Args:
+            template_name (str): The name of the template in the templates/emails directory,
+            without extension.
+            context (Optional[Dict[str, Any]]): The variables available to the template.
+        """
+        for content_type, content in email_templates.render(template_name, context).items():
+            self.set_content(content_type, content)
+
     def add_attachment(self, file_path: str, filename: Optional[str] = None) -> None:
         """Adds an attachment to the email message.
 
@@ -99,17 +113,13 @@ class EmailMessage:
             filename = os.path.basename(file_path)
         self.attachments[filename] = file_path
 
-    async def send_email(self, message_content: dict) -> None:
-        """Asynchronously send the email using the specified mailer.
+    def as_dict(self) -> Dict[str, Any]:
+        """Returns the email message details as a dictionary understood by the mailers.
 
-        Args:
-            message_content (dict): A dictionary containing the email message details.
+        Returns:
+            Dict[str, Any]: A dictionary containing the email message details.
         """
-        await self.mailer.send(message_content)
-
-    async def send(self):
-        """Asynchronously send the email using the appropriate mailer based on configuration."""
-        message_content = {
+        return {
             "from_": self.from_,
             "to": self.to,
             "bcc": self.bcc,
@@ -118,15 +128,97 @@ class EmailMessage:
             "content": self.content,
             "attachments": self.attachments,
         }
-        self.mailer = (
-            LogMail()
-            if self.suppress_mail
-            else SMTPMail(
-                hostname=settings.MAIL_SERVER,
-                port=settings.MAIL_PORT,
-                username=settings.MAIL_USERNAME,
-                password=settings.MAIL_PASSWORD,
-                use_ssl=settings.MAIL_USE_SSL,
-            )
+
+    @classmethod
+    def from_dict(cls, message_content: Dict[str, Any], suppress_mail: bool = False):
+        """Builds an email message from a dictionary created by as_dict.
+
+        The sender is converted back to a tuple, since it becomes a list when the dictionary is
+        serialized to JSON, for example when passed to a Celery task.
+
+        Args:
+            message_content (Dict[str, Any]): A dictionary containing the email message details.
+            suppress_mail (bool): Flag to determine whether to use LogMail instead of
+            actual sending.
+
+        Returns:
+            EmailMessage: The email message.
+        """
+        from_ = message_content.get("from_") or ("AZRA Bills Admin", settings.MAIL_FROM)
+        message = cls(
+            to=message_content["to"],
+            subject=message_content["subject"],
+            from_=tuple(from_) if isinstance(from_, list) else from_,
+            suppress_mail=suppress_mail,
+            cc=message_content.get("cc"),
+            bcc=message_content.get("bcc"),
+        )
+        message.content = dict(message_content.get("content") or {})
+        message.attachments = dict(message_content.get("attachments") or {})
+        return message
+
+    @staticmethod
+    def get_mailer(suppress_mail: bool = False) -> BaseMail:
+        """Returns the mailer to send emails with based on configuration.
+
+        The MAIL_TRANSPORT setting selects between sending with SMTP, logging the emails, or
+        writing them to the spool directory.
+
+        Args:
+            suppress_mail (bool): Flag to determine whether to use LogMail instead of
+            actual sending.
+
+        Returns:
+            BaseMail: The mailer object used for sending emails.
+        """
+        if suppress_mail or settings.MAIL_TRANSPORT == "log":
+            return LogMail()
+        if settings.MAIL_TRANSPORT == "spool":
+            return SpoolMail(settings.MAIL_SPOOL_PATH)
+        return SMTPMail(
+            hostname=settings.MAIL_SERVER,
+            port=settings.MAIL_PORT,
+            username=settings.MAIL_USERNAME,
+            password=settings.MAIL_PASSWORD,
+            use_ssl=settings.MAIL_USE_SSL,
+        )
+
+    async def send_email(self, message_content: dict) -> None:
+        """Asynchronously send the email using the specified mailer.
+
+        Args:
+            message_content (dict): A dictionary containing the email message details.
+        """
+        await self.mailer.send(message_content)
+
+    async def send(self):
+        """Asynchronously send the email using the appropriate mailer based on configuration."""
+        self.mailer = self.get_mailer(self.suppress_mail)
+        await self.send_email(self.as_dict())
+
+    @classmethod
+    async def send_many(
+        cls,
+        messages: List["EmailMessage"],
+        chunk_size: Optional[int] = None,
+        suppress_mail: bool = False,
+    ) -> BatchResult:
+        """Asynchronously send a batch of emails with a single mailer.
+
+        The SMTP mailer delivers the whole batch over one authenticated session, or one session per
+        chunk when chunk_size is given. A failed message does not stop the batch, its error is
+        collected in the result instead.
+
+        Args:
+            messages (List[EmailMessage]): The email messages to send.
+            chunk_size (Optional[int]): The maximum number of messages sent over one connection.
+            suppress_mail (bool): Flag to determine whether to use LogMail instead of
+            actual sending.
+
+        Returns:
+            BatchResult: The positions of the delivered messages and the failed ones' errors.
+        """
+        mailer = cls.get_mailer(suppress_mail)
+        return await mailer.send_many(
+            [message.as_dict() for message in messages], chunk_size=chunk_size
         )
-        await self.send_email(message_content)
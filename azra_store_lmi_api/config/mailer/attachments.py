@@ -0,0 +1,141 @@
+"""Module for encoding email attachments.
+
+This module provides the AttachmentCache class which base64 encodes attachment files in chunks and
+keeps the encoded content of recently used files in memory. A bill run that attaches the same file
+to thousands of emails reads and encodes it only once, as long as the file does not change.
+
+Classes:
+    AttachmentCache: A size bounded cache of base64 encoded attachment files.
+
+Attributes:
+    attachment_cache: The cache shared by every mailer of the process.
+"""
+
+import base64
+import mimetypes
+from collections import OrderedDict
+from email.mime.base import MIMEBase
+from typing import Optional, Tuple
+
+import aiofiles
+import aiofiles.os
+
+from azra_store_lmi_api.config.settings import settings
+
+# Read 57 * 1024 bytes at a time, a multiple of the 57 bytes encoded on every 76 character line,
+# so the encoded chunks can be concatenated without re-wrapping lines.
+ENCODE_CHUNK_SIZE = 57 * 1024
+
+
+class AttachmentCache:
+    """A size bounded cache of base64 encoded attachment files.
+
+    Entries are keyed by file path, modification time and size, so a changed file is encoded again.
+    The least recently used entries are evicted once the encoded content exceeds ``max_size``
+    bytes, and files whose encoded content is larger than ``max_entry_size`` bytes are encoded
+    without being cached.
+
+    Attributes:
+        max_size (int): The maximum number of encoded bytes kept in the cache.
+        max_entry_size (int): The maximum number of encoded bytes of a single cached file.
+        size (int): The number of encoded bytes currently kept in the cache.
+    """
+
+    def __init__(self, max_size: int, max_entry_size: int):
+        """Initialize the cache limits.
+
+        Args:
+            max_size (int): The maximum number of encoded bytes kept in the cache.
+            max_entry_size (int): The maximum number of encoded bytes of a single cached file.
+        """
+        self.max_size = max_size
+        self.max_entry_size = max_entry_size
+        self.size = 0
+        self._entries: OrderedDict[Tuple[str, int, int], str] = OrderedDict()
+
+    async def _encode(self, file_path: str) -> str:
+        """Base64 encode a file in chunks, without reading the whole file into memory.
+
+        Args:
+            file_path (str): The path to the file to encode.
+
+        Returns:
+            str: The base64 encoded content, wrapped in 76 character lines.
+        """
+        encoded = []
+        async with aiofiles.open(file_path, "rb") as attachment_file:
+            while chunk := await attachment_file.read(ENCODE_CHUNK_SIZE):
+                encoded.append(base64.encodebytes(chunk).decode("ascii"))
+        return "".join(encoded)
+
+    def _store(self, key: Tuple[str, int, int], encoded: str) -> None:
+        """Keep an encoded file in the cache, evicting the least recently used ones.
+
+        A file encoded by concurrent sends is stored by each of them, and replaces the content
+        already kept for it.
+
+        Args:
+            key (Tuple[str, int, int]): The file path, modification time and size.
+            encoded (str): The base64 encoded content.
+        """
+        if len(encoded) > self.max_entry_size:
+            return
+        replaced = self._entries.pop(key, None)
+        if replaced is not None:
+            self.size -= len(replaced)
+        self._entries[key] = encoded
+        self.size += len(encoded)
+        while self.size > self.max_size:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    async def get_encoded(self, file_path: str) -> str:
+        """Returns the base64 encoded content of a file, encoding it if it is not cached.
+
+        Args:
+            file_path (str): The path to the file.
+
+        Returns:
+            str: The base64 encoded content, wrapped in 76 character lines.
+        """
+        stat = await aiofiles.os.stat(file_path)
+        key = (file_path, stat.st_mtime_ns, stat.st_size)
+        encoded = self._entries.get(key)
+        if encoded is not None:
+            self._entries.move_to_end(key)
+            return encoded
+        encoded = await self._encode(file_path)
+        self._store(key, encoded)
+        return encoded
+
+    async def get_part(self, file_path: str, filename: Optional[str] = None) -> MIMEBase:
+        """Build a MIME attachment part for a file from its cached encoded content.
+
+        Args:
+            file_path (str): The path to the file to attach.
+            filename (Optional[str]): The filename to be used for the attachment.
+                If None, the file path is used.
+
+        Returns:
+            MIMEBase: The base64 encoded attachment part.
+        """
+        filename = filename or file_path
+        content_type, encoding = mimetypes.guess_type(filename)
+        if content_type is None or encoding is not None:
+            content_type = "application/octet-stream"
+        part = MIMEBase(*content_type.split("/", 1))
+        part.set_payload(await self.get_encoded(file_path))
+        part["Content-Transfer-Encoding"] = "base64"
+        part.add_header("Content-Disposition", "attachment", filename=filename)
+        return part
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        self._entries.clear()
+        self.size = 0
+
+
+attachment_cache = AttachmentCache(
+    max_size=settings.MAIL_ATTACHMENT_CACHE_SIZE,
+    max_entry_size=settings.MAIL_ATTACHMENT_CACHE_MAX_ENTRY_SIZE,
+)
@@ -2,15 +2,61 @@
 
 This module provides a base class for sending emails with various features such as formatting email
 addresses, building multipart content, adding attachments, and composing extra email fields like CC
-and BCC.
+and BCC. It also contains the BatchResult class returned by batch sends.
 """
 
-from email.mime.application import MIMEApplication
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from typing import Optional, Union
+from typing import Any, Dict, List, Optional, Union
 
-import aiofiles
+from azra_store_lmi_api.config.mailer.attachments import AttachmentCache, attachment_cache
+from azra_store_lmi_api.config.mailer.rate_limit import MailRateLimiter
+
+
+class BatchResult:
+    """Outcome of sending a batch of email messages.
+
+    Messages are identified by their position in the batch, so a failed message can be matched
+    back to its recipient by the caller.
+
+    Attributes:
+        total (int): The number of messages in the batch.
+        sent (List[int]): The positions of the messages that were delivered.
+        errors (Dict[int, str]): The error message of every message that failed, by position.
+        deferred (List[int]): The positions of the messages held back by the send rate limit.
+        retry_after (Optional[float]): Seconds to wait before sending the deferred messages.
+    """
+
+    def __init__(self, total: int):
+        self.total = total
+        self.sent: List[int] = []
+        self.errors: Dict[int, str] = {}
+        self.deferred: List[int] = []
+        self.retry_after: Optional[float] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Returns a JSON serializable representation of the result.
+
+        Returns:
+            Dict[str, Any]: The number of sent and deferred messages and the errors by position.
+        """
+        return {
+            "total": self.total,
+            "sent": len(self.sent),
+            "deferred": len(self.deferred),
+            "errors": self.errors,
+        }
+
+    def __str__(self) -> str:
+        """Returns a string representation of the BatchResult object.
+
+        Returns:
+            str: A string representation of the BatchResult object.
+        """
+        return (
+            f"BatchResult(total={self.total}, sent={len(self.sent)}, "
+            f"deferred={len(self.deferred)}, failed={len(self.errors)})"
+        )
 
 
 class BaseMail:
@@ -19,8 +65,16 @@ class BaseMail:
     This class provides utility methods for formatting email addresses, building multipart content,
     adding attachments, and composing extra email fields. It serves as a foundation for creating
     more specific email sending classes.
+
+    Attributes:
+        attachment_cache (AttachmentCache): The cache of encoded attachment files, shared by every
+            mailer so the messages of a batch encode a common attachment only once.
+        rate_limiter (Optional[MailRateLimiter]): The send rate limit of the mail provider, if any.
     """
 
+    attachment_cache: AttachmentCache = attachment_cache
+    rate_limiter: Optional[MailRateLimiter] = None
+
     def _format_emails_address(self, email_address: Union[str, tuple]) -> str:
         """Format the email address by adding the name if provided.
 
@@ -67,8 +121,8 @@ class BaseMail:
     ) -> None:
         """Add an attachment to the email message asynchronously.
 
-        This method reads a file from the given file path and attaches it to the
-        email message as an attachment.
+        This method base64 encodes the file in chunks, or reuses its encoded content from the
+        attachment cache if the file did not change, and attaches it to the email message.
 
         Args:
             file_path (str): The path to the file to be attached.
@@ -79,14 +133,35 @@ class BaseMail:
         Returns:
             None
         """
-        async with aiofiles.open(file_path, "rb") as attachment_file:
-            content = await attachment_file.read()
-            part = MIMEApplication(content)
-            part.add_header(
-                "Content-Disposition",
-                f"attachment; filename={file_path if not filename else filename}",
-            )
-            msg.attach(part)
+        part = await self.attachment_cache.get_part(file_path, filename)
+        msg.attach(part)
+
+    async def _build_email(self, message: dict) -> MIMEMultipart:
+        """Build the MIME email for a message dictionary asynchronously.
+
+        This method sets the sender, recipients and subject headers, adds the CC and BCC fields,
+        and attaches every content part and attachment of the message.
+
+        Args:
+            message (dict): A dictionary containing the email message details.
+
+        Returns:
+            MIMEMultipart: The composed email message.
+        """
+        email = MIMEMultipart("alternative")
+        email["From"] = self._format_emails_address(message["from_"])
+        email["To"] = ",".join(message["to"])
+        email["Subject"] = message["subject"]
+
+        self._compose_extra_emails(message, email)
+
+        for type_, content in message["content"].items():
+            await self.build_multipart_content(email, type_, content)
+
+        for filename, file in message["attachments"].items():
+            await self._add_attachment(file, filename, email)
+
+        return email
 
     def _compose_extra_emails(
         self,
@@ -109,3 +184,38 @@ class BaseMail:
             msg["Cc"] = ",".join(message["cc"])
         if "bcc" in message and message["bcc"] is not None:
             msg["Bcc"] = ",".join(message["bcc"])
+
+    async def send(self, message: Dict[str, Any]) -> Any:
+        """Send a single email message.
+
+        Args:
+            message (Dict[str, Any]): A dictionary containing the email message details.
+
+        Raises:
+            NotImplementedError: Mailers must implement this method.
+        """
+        raise NotImplementedError
+
+    async def send_many(
+        self, messages: List[Dict[str, Any]], chunk_size: Optional[int] = None
+    ) -> BatchResult:
+        """Send a batch of email messages, collecting the error of every failed message.
+
+        The default implementation sends the messages one by one with send. Mailers that keep a
+        connection open should override it to reuse one session for the whole batch.
+
+        Args:
+            messages (List[Dict[str, Any]]): The email message dictionaries to send.
+            chunk_size (Optional[int]): Unused by the default implementation.
+
+        Returns:
+            BatchResult: The positions of the delivered messages and the failed ones' errors.
+        """
+        result = BatchResult(total=len(messages))
+        for index, message in enumerate(messages):
+            try:
+                await self.send(message)
+                result.sent.append(index)
+            except Exception as exception:
+                result.errors[index] = str(exception)
+        return result
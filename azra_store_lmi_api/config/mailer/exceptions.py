@@ -0,0 +1,29 @@
+"""Module containing the exceptions raised by the mailers."""
+
+from typing import Optional
+
+
+class MailError(Exception):
+    """Base class of the errors raised while sending an email."""
+
+
+class MailDeliveryError(MailError):
+    """Exception raised when the mail server refuses or fails to deliver an email."""
+
+
+class MailRateLimitError(MailError):
+    """Exception raised when the send rate budget of the mail provider is exhausted.
+
+    Attributes:
+        retry_after (float): Seconds to wait before the budget allows the email to be sent.
+    """
+
+    def __init__(self, retry_after: float, message: Optional[str] = None) -> None:
+        """Initialize the MailRateLimitError.
+
+        Args:
+            retry_after (float): Seconds to wait before the budget allows the email to be sent.
+            message (Optional[str]): The error message.
+        """
+        self.retry_after = retry_after
+        super().__init__(message or f"Mail send rate exceeded, retry after {retry_after:.2f}s")
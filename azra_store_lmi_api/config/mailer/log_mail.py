@@ -8,6 +8,7 @@ in an asynchronous manner.
 from email.mime.text import MIMEText
 from typing import Any, Dict
 
+from azra_store_lmi_api.config.logger.app import logger
 from azra_store_lmi_api.config.mailer.base import BaseMail
 
 
@@ -73,7 +74,7 @@ class LogMail(BaseMail):
 
         content = MIMEText(mail_content, content_type)
 
-        return self.response(
+        email_data = self.response(
             from_=self._format_emails_address(message["from_"]),
             to=",".join(message["to"]),
             bcc=",".join(message["bcc"]) if message["bcc"] else "",
@@ -81,3 +82,5 @@ class LogMail(BaseMail):
             subject=message["subject"],
             content=content.get_payload(),
         )
+        logger.info("Email logged: %s", email_data)
+        return email_data
@@ -0,0 +1,266 @@
+"""Module for pooling asynchronous SMTP connections.
+
+This module provides the SMTPConnectionPool class which keeps a bounded number of authenticated
+aiosmtplib connections open between sends, so every email does not pay for a new TCP connection,
+EHLO, STARTTLS and AUTH round trip.
+
+Classes:
+    SMTPConnectionPool: A bounded pool of persistent asynchronous SMTP connections.
+
+Functions:
+    get_smtp_pool: Returns the shared pool for the given credentials on the running event loop.
+"""
+
+import asyncio
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager
+from email.message import Message
+from typing import AsyncGenerator, Deque, Dict, Optional, Tuple
+
+import aiosmtplib
+
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.config.settings import settings
+
+
+class SMTPConnectionPool:
+    """A bounded pool of persistent asynchronous SMTP connections.
+
+    Connections are opened lazily up to ``max_size``. Idle connections older than
+    ``idle_timeout`` seconds are closed when they are next checked out, and connections idle for
+    longer than ``keepalive_interval`` seconds are probed with a NOOP before reuse. A connection
+    dropped by the server while sending is replaced and the message is retried once.
+
+    Attributes:
+        hostname (str): The SMTP hostname.
+        port (int): The SMTP port.
+        username (Optional[str]): The SMTP username.
+        password (Optional[str]): The SMTP password.
+        use_ssl (bool): Whether to upgrade the connection with STARTTLS.
+        max_size (int): The maximum number of open connections.
+        idle_timeout (float): Seconds after which an idle connection is closed.
+        keepalive_interval (float): Seconds of idleness after which a NOOP is sent before reuse.
+        timeout (float): The SMTP command timeout in seconds.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int = 25,
+        username: Optional[str] = None,
+        password: Optional[str] = None,
+        use_ssl: bool = True,
+        max_size: int = 5,
+        idle_timeout: float = 300,
+        keepalive_interval: float = 30,
+        timeout: float = 60,
+    ):
+        """Initialize the pool with the SMTP credentials and the pool limits.
+
+        Args:
+            hostname (str): The SMTP hostname.
+            port (int): The SMTP port. Defaults to 25.
+            username (Optional[str]): The SMTP username.
+            password (Optional[str]): The SMTP password.
+            use_ssl (bool): Whether to upgrade the connection with STARTTLS. Defaults to True.
+            max_size (int): The maximum number of open connections. Defaults to 5.
+            idle_timeout (float): Seconds after which an idle connection is closed.
+                Defaults to 300.
+            keepalive_interval (float): Seconds of idleness after which a NOOP is sent before
+                reuse. Defaults to 30.
+            timeout (float): The SMTP command timeout in seconds. Defaults to 60.
+        """
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_ssl = use_ssl
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.keepalive_interval = keepalive_interval
+        self.timeout = timeout
+        self._idle: Deque[Tuple[aiosmtplib.SMTP, float]] = deque()
+        self._slots = asyncio.Semaphore(max_size)
+        self._closed = False
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        """Open and authenticate a new SMTP connection.
+
+        Returns:
+            aiosmtplib.SMTP: A connected and authenticated SMTP client.
+        """
+        connection = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            start_tls=self.use_ssl,
+            timeout=self.timeout,
+        )
+        await connection.connect()
+        if self.username:
+            await connection.login(self.username, self.password)
+        return connection
+
+    async def _is_reusable(self, connection: aiosmtplib.SMTP, last_used: float) -> bool:
+        """Check whether an idle connection can be handed out again.
+
+        Args:
+            connection (aiosmtplib.SMTP): The idle connection.
+            last_used (float): The monotonic time at which the connection was released.
+
+        Returns:
+            bool: True if the connection is still usable, False otherwise.
+        """
+        idle_for = time.monotonic() - last_used
+        if idle_for >= self.idle_timeout or not connection.is_connected:
+            return False
+        if idle_for >= self.keepalive_interval:
+            try:
+                await connection.noop()
+            except (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPResponseException):
+                return False
+        return True
+
+    async def _discard(self, connection: aiosmtplib.SMTP) -> None:
+        """Close a connection without raising if the server already dropped it.
+
+        Args:
+            connection (aiosmtplib.SMTP): The connection to close.
+        """
+        try:
+            if connection.is_connected:
+                await connection.quit()
+        except aiosmtplib.SMTPException:
+            connection.close()
+
+    async def acquire(self) -> aiosmtplib.SMTP:
+        """Check out a connection, reusing an idle one when possible.
+
+        Returns:
+            aiosmtplib.SMTP: A connected and authenticated SMTP client.
+
+        Raises:
+            RuntimeError: If the pool has been closed.
+        """
+        if self._closed:
+            raise RuntimeError("SMTP connection pool is closed")
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                connection, last_used = self._idle.pop()
+                if await self._is_reusable(connection, last_used):
+                    return connection
+                await self._discard(connection)
+            return await self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def release(self, connection: aiosmtplib.SMTP, discard: bool = False) -> None:
+        """Return a checked out connection to the pool.
+
+        Args:
+            connection (aiosmtplib.SMTP): The connection to return.
+            discard (bool): Whether to close the connection instead of keeping it idle.
+        """
+        try:
+            if discard or self._closed or not connection.is_connected:
+                await self._discard(connection)
+            else:
+                self._idle.append((connection, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncGenerator[aiosmtplib.SMTP, None]:
+        """Context manager that checks out a connection and returns it afterwards.
+
+        The connection is discarded if the block raises.
+
+        Yields:
+            aiosmtplib.SMTP: A connected and authenticated SMTP client.
+        """
+        connection = await self.acquire()
+        try:
+            yield connection
+        except BaseException:
+            await self.release(connection, discard=True)
+            raise
+        await self.release(connection)
+
+    async def send_message(self, email: Message) -> None:
+        """Send an email over a pooled connection.
+
+        If the server has dropped the connection, it is replaced and the message is sent once more.
+
+        Args:
+            email (Message): The email message to send.
+
+        Raises:
+            aiosmtplib.SMTPException: If the message could not be delivered.
+        """
+        try:
+            async with self.connection() as connection:
+                await connection.send_message(email)
+        except aiosmtplib.SMTPServerDisconnected:
+            logger.info("SMTP server disconnected, reconnecting to %s", self.hostname)
+            async with self.connection() as connection:
+                await connection.send_message(email)
+
+    async def close(self) -> None:
+        """Close all idle connections and stop handing out new ones."""
+        self._closed = True
+        while self._idle:
+            connection, _ = self._idle.pop()
+            await self._discard(connection)
+
+
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[tuple, SMTPConnectionPool]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_smtp_pool(
+    hostname: str,
+    port: int,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+    use_ssl: bool = True,
+) -> SMTPConnectionPool:
+    """Return the shared pool for the given credentials on the running event loop.
+
+    Connections belong to the event loop that opened them, so pools are kept per loop and are
+    dropped together with the loop.
+
+    Args:
+        hostname (str): The SMTP hostname.
+        port (int): The SMTP port.
+        username (Optional[str]): The SMTP username.
+        password (Optional[str]): The SMTP password.
+        use_ssl (bool): Whether to upgrade the connection with STARTTLS.
+
+    Returns:
+        SMTPConnectionPool: The pool for the given credentials.
+    """
+    loop_pools = _pools.setdefault(asyncio.get_running_loop(), {})
+    key = (hostname, port, username, password, use_ssl)
+    if key not in loop_pools:
+        loop_pools[key] = SMTPConnectionPool(
+            hostname=hostname,
+            port=port,
+            username=username,
+            password=password,
+            use_ssl=use_ssl,
+            max_size=settings.MAIL_POOL_SIZE,
+            idle_timeout=settings.MAIL_POOL_IDLE_TIMEOUT,
+            keepalive_interval=settings.MAIL_POOL_KEEPALIVE_INTERVAL,
+            timeout=settings.MAIL_TIMEOUT,
+        )
+    return loop_pools[key]
+
+
+async def close_smtp_pools() -> None:
+    """Close every pool created on the running event loop."""
+    for pool in _pools.pop(asyncio.get_running_loop(), {}).values():
+        await pool.close()
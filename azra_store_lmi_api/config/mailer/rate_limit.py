@@ -0,0 +1,148 @@
+"""Module for limiting the rate at which emails are sent to the mail provider.
+
+This module provides the MailRateLimiter class, a token bucket stored in Redis so the budget is
+shared by every Celery worker sending through the same provider. Tokens are refilled at a fixed
+rate per second up to a burst capacity, and each email consumes one token. When the bucket is
+empty the limiter raises MailRateLimitError with the time until enough tokens are available, so
+the caller can defer the email instead of failing it.
+
+The limiter also keeps the number of emails queued to the mailer, sent and deferred in a Redis
+hash, shared by every worker like the bucket.
+
+Classes:
+    MailRateLimiter: A token bucket shared by every worker, with send metrics.
+
+Functions:
+    get_mail_rate_limiter: Returns the limiter of the configured provider, if rate limiting is on.
+"""
+
+from typing import Dict, Optional
+
+from redis.exceptions import RedisError
+
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.config.mailer.exceptions import MailRateLimitError
+from azra_store_lmi_api.config.redis import get_redis
+from azra_store_lmi_api.config.settings import settings
+
+# Refills the bucket for the time elapsed since the last call and takes the requested tokens if
+# they are available, in one atomic round trip. The server clock is used so workers with drifting
+# clocks share the same bucket consistently. The retry delay is returned as a string because Redis
+# truncates Lua numbers to integers.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or burst
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+local retry_after = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    retry_after = (requested - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(retry_after)
+"""
+
+
+class MailRateLimiter:
+    """A token bucket limiting the send rate of a mail provider across every worker.
+
+    The limiter fails open: if Redis is unavailable, emails are sent without limiting rather
+    than held back.
+
+    Attributes:
+        name (str): The name of the provider, used to build the Redis keys.
+        rate (float): The number of emails allowed per second.
+        burst (int): The number of emails that can be sent at once after an idle period.
+    """
+
+    def __init__(self, name: str, rate: float, burst: int):
+        """Initialize the limiter of a provider.
+
+        Args:
+            name (str): The name of the provider, used to build the Redis keys.
+            rate (float): The number of emails allowed per second.
+            burst (int): The number of emails that can be sent at once after an idle period.
+        """
+        self.name = name
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.bucket_key = f"mail:rate_limit:{name}"
+        self.metrics_key = f"mail:metrics:{name}"
+
+    async def acquire(self, count: int = 1) -> None:
+        """Take tokens from the bucket for emails about to be sent.
+
+        Args:
+            count (int): The number of emails about to be sent. Defaults to 1.
+
+        Raises:
+            MailRateLimitError: If the budget does not allow the emails to be sent now.
+        """
+        try:
+            retry_after = float(
+                await get_redis().eval(
+                    TOKEN_BUCKET_SCRIPT,
+                    1,
+                    self.bucket_key,
+                    self.rate,
+                    self.burst,
+                    min(count, self.burst),
+                )
+            )
+        except RedisError as exception:
+            logger.warning("Mail rate limiter unavailable, sending unthrottled: %s", exception)
+            return
+        if retry_after > 0:
+            raise MailRateLimitError(retry_after)
+
+    async def record(self, queued: int = 0, sent: int = 0, deferred: int = 0) -> None:
+        """Add to the counters of emails queued to the mailer, sent and deferred.
+
+        Args:
+            queued (int): The number of emails handed to the mailer. Defaults to 0.
+            sent (int): The number of emails delivered to the provider. Defaults to 0.
+            deferred (int): The number of emails held back by the limit. Defaults to 0.
+        """
+        counts = {"queued": queued, "sent": sent, "deferred": deferred}
+        try:
+            async with get_redis().pipeline(transaction=False) as pipeline:
+                for name, count in counts.items():
+                    if count:
+                        pipeline.hincrby(self.metrics_key, name, count)
+                await pipeline.execute()
+        except RedisError as exception:
+            logger.warning("Unable to record the mail metrics: %s", exception)
+
+    async def metrics(self) -> Dict[str, int]:
+        """Returns the number of emails queued to the mailer, sent and deferred.
+
+        Returns:
+            Dict[str, int]: The counters by name.
+        """
+        counters = await get_redis().hgetall(self.metrics_key)
+        metrics = {"queued": 0, "sent": 0, "deferred": 0}
+        metrics.update({key.decode(): int(value) for key, value in counters.items()})
+        return metrics
+
+
+def get_mail_rate_limiter() -> Optional[MailRateLimiter]:
+    """Returns the rate limiter of the configured mail provider.
+
+    Returns:
+        Optional[MailRateLimiter]: The limiter, or None if MAIL_RATE_LIMIT is not set.
+    """
+    if settings.MAIL_RATE_LIMIT <= 0:
+        return None
+    return MailRateLimiter(
+        name=settings.MAIL_SERVER,
+        rate=settings.MAIL_RATE_LIMIT,
+        burst=settings.MAIL_RATE_LIMIT_BURST,
+    )
@@ -1,25 +1,35 @@
 """Module for sending emails using SMTP.
 
 This module provides a class SMTPMail for sending emails using SMTP.
-It utilizes the smtplib library for SMTP operations.
+It utilizes the aiosmtplib library over a pool of persistent connections, so sending does not
+block the event loop and does not open a new connection for every email.
 
 Classes:
     SMTPMail: A class for sending emails using SMTP.
 
 Dependencies:
-    - smtplib: For SMTP operations.
-    - email.mime.multipart: For creating multipart email messages.
+    - aiosmtplib: For asynchronous SMTP operations.
     - typing: For type hinting.
     - azra_store_lmi_api.config.logger.app: For logging.
     - azra_store_lmi_api.config.mailer.base: For the base mail class.
+    - azra_store_lmi_api.config.mailer.pool: For the SMTP connection pool.
+    - azra_store_lmi_api.config.mailer.rate_limit: For the send rate limit of the provider.
 """
 
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from typing import Optional
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import aiosmtplib
 
 from azra_store_lmi_api.config.logger.app import logger
-from azra_store_lmi_api.config.mailer.base import BaseMail
+from azra_store_lmi_api.config.mailer.base import BaseMail, BatchResult
+from azra_store_lmi_api.config.mailer.exceptions import (
+    MailDeliveryError,
+    MailError,
+    MailRateLimitError,
+)
+from azra_store_lmi_api.config.mailer.pool import SMTPConnectionPool, get_smtp_pool
+from azra_store_lmi_api.config.mailer.rate_limit import get_mail_rate_limiter
 
 
 class SMTPMail(BaseMail):
@@ -33,7 +43,8 @@ class SMTPMail(BaseMail):
         port (Optional[int]): The SMTP port.
         username (Optional[str]): The SMTP username.
         password (Optional[str]): The SMTP password.
-        use_ssl (Optional[bool]): Whether to use SSL for the SMTP connection.
+        use_ssl (Optional[bool]): Whether to upgrade the SMTP connection with STARTTLS.
+        rate_limiter (Optional[MailRateLimiter]): The send rate limit of the provider, if any.
     """
 
     def __init__(
@@ -58,6 +69,22 @@ class SMTPMail(BaseMail):
         self.username = username
         self.password = password
         self.use_ssl = use_ssl
+        self.rate_limiter = get_mail_rate_limiter()
+
+    @property
+    def pool(self) -> SMTPConnectionPool:
+        """The connection pool shared by every SMTPMail with the same credentials.
+
+        Returns:
+            SMTPConnectionPool: The pool for the configured credentials.
+        """
+        return get_smtp_pool(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            use_ssl=self.use_ssl,
+        )
 
     async def send(self, message: dict) -> None:
         """Send an email message using the SMTP protocol.
@@ -66,50 +93,133 @@ class SMTPMail(BaseMail):
             message (dict): A dictionary containing the email message details.
 
         Raises:
-            Exception: If the hostname is not set or if there's an SMTP error.
+            MailError: If the hostname is not set.
+            MailRateLimitError: If the send rate budget of the provider is exhausted.
+            MailDeliveryError: If there's an SMTP error.
 
         Returns:
             None
         """
         if self.hostname is None:
-            raise Exception("Hostname is not set")
+            raise MailError("Hostname is not set")
 
-        email = MIMEMultipart("alternative")
-        email["From"] = self._format_emails_address(message["from_"])
-        email["To"] = ",".join(message["to"])
-        email["Subject"] = message["subject"]
+        if self.rate_limiter is not None:
+            try:
+                await self.rate_limiter.acquire()
+            except MailRateLimitError:
+                await self.rate_limiter.record(queued=1, deferred=1)
+                raise
 
-        self._compose_extra_emails(message, email)
+        email = await self._build_email(message)
 
-        for type_, content in message["content"].items():
-            await self.build_multipart_content(email, type_, content)
+        try:
+            await self.pool.send_message(email)
+            logger.info("Email Sent Successfully!")
+        except aiosmtplib.SMTPException as e:
+            raise MailDeliveryError(f"SMTP Error: {str(e)}") from e
+
+        if self.rate_limiter is not None:
+            await self.rate_limiter.record(queued=1, sent=1)
+
+    async def send_many(
+        self, messages: List[Dict[str, Any]], chunk_size: Optional[int] = None
+    ) -> BatchResult:
+        """Send a batch of email messages over one authenticated SMTP session per chunk.
+
+        A message rejected by the server is recorded in the result and the session is reset, so
+        the remaining messages are still delivered on the same connection. If the server drops the
+        connection, the message is retried once on a new connection. Once the send rate budget of
+        the provider is exhausted, the remaining messages are deferred instead of sent.
+
+        Args:
+            messages (List[Dict[str, Any]]): The email message dictionaries to send.
+            chunk_size (Optional[int]): The maximum number of messages sent over one connection,
+                a new session is started for every chunk. Defaults to sending the whole batch
+                over a single pooled connection.
 
-        for filename, file in message["attachments"].items():
-            await self._add_attachment(file, filename, email)
+        Raises:
+            MailError: If the hostname is not set.
+
+        Returns:
+            BatchResult: The positions of the delivered and deferred messages and the failed ones'
+            errors.
+        """
+        if self.hostname is None:
+            raise MailError("Hostname is not set")
+
+        result = BatchResult(total=len(messages))
+        indexed = list(enumerate(messages))
+        size = chunk_size or len(indexed) or 1
+        for start in range(0, len(indexed), size):
+            if result.deferred:
+                result.deferred.extend(index for index, _ in indexed[start:])
+                break
+            await self._send_chunk(
+                deque(indexed[start : start + size]), result, recycle=chunk_size is not None
+            )
+        if self.rate_limiter is not None:
+            await self.rate_limiter.record(
+                queued=len(messages), sent=len(result.sent), deferred=len(result.deferred)
+            )
+        logger.info("Email batch sent: %s", result)
+        return result
+
+    async def _send_chunk(
+        self,
+        pending: Deque[Tuple[int, Dict[str, Any]]],
+        result: BatchResult,
+        recycle: bool = False,
+    ) -> None:
+        """Send a chunk of messages, reusing one connection until the server drops it.
+
+        Args:
+            pending (Deque[Tuple[int, Dict[str, Any]]]): The messages to send with their position.
+            result (BatchResult): The batch result to record the outcome of every message in.
+            recycle (bool): Whether to close the connection once the chunk is sent, so the next
+                chunk starts a new session.
+        """
+        retried = set()
+        while pending:
+            try:
+                connection = await self.pool.acquire()
+            except (aiosmtplib.SMTPException, OSError) as e:
+                for index, _ in pending:
+                    result.errors[index] = f"SMTP Error: {str(e)}"
+                return
 
-        with smtplib.SMTP(self.hostname, self.port) as server:
-            if self.username is not None:
-                server.user = self.username
-                server.password = self.password
+            discard = False
             try:
-                server.ehlo()
-                if self.use_ssl:
+                while pending:
+                    if self.rate_limiter is not None:
+                        try:
+                            await self.rate_limiter.acquire()
+                        except MailRateLimitError as e:
+                            result.deferred.extend(index for index, _ in pending)
+                            result.retry_after = e.retry_after
+                            pending.clear()
+                            break
+                    index, message = pending.popleft()
                     try:
-                        server.starttls()
-                    except smtplib.SMTPNotSupportedError:
-                        raise Exception("Server does not suport STARTTLS command")
-                if self.username:
-                    server.auth_login()
-                    server.login(self.username, self.password)
-
-                server.send_message(email)
-                logger.info("Email Sent Successfully!")
-            except (
-                smtplib.SMTPConnectError,
-                smtplib.SMTPSenderRefused,
-                smtplib.SMTPAuthenticationError,
-                smtplib.SMTPRecipientsRefused,
-                smtplib.SMTPServerDisconnected,
-                smtplib.SMTPException,
-            ) as e:
-                raise Exception(f"SMTP Error: {str(e)}")
+                        email = await self._build_email(message)
+                        await connection.send_message(email)
+                        result.sent.append(index)
+                    except aiosmtplib.SMTPServerDisconnected as e:
+                        discard = True
+                        if index in retried:
+                            result.errors[index] = f"SMTP Error: {str(e)}"
+                        else:
+                            retried.add(index)
+                            pending.appendleft((index, message))
+                        break
+                    except (
+                        aiosmtplib.SMTPRecipientsRefused,
+                        aiosmtplib.SMTPResponseException,
+                    ) as e:
+                        result.errors[index] = f"SMTP Error: {str(e)}"
+                        await connection.rset()
+                    except Exception as e:
+                        result.errors[index] = str(e)
+            except aiosmtplib.SMTPServerDisconnected:
+                discard = True
+            finally:
+                await self.pool.release(connection, discard=discard or recycle)
@@ -0,0 +1,286 @@
+"""Module for spooling emails to local files instead of sending them.
+
+This module provides the SpoolMail transport, which appends every fully rendered MIME message to an
+append-only data file and records its offset, length, recipients and subject in an index file, one
+JSON line per message. Several workers can write to the same spool, appends are serialized with an
+exclusive file lock, taken with ``fcntl``, or ``msvcrt`` on Windows. The SpoolReader class loads
+the index to count messages and look them up by recipient without scanning the data file, so mail
+throughput benchmarks and tests can run offline at full speed and still check what would have been
+delivered.
+
+Classes:
+    SpoolMail: A mail transport writing messages to a spool directory.
+    SpoolEntry: The index entry of a spooled message.
+    SpoolReader: Counts and reads spooled messages by recipient.
+"""
+
+import asyncio
+import json
+import os
+import sys
+from collections import defaultdict
+from contextlib import contextmanager
+from email import message_from_bytes
+from email.message import Message
+from typing import IO, Any, Dict, Iterator, List, NamedTuple, Optional
+
+from azra_store_lmi_api.config.mailer.base import BaseMail, BatchResult
+from azra_store_lmi_api.config.settings import settings
+
+DATA_FILE = "messages.spool"
+INDEX_FILE = "index.jsonl"
+
+if sys.platform == "win32":
+    import msvcrt
+
+    @contextmanager
+    def _file_lock(file: IO) -> Iterator[None]:
+        """Hold an exclusive lock on a file, waiting for it to be released by other writers.
+
+        The lock covers the first byte of the file, which every writer locks, appends still go
+        to the end of the file.
+
+        Args:
+            file (IO): The file to lock.
+        """
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    @contextmanager
+    def _file_lock(file: IO) -> Iterator[None]:
+        """Hold an exclusive lock on a file, waiting for it to be released by other writers.
+
+        Args:
+            file (IO): The file to lock.
+        """
+        fcntl.flock(file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+
+class SpoolMail(BaseMail):
+    """Class for writing emails to a spool directory instead of sending them.
+
+    Attributes:
+        path (str): The spool directory, created if it does not exist.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """Initialize the spool directory.
+
+        Args:
+            path (Optional[str]): The spool directory. Defaults to the MAIL_SPOOL_PATH setting.
+        """
+        self.path = path or settings.MAIL_SPOOL_PATH
+
+    def _append(self, records: List[tuple]) -> None:
+        """Append messages to the data file and their entries to the index under a file lock.
+
+        Args:
+            records (List[tuple]): The raw message, recipients and subject of every message.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, DATA_FILE), "ab") as data_file, open(
+            os.path.join(self.path, INDEX_FILE), "a", encoding="utf-8"
+        ) as index_file:
+            with _file_lock(data_file):
+                offset = data_file.seek(0, os.SEEK_END)
+                lines = []
+                for raw, recipients, subject in records:
+                    data_file.write(raw)
+                    lines.append(
+                        json.dumps(
+                            {
+                                "offset": offset,
+                                "length": len(raw),
+                                "recipients": recipients,
+                                "subject": subject,
+                            }
+                        )
+                        + "\n"
+                    )
+                    offset += len(raw)
+                data_file.flush()
+                # The index is written after the data, so a reader never sees an entry whose
+                # message is incomplete.
+                index_file.write("".join(lines))
+                index_file.flush()
+
+    async def _render(self, message: Dict[str, Any]) -> tuple:
+        """Render a message dictionary into the record appended to the spool.
+
+        Args:
+            message (Dict[str, Any]): A dictionary containing the email message details.
+
+        Returns:
+            tuple: The raw MIME message, its lower cased recipients and its subject.
+        """
+        email = await self._build_email(message)
+        recipients = [
+            recipient.lower()
+            for field in ("to", "cc", "bcc")
+            for recipient in (message.get(field) or [])
+        ]
+        return email.as_bytes(), recipients, message["subject"]
+
+    async def send(self, message: Dict[str, Any]) -> None:
+        """Write an email message to the spool.
+
+        Args:
+            message (Dict[str, Any]): A dictionary containing the email message details.
+
+        Returns:
+            None
+        """
+        await asyncio.to_thread(self._append, [await self._render(message)])
+
+    async def send_many(
+        self, messages: List[Dict[str, Any]], chunk_size: Optional[int] = None
+    ) -> BatchResult:
+        """Write a batch of email messages to the spool with a single append.
+
+        Args:
+            messages (List[Dict[str, Any]]): The email message dictionaries to write.
+            chunk_size (Optional[int]): Unused, accepted for compatibility with SMTPMail.
+
+        Returns:
+            BatchResult: The positions of the written messages and the failed ones' errors.
+        """
+        result = BatchResult(total=len(messages))
+        records = []
+        for index, message in enumerate(messages):
+            try:
+                records.append(await self._render(message))
+                result.sent.append(index)
+            except Exception as exception:
+                result.errors[index] = str(exception)
+        if records:
+            await asyncio.to_thread(self._append, records)
+        return result
+
+
+class SpoolEntry(NamedTuple):
+    """The index entry of a spooled message.
+
+    Attributes:
+        offset (int): The position of the message in the data file.
+        length (int): The size of the message in bytes.
+        recipients (List[str]): The lower cased To, Cc and Bcc recipients.
+        subject (str): The subject of the message.
+    """
+
+    offset: int
+    length: int
+    recipients: List[str]
+    subject: str
+
+
+class SpoolReader:
+    """Counts and reads the messages of a spool directory by recipient.
+
+    The index is loaded in memory with the positions of the messages of every recipient, and
+    refresh only reads the entries appended since the previous load.
+
+    Attributes:
+        path (str): The spool directory.
+        entries (List[SpoolEntry]): The index entries, in the order messages were spooled.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """Initialize the reader and load the index.
+
+        Args:
+            path (Optional[str]): The spool directory. Defaults to the MAIL_SPOOL_PATH setting.
+        """
+        self.path = path or settings.MAIL_SPOOL_PATH
+        self.entries: List[SpoolEntry] = []
+        self._by_recipient: Dict[str, List[int]] = defaultdict(list)
+        self._index_position = 0
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Load the index entries appended since the previous load."""
+        index_path = os.path.join(self.path, INDEX_FILE)
+        if not os.path.exists(index_path):
+            return
+        with open(index_path, "rb") as index_file:
+            index_file.seek(self._index_position)
+            for line in index_file:
+                if not line.endswith(b"\n"):
+                    # An entry still being written, it is read by the next refresh.
+                    break
+                entry = SpoolEntry(**json.loads(line))
+                for recipient in set(entry.recipients):
+                    self._by_recipient[recipient].append(len(self.entries))
+                self.entries.append(entry)
+                self._index_position += len(line)
+
+    def __len__(self) -> int:
+        """Returns the number of spooled messages.
+
+        Returns:
+            int: The number of spooled messages.
+        """
+        return len(self.entries)
+
+    def count(self, recipient: Optional[str] = None) -> int:
+        """Returns the number of spooled messages, or of the messages sent to a recipient.
+
+        Args:
+            recipient (Optional[str]): The email address to count the messages of.
+
+        Returns:
+            int: The number of messages.
+        """
+        if recipient is None:
+            return len(self.entries)
+        return len(self._by_recipient.get(recipient.lower(), []))
+
+    def lookup(self, recipient: str) -> List[SpoolEntry]:
+        """Returns the index entries of the messages sent to a recipient.
+
+        Args:
+            recipient (str): The email address to look up.
+
+        Returns:
+            List[SpoolEntry]: The entries, in the order messages were spooled.
+        """
+        return [
+            self.entries[position] for position in self._by_recipient.get(recipient.lower(), [])
+        ]
+
+    def read(self, entry: SpoolEntry) -> Message:
+        """Read and parse a spooled message.
+
+        Args:
+            entry (SpoolEntry): The index entry of the message.
+
+        Returns:
+            Message: The parsed MIME message.
+        """
+        with open(os.path.join(self.path, DATA_FILE), "rb") as data_file:
+            data_file.seek(entry.offset)
+            return message_from_bytes(data_file.read(entry.length))
+
+    def messages(self, recipient: Optional[str] = None) -> Iterator[Message]:
+        """Iterate over the spooled messages, or the messages sent to a recipient.
+
+        Args:
+            recipient (Optional[str]): The email address to read the messages of.
+
+        Yields:
+            Message: The parsed MIME messages, in the order they were spooled.
+        """
+        entries = self.entries if recipient is None else self.lookup(recipient)
+        for entry in entries:
+            yield self.read(entry)
@@ -0,0 +1,48 @@
+"""This module contains the background tasks for sending emails in bulk.
+
+It includes a task that delivers a batch of emails over a single SMTP session, so bulk runs such as
+store reminders do not open a connection and log in for every email. The messages held back by the
+send rate limit of the provider are enqueued again as a new batch, once the budget allows them.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from azra_store_lmi_api.config.celery.decorator import async_task
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.config.mailer.adapter import EmailMessage
+
+
+@async_task(idempotent=True)
+async def send_email_batch(
+    messages: List[Dict[str, Any]], chunk_size: Optional[int] = None, suppress_mail: bool = False
+) -> Dict[str, Any]:
+    """Send a batch of emails over one SMTP session per chunk.
+
+    Args:
+        messages (List[Dict[str, Any]]): The email messages, as built by EmailMessage.as_dict.
+        chunk_size (Optional[int]): The maximum number of messages sent over one connection.
+        suppress_mail (bool): Flag to determine whether to use LogMail instead of actual sending.
+
+    Returns:
+        Dict[str, Any]: The number of sent and deferred messages and the errors of the failed ones
+        by position.
+
+    Logs:
+        - Info: The outcome of the batch.
+        - Error: The recipients and error of every failed message.
+    """
+    result = await EmailMessage.send_many(
+        [EmailMessage.from_dict(message) for message in messages],
+        chunk_size=chunk_size,
+        suppress_mail=suppress_mail,
+    )
+    for index, error in result.errors.items():
+        logger.error("Unable to send email to %s: %s", messages[index]["to"], error)
+    if result.deferred:
+        send_email_batch.apply_async(
+            args=([messages[index] for index in result.deferred], chunk_size, suppress_mail),
+            countdown=result.retry_after,
+        )
+        logger.info("%s emails deferred by %ss.", len(result.deferred), result.retry_after)
+    logger.info("Email batch processed: %s", result)
+    return result.as_dict()
@@ -0,0 +1,152 @@
+"""Module for rendering email bodies from templates.
+
+This module provides the EmailTemplateRenderer class which loads email templates from the
+``templates/emails`` package directory, compiles each of them once per process and renders the
+plain text and HTML parts of an email from a single context.
+
+A template named ``saas_admin_credentials`` is made of ``saas_admin_credentials.txt`` for the plain
+text part and ``saas_admin_credentials.html`` for the HTML part, either of which may be omitted.
+Templates can use two helpers, cached until their file changes when templates are reloaded:
+
+- ``inline_css(name)``: the content of a stylesheet, to be embedded in a ``<style>`` tag.
+- ``fragment(name)``: a static fragment, such as a footer, rendered once without context.
+
+Classes:
+    EmailTemplateRenderer: Renders email content parts from compiled templates.
+
+Attributes:
+    email_templates: The renderer shared by the whole process.
+"""
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from jinja2 import Environment, PackageLoader, Template, TemplateNotFound, select_autoescape
+from markupsafe import Markup
+
+from azra_store_lmi_api.config.settings import settings
+
+# Content types rendered for every template, in the order they are attached to the email.
+CONTENT_TYPES = {"plain": "txt", "html": "html"}
+
+
+class EmailTemplateRenderer:
+    """Renders the content parts of emails from templates compiled once per process.
+
+    Attributes:
+        environment (Environment): The Jinja environment holding the compiled templates.
+    """
+
+    def __init__(
+        self,
+        package_name: str = "azra_store_lmi_api",
+        package_path: str = "templates/emails",
+        auto_reload: bool = False,
+    ):
+        """Initialize the renderer for a package template directory.
+
+        Args:
+            package_name (str): The package containing the templates.
+                Defaults to "azra_store_lmi_api".
+            package_path (str): The templates directory inside the package.
+                Defaults to "templates/emails".
+            auto_reload (bool): Whether to recompile templates when their file changes.
+                Defaults to False, so templates are never checked again after compilation.
+        """
+        self.environment = Environment(
+            loader=PackageLoader(package_name, package_path),
+            autoescape=select_autoescape(["html"]),
+            auto_reload=auto_reload,
+            cache_size=-1,
+            trim_blocks=True,
+            lstrip_blocks=True,
+            keep_trailing_newline=True,
+        )
+        self.environment.globals["inline_css"] = self.inline_css
+        self.environment.globals["fragment"] = self.fragment
+        self._variants: Dict[str, Dict[str, str]] = {}
+        self._stylesheets: Dict[str, Tuple[Markup, Optional[Callable[[], bool]]]] = {}
+        self._fragments: Dict[str, Tuple[Template, Markup]] = {}
+
+    def inline_css(self, name: str) -> Markup:
+        """Returns the content of a stylesheet to embed in an HTML email.
+
+        The stylesheet is read once, and again when its file changes if templates are reloaded.
+
+        Args:
+            name (str): The stylesheet path relative to the templates directory.
+
+        Returns:
+            Markup: The stylesheet content, marked safe for HTML templates.
+        """
+        cached = self._stylesheets.get(name)
+        if cached is None or (self.environment.auto_reload and cached[1] and not cached[1]()):
+            source, _, uptodate = self.environment.loader.get_source(self.environment, name)
+            cached = self._stylesheets[name] = (Markup(source.strip()), uptodate)
+        return cached[0]
+
+    def fragment(self, name: str) -> Markup:
+        """Returns a static fragment rendered once without context.
+
+        The fragment is rendered again when its template is recompiled, if templates are reloaded.
+
+        Args:
+            name (str): The fragment template path relative to the templates directory.
+
+        Returns:
+            Markup: The rendered fragment, marked safe for HTML templates.
+        """
+        template = self.environment.get_template(name)
+        cached = self._fragments.get(name)
+        if cached is None or cached[0] is not template:
+            cached = self._fragments[name] = (template, Markup(template.render()))
+        return cached[1]
+
+    def _get_variants(self, name: str) -> Dict[str, str]:
+        """Returns the template file of every content type available for a template.
+
+        Args:
+            name (str): The template name, without extension.
+
+        Returns:
+            Dict[str, str]: The template file by content type.
+
+        Raises:
+            TemplateNotFound: If there is no template for any content type.
+        """
+        if name not in self._variants:
+            variants = {}
+            for content_type, extension in CONTENT_TYPES.items():
+                template_name = f"{name}.{extension}"
+                try:
+                    self.environment.get_template(template_name)
+                except TemplateNotFound:
+                    continue
+                variants[content_type] = template_name
+            if not variants:
+                raise TemplateNotFound(name)
+            self._variants[name] = variants
+        return self._variants[name]
+
+    def render(self, name: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+        """Render every content part of a template from one context.
+
+        Args:
+            name (str): The template name, without extension.
+            context (Optional[Dict[str, Any]]): The variables available to the templates.
+
+        Returns:
+            Dict[str, str]: The rendered content by content type, plain text first.
+        """
+        context = context or {}
+        return {
+            content_type: self.environment.get_template(template_name).render(context)
+            for content_type, template_name in self._get_variants(name).items()
+        }
+
+    def compile_all(self) -> None:
+        """Compile every template of the directory ahead of the first render."""
+        for template_name in self.environment.list_templates(extensions=["txt", "html"]):
+            self.environment.get_template(template_name)
+
+
+email_templates = EmailTemplateRenderer(auto_reload=settings.ENVIRONMENT == "development")
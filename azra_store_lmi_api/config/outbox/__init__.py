@@ -0,0 +1,20 @@
+"""This module provides the transactional outbox for background tasks.
+
+Tasks are written to the outbox table in the same transaction as the domain change that triggers
+them, and a relay process dispatches them to Celery once the transaction has been committed. The
+request latency no longer depends on the broker, and a task is never lost when the broker is
+unavailable: it stays in the outbox until it can be dispatched, at least once.
+
+Usage:
+    from azra_store_lmi_api.config.outbox import enqueue
+
+    session.add(saas_admin)
+    await session.flush()
+    await enqueue(session, send_saas_admin_credentials, saas_admin.id)
+    await session.commit()
+
+Run the relay with ``python -m azra_store_lmi_api.commands.outbox_relay``.
+"""
+
+from azra_store_lmi_api.config.outbox.models import OutboxMessage as OutboxMessage
+from azra_store_lmi_api.config.outbox.utils import enqueue as enqueue
@@ -0,0 +1,49 @@
+"""This module contains the OutboxMessage model."""
+
+from datetime import datetime
+from typing import Any, Optional
+
+from sqlalchemy import BigInteger, DateTime, Integer, String, Text, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from azra_store_lmi_api.models import BaseModal
+
+
+class OutboxMessage(BaseModal):
+    """Represents a Celery task waiting to be dispatched by the outbox relay.
+
+    This class defines the structure for the 'outbox_messages' table. Rows are deleted once their
+    task has been sent to the broker, and kept with their failure time once their dispatch failed
+    too many times.
+
+    Attributes:
+        id (int): The primary key of the message, which is also the dispatch order.
+        task_name (str): The registered name of the Celery task.
+        args (list): The positional arguments of the task.
+        kwargs (dict): The keyword arguments of the task.
+        options (dict): The options passed to ``send_task``, such as the queue or countdown.
+        attempts (int): The number of failed dispatch attempts.
+        available_at (datetime): The time after which the message can be dispatched.
+        last_error (Optional[str]): The error of the last failed dispatch attempt.
+        failed_at (Optional[datetime]): The time the message was given up on, after too many
+            failed dispatch attempts.
+
+    Inherits from:
+        BaseModal: Provides common functionality for all models.
+    """
+
+    __tablename__ = "outbox_messages"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+
+    task_name: Mapped[str] = mapped_column(String(255))
+    args: Mapped[list[Any]] = mapped_column(JSONB, default=list)
+    kwargs: Mapped[dict[str, Any]] = mapped_column(JSONB, default=dict)
+    options: Mapped[dict[str, Any]] = mapped_column(JSONB, default=dict)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    available_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), index=True
+    )
+    last_error: Mapped[Optional[str]] = mapped_column(Text)
+    failed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
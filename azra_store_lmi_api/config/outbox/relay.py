@@ -0,0 +1,154 @@
+"""This module contains the relay which dispatches the outbox messages to Celery.
+
+Each batch is selected with ``FOR UPDATE SKIP LOCKED``, so several relay processes can drain the
+outbox concurrently without dispatching the same message twice. A message is deleted in the same
+transaction that locked it, after it was sent to the broker. If that transaction fails to commit,
+the message is sent again by the next batch, which makes the delivery at least once.
+
+A message which fails to be dispatched ``OUTBOX_MAX_ATTEMPTS`` times is marked as failed and no
+longer dispatched, so a task the broker keeps rejecting does not come back forever. Failed
+messages stay in the outbox until they are dispatched again with ``retry_failed``.
+"""
+
+import asyncio
+from datetime import timedelta
+from typing import List, Optional, Sequence
+
+from kombu.exceptions import OperationalError
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.config.celery.app import celery
+from azra_store_lmi_api.config.database import get_db_context
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.config.outbox.models import OutboxMessage
+from azra_store_lmi_api.config.settings import settings
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    """Returns the exponential backoff before a failed message is dispatched again.
+
+    Args:
+        attempts (int): The number of failed dispatch attempts of the message.
+
+    Returns:
+        timedelta: The delay before the next attempt.
+    """
+    delay = settings.OUTBOX_RETRY_BACKOFF * 2 ** (attempts - 1)
+    return timedelta(seconds=min(delay, settings.OUTBOX_RETRY_BACKOFF_MAX))
+
+
+async def relay_batch(session: AsyncSession, batch_size: int) -> int:
+    """Dispatch one batch of available outbox messages to Celery.
+
+    Args:
+        session (AsyncSession): The session used to lock and delete the messages.
+        batch_size (int): The maximum number of messages to dispatch.
+
+    Returns:
+        int: The number of messages selected, whether their dispatch succeeded or not.
+    """
+    messages = (
+        await session.scalars(
+            select(OutboxMessage)
+            .where(OutboxMessage.available_at <= func.now(), OutboxMessage.failed_at.is_(None))
+            .order_by(OutboxMessage.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+    ).all()
+    dispatched: List[int] = []
+    for message in messages:
+        try:
+            celery.send_task(
+                message.task_name, args=message.args, kwargs=message.kwargs, **message.options
+            )
+            dispatched.append(message.id)
+        except Exception as exception:
+            message.attempts += 1
+            message.last_error = str(exception)
+            if message.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+                message.failed_at = func.now()
+                logger.error(
+                    "Outbox message %s (%s) failed after %s attempts: %s",
+                    message.id,
+                    message.task_name,
+                    message.attempts,
+                    exception,
+                )
+            else:
+                message.available_at = func.now() + _retry_delay(message.attempts)
+                logger.warning(
+                    "Unable to dispatch outbox message %s (%s), attempt %s: %s",
+                    message.id,
+                    message.task_name,
+                    message.attempts,
+                    exception,
+                )
+            if isinstance(exception, OperationalError):
+                # The broker is unavailable, the rest of the batch would fail the same way.
+                break
+    if dispatched:
+        await session.execute(delete(OutboxMessage).where(OutboxMessage.id.in_(dispatched)))
+    await session.commit()
+    return len(messages)
+
+
+async def retry_failed(session: AsyncSession, ids: Optional[Sequence[int]] = None) -> int:
+    """Make failed outbox messages available to the relay again, with their attempts reset.
+
+    Args:
+        session (AsyncSession): The session used to update the messages.
+        ids (Optional[Sequence[int]]): The ids of the messages to retry. Defaults to every
+            failed message.
+
+    Returns:
+        int: The number of messages made available again.
+    """
+    statement = update(OutboxMessage).where(OutboxMessage.failed_at.is_not(None))
+    if ids is not None:
+        statement = statement.where(OutboxMessage.id.in_(ids))
+    result = await session.execute(
+        statement.values(failed_at=None, attempts=0, available_at=func.now())
+    )
+    await session.commit()
+    return result.rowcount
+
+
+async def run_relay(
+    batch_size: Optional[int] = None,
+    poll_interval: Optional[float] = None,
+    once: bool = False,
+    stop_event: Optional[asyncio.Event] = None,
+) -> None:
+    """Drain the outbox to Celery until stopped.
+
+    Full batches are followed by the next batch immediately, the relay only waits for the poll
+    interval once the outbox has been drained.
+
+    Args:
+        batch_size (Optional[int]): The number of messages per batch.
+            Defaults to the OUTBOX_BATCH_SIZE setting.
+        poll_interval (Optional[float]): Seconds to wait when the outbox is drained.
+            Defaults to the OUTBOX_POLL_INTERVAL setting.
+        once (bool): Whether to return as soon as the outbox is drained. Defaults to False.
+        stop_event (Optional[asyncio.Event]): An event which stops the relay when set.
+    """
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    poll_interval = poll_interval or settings.OUTBOX_POLL_INTERVAL
+    stop_event = stop_event or asyncio.Event()
+    while not stop_event.is_set():
+        try:
+            async with get_db_context() as session:
+                selected = await relay_batch(session, batch_size)
+        except Exception as exception:
+            logger.exception("Error occurred while relaying the outbox: \n%s", str(exception))
+            selected = 0
+        if selected >= batch_size:
+            continue
+        if once:
+            break
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout=poll_interval)
+        except asyncio.TimeoutError:
+            pass
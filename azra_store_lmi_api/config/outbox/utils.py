@@ -0,0 +1,47 @@
+"""This module contains the helpers used to write tasks to the outbox."""
+
+from typing import Any, Dict, Optional, Union
+
+from celery import Task
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.config.celery.idempotency import IDEMPOTENCY_HEADER
+from azra_store_lmi_api.config.outbox.models import OutboxMessage
+
+
+async def enqueue(
+    session: AsyncSession,
+    task: Union[Task, str],
+    *args: Any,
+    options: Optional[Dict[str, Any]] = None,
+    idempotency_key: Optional[str] = None,
+    **kwargs: Any,
+) -> OutboxMessage:
+    """Add a task to the outbox of the session's current transaction.
+
+    The task is dispatched by the outbox relay only if the transaction is committed, so it is
+    never sent for a domain change that was rolled back.
+
+    Args:
+        session (AsyncSession): The session holding the domain change.
+        task (Union[Task, str]): The Celery task, or its registered name.
+        *args: The positional arguments of the task, which must be JSON serializable.
+        options (Optional[Dict[str, Any]]): The options passed to ``send_task``.
+        idempotency_key (Optional[str]): The idempotency key of an idempotent task, such as the
+            id of the API request, so a retried request does not run the task twice.
+        **kwargs: The keyword arguments of the task, which must be JSON serializable.
+
+    Returns:
+        OutboxMessage: The outbox message added to the session.
+    """
+    options = dict(options or {})
+    if idempotency_key is not None:
+        options["headers"] = {**options.get("headers", {}), IDEMPOTENCY_HEADER: idempotency_key}
+    message = OutboxMessage(
+        task_name=task if isinstance(task, str) else task.name,
+        args=list(args),
+        kwargs=kwargs,
+        options=options,
+    )
+    session.add(message)
+    return message
@@ -0,0 +1,42 @@
+"""Module for the Redis client shared by the application.
+
+This module provides a Redis client for the running event loop. Celery workers run every task in
+an event loop of their own, so a client is created for each loop instead of once per process, and
+its connections are never used from another loop.
+
+Functions:
+    get_redis: Returns the Redis client of the running event loop.
+    close_redis: Closes the Redis client of the running event loop.
+"""
+
+import asyncio
+from weakref import WeakKeyDictionary
+
+from redis.asyncio import Redis
+
+from azra_store_lmi_api.config.settings import settings
+
+_clients: "WeakKeyDictionary[asyncio.AbstractEventLoop, Redis]" = WeakKeyDictionary()
+
+
+def get_redis() -> Redis:
+    """Returns the Redis client of the running event loop, creating it if needed.
+
+    The client connects to REDIS_URL, which defaults to the Celery broker.
+
+    Returns:
+        Redis: The Redis client.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = Redis.from_url(settings.REDIS_URL or settings.CELERY_BROKER_URL)
+        _clients[loop] = client
+    return client
+
+
+async def close_redis() -> None:
+    """Closes the Redis client of the running event loop, if any."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,12 @@
+"""This module provides the periodic job framework on Celery beat.
+
+Periodic jobs are declared with ``periodic_job`` in the ``tasks`` package of each app, next to its
+other tasks, and are added to the beat schedule when their module is imported. A job never
+overlaps itself, even across beat replicas, and the duration and row count of every run are
+recorded in the ``job_runs`` table.
+
+Run the scheduler with ``celery -A azra_store_lmi_api.config.celery.app beat``.
+"""
+
+from azra_store_lmi_api.config.scheduler.models import JobRun as JobRun
+from azra_store_lmi_api.config.scheduler.registry import periodic_job as periodic_job
@@ -0,0 +1,68 @@
+"""Module for the distributed lock preventing a periodic job from overlapping itself."""
+
+import uuid
+from typing import Optional
+
+from redis.exceptions import RedisError
+
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.config.redis import get_redis
+
+# Deletes the lock only if it is still held by the same owner, so a run whose lock expired does
+# not release the lock of the next run.
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class JobLock:
+    """A lock held in Redis by one run of a periodic job at a time.
+
+    Attributes:
+        key (str): The Redis key of the lock.
+        timeout (int): Seconds after which the lock expires if it was not released.
+    """
+
+    def __init__(self, name: str, timeout: int):
+        """Initialize the lock of a job.
+
+        Args:
+            name (str): The name of the periodic job.
+            timeout (int): Seconds after which the lock expires if it was not released.
+        """
+        self.key = f"scheduler:lock:{name}"
+        self.timeout = timeout
+        self._token: Optional[str] = None
+
+    async def acquire(self) -> bool:
+        """Acquire the lock without waiting.
+
+        Unlike the other uses of Redis, the lock fails closed: if Redis is unavailable, the run
+        is skipped rather than risking an overlap, and the job runs again at its next schedule.
+
+        Returns:
+            bool: True if the lock was acquired, False if another run holds it.
+        """
+        token = uuid.uuid4().hex
+        try:
+            acquired = await get_redis().set(self.key, token, nx=True, ex=self.timeout)
+        except RedisError as exception:
+            logger.warning("Unable to acquire %s: %s", self.key, exception)
+            return False
+        if acquired:
+            self._token = token
+            return True
+        return False
+
+    async def release(self) -> None:
+        """Release the lock if it is still held by this run."""
+        if self._token is None:
+            return
+        try:
+            await get_redis().eval(RELEASE_SCRIPT, 1, self.key, self._token)
+        except RedisError as exception:
+            logger.warning("Unable to release %s: %s", self.key, exception)
+        self._token = None
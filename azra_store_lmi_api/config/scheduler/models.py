@@ -0,0 +1,52 @@
+"""This module contains the JobRun model."""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, DateTime, Float, Integer, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from azra_store_lmi_api.core.utils import BaseEnum
+from azra_store_lmi_api.models import BaseModal
+
+
+class JobRun(BaseModal):
+    """Represents a run of a periodic job in the database.
+
+    This class defines the structure for the 'job_runs' table.
+
+    Attributes:
+        id (int): The primary key of the run.
+        name (str): The name of the periodic job.
+        status (int): The outcome of the run, see JobRunStatusEnum.
+        started_at (datetime): The time the run started.
+        duration (float): The duration of the run in seconds.
+        rows (Optional[int]): The number of rows processed by the job, if it reports it.
+        error (Optional[str]): The error of a failed run.
+
+    Inherits from:
+        BaseModal: Provides common functionality for all models.
+    """
+
+    __tablename__ = "job_runs"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+
+    name: Mapped[str] = mapped_column(String(255), index=True)
+    status: Mapped[int] = mapped_column(Integer)
+    started_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    duration: Mapped[float] = mapped_column(Float)
+    rows: Mapped[Optional[int]] = mapped_column(Integer)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+
+
+class JobRunStatusEnum(BaseEnum):
+    """Enumeration of the outcomes of a periodic job run.
+
+    Attributes:
+        SUCCEEDED (int): The job completed.
+        FAILED (int): The job raised an error.
+    """
+
+    SUCCEEDED = 10
+    FAILED = 20
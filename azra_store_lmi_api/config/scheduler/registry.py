@@ -0,0 +1,185 @@
+"""Module for declaring periodic jobs next to the tasks of each app.
+
+A periodic job is an async function returning the number of rows it processed, declared with
+``periodic_job`` in the ``tasks`` package of an app. The decorator turns it into a Celery task and
+adds its entry to the ``beat_schedule`` of the Celery configuration, which beat reads when it
+builds its scheduler, once the task modules have been discovered.
+
+Every run of a job takes a lock in Redis, so a job never overlaps itself even if several beat
+replicas send it, and records its outcome, duration and row count in the ``job_runs`` table.
+
+Usage:
+    from celery.schedules import crontab
+
+    from azra_store_lmi_api.config.scheduler import periodic_job
+
+    @periodic_job(crontab(minute=0))
+    async def clear_expired_otps() -> int:
+        ...
+        return result.rowcount
+
+Classes:
+    PeriodicJob: A registered periodic job.
+
+Functions:
+    periodic_job: Declares an async function as a periodic job.
+    run_job: Runs a job under its lock and records the run.
+    build_beat_schedule: Returns the beat schedule of every registered job.
+
+Attributes:
+    registry: The registered periodic jobs by name.
+"""
+
+import time
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Any, Callable, Coroutine, Dict, NamedTuple, Optional, Union
+
+from celery import Task
+from celery.schedules import schedule as celery_schedule
+
+from azra_store_lmi_api.config.celery.app import celery
+from azra_store_lmi_api.config.celery.decorator import async_task
+from azra_store_lmi_api.config.database import get_db_context
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.config.scheduler.lock import JobLock
+from azra_store_lmi_api.config.scheduler.models import JobRun, JobRunStatusEnum
+from azra_store_lmi_api.config.settings import settings
+
+JobFunction = Callable[[], Coroutine[Any, Any, Optional[int]]]
+
+
+class PeriodicJob(NamedTuple):
+    """A registered periodic job.
+
+    Attributes:
+        name (str): The name of the job, which is also the name of its task.
+        task (Task): The Celery task running the job.
+        schedule (Union[float, celery_schedule]): Seconds between runs, or a Celery schedule.
+        options (Dict[str, Any]): The options used to send the task, such as the queue.
+    """
+
+    name: str
+    task: Task
+    schedule: Union[float, celery_schedule]
+    options: Dict[str, Any]
+
+
+registry: Dict[str, PeriodicJob] = {}
+
+
+async def _record_run(
+    name: str,
+    status: JobRunStatusEnum,
+    started_at: datetime,
+    duration: float,
+    rows: Optional[int],
+    error: Optional[str],
+) -> None:
+    """Record the outcome of a run in the job_runs table, without failing the job."""
+    try:
+        async with get_db_context() as session:
+            session.add(
+                JobRun(
+                    name=name,
+                    status=status.value,
+                    started_at=started_at,
+                    duration=duration,
+                    rows=rows,
+                    error=error,
+                )
+            )
+            await session.commit()
+    except Exception as exception:
+        logger.exception("Error occurred while recording the run of %s: \n%s", name, exception)
+
+
+async def run_job(name: str, func: JobFunction, lock_timeout: int) -> Optional[int]:
+    """Run a periodic job under its lock and record the run.
+
+    Args:
+        name (str): The name of the job.
+        func (JobFunction): The job function.
+        lock_timeout (int): Seconds after which the lock expires if the run did not release it.
+
+    Returns:
+        Optional[int]: The number of rows processed, or None if the job is already running.
+    """
+    lock = JobLock(name, lock_timeout)
+    if not await lock.acquire():
+        logger.info("Periodic job %s skipped, a previous run is still in progress.", name)
+        return None
+    started_at = datetime.now(timezone.utc)
+    started = time.perf_counter()
+    try:
+        rows = await func()
+    except Exception as exception:
+        await _record_run(
+            name,
+            JobRunStatusEnum.FAILED,
+            started_at,
+            time.perf_counter() - started,
+            None,
+            str(exception),
+        )
+        raise
+    finally:
+        await lock.release()
+    duration = time.perf_counter() - started
+    await _record_run(name, JobRunStatusEnum.SUCCEEDED, started_at, duration, rows, None)
+    logger.info("Periodic job %s processed %s rows in %.3fs.", name, rows, duration)
+    return rows
+
+
+def periodic_job(
+    schedule: Union[float, celery_schedule],
+    *,
+    lock_timeout: Optional[int] = None,
+    options: Optional[Dict[str, Any]] = None,
+    **kwargs: Any,
+) -> Callable[[JobFunction], Task]:
+    """A decorator that declares an async function as a periodic job.
+
+    Args:
+        schedule (Union[float, celery_schedule]): Seconds between runs, or a Celery schedule
+            such as a crontab.
+        lock_timeout (Optional[int]): Seconds after which the lock of a run expires.
+            Defaults to the SCHEDULER_LOCK_TIMEOUT setting.
+        options (Optional[Dict[str, Any]]): The options used to send the task, such as the queue.
+        **kwargs: Arbitrary keyword arguments to be passed to the Celery task.
+
+    Returns:
+        Callable[[JobFunction], Task]: A decorator returning the Celery task of the job.
+    """
+
+    def _decorator(func: JobFunction) -> Task:
+        @wraps(func)
+        async def _job() -> Optional[int]:
+            return await run_job(task.name, func, lock_timeout or settings.SCHEDULER_LOCK_TIMEOUT)
+
+        task = async_task(**kwargs)(_job)
+        job = PeriodicJob(task.name, task, schedule, options or {})
+        registry[task.name] = job
+        # Beat merges the configured schedule when it builds its scheduler, before it sends
+        # beat_init, so the entry is added now. An entry configured explicitly is kept.
+        celery.conf.beat_schedule = {
+            task.name: _beat_entry(job),
+            **(celery.conf.beat_schedule or {}),
+        }
+        return task
+
+    return _decorator
+
+
+def _beat_entry(job: PeriodicJob) -> Dict[str, Any]:
+    """Returns the beat schedule entry of a job."""
+    return {"task": job.name, "schedule": job.schedule, "options": job.options}
+
+
+def build_beat_schedule() -> Dict[str, Dict[str, Any]]:
+    """Returns the beat schedule of every registered job.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: The beat schedule entries by job name.
+    """
+    return {job.name: _beat_entry(job) for job in registry.values()}
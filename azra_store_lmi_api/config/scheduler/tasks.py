@@ -0,0 +1,27 @@
+"""This module contains the periodic jobs maintaining the scheduler itself."""
+
+from datetime import timedelta
+
+from celery.schedules import crontab
+from sqlalchemy import delete, func
+
+from azra_store_lmi_api.config.database import get_db_context
+from azra_store_lmi_api.config.scheduler.models import JobRun
+from azra_store_lmi_api.config.scheduler.registry import periodic_job
+from azra_store_lmi_api.config.settings import settings
+
+
+@periodic_job(crontab(hour=3, minute=30))
+async def prune_job_runs() -> int:
+    """Delete the job runs older than SCHEDULER_JOB_RUN_RETENTION_DAYS.
+
+    Returns:
+        int: The number of deleted runs.
+    """
+    retention = timedelta(days=settings.SCHEDULER_JOB_RUN_RETENTION_DAYS)
+    async with get_db_context() as session:
+        result = await session.execute(
+            delete(JobRun).where(JobRun.started_at < func.now() - retention)
+        )
+        await session.commit()
+    return result.rowcount
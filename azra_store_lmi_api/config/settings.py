@@ -3,7 +3,7 @@
 This module loads application settings from environment variables and a .env file.
 """
 
-from typing import Literal
+from typing import Literal, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -29,9 +29,59 @@ class Settings(BaseSettings):
     MAIL_SERVER: str
     MAIL_USE_SSL: bool
     MAIL_USE_TLS: bool
+    MAIL_TIMEOUT: int = 60
+    MAIL_POOL_SIZE: int = 5
+    MAIL_POOL_IDLE_TIMEOUT: int = 300
+    MAIL_POOL_KEEPALIVE_INTERVAL: int = 30
+    MAIL_ATTACHMENT_CACHE_SIZE: int = 64 * 1024 * 1024
+    MAIL_ATTACHMENT_CACHE_MAX_ENTRY_SIZE: int = 16 * 1024 * 1024
+    MAIL_RATE_LIMIT: float = 0
+    MAIL_RATE_LIMIT_BURST: int = 10
+    MAIL_TRANSPORT: Literal["smtp", "log", "spool"] = "smtp"
+    MAIL_SPOOL_PATH: str = "spool/mail"
     ADMIN_APP_BASE_URL: str
     TENANT_APP_BASE_URL: str
     CELERY_BROKER_URL: str
+    REDIS_URL: Optional[str] = None
+    CACHE_ENABLED: bool = True
+    CACHE_TTL: int = 300
+    CACHE_EARLY_REFRESH: float = 1.0
+    CACHE_LOCK_TIMEOUT: float = 5.0
+    CITY_AUTOCOMPLETE_IN_MEMORY: bool = True
+    CELERY_VISIBILITY_TIMEOUT: int = 3600
+    CELERY_WORKER_PREFETCH_MULTIPLIER: int = 4
+    CELERY_IDEMPOTENCY_TTL: int = 86400
+    CELERY_IDEMPOTENCY_LOCK_TTL: int = 3600
+    CELERY_TRANSACTIONAL_MAIL_CONCURRENCY: int = 4
+    CELERY_TRANSACTIONAL_MAIL_PREFETCH_MULTIPLIER: int = 4
+    CELERY_TRANSACTIONAL_MAIL_ACKS_LATE: bool = True
+    CELERY_BULK_MAIL_CONCURRENCY: int = 2
+    CELERY_BULK_MAIL_PREFETCH_MULTIPLIER: int = 1
+    CELERY_BULK_MAIL_ACKS_LATE: bool = True
+    CELERY_REPORTS_CONCURRENCY: int = 2
+    CELERY_REPORTS_PREFETCH_MULTIPLIER: int = 1
+    CELERY_REPORTS_ACKS_LATE: bool = True
+    CELERY_PROVISIONING_CONCURRENCY: int = 1
+    CELERY_PROVISIONING_PREFETCH_MULTIPLIER: int = 1
+    CELERY_PROVISIONING_ACKS_LATE: bool = False
+    STORE_PROVISIONING_MIGRATION_TIMEOUT: int = 600
+    STORE_PROVISIONING_STUCK_AFTER: int = 1800
+    STORE_STATUS_RETRY_AFTER: int = 2
+    STORE_LOCATIONS_REFRESH_INTERVAL: float = 30.0
+    STORE_CALENDAR_TTL: float = 300.0
+    STORE_CALENDAR_MONTHS: int = 24
+    TENANT_SHARD: str = "default"
+    TENANT_TEMPLATE_SCHEMA: str = "tenant_template"
+    TENANT_MIGRATION_CONCURRENCY: int = 4
+    TENANT_MIGRATION_RETRIES: int = 2
+    TENANT_MIGRATION_RETRY_DELAY: float = 5.0
+    OUTBOX_BATCH_SIZE: int = 100
+    OUTBOX_POLL_INTERVAL: float = 1.0
+    OUTBOX_RETRY_BACKOFF: int = 5
+    OUTBOX_RETRY_BACKOFF_MAX: int = 300
+    OUTBOX_MAX_ATTEMPTS: int = 10
+    SCHEDULER_LOCK_TIMEOUT: int = 3600
+    SCHEDULER_JOB_RUN_RETENTION_DAYS: int = 30
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
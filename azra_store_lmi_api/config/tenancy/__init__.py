@@ -0,0 +1,23 @@
+"""This module provides the tenant registry, which maps every store to its schema.
+
+The ``tenants`` table in the public schema records the schema of each store, the alembic revision
+it is at, its status and the shard holding it. The provisioning registers and activates the
+schemas, the tenant migrations read the schemas to migrate from it and record their revisions,
+and a session is routed to the schema of an active store with ``route_to_tenant``, the only way
+to set the search path of a request to a tenant schema.
+
+Usage:
+    from azra_store_lmi_api.config.tenancy import route_to_tenant
+
+    if await route_to_tenant(session, store_id) is None:
+        return HTTPNotFoundError("Store not found.")
+"""
+
+from azra_store_lmi_api.config.tenancy.models import Tenant as Tenant
+from azra_store_lmi_api.config.tenancy.models import TenantStatusEnum as TenantStatusEnum
+from azra_store_lmi_api.config.tenancy.registry import active_tenants as active_tenants
+from azra_store_lmi_api.config.tenancy.registry import register_tenant as register_tenant
+from azra_store_lmi_api.config.tenancy.registry import revision_key as revision_key
+from azra_store_lmi_api.config.tenancy.registry import route_to_tenant as route_to_tenant
+from azra_store_lmi_api.config.tenancy.registry import set_tenant_revision as set_tenant_revision
+from azra_store_lmi_api.config.tenancy.registry import tenants_behind as tenants_behind
@@ -0,0 +1,56 @@
+"""This module contains the Tenant model."""
+
+from typing import Optional
+
+from sqlalchemy import ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from azra_store_lmi_api.core.utils import BaseEnum
+from azra_store_lmi_api.models import BaseModal
+
+
+class Tenant(BaseModal):
+    """Represents the schema of a store in the tenant registry.
+
+    This class defines the structure for the 'tenants' table, which lives in the public schema
+    whatever the search path, so the migrations of a store schema can read and update it.
+
+    Attributes:
+        store_id (str): The primary key of the tenant, the id of its store.
+        schema_name (str): The name of the schema of the store.
+        revision (Optional[str]): The alembic revision the schema is at, see ``revision_key``.
+            None until the schema is first migrated.
+        status (int): The status of the schema, see TenantStatusEnum.
+        shard (str): The database holding the schema, see TENANT_SHARD.
+
+    Inherits from:
+        BaseModal: Provides common functionality for all models.
+    """
+
+    __tablename__ = "tenants"
+    __table_args__ = (
+        # Serves the tenants of a shard, and those at or behind a revision, see tenants_behind.
+        Index("ix_tenants_shard_revision", "shard", "revision"),
+        {"schema": "public"},
+    )
+
+    store_id: Mapped[str] = mapped_column(String, ForeignKey("stores.id"), primary_key=True)
+
+    schema_name: Mapped[str] = mapped_column(String(63), unique=True)
+    revision: Mapped[Optional[str]] = mapped_column(String(255))
+    status: Mapped[int] = mapped_column(Integer)
+    shard: Mapped[str] = mapped_column(String(63))
+
+
+class TenantStatusEnum(BaseEnum):
+    """Enumeration of the statuses of a tenant schema.
+
+    Attributes:
+        PROVISIONING (int): The schema is being created by the provisioning of its store.
+        ACTIVE (int): The schema is provisioned, it is routed to and migrated with the others.
+        FAILED (int): The provisioning of the schema failed.
+    """
+
+    PROVISIONING = 10
+    ACTIVE = 20
+    FAILED = 30
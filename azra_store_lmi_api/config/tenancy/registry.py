@@ -0,0 +1,112 @@
+"""This module contains the queries of the tenant registry.
+
+The statements are built here and executed by their callers, the API and the provisioning
+worker on async sessions, the tenant migrations on sync connections.
+"""
+
+from typing import Iterable, Optional
+
+from sqlalchemy import Select, Update, or_, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.config.settings import settings
+from azra_store_lmi_api.config.tenancy.models import Tenant, TenantStatusEnum
+
+
+def revision_key(heads: Iterable[str]) -> Optional[str]:
+    """Returns the revision of the registry for the heads of a schema.
+
+    Args:
+        heads (Iterable[str]): The alembic heads of the schema, several if the migrations branch.
+
+    Returns:
+        Optional[str]: The sorted heads joined by commas, None if the schema has none.
+    """
+    return ",".join(sorted(heads)) or None
+
+
+def register_tenant(session: AsyncSession, store_id: str, schema_name: str) -> Tenant:
+    """Add the schema of a new store to the registry, in the PROVISIONING status.
+
+    Args:
+        session (AsyncSession): The database session, in the transaction creating the store.
+        store_id (str): The id of the store.
+        schema_name (str): The name of the schema of the store.
+
+    Returns:
+        Tenant: The tenant, added to the session.
+    """
+    tenant = Tenant(
+        store_id=store_id,
+        schema_name=schema_name,
+        status=TenantStatusEnum.PROVISIONING.value,
+        shard=settings.TENANT_SHARD,
+    )
+    session.add(tenant)
+    return tenant
+
+
+def active_tenants() -> Select:
+    """Returns the statement selecting the schemas of the active tenants of this shard, by name."""
+    return (
+        select(Tenant.schema_name)
+        .where(
+            Tenant.shard == settings.TENANT_SHARD,
+            Tenant.status == TenantStatusEnum.ACTIVE.value,
+        )
+        .order_by(Tenant.schema_name)
+    )
+
+
+def tenants_behind(revision: Optional[str]) -> Select:
+    """Returns the statement selecting the schemas of the active tenants not at a revision.
+
+    The revision is compared with two ranges rather than ``!=``, so the query is served by the
+    index on the shard and revision instead of a scan of the tenants of the shard.
+
+    Args:
+        revision (Optional[str]): The revision of the heads, see ``revision_key``.
+
+    Returns:
+        Select: The statement, selecting the schema names.
+    """
+    behind = Tenant.revision.is_(None)
+    if revision is not None:
+        behind = or_(Tenant.revision < revision, Tenant.revision > revision, behind)
+    return active_tenants().where(behind)
+
+
+def set_tenant_revision(schema_name: str, revision: Optional[str]) -> Update:
+    """Returns the statement recording the revision a schema was migrated to.
+
+    Args:
+        schema_name (str): The name of the schema.
+        revision (Optional[str]): The revision of its heads, see ``revision_key``.
+
+    Returns:
+        Update: The statement.
+    """
+    return update(Tenant).where(Tenant.schema_name == schema_name).values(revision=revision)
+
+
+async def route_to_tenant(session: AsyncSession, store_id: str) -> Optional[str]:
+    """Set the search path of the transaction of a session to the schema of an active store.
+
+    Args:
+        session (AsyncSession): The database session, whose transaction is routed.
+        store_id (str): The id of the store.
+
+    Returns:
+        Optional[str]: The schema of the store, None if it has no active schema in this shard, in
+        which case the search path is left as it was.
+    """
+    schema_name = await session.scalar(
+        select(Tenant.schema_name).where(
+            Tenant.store_id == store_id,
+            Tenant.shard == settings.TENANT_SHARD,
+            Tenant.status == TenantStatusEnum.ACTIVE.value,
+        )
+    )
+    if schema_name is not None:
+        await session.execute(text(f'SET LOCAL search_path TO "{schema_name}", public'))
+    return schema_name
@@ -0,0 +1,355 @@
+"""This module contains the cloning of the template schema into new tenant schemas.
+
+The template schema is migrated with the tenant schemas, so it is kept at head, along with the
+rows inserted by the data migrations. Cloning it recreates its objects in the new schema from the
+catalog, with their names, then copies its rows, in the transaction of the caller. Its
+alembic_version table is copied like the others, which stamps the new schema at the revision of
+the template, without replaying the migrations.
+
+The definitions are read with the search path set to ``pg_catalog`` only, so PostgreSQL qualifies
+every name of the template schema, and the qualifier is then replaced by the new schema. The
+statements are sent to the driver as one script, so the clone costs a round trip per kind of
+object read from the catalog rather than per object created.
+
+Enum types, functions, sequences, tables with their constraints and indexes, views, materialized
+views and triggers are cloned, without their comments and privileges. Other objects raise a
+``CloneError``, so a migration adding one makes the provisioning replay the migrations instead of
+creating incomplete schemas.
+"""
+
+import re
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+class CloneError(Exception):
+    """Raised when the template schema holds an object which cannot be cloned."""
+
+
+def _quote(identifier: str) -> str:
+    """Returns a quoted identifier."""
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+async def schema_revision(session: AsyncSession, schema: str) -> Optional[str]:
+    """Returns the revision a schema is at, see ``revision_key``.
+
+    Args:
+        session (AsyncSession): The database session.
+        schema (str): The name of the schema.
+
+    Returns:
+        Optional[str]: The revision, None if the schema was never migrated.
+    """
+    version_table = f"{_quote(schema)}.alembic_version"
+    if await session.scalar(text("SELECT to_regclass(:name)"), {"name": version_table}) is None:
+        return None
+    heads = await session.scalars(text(f"SELECT version_num FROM {version_table}"))
+    return ",".join(sorted(heads)) or None
+
+
+class _Cloner:
+    """Builds the statements cloning the objects of a source schema into a target schema."""
+
+    def __init__(self, session: AsyncSession, source: str, target: str) -> None:
+        self.session = session
+        self.source = source
+        self.target = _quote(target)
+        self.statements: List[str] = []
+        # Names of the source schema, as qualified by PostgreSQL in definitions.
+        self._qualifier = re.compile(rf'(?<![\w"])(?:{re.escape(_quote(source))}|{source})\.')
+
+    def retarget(self, definition: str) -> str:
+        """Returns a definition with the names of the source schema moved to the target."""
+        return self._qualifier.sub(lambda _: f"{self.target}.", definition)
+
+    async def rows(self, query: str) -> List:
+        """Returns the rows of a catalog query, bound to the source schema."""
+        return (await self.session.execute(text(query), {"schema": self.source})).all()
+
+    def add(self, statement: str) -> None:
+        """Add a statement to the script creating the target schema."""
+        self.statements.append(statement)
+
+    async def execute(self) -> None:
+        """Execute the script, in one round trip."""
+        # Sent to the driver as is and without parameters, so the colons and percent signs of
+        # casts, literals and function bodies are not read as placeholders.
+        connection = await self.session.connection()
+        await connection.exec_driver_sql(
+            ";\n".join(self.statements), execution_options={"no_parameters": True}
+        )
+
+    async def check_supported(self) -> None:
+        """Raise a CloneError if the source schema holds an object which cannot be cloned."""
+        unsupported = await self.rows(
+            """SELECT format('%s %s', kind, name) FROM (
+                SELECT 'type' AS kind, t.typname AS name FROM pg_type t
+                JOIN pg_namespace n ON n.oid = t.typnamespace
+                LEFT JOIN pg_class c ON c.oid = t.typrelid
+                WHERE n.nspname = :schema AND t.typelem = 0 AND (
+                    t.typtype IN ('d', 'r', 'm') OR (t.typtype = 'c' AND c.relkind = 'c')
+                )
+                UNION ALL
+                SELECT 'relation', c.relname FROM pg_class c
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = :schema AND (
+                    c.relkind IN ('p', 'f') OR c.relispartition
+                    OR EXISTS (SELECT FROM pg_inherits i WHERE i.inhrelid = c.oid)
+                )
+                UNION ALL
+                SELECT 'rule', r.rulename FROM pg_rewrite r
+                JOIN pg_class c ON c.oid = r.ev_class
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = :schema AND r.rulename <> '_RETURN'
+                UNION ALL
+                SELECT 'policy', p.polname FROM pg_policy p
+                JOIN pg_class c ON c.oid = p.polrelid
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = :schema
+                UNION ALL
+                SELECT 'routine', p.proname FROM pg_proc p
+                JOIN pg_namespace n ON n.oid = p.pronamespace
+                WHERE n.nspname = :schema AND p.prokind NOT IN ('f', 'p')
+            ) objects"""
+        )
+        if unsupported:
+            names = ", ".join(row[0] for row in unsupported)
+            raise CloneError(f"The {self.source} schema holds objects not cloned: {names}.")
+
+    async def clone_types(self) -> None:
+        """Create the enum types."""
+        for name, labels in await self.rows(
+            """SELECT t.typname, array_agg(e.enumlabel ORDER BY e.enumsortorder) FROM pg_type t
+            JOIN pg_namespace n ON n.oid = t.typnamespace
+            JOIN pg_enum e ON e.enumtypid = t.oid
+            WHERE n.nspname = :schema GROUP BY t.oid, t.typname ORDER BY t.oid"""
+        ):
+            values = ", ".join("'" + label.replace("'", "''") + "'" for label in labels)
+            self.add(f"CREATE TYPE {self.target}.{_quote(name)} AS ENUM ({values})")
+
+    async def clone_functions(self) -> None:
+        """Create the functions and procedures, whose bodies are not checked until tables exist."""
+        self.add("SET LOCAL check_function_bodies TO off")
+        for (definition,) in await self.rows(
+            """SELECT pg_get_functiondef(p.oid) FROM pg_proc p
+            JOIN pg_namespace n ON n.oid = p.pronamespace
+            WHERE n.nspname = :schema ORDER BY p.oid"""
+        ):
+            self.add(self.retarget(definition))
+
+    async def clone_sequences(self) -> None:
+        """Create the sequences, except those of identity columns, created with their tables."""
+        for name, data_type, start, increment, minimum, maximum, cache, cycle in await self.rows(
+            """SELECT c.relname, format_type(s.seqtypid, NULL), s.seqstart, s.seqincrement,
+                s.seqmin, s.seqmax, s.seqcache, s.seqcycle
+            FROM pg_sequence s
+            JOIN pg_class c ON c.oid = s.seqrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = :schema AND NOT EXISTS (
+                SELECT FROM pg_depend d WHERE d.objid = c.oid AND d.deptype = 'i'
+            )
+            ORDER BY c.oid"""
+        ):
+            self.add(
+                f"CREATE SEQUENCE {self.target}.{_quote(name)} AS {data_type} "
+                f"INCREMENT BY {increment} MINVALUE {minimum} MAXVALUE {maximum} "
+                f"START WITH {start} CACHE {cache} {'CYCLE' if cycle else 'NO CYCLE'}"
+            )
+
+    async def clone_tables(self) -> List[str]:
+        """Create the tables with their columns, and return their names."""
+        columns = await self.rows(
+            """SELECT c.relname, c.relpersistence, a.attname,
+                format_type(a.atttypid, a.atttypmod), a.attnotnull, a.attidentity,
+                a.attgenerated, pg_get_expr(ad.adbin, ad.adrelid),
+                CASE WHEN a.attcollation <> t.typcollation THEN co.collname END
+            FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+            JOIN pg_type t ON t.oid = a.atttypid
+            LEFT JOIN pg_attrdef ad ON ad.adrelid = c.oid AND ad.adnum = a.attnum
+            LEFT JOIN pg_collation co ON co.oid = a.attcollation
+            WHERE n.nspname = :schema AND c.relkind = 'r'
+            ORDER BY c.oid, a.attnum"""
+        )
+        tables = {}
+        for (
+            table,
+            persistence,
+            name,
+            data_type,
+            not_null,
+            identity,
+            generated,
+            default,
+            collation,
+        ) in columns:
+            column = f"{_quote(name)} {self.retarget(data_type)}"
+            if collation is not None:
+                column += f" COLLATE {_quote(collation)}"
+            if generated == "s":
+                column += f" GENERATED ALWAYS AS ({self.retarget(default)}) STORED"
+            elif default is not None:
+                column += f" DEFAULT {self.retarget(default)}"
+            if identity:
+                column += f" GENERATED {'ALWAYS' if identity == 'a' else 'BY DEFAULT'} AS IDENTITY"
+            if not_null:
+                column += " NOT NULL"
+            tables.setdefault((table, persistence), []).append(column)
+        for (table, persistence), definitions in tables.items():
+            unlogged = "UNLOGGED " if persistence == "u" else ""
+            self.add(
+                f"CREATE {unlogged}TABLE {self.target}.{_quote(table)} ({', '.join(definitions)})"
+            )
+        # Tables without columns have no row in the query above.
+        for (table,) in await self.rows(
+            """SELECT c.relname FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = :schema AND c.relkind = 'r' AND NOT EXISTS (
+                SELECT FROM pg_attribute a
+                WHERE a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+            )"""
+        ):
+            self.add(f"CREATE TABLE {self.target}.{_quote(table)} ()")
+            tables[(table, "p")] = []
+        return [table for table, _ in tables]
+
+    async def copy_rows(self, tables: List[str]) -> None:
+        """Copy the rows of the tables, except their generated columns."""
+        columns = {}
+        for table, name, data_type in await self.rows(
+            """SELECT c.relname, a.attname, format_type(a.atttypid, a.atttypmod) FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+            WHERE n.nspname = :schema AND c.relkind = 'r' AND a.attgenerated = ''
+            ORDER BY c.oid, a.attnum"""
+        ):
+            target_type = self.retarget(data_type)
+            # The values of the enum types of the source are cast to those of the target.
+            value = (
+                _quote(name)
+                if target_type == data_type
+                else f"{_quote(name)}::text::{target_type}"
+            )
+            columns.setdefault(table, []).append((_quote(name), value))
+        source = _quote(self.source)
+        for table in tables:
+            if table not in columns:
+                continue
+            names = ", ".join(name for name, _ in columns[table])
+            values = ", ".join(value for _, value in columns[table])
+            self.add(
+                f"INSERT INTO {self.target}.{_quote(table)} ({names}) OVERRIDING SYSTEM VALUE "
+                f"SELECT {values} FROM {source}.{_quote(table)}"
+            )
+
+    async def copy_sequence_values(self) -> None:
+        """Set the sequences, including those of identity columns, to their source values."""
+        source = _quote(self.source)
+        for name, owner, column, identity in await self.rows(
+            """SELECT c.relname, t.relname, a.attname, d.deptype = 'i' FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            LEFT JOIN pg_depend d ON d.objid = c.oid AND d.classid = 'pg_class'::regclass
+                AND d.refclassid = 'pg_class'::regclass AND d.deptype IN ('a', 'i')
+            LEFT JOIN pg_class t ON t.oid = d.refobjid
+            LEFT JOIN pg_attribute a ON a.attrelid = d.refobjid AND a.attnum = d.refobjsubid
+            WHERE n.nspname = :schema AND c.relkind = 'S'"""
+        ):
+            if identity:
+                target = (
+                    f"pg_get_serial_sequence('{self.target}.{_quote(owner)}', "
+                    f"'{column.replace(chr(39), chr(39) * 2)}')"
+                )
+            else:
+                target = f"'{self.target}.{_quote(name)}'"
+                if owner is not None:
+                    self.add(
+                        f"ALTER SEQUENCE {self.target}.{_quote(name)} "
+                        f"OWNED BY {self.target}.{_quote(owner)}.{_quote(column)}"
+                    )
+            self.add(
+                f"SELECT setval({target}, last_value, is_called) FROM {source}.{_quote(name)}"
+            )
+
+    async def clone_constraints(self) -> None:
+        """Add the constraints of the tables with their names, the foreign keys last."""
+        for table, name, definition in await self.rows(
+            """SELECT c.relname, co.conname, pg_get_constraintdef(co.oid) FROM pg_constraint co
+            JOIN pg_class c ON c.oid = co.conrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = :schema AND co.contype IN ('p', 'u', 'x', 'c', 'f')
+            ORDER BY co.contype = 'f', co.oid"""
+        ):
+            self.add(
+                f"ALTER TABLE {self.target}.{_quote(table)} "
+                f"ADD CONSTRAINT {_quote(name)} {self.retarget(definition)}"
+            )
+
+    async def clone_views(self) -> None:
+        """Create the views and materialized views, in creation order."""
+        for name, kind, definition in await self.rows(
+            """SELECT c.relname, c.relkind, pg_get_viewdef(c.oid) FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = :schema AND c.relkind IN ('v', 'm') ORDER BY c.oid"""
+        ):
+            view = "MATERIALIZED VIEW" if kind == "m" else "VIEW"
+            self.add(f"CREATE {view} {self.target}.{_quote(name)} AS {self.retarget(definition)}")
+
+    async def clone_indexes(self) -> None:
+        """Create the indexes which do not back a constraint, with their names."""
+        for (definition,) in await self.rows(
+            """SELECT pg_get_indexdef(i.indexrelid) FROM pg_index i
+            JOIN pg_class c ON c.oid = i.indexrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = :schema AND NOT EXISTS (
+                SELECT FROM pg_constraint co WHERE co.conindid = i.indexrelid
+            )
+            ORDER BY i.indexrelid"""
+        ):
+            self.add(self.retarget(definition))
+
+    async def clone_triggers(self) -> None:
+        """Create the triggers of the tables and views."""
+        for (definition,) in await self.rows(
+            """SELECT pg_get_triggerdef(tg.oid) FROM pg_trigger tg
+            JOIN pg_class c ON c.oid = tg.tgrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = :schema AND NOT tg.tgisinternal ORDER BY tg.oid"""
+        ):
+            self.add(self.retarget(definition))
+
+
+async def clone_schema(session: AsyncSession, source: str, target: str) -> None:
+    """Create a schema with the objects and rows of another, in the transaction of a session.
+
+    Args:
+        session (AsyncSession): The database session, committed by the caller.
+        source (str): The name of the schema to clone, usually the template schema.
+        target (str): The name of the new schema.
+
+    Raises:
+        CloneError: If the source schema holds an object which cannot be cloned.
+    """
+    search_path = await session.scalar(text("SELECT current_setting('search_path')"))
+    await session.execute(text("SET LOCAL search_path TO pg_catalog"))
+    cloner = _Cloner(session, source, target)
+    await cloner.check_supported()
+    cloner.add(f"CREATE SCHEMA {_quote(target)}")
+    await cloner.clone_types()
+    await cloner.clone_functions()
+    await cloner.clone_sequences()
+    tables = await cloner.clone_tables()
+    await cloner.copy_rows(tables)
+    await cloner.copy_sequence_values()
+    await cloner.clone_constraints()
+    await cloner.clone_views()
+    await cloner.clone_indexes()
+    await cloner.clone_triggers()
+    await cloner.execute()
+    await session.execute(
+        text("SELECT set_config('search_path', :search_path, true)"),
+        {"search_path": search_path},
+    )
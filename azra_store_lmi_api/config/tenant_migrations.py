@@ -0,0 +1,310 @@
+"""Module for migrating the store schemas in parallel.
+
+``alembic upgrade head`` migrates the schemas one after the other over a single connection. This
+runner spreads them over a pool of worker processes instead, each holding one connection, so at
+most ``concurrency`` schemas are migrated at a time. Alembic keeps its migration context in module
+globals, which is why the workers are processes rather than threads or coroutines.
+
+The public schema is migrated first, then the template schema cloned into new tenant schemas, see
+``config/tenancy/template.py``, and the schemas of the active tenants of this shard, read from the
+tenant registry. Each worker configures alembic with its connection, see ``env.py``,
+sets the search path to the schema, upgrades it to head and records the new revision in the
+registry, in one transaction. A schema which fails is submitted again up to ``retries`` times,
+after a linear backoff. Every schema is reported as it completes, with its duration, then a
+summary lists the slowest schemas and the failures.
+
+In resume mode, only the tenants whose registered revision is not head are migrated, selected by
+one indexed query on the registry, so a deploy interrupted half way only migrates the schemas it
+did not reach.
+
+Classes:
+    SchemaResult: The outcome of the migrations of a schema.
+
+Functions:
+    head_revision: Returns the revision of the heads of the migrations.
+    migrate_schema: Upgrades a schema to head, in a worker process.
+    migrate_schemas: Upgrades the schemas to head, in parallel.
+    run: Upgrades the public schema, then the template and tenant schemas to head.
+    summarize: Logs the summary of a run.
+"""
+
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import Connection, Engine, create_engine, func, select, text
+from sqlalchemy.pool import NullPool
+
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.config.settings import settings
+from azra_store_lmi_api.config.tenancy import (
+    active_tenants,
+    revision_key,
+    set_tenant_revision,
+    tenants_behind,
+)
+
+UPGRADED = "upgraded"
+CURRENT = "current"
+FAILED = "failed"
+
+PUBLIC_SCHEMA = "public"
+
+# The directory of alembic.ini, which the migrations are resolved from.
+_PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# The engine and alembic configuration of a worker process, set by ``_init_worker``.
+_worker_engine: Optional[Engine] = None
+_worker_config: Optional[Config] = None
+
+
+class SchemaResult(NamedTuple):
+    """The outcome of the migrations of a schema.
+
+    Attributes:
+        schema (str): The name of the schema.
+        status (str): UPGRADED, CURRENT if it was already at head, or FAILED.
+        seconds (float): The duration of the last attempt.
+        attempts (int): The number of attempts.
+        error (Optional[str]): The error of the last attempt, if it failed.
+    """
+
+    schema: str
+    status: str
+    seconds: float
+    attempts: int = 1
+    error: Optional[str] = None
+
+
+def _identifier(schema: str) -> str:
+    """Returns the quoted identifier of a schema."""
+    return '"' + schema.replace('"', '""') + '"'
+
+
+def alembic_config() -> Config:
+    """Returns the alembic configuration of the project, independent of the working directory."""
+    config = Config(str(_PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(_PROJECT_ROOT / "azra_store_lmi_api/migrations"))
+    return config
+
+
+def head_revision() -> Optional[str]:
+    """Returns the revision of the heads of the migrations, see ``revision_key``."""
+    return revision_key(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+
+def _schema_revision(connection: Connection, schema: str) -> Optional[str]:
+    """Returns the revision a schema is at, read from its alembic_version table."""
+    context = MigrationContext.configure(connection, opts={"version_table_schema": schema})
+    return revision_key(context.get_current_heads())
+
+
+def _init_worker() -> None:
+    """Create the engine and alembic configuration of a worker process."""
+    global _worker_engine, _worker_config
+    _worker_engine = create_engine(
+        settings.DATABASE_URL, pool_size=1, max_overflow=0, pool_pre_ping=True
+    )
+    _worker_config = alembic_config()
+    # The runner reports the progress, env.py must not reconfigure the logging of the workers.
+    _worker_config.attributes["configure_logger"] = False
+
+
+def migrate_schema(schema: str, delay: float = 0) -> SchemaResult:
+    """Upgrade a schema to head, in a worker process.
+
+    Args:
+        schema (str): The name of the schema.
+        delay (float): The seconds to wait before starting, when the schema is retried.
+
+    Returns:
+        SchemaResult: The outcome of the migrations, FAILED with the error if they raised.
+    """
+    time.sleep(delay)
+    started = time.perf_counter()
+    try:
+        with _worker_engine.connect() as connection:
+            connection.execute(text(f"SET search_path TO {_identifier(schema)}"))
+            connection.dialect.default_schema_name = schema
+            before = _schema_revision(connection, schema)
+            connection.commit()
+            # Alembic joins the transaction begun here, which also records the revision.
+            with connection.begin():
+                _worker_config.attributes["connection"] = connection
+                try:
+                    command.upgrade(_worker_config, "head")
+                finally:
+                    del _worker_config.attributes["connection"]
+                after = _schema_revision(connection, schema)
+                connection.execute(set_tenant_revision(schema, after))
+    except Exception as exception:
+        return SchemaResult(
+            schema,
+            FAILED,
+            time.perf_counter() - started,
+            error=f"{type(exception).__name__}: {exception}",
+        )
+    status = CURRENT if before == after else UPGRADED
+    return SchemaResult(schema, status, time.perf_counter() - started)
+
+
+def migrate_schemas(
+    schemas: List[str], concurrency: int, retries: int, retry_delay: float
+) -> List[SchemaResult]:
+    """Upgrade the schemas to head, in parallel.
+
+    Args:
+        schemas (List[str]): The names of the schemas.
+        concurrency (int): The number of worker processes, each with one database connection.
+        retries (int): The number of times a failed schema is retried.
+        retry_delay (float): The seconds before the first retry, multiplied by the attempt.
+
+    Returns:
+        List[SchemaResult]: The outcome of every schema, in the order they completed.
+    """
+    results: List[SchemaResult] = []
+    if not schemas:
+        return results
+    with ProcessPoolExecutor(
+        max_workers=min(concurrency, len(schemas)),
+        # Workers are spawned, forked workers would share the connections of the parent.
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+    ) as executor:
+        pending: Dict[Future, Tuple[str, int]] = {
+            executor.submit(migrate_schema, schema): (schema, 1) for schema in schemas
+        }
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                schema, attempt = pending.pop(future)
+                result = future.result()._replace(attempts=attempt)
+                if result.status == FAILED and attempt <= retries:
+                    logger.warning(
+                        "%s failed in %.2fs (attempt %d of %d): %s",
+                        schema,
+                        result.seconds,
+                        attempt,
+                        retries + 1,
+                        result.error.splitlines()[0],
+                    )
+                    retry = executor.submit(migrate_schema, schema, retry_delay * attempt)
+                    pending[retry] = (schema, attempt + 1)
+                    continue
+                results.append(result)
+                logger.info(
+                    "[%d/%d] %s %s in %.2fs",
+                    len(results),
+                    len(schemas),
+                    schema,
+                    result.status,
+                    result.seconds,
+                )
+    return results
+
+
+def run(
+    concurrency: int,
+    retries: int,
+    retry_delay: float,
+    resume: bool = False,
+    schemas: Optional[List[str]] = None,
+) -> Tuple[List[SchemaResult], int]:
+    """Upgrade the public schema, then the template and tenant schemas to head, in parallel.
+
+    Args:
+        concurrency (int): The number of schemas migrated at a time.
+        retries (int): The number of times a failed schema is retried.
+        retry_delay (float): The seconds before the first retry, multiplied by the attempt.
+        resume (bool): Whether to skip the schemas already at head.
+        schemas (Optional[List[str]]): The schemas to migrate, registered or not, instead of the
+            public, template and tenant schemas. They are all migrated, even in resume mode.
+
+    Returns:
+        Tuple[List[SchemaResult], int]: The outcome of the migrated schemas, and the number of
+        schemas skipped by the resume mode.
+    """
+    if schemas is not None:
+        logger.info("Migrating %d schemas, %d at a time.", len(schemas), concurrency)
+        return migrate_schemas(schemas, concurrency, retries, retry_delay), 0
+    head = head_revision()
+    engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        with engine.connect() as connection:
+            public_at_head = _schema_revision(connection, PUBLIC_SCHEMA) == head
+    finally:
+        engine.dispose()
+    results, skipped = [], 0
+    if resume and public_at_head:
+        skipped += 1
+    else:
+        results = migrate_schemas([PUBLIC_SCHEMA], 1, retries, retry_delay)
+        if results[0].status == FAILED:
+            logger.error("The public schema failed, the tenant schemas are not migrated.")
+            return results, skipped
+    # The registry is read once the public schema, which holds it, is at head.
+    template = settings.TENANT_TEMPLATE_SCHEMA
+    engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+    try:
+        with engine.connect() as connection:
+            connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {_identifier(template)}"))
+            connection.commit()
+            template_at_head = _schema_revision(connection, template) == head
+            tenants = active_tenants()
+            if resume:
+                total = connection.scalar(select(func.count()).select_from(tenants.subquery()))
+                tenants = tenants_behind(head)
+            schemas = list(connection.scalars(tenants))
+            if resume:
+                skipped += total - len(schemas)
+    finally:
+        engine.dispose()
+    # The template is migrated first, new stores are provisioned by replaying the migrations
+    # until it is at head.
+    if resume and template_at_head:
+        skipped += 1
+    else:
+        schemas.insert(0, template)
+    if skipped:
+        logger.info("Skipping %d schemas already at head.", skipped)
+    logger.info(
+        "Migrating %d template and tenant schemas, %d at a time.", len(schemas), concurrency
+    )
+    return results + migrate_schemas(schemas, concurrency, retries, retry_delay), skipped
+
+
+def summarize(results: List[SchemaResult], skipped: int, seconds: float) -> None:
+    """Log the summary of a run.
+
+    Args:
+        results (List[SchemaResult]): The outcome of the migrated schemas.
+        skipped (int): The number of schemas skipped by the resume mode.
+        seconds (float): The duration of the run.
+    """
+    counts = {status: 0 for status in (UPGRADED, CURRENT, FAILED)}
+    for result in results:
+        counts[result.status] += 1
+    logger.info(
+        "%d upgraded, %d already at head, %d skipped, %d failed in %.2fs "
+        "(%.2fs of migrations, %d retries).",
+        counts[UPGRADED],
+        counts[CURRENT],
+        skipped,
+        counts[FAILED],
+        seconds,
+        sum(result.seconds for result in results),
+        sum(result.attempts - 1 for result in results),
+    )
+    for result in sorted(results, key=lambda result: result.seconds, reverse=True)[:5]:
+        logger.info("Slowest: %s in %.2fs.", result.schema, result.seconds)
+    for result in results:
+        if result.status == FAILED:
+            logger.error(
+                "Failed: %s after %d attempts: %s", result.schema, result.attempts, result.error
+            )
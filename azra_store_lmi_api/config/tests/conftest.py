@@ -0,0 +1,19 @@
+from typing import List
+
+import pytest
+
+from azra_store_lmi_api.config.mailer.pool import SMTPConnectionPool
+from azra_store_lmi_api.config.tests.fakes import FakeSMTP
+
+
+@pytest.fixture
+def smtp_connections(monkeypatch) -> List[FakeSMTP]:
+    """Open fake SMTP connections instead of connecting to a server, and return them."""
+    opened: List[FakeSMTP] = []
+
+    async def _connect(self):
+        opened.append(FakeSMTP())
+        return opened[-1]
+
+    monkeypatch.setattr(SMTPConnectionPool, "_connect", _connect)
+    return opened
@@ -0,0 +1,51 @@
+"""Module contains fake connections to be used in testcases."""
+
+from email.message import Message
+from typing import List, Set
+
+import aiosmtplib
+
+
+class FakeSMTP:
+    """An SMTP connection recording the messages it sends instead of connecting to a server.
+
+    Attributes:
+        is_connected (bool): Whether the connection is open.
+        sent (List[Message]): The messages sent, in order.
+        noops (int): The number of NOOP commands sent.
+        resets (int): The number of RSET commands sent.
+        fail_noop (bool): Whether NOOP fails as if the server dropped the connection.
+        disconnect_on_send (bool): Whether sending drops the connection.
+        refused (Set[str]): The subjects of the messages the server refuses.
+    """
+
+    def __init__(self):
+        self.is_connected = True
+        self.sent: List[Message] = []
+        self.noops = 0
+        self.resets = 0
+        self.fail_noop = False
+        self.disconnect_on_send = False
+        self.refused: Set[str] = set()
+
+    async def send_message(self, email: Message) -> None:
+        if self.disconnect_on_send:
+            self.is_connected = False
+            raise aiosmtplib.SMTPServerDisconnected("Connection lost")
+        if email["Subject"] in self.refused:
+            raise aiosmtplib.SMTPResponseException(550, "Mailbox unavailable")
+        self.sent.append(email)
+
+    async def noop(self) -> None:
+        self.noops += 1
+        if self.fail_noop:
+            raise aiosmtplib.SMTPServerDisconnected("Connection lost")
+
+    async def rset(self) -> None:
+        self.resets += 1
+
+    async def quit(self) -> None:
+        self.is_connected = False
+
+    def close(self) -> None:
+        self.is_connected = False
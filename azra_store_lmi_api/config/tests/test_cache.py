@@ -0,0 +1,186 @@
+"""This module contains unit tests for the read-through cache.
+
+It includes tests for loading and reading entries, invalidating a namespace by its version key,
+sharing one load between concurrent requests and processes, refreshing entries early, and falling
+back to the loader when Redis is unavailable.
+"""
+
+import asyncio
+import time
+
+import msgpack
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from azra_store_lmi_api.config import cache
+from azra_store_lmi_api.config.cache import ReadThroughCache
+from azra_store_lmi_api.config.settings import settings
+
+
+class CountingLoader:
+    """A loader returning a new value on every call, after an optional delay."""
+
+    def __init__(self, delay: float = 0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self) -> dict:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"value": self.calls}
+
+
+@pytest.fixture(autouse=True)
+def cache_enabled(monkeypatch):
+    """Enable the cache, which the view tests turn off."""
+    monkeypatch.setattr(settings, "CACHE_ENABLED", True)
+
+
+@pytest.mark.asyncio
+async def test_entry_loaded_once(fake_redis: FakeAsyncRedis):
+    """Test that an entry is loaded on a miss, stored under the current version, and then read
+    from Redis, while a missing value is not stored."""
+    saas_admin_cache = ReadThroughCache("tests", early_refresh=0)
+    loader = CountingLoader()
+
+    assert await saas_admin_cache.get_or_load("detail:1", loader) == {"value": 1}
+    assert await saas_admin_cache.get_or_load("detail:1", loader) == {"value": 1}
+    assert loader.calls == 1
+    value, _, _ = msgpack.unpackb(await fake_redis.get("cache:tests:0:detail:1"))
+    assert value == {"value": 1}
+    assert 0 < await fake_redis.ttl("cache:tests:0:detail:1") <= saas_admin_cache.ttl
+
+    async def load_missing():
+        return None
+
+    assert await saas_admin_cache.get_or_load("detail:2", load_missing) is None
+    assert await fake_redis.get("cache:tests:0:detail:2") is None
+
+
+@pytest.mark.asyncio
+async def test_invalidate_bumps_version(fake_redis: FakeAsyncRedis):
+    """Test that invalidating a namespace increments its version, so its entries are loaded
+    again, and leaves the entries of other namespaces."""
+    saas_admin_cache = ReadThroughCache("tests", early_refresh=0)
+    other_cache = ReadThroughCache("others", early_refresh=0)
+    loader, other_loader = CountingLoader(), CountingLoader()
+    await saas_admin_cache.get_or_load("list", loader)
+    await other_cache.get_or_load("list", other_loader)
+
+    await saas_admin_cache.invalidate()
+    assert await fake_redis.get("cache:tests:version") == b"1"
+    assert await saas_admin_cache.get_or_load("list", loader) == {"value": 2}
+    assert await fake_redis.exists("cache:tests:1:list")
+    assert await other_cache.get_or_load("list", other_loader) == {"value": 1}
+    assert (loader.calls, other_loader.calls) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_load_started_before_invalidate_is_not_read(fake_redis: FakeAsyncRedis):
+    """Test that a value loaded while the namespace is invalidated is stored under the previous
+    version, so it is never read after the invalidation."""
+    saas_admin_cache = ReadThroughCache("tests", early_refresh=0)
+    loaded = asyncio.Event()
+
+    async def load_stale():
+        loaded.set()
+        await asyncio.sleep(0.05)
+        return {"value": "stale"}
+
+    stale = asyncio.ensure_future(saas_admin_cache.get_or_load("list", load_stale))
+    await loaded.wait()
+    await saas_admin_cache.invalidate()
+    assert await stale == {"value": "stale"}
+
+    assert await saas_admin_cache.get_or_load("list", CountingLoader()) == {"value": 1}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_load_once(fake_redis: FakeAsyncRedis):
+    """Test that concurrent misses of a key in a process share a single load."""
+    saas_admin_cache = ReadThroughCache("tests", early_refresh=0)
+    loader = CountingLoader(delay=0.05)
+
+    values = await asyncio.gather(
+        *(saas_admin_cache.get_or_load("list", loader) for _ in range(10))
+    )
+    assert values == [{"value": 1}] * 10
+    assert loader.calls == 1
+    assert not await fake_redis.exists("cache:tests:0:list:lock")
+
+
+@pytest.mark.asyncio
+async def test_miss_waits_for_other_process(fake_redis: FakeAsyncRedis):
+    """Test that a miss waits for the entry of a load holding the lock in another process,
+    and loads the value itself if the lock times out."""
+    saas_admin_cache = ReadThroughCache("tests", early_refresh=0, lock_timeout=0.5)
+    loader = CountingLoader()
+    await fake_redis.set("cache:tests:0:list:lock", 1)
+
+    async def store_entry():
+        await asyncio.sleep(0.05)
+        entry = msgpack.packb([{"value": "other"}, 0.01, time.time() + 60])
+        await fake_redis.set("cache:tests:0:list", entry)
+
+    value, _ = await asyncio.gather(saas_admin_cache.get_or_load("list", loader), store_entry())
+    assert value == {"value": "other"}
+    assert loader.calls == 0
+
+    await fake_redis.set("cache:tests:0:detail:1:lock", 1)
+    assert await saas_admin_cache.get_or_load("detail:1", loader) == {"value": 1}
+    assert loader.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_early_refresh(fake_redis: FakeAsyncRedis, monkeypatch):
+    """Test that an entry close to its expiry is refreshed early when the random draw falls
+    below its probability, and is read otherwise."""
+    saas_admin_cache = ReadThroughCache("tests", ttl=60, early_refresh=1.0)
+    loader = CountingLoader()
+    # Expires in one second, after a load which took ten.
+    entry = msgpack.packb([{"value": "cached"}, 10.0, time.time() + 1])
+    await fake_redis.set("cache:tests:0:list", entry)
+
+    monkeypatch.setattr(cache.random, "random", lambda: 1.0)
+    assert await saas_admin_cache.get_or_load("list", loader) == {"value": "cached"}
+    assert loader.calls == 0
+
+    monkeypatch.setattr(cache.random, "random", lambda: 0.5)
+    assert await saas_admin_cache.get_or_load("list", loader) == {"value": 1}
+    assert loader.calls == 1
+    value, _, expires_at = msgpack.unpackb(await fake_redis.get("cache:tests:0:list"))
+    assert value == {"value": 1}
+    assert expires_at > time.time() + 50
+
+    await fake_redis.set("cache:tests:0:list", entry)
+    no_refresh_cache = ReadThroughCache("tests", ttl=60, early_refresh=0)
+    assert await no_refresh_cache.get_or_load("list", loader) == {"value": "cached"}
+
+
+@pytest.mark.asyncio
+async def test_early_refresh_skipped_while_locked(fake_redis: FakeAsyncRedis, monkeypatch):
+    """Test that an entry due for early refresh is read while another request refreshes it."""
+    saas_admin_cache = ReadThroughCache("tests", ttl=60, early_refresh=1.0)
+    loader = CountingLoader()
+    entry = msgpack.packb([{"value": "cached"}, 10.0, time.time() + 1])
+    await fake_redis.set("cache:tests:0:list", entry)
+    await fake_redis.set("cache:tests:0:list:lock", 1)
+    monkeypatch.setattr(cache.random, "random", lambda: 0.5)
+
+    assert await saas_admin_cache.get_or_load("list", loader) == {"value": "cached"}
+    assert loader.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_redis_unavailable(monkeypatch):
+    """Test that values are loaded on every call when Redis is unavailable or the cache is
+    disabled."""
+    saas_admin_cache = ReadThroughCache("tests")
+    loader = CountingLoader()
+
+    assert await saas_admin_cache.get_or_load("list", loader) == {"value": 1}
+    assert await saas_admin_cache.get_or_load("list", loader) == {"value": 2}
+    await saas_admin_cache.invalidate()
+
+    monkeypatch.setattr(settings, "CACHE_ENABLED", False)
+    assert await saas_admin_cache.get_or_load("list", loader) == {"value": 3}
@@ -0,0 +1,137 @@
+"""This module contains unit tests for running Celery tasks at most once per idempotency key.
+
+It includes tests for deriving the key of a task call, claiming, completing and releasing keys,
+claiming a key again when the message which claimed it is delivered again after its worker died,
+and running idempotent tasks without Redis.
+"""
+
+import asyncio
+from typing import List
+
+import pytest
+from fakeredis import FakeAsyncRedis, FakeServer
+
+from azra_store_lmi_api.config.celery import idempotency
+from azra_store_lmi_api.config.celery.decorator import async_task
+from azra_store_lmi_api.config.celery.idempotency import (
+    claim,
+    complete,
+    get_idempotency_key,
+    release,
+)
+from azra_store_lmi_api.config.settings import settings
+
+KEY = "celery:idempotency:tests.task:key"
+
+runs: List[str] = []
+
+
+@async_task(idempotent=True, name="tests.idempotent_task")
+async def idempotent_task(value: str) -> str:
+    """Record a run of the task, failing for the "fail" value."""
+    runs.append(value)
+    if value == "fail":
+        raise ValueError("Task failed")
+    return value
+
+
+@pytest.fixture
+def redis_server(monkeypatch) -> FakeServer:
+    """Serve the idempotency keys of tasks run in their own event loop from an in-memory server,
+    and forget the runs of the previous test."""
+    server = FakeServer()
+    monkeypatch.setattr(idempotency, "get_redis", lambda: FakeAsyncRedis(server=server))
+    runs.clear()
+    return server
+
+
+def test_get_idempotency_key():
+    """Test that the key of a call is derived from its arguments, unless one is passed."""
+    key = get_idempotency_key("tests.task", (1, "a"), {"b": 2})
+
+    assert key == get_idempotency_key("tests.task", (1, "a"), {"b": 2})
+    assert key != get_idempotency_key("tests.task", (1, "a"), {"b": 3})
+    assert key != get_idempotency_key("tests.other", (1, "a"), {"b": 2})
+    assert get_idempotency_key("tests.task", (), {}, "request-1") == (
+        "celery:idempotency:tests.task:request-1"
+    )
+
+
+@pytest.mark.asyncio
+async def test_claim_complete_release(fake_redis: FakeAsyncRedis, monkeypatch):
+    """Test that a key is claimed by one message at a time for at least the visibility timeout,
+    released only by the message which claimed it, and kept once done."""
+    monkeypatch.setattr(settings, "CELERY_IDEMPOTENCY_LOCK_TTL", 60)
+
+    assert await claim(KEY, "task-1")
+    assert await fake_redis.get(KEY) == b"running:task-1"
+    assert settings.CELERY_VISIBILITY_TIMEOUT - 1 <= await fake_redis.ttl(KEY)
+    assert not await claim(KEY, "task-2")
+
+    await release(KEY, "task-2")
+    assert await fake_redis.get(KEY) == b"running:task-1"
+    await release(KEY, "task-1")
+    assert await fake_redis.get(KEY) is None
+    assert await claim(KEY, "task-2")
+
+    await complete(KEY)
+    assert await fake_redis.get(KEY) == b"done"
+    assert await fake_redis.ttl(KEY) == settings.CELERY_IDEMPOTENCY_TTL
+    assert not await claim(KEY, "task-2")
+    await release(KEY, "task-2")
+    assert await fake_redis.get(KEY) == b"done"
+
+
+@pytest.mark.asyncio
+async def test_claim_again_on_redelivery(fake_redis: FakeAsyncRedis):
+    """Test that a message delivered again after its worker died claims its key again, with a
+    new expiry."""
+    assert await claim(KEY, "task-1")
+    await fake_redis.expire(KEY, 10)
+
+    assert await claim(KEY, "task-1")
+    assert await fake_redis.ttl(KEY) > 10
+    assert not await claim(KEY, "task-2")
+
+
+@pytest.mark.asyncio
+async def test_claim_without_redis(fake_redis: FakeAsyncRedis):
+    """Test that tasks run without deduplication when Redis is unavailable."""
+    fake_redis.connection_pool.connection_kwargs["server"].connected = False
+
+    assert await claim(KEY, "task-1")
+    assert await claim(KEY, "task-2")
+    await complete(KEY)
+    await release(KEY, "task-1")
+
+
+def test_task_runs_once(redis_server: FakeServer):
+    """Test that an idempotent task runs once for the same arguments, whatever the message."""
+    assert idempotent_task.apply(args=["a"], task_id="task-1").result == "a"
+    assert idempotent_task.apply(args=["a"], task_id="task-2").result is None
+    assert idempotent_task.apply(args=["a"], task_id="task-1").result is None
+    idempotent_task.apply(args=["b"], task_id="task-3")
+
+    assert runs == ["a", "b"]
+
+
+def test_failed_task_released(redis_server: FakeServer):
+    """Test that a failed task releases its key, so it runs again when retried."""
+    assert idempotent_task.apply(args=["fail"], task_id="task-1").failed()
+    assert idempotent_task.apply(args=["fail"], task_id="task-2").failed()
+
+    assert runs == ["fail", "fail"]
+
+
+def test_task_runs_again_after_worker_died(redis_server: FakeServer):
+    """Test that a message delivered again after its worker died runs the task, while another
+    message for the same call is skipped."""
+    key = get_idempotency_key(idempotent_task.name, ("a",), {})
+    # The worker running the first delivery died after claiming the key.
+    assert asyncio.run(claim(key, "task-1"))
+
+    assert idempotent_task.apply(args=["a"], task_id="task-2").result is None
+    assert idempotent_task.apply(args=["a"], task_id="task-1").result == "a"
+    assert idempotent_task.apply(args=["a"], task_id="task-1").result is None
+
+    assert runs == ["a"]
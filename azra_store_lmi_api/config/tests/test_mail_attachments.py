@@ -0,0 +1,123 @@
+"""This module contains unit tests for encoding email attachments.
+
+It includes tests for encoding a file in chunks, reading the encoded content of a file from the
+cache until the file changes, evicting the least recently used files, skipping the files too large
+to cache, accounting for the size of files encoded concurrently, and building attachment parts.
+"""
+
+import asyncio
+import base64
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from azra_store_lmi_api.config.mailer.attachments import ENCODE_CHUNK_SIZE, AttachmentCache
+
+
+@pytest.fixture
+def encoded_files(monkeypatch) -> List[str]:
+    """Record the path of every file encoded by an attachment cache."""
+    encoded_files = []
+    encode = AttachmentCache._encode
+
+    async def _encode(self, file_path: str) -> str:
+        encoded_files.append(file_path)
+        return await encode(self, file_path)
+
+    monkeypatch.setattr(AttachmentCache, "_encode", _encode)
+    return encoded_files
+
+
+def _write(path: Path, size: int) -> str:
+    """Write a file of a size, and return its path."""
+    path.write_bytes(bytes(index % 251 for index in range(size)))
+    return str(path)
+
+
+@pytest.mark.asyncio
+async def test_encoded_once(tmp_path: Path, encoded_files: List[str]):
+    """Test that a file is encoded in chunks once, and read from the cache until it changes."""
+    cache = AttachmentCache(max_size=10**6, max_entry_size=10**6)
+    file_path = _write(tmp_path / "bill.pdf", ENCODE_CHUNK_SIZE * 2 + 10)
+    expected = base64.encodebytes(Path(file_path).read_bytes()).decode("ascii")
+
+    assert await cache.get_encoded(file_path) == expected
+    assert await cache.get_encoded(file_path) == expected
+    assert encoded_files == [file_path]
+    assert cache.size == len(expected)
+
+    _write(tmp_path / "bill.pdf", 10)
+    assert await cache.get_encoded(file_path) == base64.encodebytes(
+        Path(file_path).read_bytes()
+    ).decode("ascii")
+    assert encoded_files == [file_path, file_path]
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_evicted(tmp_path: Path, encoded_files: List[str]):
+    """Test that the least recently used files are evicted once the cache is full, and that the
+    size of the cache is the size of the files it keeps."""
+    a, b, c = (_write(tmp_path / name, 300) for name in ("a", "b", "c"))
+    entry_size = len(base64.encodebytes(bytes(300)))
+    cache = AttachmentCache(max_size=entry_size * 2, max_entry_size=entry_size)
+
+    await cache.get_encoded(a)
+    await cache.get_encoded(b)
+    await cache.get_encoded(a)
+    await cache.get_encoded(c)
+    assert cache.size == entry_size * 2
+
+    await cache.get_encoded(a)
+    await cache.get_encoded(c)
+    await cache.get_encoded(b)
+    assert encoded_files == [a, b, c, b]
+    assert cache.size == entry_size * 2
+
+    cache.clear()
+    assert cache.size == 0
+
+
+@pytest.mark.asyncio
+async def test_large_file_not_cached(tmp_path: Path, encoded_files: List[str]):
+    """Test that a file larger than the maximum size of an entry is encoded on every read."""
+    file_path = _write(tmp_path / "large", 1000)
+    cache = AttachmentCache(max_size=10**6, max_entry_size=1000)
+
+    await cache.get_encoded(file_path)
+    await cache.get_encoded(file_path)
+
+    assert encoded_files == [file_path, file_path]
+    assert cache.size == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_counted_once(tmp_path: Path, encoded_files: List[str]):
+    """Test that a file encoded by concurrent reads is counted once in the size of the cache."""
+    file_path = _write(tmp_path / "bill.pdf", 1000)
+    cache = AttachmentCache(max_size=10**6, max_entry_size=10**6)
+
+    first, second = await asyncio.gather(
+        cache.get_encoded(file_path), cache.get_encoded(file_path)
+    )
+
+    assert first == second
+    assert encoded_files == [file_path, file_path]
+    assert cache.size == len(first)
+
+
+@pytest.mark.asyncio
+async def test_get_part(tmp_path: Path):
+    """Test that an attachment part has the content type of its filename and the encoded file."""
+    file_path = _write(tmp_path / "bill", 100)
+    cache = AttachmentCache(max_size=10**6, max_entry_size=10**6)
+
+    part = await cache.get_part(file_path, "bill.pdf")
+    assert part.get_content_type() == "application/pdf"
+    assert part.get_filename() == "bill.pdf"
+    assert part["Content-Transfer-Encoding"] == "base64"
+    assert part.get_payload(decode=True) == Path(file_path).read_bytes()
+
+    part = await cache.get_part(file_path)
+    assert part.get_content_type() == "application/octet-stream"
+    assert part.get_filename() == file_path
@@ -0,0 +1,162 @@
+"""This module contains unit tests for sending emails in batches.
+
+It includes tests for sending a batch over one SMTP session, resetting the session after a refused
+message, retrying a message on a new connection when the server drops it, starting a session per
+chunk, and collecting the errors of the failed messages, with the SMTP, log and default mailers.
+"""
+
+from typing import List
+
+import pytest
+
+from azra_store_lmi_api.config.mailer import EmailMessage
+from azra_store_lmi_api.config.mailer.exceptions import MailError
+from azra_store_lmi_api.config.mailer.log_mail import LogMail
+from azra_store_lmi_api.config.mailer.pool import SMTPConnectionPool
+from azra_store_lmi_api.config.mailer.smtp import SMTPMail
+from azra_store_lmi_api.config.settings import settings
+from azra_store_lmi_api.config.tests.fakes import FakeSMTP
+
+
+def _messages(count: int, subject: str = "Message") -> List[dict]:
+    """Returns the dictionaries of email messages with numbered subjects."""
+    messages = []
+    for index in range(count):
+        message = EmailMessage(to=[f"user{index}@example.com"], subject=f"{subject} {index}")
+        message.set_content("plain", f"Hello {index}")
+        messages.append(message.as_dict())
+    return messages
+
+
+def _subjects(connection: FakeSMTP) -> List[str]:
+    """Returns the subjects of the messages sent over a connection."""
+    return [email["Subject"] for email in connection.sent]
+
+
+@pytest.mark.asyncio
+async def test_smtp_batch_one_session(smtp_connections: List[FakeSMTP]):
+    """Test that a batch is sent over one connection, which is kept for the next sends."""
+    mailer = SMTPMail(hostname="smtp.example.com")
+
+    result = await mailer.send_many(_messages(3))
+
+    assert (result.total, result.sent, result.errors, result.deferred) == (3, [0, 1, 2], {}, [])
+    assert len(smtp_connections) == 1
+    assert _subjects(smtp_connections[0]) == ["Message 0", "Message 1", "Message 2"]
+    assert smtp_connections[0].is_connected
+    await mailer.send_many(_messages(1))
+    assert len(smtp_connections) == 1
+
+
+@pytest.mark.asyncio
+async def test_smtp_batch_refused_message(smtp_connections: List[FakeSMTP]):
+    """Test that a message refused by the server is recorded as failed and the session reset,
+    and that the remaining messages are sent over the same connection."""
+    mailer = SMTPMail(hostname="smtp.example.com")
+    await mailer.send_many(_messages(1))
+    smtp_connections[0].refused.add("Message 1")
+
+    result = await mailer.send_many(_messages(3))
+
+    assert result.sent == [0, 2]
+    assert list(result.errors) == [1]
+    assert result.errors[1].startswith("SMTP Error:")
+    assert smtp_connections[0].resets == 1
+    assert len(smtp_connections) == 1
+
+
+@pytest.mark.asyncio
+async def test_smtp_batch_retried_on_disconnect(smtp_connections: List[FakeSMTP]):
+    """Test that a message dropped by the server is retried once on a new connection, along with
+    the rest of the batch."""
+    mailer = SMTPMail(hostname="smtp.example.com")
+    await mailer.send_many(_messages(1))
+    smtp_connections[0].disconnect_on_send = True
+
+    result = await mailer.send_many(_messages(3))
+
+    assert (result.sent, result.errors) == ([0, 1, 2], {})
+    assert len(smtp_connections) == 2
+    assert not smtp_connections[0].is_connected
+    assert _subjects(smtp_connections[1]) == ["Message 0", "Message 1", "Message 2"]
+
+
+@pytest.mark.asyncio
+async def test_smtp_batch_fails_after_retry(smtp_connections: List[FakeSMTP], monkeypatch):
+    """Test that a message dropped twice is recorded as failed, and the next ones still sent."""
+
+    async def _connect(self):
+        smtp_connections.append(FakeSMTP())
+        smtp_connections[-1].disconnect_on_send = len(smtp_connections) <= 2
+        return smtp_connections[-1]
+
+    monkeypatch.setattr(SMTPConnectionPool, "_connect", _connect)
+    mailer = SMTPMail(hostname="smtp.example.com")
+
+    result = await mailer.send_many(_messages(2))
+
+    assert result.sent == [1]
+    assert list(result.errors) == [0]
+    assert _subjects(smtp_connections[2]) == ["Message 1"]
+
+
+@pytest.mark.asyncio
+async def test_smtp_batch_chunks(smtp_connections: List[FakeSMTP]):
+    """Test that every chunk of a batch is sent over a session of its own."""
+    mailer = SMTPMail(hostname="smtp.example.com")
+
+    result = await mailer.send_many(_messages(5), chunk_size=2)
+
+    assert result.sent == [0, 1, 2, 3, 4]
+    assert [len(connection.sent) for connection in smtp_connections] == [2, 2, 1]
+    assert not any(connection.is_connected for connection in smtp_connections)
+
+
+@pytest.mark.asyncio
+async def test_smtp_batch_connection_error(monkeypatch):
+    """Test that every message of a batch fails if no connection can be opened, and that a
+    mailer without a hostname raises."""
+
+    async def _connect(self):
+        raise OSError("Connection refused")
+
+    monkeypatch.setattr(SMTPConnectionPool, "_connect", _connect)
+
+    result = await SMTPMail(hostname="smtp.example.com").send_many(_messages(2))
+    assert result.sent == []
+    assert result.errors == {
+        0: "SMTP Error: Connection refused",
+        1: "SMTP Error: Connection refused",
+    }
+    with pytest.raises(MailError):
+        await SMTPMail().send_many(_messages(1))
+
+
+@pytest.mark.asyncio
+async def test_default_batch_collects_errors():
+    """Test that mailers without a batch send send the messages one by one, and collect the
+    error of every failed message."""
+    messages = _messages(3)
+    messages[1]["content"] = {}
+
+    result = await LogMail().send_many(messages)
+
+    assert result.sent == [0, 2]
+    assert list(result.errors) == [1]
+    assert str(result) == "BatchResult(total=3, sent=2, deferred=0, failed=1)"
+
+
+@pytest.mark.asyncio
+async def test_email_message_send_many(smtp_connections: List[FakeSMTP], monkeypatch):
+    """Test that a batch of email messages is sent with the configured mailer, or logged when
+    mail is suppressed."""
+    monkeypatch.setattr(settings, "MAIL_TRANSPORT", "smtp")
+    messages = [EmailMessage.from_dict(message) for message in _messages(2)]
+
+    result = await EmailMessage.send_many(messages)
+    assert result.sent == [0, 1]
+    assert _subjects(smtp_connections[0]) == ["Message 0", "Message 1"]
+
+    result = await EmailMessage.send_many(messages, suppress_mail=True)
+    assert result.as_dict() == {"total": 2, "sent": 2, "deferred": 0, "errors": {}}
+    assert len(smtp_connections[0].sent) == 2
@@ -0,0 +1,176 @@
+"""This module contains unit tests for the SMTP connection pool.
+
+It includes tests for reusing connections between sends, evicting connections dropped by the
+server, idle too long or failing their keepalive, retrying a send on a new connection, limiting
+the number of open connections, and closing the pool.
+"""
+
+import asyncio
+from email.message import EmailMessage
+from typing import List
+
+import aiosmtplib
+import pytest
+
+from azra_store_lmi_api.config.mailer import pool as pool_module
+from azra_store_lmi_api.config.mailer.pool import SMTPConnectionPool, get_smtp_pool
+from azra_store_lmi_api.config.tests.fakes import FakeSMTP
+
+
+def _email(subject: str = "Hello") -> EmailMessage:
+    """Returns an email message."""
+    email = EmailMessage()
+    email["Subject"] = subject
+    return email
+
+
+@pytest.mark.asyncio
+async def test_connection_reused(smtp_connections: List[FakeSMTP]):
+    """Test that consecutive sends reuse one connection."""
+    pool = SMTPConnectionPool("smtp.example.com")
+
+    for index in range(3):
+        await pool.send_message(_email(f"Message {index}"))
+
+    assert len(smtp_connections) == 1
+    assert [email["Subject"] for email in smtp_connections[0].sent] == [
+        "Message 0",
+        "Message 1",
+        "Message 2",
+    ]
+    assert smtp_connections[0].noops == 0
+
+
+@pytest.mark.asyncio
+async def test_broken_connection_evicted(smtp_connections: List[FakeSMTP]):
+    """Test that an idle connection dropped by the server is discarded and replaced."""
+    pool = SMTPConnectionPool("smtp.example.com")
+    await pool.send_message(_email())
+    smtp_connections[0].is_connected = False
+
+    await pool.send_message(_email())
+
+    assert len(smtp_connections) == 2
+    assert len(smtp_connections[1].sent) == 1
+    assert len(pool._idle) == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_connections_evicted(smtp_connections: List[FakeSMTP]):
+    """Test that an idle connection is probed with NOOP after the keepalive interval, and
+    discarded if the probe fails or it was idle for longer than the idle timeout."""
+    pool = SMTPConnectionPool("smtp.example.com", keepalive_interval=0)
+    await pool.send_message(_email())
+    await pool.send_message(_email())
+    assert len(smtp_connections) == 1
+    assert smtp_connections[0].noops == 1
+
+    smtp_connections[0].fail_noop = True
+    await pool.send_message(_email())
+    assert len(smtp_connections) == 2
+    assert not smtp_connections[0].is_connected
+
+    pool.idle_timeout = 0
+    await pool.send_message(_email())
+    assert len(smtp_connections) == 3
+    assert smtp_connections[1].noops == 0
+    assert not smtp_connections[1].is_connected
+
+
+@pytest.mark.asyncio
+async def test_send_retried_on_disconnect(smtp_connections: List[FakeSMTP]):
+    """Test that a send dropped by the server is retried once on a new connection."""
+    pool = SMTPConnectionPool("smtp.example.com")
+    await pool.send_message(_email())
+    smtp_connections[0].disconnect_on_send = True
+
+    await pool.send_message(_email("Retried"))
+
+    assert len(smtp_connections) == 2
+    assert [email["Subject"] for email in smtp_connections[1].sent] == ["Retried"]
+    assert [connection for connection, _ in pool._idle] == [smtp_connections[1]]
+
+
+@pytest.mark.asyncio
+async def test_send_fails_after_retry(smtp_connections: List[FakeSMTP], monkeypatch):
+    """Test that a send dropped twice raises, and leaves no connection checked out."""
+    pool = SMTPConnectionPool("smtp.example.com", max_size=1)
+
+    async def _connect(self):
+        smtp_connections.append(FakeSMTP())
+        smtp_connections[-1].disconnect_on_send = True
+        return smtp_connections[-1]
+
+    monkeypatch.setattr(SMTPConnectionPool, "_connect", _connect)
+
+    with pytest.raises(aiosmtplib.SMTPServerDisconnected):
+        await pool.send_message(_email())
+    assert len(smtp_connections) == 2
+    assert not pool._idle
+    assert not pool._slots.locked()
+
+
+@pytest.mark.asyncio
+async def test_pool_size_limit(smtp_connections: List[FakeSMTP]):
+    """Test that no more than max_size connections are open, and that a checkout waits for a
+    connection to be returned once they are all in use."""
+    pool = SMTPConnectionPool("smtp.example.com", max_size=2)
+    first = await pool.acquire()
+    second = await pool.acquire()
+
+    waiting = asyncio.ensure_future(pool.acquire())
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+
+    await pool.release(first)
+    assert await asyncio.wait_for(waiting, timeout=1) is first
+    assert len(smtp_connections) == 2
+
+    await pool.release(second, discard=True)
+    assert not second.is_connected
+    third = await pool.acquire()
+    assert third is smtp_connections[2]
+    await pool.release(first)
+    await pool.release(third)
+    assert len(pool._idle) == 2
+
+
+@pytest.mark.asyncio
+async def test_connection_discarded_on_error(smtp_connections: List[FakeSMTP]):
+    """Test that a connection checked out by a block which raises is closed."""
+    pool = SMTPConnectionPool("smtp.example.com")
+
+    with pytest.raises(ValueError):
+        async with pool.connection():
+            raise ValueError("Unexpected")
+
+    assert not smtp_connections[0].is_connected
+    assert not pool._idle
+
+
+@pytest.mark.asyncio
+async def test_close(smtp_connections: List[FakeSMTP]):
+    """Test that closing the pool closes its idle connections and stops handing out new ones,
+    and that a connection returned afterwards is closed."""
+    pool = SMTPConnectionPool("smtp.example.com")
+    in_use = await pool.acquire()
+    await pool.send_message(_email())
+
+    await pool.close()
+    assert not smtp_connections[1].is_connected
+    await pool.release(in_use)
+    assert not in_use.is_connected
+    with pytest.raises(RuntimeError):
+        await pool.acquire()
+
+
+@pytest.mark.asyncio
+async def test_pool_shared_per_loop():
+    """Test that mailers with the same credentials share one pool on an event loop."""
+    pool = get_smtp_pool("smtp.example.com", 587, "user", "secret")
+
+    assert get_smtp_pool("smtp.example.com", 587, "user", "secret") is pool
+    assert get_smtp_pool("smtp.example.com", 587, "other", "secret") is not pool
+    await pool_module.close_smtp_pools()
+    assert get_smtp_pool("smtp.example.com", 587, "user", "secret") is not pool
+    await pool_module.close_smtp_pools()
@@ -0,0 +1,140 @@
+"""This module contains unit tests for the send rate limit of the mail provider.
+
+It includes tests for taking tokens from the bucket up to its burst, refilling it over time,
+sharing it between limiters of the same provider, failing open without Redis, counting the emails
+queued, sent and deferred, and deferring the emails of the SMTP mailer once the limit is reached.
+"""
+
+import asyncio
+from typing import List
+
+import pytest
+from fakeredis import FakeAsyncRedis
+
+from azra_store_lmi_api.config.mailer import EmailMessage
+from azra_store_lmi_api.config.mailer.exceptions import MailRateLimitError
+from azra_store_lmi_api.config.mailer.rate_limit import MailRateLimiter, get_mail_rate_limiter
+from azra_store_lmi_api.config.mailer.smtp import SMTPMail
+from azra_store_lmi_api.config.settings import settings
+from azra_store_lmi_api.config.tests.fakes import FakeSMTP
+
+
+def _message(subject: str = "Message") -> dict:
+    """Returns the dictionary of an email message."""
+    message = EmailMessage(to=["user@example.com"], subject=subject)
+    message.set_content("plain", "Hello")
+    return message.as_dict()
+
+
+@pytest.mark.asyncio
+async def test_tokens_taken_up_to_burst(fake_redis: FakeAsyncRedis):
+    """Test that emails are sent at once up to the burst, and that the next one is held back for
+    the time one token takes to refill."""
+    limiter = MailRateLimiter("smtp.example.com", rate=1, burst=3)
+
+    for _ in range(3):
+        await limiter.acquire()
+    with pytest.raises(MailRateLimitError) as error:
+        await limiter.acquire()
+
+    assert 0.9 < error.value.retry_after <= 1
+    tokens = float(await fake_redis.hget("mail:rate_limit:smtp.example.com", "tokens"))
+    assert 0 <= tokens < 0.1
+    assert 0 < await fake_redis.ttl("mail:rate_limit:smtp.example.com") <= 4
+
+
+@pytest.mark.asyncio
+async def test_tokens_refilled(fake_redis: FakeAsyncRedis):
+    """Test that the bucket is refilled at the rate, and that a request larger than the burst
+    takes the whole burst."""
+    limiter = MailRateLimiter("smtp.example.com", rate=50, burst=2)
+
+    await limiter.acquire(count=5)
+    with pytest.raises(MailRateLimitError) as error:
+        await limiter.acquire()
+    assert 0 < error.value.retry_after <= 0.02
+
+    await asyncio.sleep(0.05)
+    await limiter.acquire(count=2)
+    with pytest.raises(MailRateLimitError):
+        await limiter.acquire(count=2)
+
+
+@pytest.mark.asyncio
+async def test_bucket_shared_by_provider(fake_redis: FakeAsyncRedis):
+    """Test that the limiters of a provider share one bucket, apart from other providers."""
+    await MailRateLimiter("smtp.example.com", rate=1, burst=1).acquire()
+
+    with pytest.raises(MailRateLimitError):
+        await MailRateLimiter("smtp.example.com", rate=1, burst=1).acquire()
+    await MailRateLimiter("smtp.other.com", rate=1, burst=1).acquire()
+
+
+@pytest.mark.asyncio
+async def test_fails_open_without_redis(fake_redis: FakeAsyncRedis):
+    """Test that emails are neither held back nor failed when Redis is unavailable."""
+    fake_redis.connection_pool.connection_kwargs["server"].connected = False
+    limiter = MailRateLimiter("smtp.example.com", rate=1, burst=1)
+
+    for _ in range(3):
+        await limiter.acquire()
+    await limiter.record(queued=1, sent=1)
+
+
+@pytest.mark.asyncio
+async def test_metrics_recorded(fake_redis: FakeAsyncRedis):
+    """Test that the counters of emails queued, sent and deferred add up across records."""
+    limiter = MailRateLimiter("smtp.example.com", rate=1, burst=1)
+    assert await limiter.metrics() == {"queued": 0, "sent": 0, "deferred": 0}
+
+    await limiter.record(queued=3, sent=2, deferred=1)
+    await limiter.record(queued=1, sent=1)
+
+    assert await limiter.metrics() == {"queued": 4, "sent": 3, "deferred": 1}
+
+
+def test_get_mail_rate_limiter(monkeypatch):
+    """Test that the provider is limited only when a rate is configured."""
+    monkeypatch.setattr(settings, "MAIL_RATE_LIMIT", 0)
+    assert get_mail_rate_limiter() is None
+
+    monkeypatch.setattr(settings, "MAIL_RATE_LIMIT", 5)
+    monkeypatch.setattr(settings, "MAIL_RATE_LIMIT_BURST", 0)
+    limiter = get_mail_rate_limiter()
+    assert (limiter.name, limiter.rate, limiter.burst) == (settings.MAIL_SERVER, 5, 1)
+
+
+@pytest.mark.asyncio
+async def test_smtp_send_deferred(
+    fake_redis: FakeAsyncRedis, smtp_connections: List[FakeSMTP], monkeypatch
+):
+    """Test that an email sent past the limit is held back and counted as deferred."""
+    monkeypatch.setattr(settings, "MAIL_RATE_LIMIT", 0.5)
+    monkeypatch.setattr(settings, "MAIL_RATE_LIMIT_BURST", 1)
+    mailer = SMTPMail(hostname="smtp.example.com")
+
+    await mailer.send(_message())
+    with pytest.raises(MailRateLimitError) as error:
+        await mailer.send(_message())
+
+    assert 1.9 < error.value.retry_after <= 2
+    assert len(smtp_connections[0].sent) == 1
+    assert await mailer.rate_limiter.metrics() == {"queued": 2, "sent": 1, "deferred": 1}
+
+
+@pytest.mark.asyncio
+async def test_smtp_batch_deferred(
+    fake_redis: FakeAsyncRedis, smtp_connections: List[FakeSMTP], monkeypatch
+):
+    """Test that the messages of a batch past the limit are deferred, including the next chunks,
+    with the delay until the budget allows them."""
+    monkeypatch.setattr(settings, "MAIL_RATE_LIMIT", 1)
+    monkeypatch.setattr(settings, "MAIL_RATE_LIMIT_BURST", 3)
+    mailer = SMTPMail(hostname="smtp.example.com")
+
+    result = await mailer.send_many([_message(str(index)) for index in range(5)], chunk_size=2)
+
+    assert (result.sent, result.deferred) == ([0, 1, 2], [3, 4])
+    assert 0.9 < result.retry_after <= 1
+    assert [len(connection.sent) for connection in smtp_connections] == [2, 1]
+    assert await mailer.rate_limiter.metrics() == {"queued": 5, "sent": 3, "deferred": 2}
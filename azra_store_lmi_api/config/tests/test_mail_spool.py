@@ -0,0 +1,167 @@
+"""This module contains unit tests for spooling emails to local files.
+
+It includes tests for writing messages and batches to the spool, reading them back by recipient,
+loading only the entries appended since the previous load, serializing the appends of several
+writers with a file lock, and locking the spool on Windows.
+"""
+
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import threading
+import types
+from pathlib import Path
+
+import pytest
+
+from azra_store_lmi_api.config.mailer import EmailMessage, spool
+from azra_store_lmi_api.config.mailer.spool import (
+    DATA_FILE,
+    INDEX_FILE,
+    SpoolEntry,
+    SpoolMail,
+    SpoolReader,
+)
+
+
+def _message(subject: str = "Message", **recipients) -> dict:
+    """Returns the dictionary of an email message, to a user unless recipients are given."""
+    message = EmailMessage(
+        to=recipients.get("to", ["user@example.com"]),
+        subject=subject,
+        cc=recipients.get("cc"),
+        bcc=recipients.get("bcc"),
+    )
+    message.set_content("plain", f"Body of {subject}")
+    return message.as_dict()
+
+
+@pytest.mark.asyncio
+async def test_send_and_read(tmp_path: Path):
+    """Test that a spooled message is read back by any of its recipients, whatever their case."""
+    await SpoolMail(str(tmp_path)).send(
+        _message("Bill", to=["User@Example.com"], cc=["cc@example.com"], bcc=["bcc@example.com"])
+    )
+
+    reader = SpoolReader(str(tmp_path))
+    assert len(reader) == reader.count() == 1
+    (entry,) = reader.lookup("user@example.com")
+    assert entry.recipients == ["user@example.com", "cc@example.com", "bcc@example.com"]
+    assert reader.lookup("BCC@example.com") == [entry]
+    email = reader.read(entry)
+    assert email["Subject"] == "Bill"
+    assert email.get_payload()[0].get_payload() == "Body of Bill"
+    assert reader.count("other@example.com") == 0
+
+
+@pytest.mark.asyncio
+async def test_send_many(tmp_path: Path):
+    """Test that a batch is written with one append, messages back to back, and that the error of
+    a message which cannot be rendered is returned without writing it."""
+    messages = [
+        _message(f"Bill {index}", to=[f"user{index % 2}@example.com"]) for index in range(3)
+    ]
+    messages.insert(1, {**_message("Broken"), "attachments": {"bill.pdf": str(tmp_path / "no")}})
+
+    result = await SpoolMail(str(tmp_path)).send_many(messages)
+
+    assert (result.sent, list(result.errors)) == ([0, 2, 3], [1])
+    reader = SpoolReader(str(tmp_path))
+    assert [entry.subject for entry in reader.entries] == ["Bill 0", "Bill 1", "Bill 2"]
+    assert [entry.offset for entry in reader.entries[1:]] == [
+        entry.offset + entry.length for entry in reader.entries[:-1]
+    ]
+    assert reader.count("user0@example.com") == 2
+    assert [email["Subject"] for email in reader.messages("user1@example.com")] == ["Bill 1"]
+    assert os.path.getsize(tmp_path / DATA_FILE) == sum(entry.length for entry in reader.entries)
+
+
+@pytest.mark.asyncio
+async def test_refresh_reads_new_entries(tmp_path: Path):
+    """Test that a reader loads only the entries appended since its previous load, and leaves an
+    entry still being written to the next load."""
+    mailer = SpoolMail(str(tmp_path))
+    reader = SpoolReader(str(tmp_path))
+    assert len(reader) == 0
+
+    await mailer.send(_message("First"))
+    reader.refresh()
+    await mailer.send(_message("Second"))
+    line = json.dumps(SpoolEntry(0, 1, ["late@example.com"], "Late")._asdict())
+    with open(tmp_path / INDEX_FILE, "a", encoding="utf-8") as index_file:
+        index_file.write(line)
+    reader.refresh()
+    assert [entry.subject for entry in reader.entries] == ["First", "Second"]
+
+    with open(tmp_path / INDEX_FILE, "a", encoding="utf-8") as index_file:
+        index_file.write("\n")
+    reader.refresh()
+    assert [entry.subject for entry in reader.entries] == ["First", "Second", "Late"]
+    assert reader.count("late@example.com") == 1
+
+
+@pytest.mark.asyncio
+async def test_append_waits_for_lock(tmp_path: Path):
+    """Test that a message is written only once another writer has released the spool."""
+    mailer = SpoolMail(str(tmp_path))
+    await mailer.send(_message("First"))
+    locked, release = threading.Event(), threading.Event()
+
+    def hold_lock():
+        with open(tmp_path / DATA_FILE, "ab") as data_file, spool._file_lock(data_file):
+            locked.set()
+            release.wait(5)
+
+    holder = asyncio.create_task(asyncio.to_thread(hold_lock))
+    await asyncio.to_thread(locked.wait, 5)
+    sender = asyncio.create_task(mailer.send(_message("Second")))
+    await asyncio.sleep(0.1)
+    assert not sender.done()
+    assert len(SpoolReader(str(tmp_path))) == 1
+
+    release.set()
+    await asyncio.gather(holder, sender)
+    assert [entry.subject for entry in SpoolReader(str(tmp_path)).entries] == ["First", "Second"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writers(tmp_path: Path):
+    """Test that the messages of concurrent writers are neither interleaved nor lost."""
+    mailers = [SpoolMail(str(tmp_path)) for _ in range(4)]
+
+    await asyncio.gather(
+        *(
+            mailer.send_many([_message(f"{number}-{index}") for index in range(5)])
+            for number, mailer in enumerate(mailers)
+        )
+    )
+
+    reader = SpoolReader(str(tmp_path))
+    assert sorted(email["Subject"] for email in reader.messages()) == sorted(
+        f"{number}-{index}" for number in range(4) for index in range(5)
+    )
+    for number in range(4):
+        offsets = [entry.offset for entry in reader.entries if entry.subject[0] == str(number)]
+        assert offsets == sorted(offsets)
+
+
+@pytest.mark.asyncio
+async def test_windows_lock(tmp_path: Path, monkeypatch):
+    """Test that the spool is locked with msvcrt on Windows, where fcntl does not exist."""
+    calls = []
+    msvcrt = types.ModuleType("msvcrt")
+    msvcrt.LK_LOCK, msvcrt.LK_UNLCK = 1, 0
+    msvcrt.locking = lambda fd, mode, length: calls.append((mode, length))
+    monkeypatch.setattr(sys, "platform", "win32")
+    monkeypatch.setitem(sys.modules, "fcntl", None)
+    monkeypatch.setitem(sys.modules, "msvcrt", msvcrt)
+    spec = importlib.util.spec_from_file_location("windows_spool", spool.__file__)
+    windows_spool = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(windows_spool)
+
+    await windows_spool.SpoolMail(str(tmp_path)).send(_message("Bill"))
+
+    assert calls == [(msvcrt.LK_LOCK, 1), (msvcrt.LK_UNLCK, 1)]
+    assert [entry.subject for entry in SpoolReader(str(tmp_path)).entries] == ["Bill"]
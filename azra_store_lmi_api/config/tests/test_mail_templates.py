@@ -0,0 +1,101 @@
+"""This module contains unit tests for rendering emails from templates.
+
+It includes tests for rendering the parts of a template with its stylesheet and fragments, caching
+the helpers of a renderer, reading them again when their file changes if templates are reloaded,
+and releasing the renderer along with its helpers.
+"""
+
+import gc
+import os
+import weakref
+from pathlib import Path
+
+from jinja2 import FileSystemLoader
+
+from azra_store_lmi_api.config.mailer.templates import EmailTemplateRenderer
+
+
+def _renderer(directory: Path, auto_reload: bool) -> EmailTemplateRenderer:
+    """Returns a renderer of a template with a stylesheet and a fragment written to a directory."""
+    (directory / "styles.css").write_text("p { color: red; }\n")
+    (directory / "footer.html").write_text("<p>Footer</p>")
+    (directory / "welcome.html").write_text(
+        '<style>{{ inline_css("styles.css") }}</style>{{ fragment("footer.html") }}'
+    )
+    renderer = EmailTemplateRenderer(auto_reload=auto_reload)
+    renderer.environment.loader = FileSystemLoader(directory)
+    return renderer
+
+
+def _change(path: Path, content: str) -> None:
+    """Rewrite a file, moving its modification time forward so the change is seen."""
+    modified = path.stat().st_mtime
+    path.write_text(content)
+    os.utime(path, (modified + 1, modified + 1))
+
+
+def test_render_package_template():
+    """Test that every part of a package template is rendered from one context, with its
+    stylesheet and footer."""
+    content = EmailTemplateRenderer().render(
+        "saas_admin_credentials",
+        {"username": "admin", "email": "admin@example.com", "password": "<secret>"},
+    )
+
+    assert list(content) == ["plain", "html"]
+    assert "username: admin" in content["plain"]
+    assert "please do not reply" in content["plain"]
+    assert "&lt;secret&gt;" in content["html"]
+    assert "background-color: #f4f5f7;" in content["html"]
+    assert '<p class="footer">' in content["html"]
+
+
+def test_helpers_cached(tmp_path: Path, monkeypatch):
+    """Test that the stylesheets and fragments are read once, and kept when their file changes
+    if templates are not reloaded."""
+    renderer = _renderer(tmp_path, auto_reload=False)
+    loader = renderer.environment.loader
+    sources = []
+
+    def get_source(environment, template):
+        sources.append(template)
+        return FileSystemLoader.get_source(loader, environment, template)
+
+    monkeypatch.setattr(loader, "get_source", get_source)
+
+    assert renderer.render("welcome") == {"html": "<style>p { color: red; }</style><p>Footer</p>"}
+    _change(tmp_path / "styles.css", "p { color: blue; }")
+    _change(tmp_path / "footer.html", "<p>Changed</p>")
+
+    assert renderer.render("welcome") == {"html": "<style>p { color: red; }</style><p>Footer</p>"}
+    assert renderer.inline_css("styles.css") is renderer.inline_css("styles.css")
+    assert sources.count("styles.css") == 1
+
+
+def test_helpers_reloaded(tmp_path: Path):
+    """Test that the stylesheets and fragments are read again when their file changes if
+    templates are reloaded, and kept otherwise."""
+    renderer = _renderer(tmp_path, auto_reload=True)
+    stylesheet = renderer.inline_css("styles.css")
+    footer = renderer.fragment("footer.html")
+    assert renderer.inline_css("styles.css") is stylesheet
+    assert renderer.fragment("footer.html") is footer
+
+    _change(tmp_path / "styles.css", "p { color: blue; }")
+    _change(tmp_path / "footer.html", "<p>Changed</p>")
+
+    assert renderer.render("welcome") == {
+        "html": "<style>p { color: blue; }</style><p>Changed</p>"
+    }
+
+
+def test_renderer_released(tmp_path: Path):
+    """Test that a renderer is released once unused, along with the helpers it cached."""
+    renderer = _renderer(tmp_path, auto_reload=False)
+    renderer.render("welcome")
+    reference = weakref.ref(renderer)
+
+    del renderer
+    gc.collect()
+
+    assert reference() is None
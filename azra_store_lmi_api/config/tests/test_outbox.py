@@ -0,0 +1,160 @@
+"""This module contains unit tests for the transactional outbox.
+
+It includes tests for dispatching the outbox messages to Celery and deleting them, retrying the
+failed dispatches with a backoff, marking the messages which failed too many times as failed,
+stopping a batch when the broker is unavailable, and dispatching the failed messages again.
+"""
+
+from datetime import datetime, timezone
+from typing import List
+
+import pytest
+import pytest_asyncio
+from kombu.exceptions import OperationalError
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.config.outbox import OutboxMessage, enqueue, relay
+from azra_store_lmi_api.config.outbox.relay import relay_batch, retry_failed
+from azra_store_lmi_api.config.settings import settings
+
+
+class FakeCelery:
+    """Records the tasks sent to the broker, failing with the errors queued up."""
+
+    def __init__(self):
+        self.sent: List[tuple] = []
+        self.errors: List[Exception] = []
+
+    def send_task(self, name: str, args: list, kwargs: dict, **options):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append((name, args, kwargs, options))
+
+
+@pytest_asyncio.fixture
+async def broker(db_session: AsyncSession, monkeypatch) -> FakeCelery:
+    """Empty the outbox, and record the tasks dispatched by the relay instead of sending them."""
+    await db_session.execute(delete(OutboxMessage))
+    await db_session.commit()
+    broker = FakeCelery()
+    monkeypatch.setattr(relay, "celery", broker)
+    return broker
+
+
+async def _enqueue(db_session: AsyncSession, count: int) -> List[int]:
+    """Add messages to the outbox, and return their ids."""
+    messages = [
+        await enqueue(db_session, "tasks.example", index, options={"queue": "reports"})
+        for index in range(count)
+    ]
+    await db_session.flush()
+    ids = [message.id for message in messages]
+    await db_session.commit()
+    return ids
+
+
+async def _make_available(db_session: AsyncSession) -> None:
+    """Make every outbox message waiting for its retry available at once."""
+    await db_session.execute(update(OutboxMessage).values(available_at=func.now()))
+    await db_session.commit()
+
+
+async def _messages(db_session: AsyncSession) -> List[OutboxMessage]:
+    """Returns the messages left in the outbox."""
+    db_session.expire_all()
+    return (await db_session.scalars(select(OutboxMessage).order_by(OutboxMessage.id))).all()
+
+
+@pytest.mark.asyncio
+async def test_dispatched_messages_deleted(db_session: AsyncSession, broker: FakeCelery):
+    """Test that the messages are dispatched in order with their options, then deleted, and that
+    a message with an idempotency key is sent with its header."""
+    await _enqueue(db_session, 2)
+    await enqueue(db_session, "tasks.example", idempotency_key="request-1")
+    await db_session.commit()
+
+    assert await relay_batch(db_session, 10) == 3
+
+    assert broker.sent == [
+        ("tasks.example", [0], {}, {"queue": "reports"}),
+        ("tasks.example", [1], {}, {"queue": "reports"}),
+        ("tasks.example", [], {}, {"headers": {"idempotency_key": "request-1"}}),
+    ]
+    assert await _messages(db_session) == []
+    assert await relay_batch(db_session, 10) == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_dispatch_retried(db_session: AsyncSession, broker: FakeCelery):
+    """Test that a message which fails to be dispatched is kept with its error, retried after a
+    backoff, and that the rest of the batch is dispatched."""
+    first, _ = await _enqueue(db_session, 2)
+    broker.errors.append(ValueError("Unknown task"))
+
+    assert await relay_batch(db_session, 10) == 2
+    (message,) = await _messages(db_session)
+    assert (message.id, message.attempts, message.last_error) == (first, 1, "Unknown task")
+    assert message.available_at > datetime.now(timezone.utc)
+    assert message.failed_at is None
+    assert [args for _, args, _, _ in broker.sent] == [[1]]
+
+    assert await relay_batch(db_session, 10) == 0
+    await _make_available(db_session)
+    assert await relay_batch(db_session, 10) == 1
+    assert await _messages(db_session) == []
+
+
+@pytest.mark.asyncio
+async def test_message_failed_after_max_attempts(
+    db_session: AsyncSession, broker: FakeCelery, monkeypatch
+):
+    """Test that a message which fails to be dispatched too many times is marked as failed, and
+    is no longer dispatched."""
+    monkeypatch.setattr(settings, "OUTBOX_MAX_ATTEMPTS", 2)
+    await _enqueue(db_session, 1)
+    broker.errors.extend([ValueError("Unknown task"), ValueError("Unknown task")])
+
+    await relay_batch(db_session, 10)
+    await _make_available(db_session)
+    await relay_batch(db_session, 10)
+
+    (message,) = await _messages(db_session)
+    assert message.attempts == 2
+    assert message.failed_at is not None
+    await _make_available(db_session)
+    assert await relay_batch(db_session, 10) == 0
+    assert broker.sent == []
+
+
+@pytest.mark.asyncio
+async def test_broker_unavailable_stops_batch(db_session: AsyncSession, broker: FakeCelery):
+    """Test that a batch stops at the first message the broker is unavailable for, and leaves the
+    next messages untouched."""
+    await _enqueue(db_session, 2)
+    broker.errors.append(OperationalError("Connection refused"))
+
+    assert await relay_batch(db_session, 10) == 2
+
+    first, second = await _messages(db_session)
+    assert (first.attempts, second.attempts) == (1, 0)
+    assert broker.sent == []
+
+
+@pytest.mark.asyncio
+async def test_retry_failed(db_session: AsyncSession, broker: FakeCelery, monkeypatch):
+    """Test that failed messages are made available again with their attempts reset, and are
+    then dispatched."""
+    monkeypatch.setattr(settings, "OUTBOX_MAX_ATTEMPTS", 1)
+    first, second = await _enqueue(db_session, 2)
+    broker.errors.extend([ValueError("Unknown task"), ValueError("Unknown task")])
+    await relay_batch(db_session, 10)
+
+    assert await retry_failed(db_session, [second]) == 1
+    assert [message.id for message in await _messages(db_session)] == [first, second]
+    assert await relay_batch(db_session, 10) == 1
+    assert [args for _, args, _, _ in broker.sent] == [[1]]
+
+    assert await retry_failed(db_session) == 1
+    assert await relay_batch(db_session, 10) == 1
+    assert await _messages(db_session) == []
@@ -0,0 +1,206 @@
+"""This module contains unit tests for the periodic jobs.
+
+It includes tests for building the beat schedule of the registered jobs, the scheduler of beat
+holding them, dispatching the jobs once they are due, running a job under its lock and recording
+its runs, skipping a run while another one holds the lock or Redis is unavailable, and pruning
+the old runs.
+"""
+
+import inspect
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List
+
+import pytest
+from celery.beat import PersistentScheduler, Scheduler, Service
+from celery.schedules import crontab
+from fakeredis import FakeAsyncRedis
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.apps.admin.tasks.maintenance import (
+    clear_expired_otps,
+    requeue_stuck_stores,
+)
+from azra_store_lmi_api.config.celery.app import celery
+from azra_store_lmi_api.config.scheduler import JobRun, periodic_job
+from azra_store_lmi_api.config.scheduler import registry as registry_module
+from azra_store_lmi_api.config.scheduler.lock import JobLock
+from azra_store_lmi_api.config.scheduler.models import JobRunStatusEnum
+from azra_store_lmi_api.config.scheduler.registry import build_beat_schedule, run_job
+from azra_store_lmi_api.config.scheduler.tasks import prune_job_runs
+from azra_store_lmi_api.config.settings import settings
+
+JOB_NAME = "tests.periodic_job"
+
+
+@periodic_job(60.0, options={"queue": "reports"}, name=JOB_NAME)
+async def example_job() -> int:
+    """A job processing 3 rows every minute."""
+    return 3
+
+
+async def _runs(db_session: AsyncSession, name: str) -> List[JobRun]:
+    """Returns the recorded runs of a job."""
+    return (await db_session.scalars(select(JobRun).where(JobRun.name == name))).all()
+
+
+def test_beat_schedule():
+    """Test that every registered job is in the beat schedule with its options."""
+    schedule = build_beat_schedule()
+
+    assert schedule[JOB_NAME] == {
+        "task": JOB_NAME,
+        "schedule": 60.0,
+        "options": {"queue": "reports"},
+    }
+    assert schedule[clear_expired_otps.name]["schedule"] == crontab(minute="*/15")
+    assert schedule[prune_job_runs.name]["schedule"] == crontab(hour=3, minute=30)
+    assert schedule[requeue_stuck_stores.name]["schedule"] == crontab(minute="*/5")
+
+
+def test_beat_scheduler_schedule(tmp_path: Path):
+    """Test that the scheduler built by beat when it starts holds every registered job, with the
+    entries of the Celery schedule."""
+    service = Service(app=celery, schedule_filename=str(tmp_path / "celerybeat-schedule"))
+    scheduler = service.get_scheduler()
+    try:
+        assert isinstance(scheduler, PersistentScheduler)
+        for name in (
+            JOB_NAME,
+            clear_expired_otps.name,
+            requeue_stuck_stores.name,
+            prune_job_runs.name,
+        ):
+            assert scheduler.schedule[name].task == name
+        assert scheduler.schedule[JOB_NAME].options == {"queue": "reports"}
+    finally:
+        scheduler.close()
+
+
+def test_explicit_beat_entry_kept(monkeypatch):
+    """Test that a job declared with the name of an entry configured explicitly keeps the
+    configured entry."""
+    name = "tests.explicit_job"
+    explicit = {"task": name, "schedule": 5.0}
+    monkeypatch.setattr(celery.conf, "beat_schedule", {name: explicit})
+    monkeypatch.setattr(registry_module, "registry", dict(registry_module.registry))
+
+    @periodic_job(60.0, name=name)
+    async def explicit_job() -> int:
+        return 0
+
+    assert celery.conf.beat_schedule[name] == explicit
+    assert build_beat_schedule()[name]["schedule"] == 60.0
+
+
+def test_due_job_dispatched(monkeypatch):
+    """Test that beat sends a job with its options once it is due, and not again before its
+    next run."""
+    sent = []
+    monkeypatch.setattr(
+        example_job, "apply_async", lambda *args, **kwargs: sent.append(kwargs["queue"])
+    )
+    scheduler = Scheduler(app=celery, lazy=True)
+    # The tasks are sent by the recorder, without a connection to the broker.
+    scheduler.producer = None
+    scheduler.update_from_dict({JOB_NAME: build_beat_schedule()[JOB_NAME]})
+    entry = scheduler.schedule[JOB_NAME]
+    assert not entry.is_due().is_due
+
+    entry.last_run_at = entry.default_now() - timedelta(seconds=61)
+    assert entry.is_due().is_due
+    scheduler.tick()
+    assert sent == ["reports"]
+
+    remaining = scheduler.tick()
+    assert sent == ["reports"]
+    assert 0 < remaining <= 60
+
+
+def test_crontab_due():
+    """Test that a job scheduled every quarter of an hour is due once a quarter has passed since
+    its last run."""
+    schedule = build_beat_schedule()[clear_expired_otps.name]["schedule"]
+    now = schedule.now()
+
+    assert schedule.is_due(now - timedelta(minutes=16)).is_due
+    state = schedule.is_due(now)
+    assert not state.is_due
+    assert 0 < state.next <= 15 * 60
+
+
+@pytest.mark.asyncio
+async def test_run_recorded(db_session: AsyncSession, fake_redis: FakeAsyncRedis, db_context):
+    """Test that a run returns the rows of the job, records them with its duration, and releases
+    its lock."""
+    assert await run_job("tests.recorded", inspect.unwrap(example_job.run), 60) == 3
+
+    (run,) = await _runs(db_session, "tests.recorded")
+    assert (run.status, run.rows, run.error) == (JobRunStatusEnum.SUCCEEDED.value, 3, None)
+    assert run.duration >= 0
+    assert await fake_redis.get("scheduler:lock:tests.recorded") is None
+
+
+@pytest.mark.asyncio
+async def test_failed_run_recorded(
+    db_session: AsyncSession, fake_redis: FakeAsyncRedis, db_context
+):
+    """Test that a failed run is recorded with its error, releases its lock and raises."""
+
+    async def failing_job() -> int:
+        raise ValueError("Job failed")
+
+    with pytest.raises(ValueError):
+        await run_job("tests.failed", failing_job, 60)
+
+    (run,) = await _runs(db_session, "tests.failed")
+    assert (run.status, run.rows, run.error) == (JobRunStatusEnum.FAILED.value, None, "Job failed")
+    assert await fake_redis.get("scheduler:lock:tests.failed") is None
+
+
+@pytest.mark.asyncio
+async def test_overlapping_run_skipped(
+    db_session: AsyncSession, fake_redis: FakeAsyncRedis, db_context
+):
+    """Test that a run is skipped while another run holds the lock of the job, or when Redis is
+    unavailable, and that skipped runs are not recorded."""
+    calls = []
+
+    async def job() -> int:
+        calls.append(1)
+        return 1
+
+    lock = JobLock("tests.overlap", 60)
+    assert await lock.acquire()
+    assert await run_job("tests.overlap", job, 60) is None
+    await lock.release()
+    assert await run_job("tests.overlap", job, 60) == 1
+
+    fake_redis.connection_pool.connection_kwargs["server"].connected = False
+    assert await run_job("tests.overlap", job, 60) is None
+    assert calls == [1]
+    assert len(await _runs(db_session, "tests.overlap")) == 1
+
+
+@pytest.mark.asyncio
+async def test_prune_job_runs(db_session: AsyncSession, db_context, monkeypatch):
+    """Test that the runs older than the retention are deleted, and the recent ones kept."""
+    monkeypatch.setattr(settings, "SCHEDULER_JOB_RUN_RETENTION_DAYS", 7)
+    await db_session.execute(delete(JobRun))
+    now = datetime.now(timezone.utc)
+    for days in (1, 6, 8, 30):
+        db_session.add(
+            JobRun(
+                name="tests.pruned",
+                status=JobRunStatusEnum.SUCCEEDED.value,
+                started_at=now - timedelta(days=days),
+                duration=0.1,
+            )
+        )
+    await db_session.commit()
+
+    assert await inspect.unwrap(prune_job_runs.run)() == 2
+
+    runs = await _runs(db_session, "tests.pruned")
+    assert sorted((now - run.started_at).days for run in runs) == [1, 6]
@@ -0,0 +1,179 @@
+"""This module contains unit tests for the parallel migrations of the store schemas.
+
+It includes tests for the connection of a worker passed through to the migration environment,
+for the isolation and retries of a schema whose migrations fail, and for the exit status of the
+migrate_tenants command. The migrations are a single revision written next to a copy of the
+environment of the project, and the worker processes are replaced by a thread, run on the test
+database.
+"""
+
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import pytest
+from sqlalchemy import Engine, create_engine, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.apps.admin.models import Store
+from azra_store_lmi_api.apps.admin.tests.factory import create_stores
+from azra_store_lmi_api.commands import migrate_tenants
+from azra_store_lmi_api.config import tenant_migrations
+from azra_store_lmi_api.config.tenancy import Tenant, register_tenant
+from azra_store_lmi_api.conftest import async_test_engine
+
+REVISION = "0001"
+
+MIGRATION = f'''"""Create the widgets table."""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "{REVISION}"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table("widgets", sa.Column("id", sa.Integer, primary_key=True))
+
+
+def downgrade():
+    op.drop_table("widgets")
+'''
+
+
+class ThreadExecutor(ThreadPoolExecutor):
+    """Runs the workers of the migrations in a thread of the test process."""
+
+    def __init__(self, max_workers: int, mp_context=None, initializer=None):
+        # Alembic keeps its context in module globals, the schemas are migrated one at a time.
+        super().__init__(max_workers=1)
+
+
+@pytest.fixture
+def worker(tmp_path: Path, monkeypatch) -> Iterator[Engine]:
+    """Configure the worker of the test process with an engine on the test database, and the
+    migrations of the widgets table run by the environment of the project."""
+    script_location = tmp_path / "migrations"
+    (script_location / "versions").mkdir(parents=True)
+    migrations = tenant_migrations._PROJECT_ROOT / "azra_store_lmi_api/migrations"
+    for name in ("env.py", "script.py.mako"):
+        shutil.copy(migrations / name, script_location / name)
+    (script_location / "versions" / f"{REVISION}_widgets.py").write_text(MIGRATION)
+    config = tenant_migrations.alembic_config()
+    config.set_main_option("script_location", str(script_location))
+    config.attributes["configure_logger"] = False
+    engine = create_engine(
+        async_test_engine.url.render_as_string(hide_password=False), pool_size=1, max_overflow=0
+    )
+    monkeypatch.setattr(tenant_migrations, "_worker_engine", engine)
+    monkeypatch.setattr(tenant_migrations, "_worker_config", config)
+    monkeypatch.setattr(tenant_migrations, "ProcessPoolExecutor", ThreadExecutor)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def schemas(worker: Engine) -> Iterator[List[str]]:
+    """Collect the schemas created by a test, and drop them once it ran."""
+    created: List[str] = []
+    yield created
+    with worker.begin() as connection:
+        for schema in created:
+            connection.execute(text(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE'))
+
+
+async def _create_tenants(
+    db_session: AsyncSession, schemas: List[str], count: int, broken: bool = True
+) -> List[str]:
+    """Create the schemas of stores registered as tenants, the second one with a widgets table
+    already, on which the migrations fail, and return their names."""
+    for store_id in await create_stores(db_session, count):
+        schema = await db_session.scalar(
+            select(Store.unique_indentifier).where(Store.id == store_id)
+        )
+        register_tenant(db_session, store_id, schema)
+        schemas.append(schema)
+        await db_session.execute(text(f'CREATE SCHEMA "{schema}"'))
+    if broken:
+        await db_session.execute(text(f'CREATE TABLE "{schemas[1]}".widgets (id integer)'))
+    await db_session.commit()
+    return list(schemas)
+
+
+async def _revisions(db_session: AsyncSession, schemas: List[str]) -> Dict[str, Optional[str]]:
+    """Returns the revisions of schemas recorded in the tenant registry."""
+    rows = await db_session.execute(
+        select(Tenant.schema_name, Tenant.revision).where(Tenant.schema_name.in_(schemas))
+    )
+    return dict(rows.all())
+
+
+async def _tables(db_session: AsyncSession, schema: str) -> List[str]:
+    """Returns the tables of a schema."""
+    rows = await db_session.scalars(
+        text("SELECT tablename FROM pg_tables WHERE schemaname = :schema ORDER BY tablename"),
+        {"schema": schema},
+    )
+    return list(rows)
+
+
+@pytest.mark.asyncio
+async def test_migrate_schema(db_session: AsyncSession, schemas: List[str]):
+    """Test that the environment migrates the schema on the connection of the worker, with its
+    search path, and that the revision of the schema is recorded in the registry once."""
+    (schema,) = await _create_tenants(db_session, schemas, 1, broken=False)
+
+    result = tenant_migrations.migrate_schema(schema)
+    assert (result.schema, result.status, result.error) == (
+        schema,
+        tenant_migrations.UPGRADED,
+        None,
+    )
+    assert await _tables(db_session, schema) == ["alembic_version", "widgets"]
+    assert await _revisions(db_session, [schema]) == {schema: REVISION}
+    assert "widgets" not in await _tables(db_session, "public")
+
+    result = tenant_migrations.migrate_schema(schema)
+    assert result.status == tenant_migrations.CURRENT
+
+
+@pytest.mark.asyncio
+async def test_migrate_schemas_failure(db_session: AsyncSession, schemas: List[str]):
+    """Test that a schema whose migrations fail is retried, then reported as failed with its
+    error and rolled back, without preventing the other schemas from being migrated."""
+    first, broken, last = await _create_tenants(db_session, schemas, 3)
+
+    results = tenant_migrations.migrate_schemas([first, broken, last], 4, 1, 0)
+
+    outcomes = {result.schema: (result.status, result.attempts) for result in results}
+    assert outcomes == {
+        first: (tenant_migrations.UPGRADED, 1),
+        broken: (tenant_migrations.FAILED, 2),
+        last: (tenant_migrations.UPGRADED, 1),
+    }
+    (failure,) = [result for result in results if result.status == tenant_migrations.FAILED]
+    assert failure.error.startswith("ProgrammingError")
+    assert "widgets" in failure.error
+    assert await _revisions(db_session, [first, broken, last]) == {
+        first: REVISION,
+        broken: None,
+        last: REVISION,
+    }
+    assert await _tables(db_session, broken) == ["widgets"]
+
+
+@pytest.mark.asyncio
+async def test_command_exit_status(db_session: AsyncSession, schemas: List[str]):
+    """Test that the command migrates the schemas it is given, and exits with 1 if one failed and
+    0 once they are all at head."""
+    tenants = await _create_tenants(db_session, schemas, 3)
+
+    assert migrate_tenants.main(2, 0, 0, False, tenants) == 1
+    await db_session.execute(text(f'DROP TABLE "{tenants[1]}".widgets'))
+    await db_session.commit()
+    assert migrate_tenants.main(2, 0, 0, True, tenants) == 0
+    assert set((await _revisions(db_session, tenants)).values()) == {REVISION}
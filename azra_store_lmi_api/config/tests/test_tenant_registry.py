@@ -0,0 +1,71 @@
+"""This module contains unit tests for the routing of a session to the schema of a store.
+
+It includes tests for the search path of a transaction routed to the schema of an active store,
+and for the stores which are not routed: unknown, not yet active, or held by another shard.
+"""
+
+from typing import Dict, Tuple
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.apps.admin.models import Store
+from azra_store_lmi_api.apps.admin.tests.factory import create_stores
+from azra_store_lmi_api.config.tenancy import TenantStatusEnum, register_tenant, route_to_tenant
+
+TENANTS = {
+    "active": (TenantStatusEnum.ACTIVE, None),
+    "provisioning": (TenantStatusEnum.PROVISIONING, None),
+    "other_shard": (TenantStatusEnum.ACTIVE, "other"),
+}
+
+
+async def _create_tenants(
+    db_session: AsyncSession, tenants: Dict[str, Tuple[TenantStatusEnum, str]]
+) -> Dict[str, Tuple[str, str]]:
+    """Create stores registered as tenants with a status and shard, and return their ids and the
+    names of their schemas."""
+    created = {}
+    for name, store_id in zip(tenants, await create_stores(db_session, len(tenants))):
+        status, shard = tenants[name]
+        schema = await db_session.scalar(
+            select(Store.unique_indentifier).where(Store.id == store_id)
+        )
+        tenant = register_tenant(db_session, store_id, schema)
+        tenant.status = status.value
+        tenant.shard = shard or tenant.shard
+        created[name] = (store_id, schema)
+    await db_session.commit()
+    return created
+
+
+async def _search_path(db_session: AsyncSession) -> str:
+    """Returns the search path of the transaction of a session."""
+    return await db_session.scalar(text("SELECT current_setting('search_path')"))
+
+
+@pytest.mark.asyncio
+async def test_route_to_tenant(db_session: AsyncSession):
+    """Test that the transaction of a session is routed to the schema of an active store, and that
+    the search path is back to the default once it ends."""
+    store_id, schema = (await _create_tenants(db_session, TENANTS))["active"]
+    default = await _search_path(db_session)
+
+    assert await route_to_tenant(db_session, store_id) == schema
+    assert await _search_path(db_session) == f"{schema}, public"
+    await db_session.rollback()
+    assert await _search_path(db_session) == default
+
+
+@pytest.mark.asyncio
+async def test_route_to_tenant_not_routed(db_session: AsyncSession):
+    """Test that an unknown store, a store still being provisioned and a store of another shard
+    are not routed, and that the search path is left as it was."""
+    tenants = await _create_tenants(db_session, TENANTS)
+    default = await _search_path(db_session)
+
+    for store_id in ("unknown", tenants["provisioning"][0], tenants["other_shard"][0]):
+        assert await route_to_tenant(db_session, store_id) is None
+        assert await _search_path(db_session) == default
+    await db_session.rollback()
@@ -0,0 +1,216 @@
+"""This module contains unit tests for the cloning of the template schema.
+
+It includes tests for the catalog of a cloned schema, compared with the catalog of a schema which
+replayed the migrations: its tables, columns and defaults, constraints, indexes, sequences,
+functions, triggers, views and rows, with casts and colons in definitions and values, as well as
+for the objects which cannot be cloned.
+"""
+
+import uuid
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import pytest
+from alembic import command
+from sqlalchemy import Connection, Engine, create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from azra_store_lmi_api.config.tenancy.template import CloneError, clone_schema, schema_revision
+from azra_store_lmi_api.config.tenant_migrations import alembic_config
+from azra_store_lmi_api.conftest import async_test_engine
+
+REVISION = "0001"
+
+MIGRATION = f'''"""Create the items and orders of a tenant."""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "{REVISION}"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "items",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False, server_default="a:b"),
+        sa.Column("price", sa.Numeric(10, 2), server_default=sa.text("'0'::numeric")),
+        sa.Column("ratio", sa.Text, server_default=sa.text("'1:2'::text")),
+        sa.CheckConstraint("price >= 0::numeric", name="ck_items_price"),
+        sa.UniqueConstraint("name", "ratio", name="uq_items_name_ratio"),
+    )
+    op.create_index("ix_items_name", "items", ["name"])
+    op.create_index(
+        "ix_items_expensive", "items", ["price"], postgresql_where=sa.text("price > 100::numeric")
+    )
+    op.create_table(
+        "orders",
+        sa.Column("id", sa.BigInteger, sa.Identity(), primary_key=True),
+        sa.Column("item_id", sa.Integer, sa.ForeignKey("items.id", name="fk_orders_item")),
+        sa.Column("state", sa.Enum("open", "paid", name="order_state"), server_default="open"),
+        sa.Column("quantity", sa.Integer, nullable=False),
+        sa.Column("total", sa.Integer, sa.Computed("quantity * 2")),
+    )
+    op.execute("CREATE SEQUENCE tickets START 100")
+    op.execute(
+        "CREATE FUNCTION touch() RETURNS trigger LANGUAGE plpgsql AS "
+        "$$ BEGIN RAISE NOTICE 'order %: %', NEW.id, NEW.quantity::text; "
+        "NEW.quantity := greatest(NEW.quantity, 1); RETURN NEW; END $$"
+    )
+    op.execute(
+        "CREATE TRIGGER touch BEFORE INSERT ON orders FOR EACH ROW EXECUTE FUNCTION touch()"
+    )
+    op.execute(
+        "CREATE VIEW open_orders AS SELECT o.id, i.name || ':' || o.state::text AS label "
+        "FROM orders o JOIN items i ON i.id = o.item_id WHERE o.state = 'open'::order_state"
+    )
+    op.execute(
+        "INSERT INTO items (name, price, ratio) "
+        "VALUES ('colon \\\\:name', 1.5, '3:4'), ('percent %s', 2, DEFAULT)"
+    )
+    op.execute("INSERT INTO orders (item_id, quantity) SELECT id, 0 FROM items")
+    op.execute("SELECT nextval('tickets')")
+
+
+def downgrade():
+    op.drop_table("orders")
+    op.drop_table("items")
+'''
+
+CATALOG = {
+    "columns": """SELECT c.relname, a.attname, format_type(a.atttypid, a.atttypmod),
+        a.attnotnull, a.attidentity, a.attgenerated, pg_get_expr(d.adbin, d.adrelid)
+        FROM pg_attribute a JOIN pg_class c ON c.oid = a.attrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        LEFT JOIN pg_attrdef d ON d.adrelid = c.oid AND d.adnum = a.attnum
+        WHERE n.nspname = :schema AND a.attnum > 0 AND NOT a.attisdropped""",
+    "relations": """SELECT c.relname, c.relkind, c.relpersistence FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace WHERE n.nspname = :schema""",
+    "constraints": """SELECT co.conname, co.contype, pg_get_constraintdef(co.oid)
+        FROM pg_constraint co
+        JOIN pg_namespace n ON n.oid = co.connamespace WHERE n.nspname = :schema""",
+    "indexes": "SELECT indexname, indexdef FROM pg_indexes WHERE schemaname = :schema",
+    "sequences": """SELECT sequencename, data_type, start_value, increment_by, last_value
+        FROM pg_sequences WHERE schemaname = :schema""",
+    "functions": """SELECT pg_get_functiondef(p.oid) FROM pg_proc p
+        JOIN pg_namespace n ON n.oid = p.pronamespace WHERE n.nspname = :schema""",
+    "triggers": """SELECT pg_get_triggerdef(t.oid) FROM pg_trigger t
+        JOIN pg_class c ON c.oid = t.tgrelid JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = :schema AND NOT t.tgisinternal""",
+    "views": """SELECT c.relname, pg_get_viewdef(c.oid) FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = :schema AND c.relkind IN ('v', 'm')""",
+    "types": """SELECT t.typname, e.enumlabel, e.enumsortorder FROM pg_enum e
+        JOIN pg_type t ON t.oid = e.enumtypid JOIN pg_namespace n ON n.oid = t.typnamespace
+        WHERE n.nspname = :schema""",
+}
+
+
+@pytest.fixture
+def sync_engine() -> Iterator[Engine]:
+    """A synchronous engine on the test database, for the migrations."""
+    engine = create_engine(async_test_engine.url.render_as_string(hide_password=False))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def schemas(sync_engine: Engine) -> Iterator[Dict[str, str]]:
+    """The names of the template, replayed and cloned schemas of a test, dropped once it ran."""
+    suffix = uuid.uuid4().hex[:8]
+    names = {kind: f"{kind}_{suffix}" for kind in ("template", "replayed", "cloned")}
+    yield names
+    with sync_engine.begin() as connection:
+        for schema in names.values():
+            connection.execute(text(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE'))
+
+
+def _replay(connection: Connection, versions: Path, schema: str) -> None:
+    """Create a schema and replay the migrations in it, through the environment of the project."""
+    connection.execute(text(f'CREATE SCHEMA "{schema}"'))
+    connection.execute(text(f'SET search_path TO "{schema}"'))
+    connection.commit()
+    connection.dialect.default_schema_name = schema
+    config = alembic_config()
+    config.set_main_option("version_locations", str(versions))
+    config.set_main_option("path_separator", "os")
+    config.attributes.update(connection=connection, configure_logger=False)
+    with connection.begin():
+        command.upgrade(config, "head")
+
+
+def _catalog(connection: Connection, schema: str) -> Dict[str, List]:
+    """Returns the objects and rows of a schema, with its name replaced."""
+    # Every name of the schema is qualified in the definitions, whatever the schema.
+    connection.execute(text("SET search_path TO pg_catalog"))
+    catalog = {}
+    for name, query in CATALOG.items():
+        rows = connection.execute(text(query), {"schema": schema}).all()
+        catalog[name] = sorted(
+            tuple(str(value).replace(schema, "<schema>") for value in row) for row in rows
+        )
+    for table in ("items", "orders", "alembic_version"):
+        rows = connection.execute(text(f'SELECT * FROM "{schema}"."{table}" ORDER BY 1'))
+        catalog[table] = [tuple(row) for row in rows]
+    connection.rollback()
+    return catalog
+
+
+@pytest.mark.asyncio
+async def test_clone_schema(
+    schemas: Dict[str, str], sync_engine: Engine, db_session: AsyncSession, tmp_path: Path
+):
+    """Test that a cloned schema has the same catalog and rows as a schema which replayed the
+    migrations, with the casts and colons of its definitions and values intact."""
+    (tmp_path / f"{REVISION}_items.py").write_text(MIGRATION)
+    with sync_engine.connect() as connection:
+        _replay(connection, tmp_path, schemas["template"])
+        _replay(connection, tmp_path, schemas["replayed"])
+
+    await clone_schema(db_session, schemas["template"], schemas["cloned"])
+    await db_session.commit()
+
+    assert await schema_revision(db_session, schemas["cloned"]) == REVISION
+    with sync_engine.connect() as connection:
+        replayed = _catalog(connection, schemas["replayed"])
+        cloned = _catalog(connection, schemas["cloned"])
+    assert ("items", "ratio", "text", "False", "", "", "'1:2'::text") in cloned["columns"]
+    assert [row[1:3] for row in cloned["items"]] == [("colon :name", 1.5), ("percent %s", 2)]
+    for name in replayed:
+        assert cloned[name] == replayed[name], name
+
+    await db_session.execute(
+        text(f'INSERT INTO "{schemas["cloned"]}".orders (item_id, quantity) VALUES (1, 0)')
+    )
+    order = await db_session.execute(
+        text(f'SELECT id, quantity FROM "{schemas["cloned"]}".orders ORDER BY id DESC LIMIT 1')
+    )
+    assert tuple(order.one()) == (3, 1)
+    await db_session.rollback()
+
+
+@pytest.mark.asyncio
+async def test_clone_schema_unsupported(
+    schemas: Dict[str, str], sync_engine: Engine, db_session: AsyncSession
+):
+    """Test that a template holding an object which cannot be cloned raises a CloneError before
+    the new schema is created."""
+    template = schemas["template"]
+    with sync_engine.begin() as connection:
+        connection.execute(text(f'CREATE SCHEMA "{template}"'))
+        connection.execute(
+            text(f'CREATE DOMAIN "{template}".positive AS integer CHECK (VALUE > 0)')
+        )
+
+    with pytest.raises(CloneError, match="type positive"):
+        await clone_schema(db_session, template, schemas["cloned"])
+    await db_session.rollback()
+    assert (
+        await db_session.scalar(
+            text("SELECT to_regnamespace(:schema)"), {"schema": f'"{schemas["cloned"]}"'}
+        )
+        is None
+    )
@@ -1,6 +1,8 @@
 """This module contains pytest fixtures and utility functions for setting up and tearing down test
-databases, creating database sessions, and mocking functions for testing purposes."""
+databases, creating database sessions, opening the sessions of tasks on the test database,
+replacing Redis with an in-memory server, and mocking functions for testing purposes."""
 
+import asyncio
 import os
 from typing import Optional
 from unittest.mock import MagicMock
@@ -8,10 +10,14 @@ from urllib.parse import urlparse
 
 import pytest_asyncio
 from faker import Faker
+from fakeredis import FakeAsyncRedis, FakeServer
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
+# The models are registered on the metadata, so every table is created whichever tests run.
+from azra_store_lmi_api.apps.admin import models  # noqa: F401
+from azra_store_lmi_api.config import database, redis
 from azra_store_lmi_api.core.enums import OrderByType
 from azra_store_lmi_api.models import BaseModal
 
@@ -70,6 +76,20 @@ async def db_session():
         yield session
 
 
+@pytest_asyncio.fixture
+async def db_context(monkeypatch):
+    """Open the sessions of get_db_context on the test database.
+
+    Tasks and background jobs open their own sessions with get_db_context, outside of the
+    dependency overridden for requests.
+    """
+    monkeypatch.setattr(
+        database,
+        "async_session",
+        sessionmaker(async_test_engine, class_=AsyncSession, expire_on_commit=False),
+    )
+
+
 async def override_session_dependency():
     """Create and yield an override database session.
 
@@ -84,6 +104,24 @@ async def override_session_dependency():
         yield session
 
 
+@pytest_asyncio.fixture
+async def fake_redis():
+    """Serve the Redis client of the running event loop from an empty in-memory server.
+
+    Without this fixture Redis is unavailable in tests, and the code under test takes its
+    fallback path.
+
+    Yields:
+        FakeAsyncRedis: The Redis client returned by get_redis.
+    """
+    loop = asyncio.get_running_loop()
+    client = FakeAsyncRedis(server=FakeServer())
+    redis._clients[loop] = client
+    yield client
+    redis._clients.pop(loop, None)
+    await client.aclose()
+
+
 @pytest_asyncio.fixture
 async def mocker(monkeypatch):
     """A fixture to mock functions and add return values or side effects.
@@ -0,0 +1,119 @@
+"""Module for conditional GET requests.
+
+Responses carry an ``ETag`` and a ``Last-Modified`` header derived from the ``updated_at`` column
+of the rows they are built from. A client sending them back in ``If-None-Match`` or
+``If-Modified-Since`` gets an empty ``304 Not Modified`` response if the rows did not change, so
+the view can answer from the validator alone, without loading or serializing the rows.
+
+Following RFC 9110, ``If-Modified-Since`` is ignored when ``If-None-Match`` is present, and
+``If-None-Match`` uses the weak comparison.
+
+Classes:
+    Validator: The ETag and last modification time of a response.
+
+Functions:
+    is_not_modified: Whether a request can be answered with 304 Not Modified.
+    not_modified_response: Returns a 304 Not Modified response.
+"""
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, NamedTuple, Optional
+
+from fastapi import Request, Response, status
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class Validator(NamedTuple):
+    """The ETag and last modification time of a response.
+
+    Attributes:
+        etag (str): The entity tag, prefixed with ``W/`` if it is weak.
+        last_modified (datetime): The time the response last changed.
+    """
+
+    etag: str
+    last_modified: datetime
+
+    @classmethod
+    def strong(cls, key: str, updated_at: datetime) -> "Validator":
+        """Returns the strong validator of a single row.
+
+        Args:
+            key (str): The identifier of the row in its table.
+            updated_at (datetime): The time the row was last updated.
+
+        Returns:
+            Validator: The validator.
+        """
+        return cls(f'"{key}.{_timestamp(updated_at):x}"', updated_at)
+
+    @classmethod
+    def weak(cls, count: int, updated_at: Optional[datetime]) -> "Validator":
+        """Returns the weak validator of a collection of rows.
+
+        Args:
+            count (int): The number of rows of the collection.
+            updated_at (Optional[datetime]): The time the last updated row of the collection was
+                updated, None if the collection is empty.
+
+        Returns:
+            Validator: The validator.
+        """
+        updated_at = updated_at or _EPOCH
+        return cls(f'W/"{count}.{_timestamp(updated_at):x}"', updated_at)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """Dict[str, str]: The ETag and Last-Modified headers of the response."""
+        return {
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(
+                self.last_modified.astimezone(timezone.utc), usegmt=True
+            ),
+        }
+
+
+def _timestamp(value: datetime) -> int:
+    """Returns a datetime as microseconds since the epoch."""
+    return (value - _EPOCH) // timedelta(microseconds=1)
+
+
+def is_not_modified(request: Request, validator: Validator) -> bool:
+    """Whether a request can be answered with 304 Not Modified.
+
+    Args:
+        request (Request): The incoming request.
+        validator (Validator): The validator of the current response.
+
+    Returns:
+        bool: True if the client already has the current response.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        etags = {etag.strip().removeprefix("W/") for etag in if_none_match.split(",")}
+        return "*" in etags or validator.etag.removeprefix("W/") in etags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have a precision of one second.
+    return validator.last_modified.replace(microsecond=0) <= since
+
+
+def not_modified_response(validator: Validator) -> Response:
+    """Returns a 304 Not Modified response.
+
+    Args:
+        validator (Validator): The validator of the current response.
+
+    Returns:
+        Response: The empty response, with the ETag and Last-Modified headers.
+    """
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=validator.headers)
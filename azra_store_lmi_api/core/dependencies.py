@@ -16,7 +16,11 @@ async def paginator_query_params(
     order_by: Literal[*OrderByType.values()] = Query(default=OrderByType.ASC.value),
 ):
     """Common dependency for the paginator query param."""
-    return {"page": page, "size": size, "order_by": asc if order_by == OrderByType.ASC else desc}
+    return {
+        "page": page,
+        "size": size,
+        "order_by": asc if order_by == OrderByType.ASC.value else desc,
+    }
 
 
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
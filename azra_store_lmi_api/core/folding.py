@@ -0,0 +1,78 @@
+"""Module for accent and case insensitive matching of names.
+
+Names are compared in their folded form: case folded, without accents, and with every run of
+punctuation and spaces replaced by a single space, so ``"Saint-Étienne"`` and ``"saint etienne"``
+are equal.
+
+``fold_sql`` is the closest equivalent in SQL built from immutable functions only, so it can be
+used in an index expression. It maps accented Latin letters to their base letter and punctuation
+to a space, but does not expand ligatures such as ``"æ"`` or collapse spaces.
+
+Functions:
+    fold: Returns the folded form of a text.
+    fold_sql: Returns the SQL expression folding a string column.
+"""
+
+import re
+import unicodedata
+
+from sqlalchemy import func, literal_column
+from sqlalchemy.sql.elements import ColumnElement
+
+# Letters without a canonical decomposition to their base letter.
+_LETTERS = str.maketrans(
+    {"ø": "o", "đ": "d", "ð": "d", "ł": "l", "ħ": "h", "ı": "i", "æ": "ae", "œ": "oe", "þ": "th"}
+)
+_SEPARATORS = re.compile(r"[\W_]+")
+_PUNCTUATION = "-'’.,/()"
+
+
+def fold(text: str) -> str:
+    """Returns the folded form of a text.
+
+    Args:
+        text (str): The text to fold.
+
+    Returns:
+        str: The text case folded, without accents, and with its words separated by one space.
+    """
+    if text.isascii():
+        return _SEPARATORS.sub(" ", text.lower()).strip()
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    letters = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _SEPARATORS.sub(" ", letters.translate(_LETTERS)).strip()
+
+
+def _translation() -> tuple:
+    """Returns the characters replaced by ``fold_sql`` and their replacements."""
+    source, target = [], []
+    for code_point in range(0xC0, 0x250):
+        char = chr(code_point)
+        folded = fold(char)
+        if len(folded) == 1 and folded.isascii() and folded != char.lower():
+            source.append(char)
+            target.append(folded)
+    source.extend(_PUNCTUATION)
+    target.extend(" " * len(_PUNCTUATION))
+    return "".join(source), "".join(target)
+
+
+_SQL_SOURCE, _SQL_TARGET = _translation()
+
+
+def _sql_string(value: str) -> ColumnElement:
+    """Returns a string constant rendered inline, so an index expression matches queries."""
+    return literal_column("'" + value.replace("'", "''") + "'")
+
+
+def fold_sql(column: ColumnElement) -> ColumnElement:
+    """Returns the SQL expression folding a string column.
+
+    Args:
+        column (ColumnElement): The string column.
+
+    Returns:
+        ColumnElement: The column lower cased, without accents, and with punctuation replaced by
+            spaces.
+    """
+    return func.translate(func.lower(column), _sql_string(_SQL_SOURCE), _sql_string(_SQL_TARGET))
@@ -12,12 +12,21 @@ import sys
 from logging.config import fileConfig
 
 from alembic import context
+from alembic.runtime.migration import MigrationContext
 from sqlalchemy import text
 from sqlalchemy.engine import Connection
 
 from azra_store_lmi_api.apps.admin.models import *  # noqa: F403
 from azra_store_lmi_api.config.database import Base, async_engine
+from azra_store_lmi_api.config.outbox import OutboxMessage  # noqa: F401
+from azra_store_lmi_api.config.scheduler import JobRun  # noqa: F401
 from azra_store_lmi_api.config.settings import settings
+from azra_store_lmi_api.config.tenancy import (  # noqa: F401
+    Tenant,
+    active_tenants,
+    revision_key,
+    set_tenant_revision,
+)
 
 # Add configuration to use windows compatible event loop
 if sys.platform == "win32":
@@ -31,7 +40,7 @@ config.set_main_option("sqlalchemy.url", str(settings.DATABASE_URL))
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
-if config.config_file_name is not None:
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
     fileConfig(config.config_file_name)
 
 # add your model's MetaData object here
@@ -53,6 +62,7 @@ async def run_migrations_for_tenant(connection, schema_name):
     1. Sets the search path to the specified schema.
     2. Creates or updates tenant-specific views.
     3. Runs migrations for the schema.
+    4. Records the revision of the schema in the tenant registry.
 
     Args:
         connection: The database connection to use for migrations.
@@ -60,6 +70,7 @@ async def run_migrations_for_tenant(connection, schema_name):
     """
     await set_search_path(connection, schema_name)
     await run_migrations_for_schema(connection)
+    await record_tenant_revision(connection, schema_name)
 
 
 def run_migrations_offline() -> None:
@@ -112,16 +123,33 @@ async def run_migrations_for_schema(connection) -> None:
     await connection.run_sync(do_run_migrations)
 
 
+async def record_tenant_revision(connection, schema: str) -> None:
+    """Record the revision of a tenant schema in the registry, once the registry exists."""
+    if (
+        schema == "public"
+        or await connection.scalar(text("SELECT to_regclass('public.tenants')")) is None
+    ):
+        return
+    heads = await connection.run_sync(
+        lambda sync_connection: MigrationContext.configure(sync_connection).get_current_heads()
+    )
+    await connection.execute(set_tenant_revision(schema, revision_key(heads)))
+    await connection.commit()
+
+
 async def fetch_db_schemas(connection) -> list:
-    """Fetch the list of schemas from the database."""
-    return (
-        await connection.scalars(
-            text(
-                """SELECT schema_name FROM information_schema.schemata
-                where schema_name not in ('pg_catalog', 'information_schema', 'pg_toast')"""
-            )
-        )
-    ).all()
+    """Fetch the list of schemas to migrate: public, the template of the tenant schemas, then the
+    active tenants of the registry.
+
+    The registry is only read once it exists, before the first migration of the public schema
+    only the public schema is migrated.
+    """
+    if await connection.scalar(text("SELECT to_regclass('public.tenants')")) is None:
+        return ["public"]
+    template = settings.TENANT_TEMPLATE_SCHEMA
+    await connection.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{template}"'))
+    await connection.commit()
+    return ["public", template, *(await connection.scalars(active_tenants())).all()]
 
 
 async def run_async_migrations() -> None:
@@ -133,24 +161,25 @@ async def run_async_migrations() -> None:
         user_schema_name = context.get_x_argument(as_dictionary=True).get("tenant")
         async with connectable.connect() as connection:
             if user_schema_name is None:
-                schema_list = await fetch_db_schemas(connection)
-                if len(schema_list) > 0:
-                    for schema in schema_list:
-                        await run_migrations_for_tenant(connection, schema)
-                else:
-                    print("No schemas found in the database. Skipping migrations.")
+                for schema in await fetch_db_schemas(connection):
+                    await run_migrations_for_tenant(connection, schema)
             else:
                 await run_migrations_for_tenant(connection, user_schema_name)
-    except Exception as error:
-        print(error)
     finally:
         await connectable.dispose()
 
 
 def run_migrations_online() -> None:
-    """Run migrations in 'online' mode."""
+    """Run migrations in 'online' mode.
 
-    asyncio.run(run_async_migrations())
+    The parallel tenant migrations pass the connection of their worker, with the search path
+    already set to the schema, see ``config/tenant_migrations.py``.
+    """
+    connection = config.attributes.get("connection")
+    if connection is None:
+        asyncio.run(run_async_migrations())
+    else:
+        do_run_migrations(connection)
 
 
 if context.is_offline_mode():
@@ -18,7 +18,7 @@ class BaseModal(Base, AsyncAttrs):
     updated_at = mapped_column(
         DateTime(timezone=True),
         server_default=func.now(),
-        server_onupdate=func.now(),
+        onupdate=func.now(),
         nullable=False,
     )
 
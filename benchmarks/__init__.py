@@ -0,0 +1,10 @@
+"""Benchmarks for the AZRA Store LMI API.
+
+Each module in this package is a standalone script that can be run with ``python -m``, for
+example::
+
+    python -m benchmarks.mail_transport --messages 500
+
+The scripts load the application settings, so they should be run from the project root with the
+same ``.env`` file used by the application.
+"""
@@ -0,0 +1,79 @@
+"""Benchmark the per call overhead of async Celery tasks.
+
+Runs a no-op task and a task executing ``SELECT 1`` in the worker process, first with
+``AsyncToSync`` creating an event loop for every call, then on the persistent event loop of the
+worker runtime. SQLAlchemy does not support using an async connection from another event loop
+than the one that opened it, which pooled connections do with ``AsyncToSync``, so the database task
+is also measured disposing the engine after every call, which is the supported way.
+
+Usage:
+    python -m benchmarks.celery_tasks --calls 2000
+"""
+
+import argparse
+import logging
+import time
+from typing import Callable
+
+from sqlalchemy import text
+
+from azra_store_lmi_api.config.celery import async_task
+from azra_store_lmi_api.config.celery.runtime import worker_runtime
+from azra_store_lmi_api.config.database import async_engine, get_db_context
+from azra_store_lmi_api.config.logger.app import logger
+
+
+@async_task()
+async def noop_task() -> None:
+    """Do nothing."""
+
+
+@async_task()
+async def select_task() -> int:
+    """Execute ``SELECT 1`` on a session from the shared engine."""
+    async with get_db_context() as session:
+        return await session.scalar(text("SELECT 1"))
+
+
+@async_task()
+async def select_task_disposing() -> int:
+    """Execute ``SELECT 1`` and dispose the engine, as needed when every call has its own loop."""
+    try:
+        async with get_db_context() as session:
+            return await session.scalar(text("SELECT 1"))
+    finally:
+        await async_engine.dispose()
+
+
+def measure(call: Callable[[], object], calls: int) -> float:
+    """Call a task body in process and return the cost per call in microseconds."""
+    call()
+    started = time.perf_counter()
+    for _ in range(calls):
+        call()
+    return (time.perf_counter() - started) / calls * 1_000_000
+
+
+def main(calls: int) -> None:
+    """Print the per call cost of every task with and without the worker runtime."""
+    print(f"{'':<26} {'AsyncToSync':>14} {'worker runtime':>16}")
+    for name, per_call, shared in (
+        ("no-op", noop_task, noop_task),
+        ("SELECT 1 (pooled)", select_task, select_task),
+        ("SELECT 1 (disposed)", select_task_disposing, select_task),
+    ):
+        loop_per_call = measure(per_call, calls)
+        worker_runtime.start()
+        try:
+            persistent = measure(shared, calls)
+        finally:
+            worker_runtime.stop()
+        print(f"{name:<26} {loop_per_call:11.1f} us {persistent:13.1f} us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+    main(args.calls)
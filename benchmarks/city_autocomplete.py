@@ -0,0 +1,130 @@
+"""Benchmark the city autocomplete at typing rates.
+
+Simulates users of the store onboarding form typing the name of a city, one request per
+keystroke, with a country or a state already selected for two thirds of them. The keystrokes are
+first searched in the prefix index of the reference data snapshot directly, then sent to the
+endpoint at a fixed arrival rate, searching the snapshot and then the database. Requests are sent
+on schedule whether or not the previous ones were answered, so the latencies include the time
+spent waiting to be served.
+
+The cities are read from the database of the application, loaded with ``load_geo_data``.
+
+Usage:
+    python -m benchmarks.city_autocomplete --users 200 --rate 250
+"""
+
+import argparse
+import asyncio
+import logging
+import math
+import random
+import time
+from typing import List, Optional, Tuple
+
+from httpx import ASGITransport, AsyncClient
+
+from azra_store_lmi_api.apps.admin.reference_data import ReferenceData, reference_data
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.config.settings import settings
+from main import app
+
+# The query, state id and country id of a keystroke.
+Keystroke = Tuple[str, Optional[int], Optional[int]]
+
+
+def build_keystrokes(snapshot: ReferenceData, users: int, seed: int) -> List[Keystroke]:
+    """Build the keystrokes of users typing the first letters of random cities."""
+    randomizer = random.Random(seed)
+    cities = snapshot.cities.all()
+    keystrokes = []
+    for _ in range(users):
+        city = randomizer.choice(cities)
+        state_id, country_id = None, None
+        scope = randomizer.randrange(3)
+        if scope == 1:
+            state_id = city.state_id
+        elif scope == 2:
+            country_id = snapshot.states.parent_of(city.state_id)
+        for length in range(1, min(len(city.name), randomizer.randint(3, 8)) + 1):
+            keystrokes.append((city.name[:length], state_id, country_id))
+    return keystrokes
+
+
+def percentile(latencies: List[float], fraction: float) -> float:
+    """Returns a percentile of the latencies."""
+    ordered = sorted(latencies)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def report(name: str, latencies: List[float], elapsed: float, errors: int = 0) -> None:
+    """Print the throughput, latency percentiles in milliseconds and errors of a run."""
+    print(
+        f"{name:<22} {len(latencies) / elapsed:10.0f} {percentile(latencies, 0.5) * 1000:9.3f} "
+        f"{percentile(latencies, 0.99) * 1000:9.3f} {max(latencies) * 1000:9.3f} {errors:7}"
+    )
+
+
+def search_index(snapshot: ReferenceData, keystrokes: List[Keystroke], limit: int) -> None:
+    """Search every keystroke in the prefix index of the snapshot."""
+    latencies = []
+    started = time.perf_counter()
+    for query, state_id, country_id in keystrokes:
+        call_started = time.perf_counter()
+        snapshot.city_names.search(query, limit, state_id, country_id)
+        latencies.append(time.perf_counter() - call_started)
+    report("index", latencies, time.perf_counter() - started)
+
+
+async def send_keystrokes(
+    client: AsyncClient, name: str, keystrokes: List[Keystroke], rate: float, limit: int
+) -> None:
+    """Send every keystroke to the endpoint at a fixed arrival rate."""
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    async def send(index: int, keystroke: Keystroke) -> Tuple[float, bool]:
+        scheduled = started + index / rate
+        await asyncio.sleep(scheduled - loop.time())
+        query, state_id, country_id = keystroke
+        params = {"q": query, "limit": limit}
+        if state_id is not None:
+            params["state_id"] = state_id
+        if country_id is not None:
+            params["country_id"] = country_id
+        response = await client.get("/cities/autocomplete", params=params)
+        return loop.time() - scheduled, response.is_success
+
+    results = await asyncio.gather(
+        *(send(index, keystroke) for index, keystroke in enumerate(keystrokes))
+    )
+    errors = sum(1 for _, success in results if not success)
+    report(name, [latency for latency, _ in results], loop.time() - started, errors)
+
+
+async def main(users: int, rate: float, limit: int, seed: int) -> None:
+    """Print the latency of the autocomplete from the index, and from the endpoint."""
+    snapshot = await reference_data.reload()
+    keystrokes = build_keystrokes(snapshot, users, seed)
+    print(f"{len(snapshot.cities)} cities, {len(keystrokes)} keystrokes at {rate:.0f}/s")
+    print(f"{'':<22} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}")
+    search_index(snapshot, keystrokes, limit)
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url=settings.ADMIN_APP_BASE_URL
+    ) as client:
+        await send_keystrokes(client, "endpoint (snapshot)", keystrokes, rate, limit)
+        settings.CITY_AUTOCOMPLETE_IN_MEMORY = False
+        try:
+            await send_keystrokes(client, "endpoint (database)", keystrokes, rate, limit)
+        finally:
+            settings.CITY_AUTOCOMPLETE_IN_MEMORY = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--rate", type=float, default=250, help="Keystrokes per second")
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+    asyncio.run(main(args.users, args.rate, args.limit, args.seed))
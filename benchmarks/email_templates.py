@@ -0,0 +1,71 @@
+"""Benchmark the per message cost of rendering email templates.
+
+Compares rendering the plain text and HTML parts with the process wide compiled renderer against
+compiling the templates again for every message, with the previous inline f-string as a baseline.
+
+Usage:
+    python -m benchmarks.email_templates --batch-sizes 1000 5000 10000
+"""
+
+import argparse
+import time
+from typing import Callable
+
+from azra_store_lmi_api.config.mailer.templates import EmailTemplateRenderer, email_templates
+
+
+def build_context(index: int) -> dict:
+    """Build the template context of one message."""
+    return {
+        "username": f"admin_{index}",
+        "email": f"admin_{index}@example.com",
+        "password": f"Secret#{index:06d}",
+    }
+
+
+def render_fstring(index: int) -> None:
+    """Render the body the way send_saas_admin_credentials did before templates."""
+    context = build_context(index)
+    _ = (
+        f"See your credentials \nusername: {context['username']}\n"
+        f"email: {context['email']}\npassword: {context['password']}"
+    )
+
+
+def render_compiled(index: int) -> None:
+    """Render both parts with the shared, already compiled renderer."""
+    email_templates.render("saas_admin_credentials", build_context(index))
+
+
+def render_uncached(index: int) -> None:
+    """Render both parts with a new renderer, compiling every template again."""
+    EmailTemplateRenderer().render("saas_admin_credentials", build_context(index))
+
+
+def measure(render: Callable[[int], None], batch_size: int) -> float:
+    """Render a batch and return the cost per message in microseconds."""
+    started = time.perf_counter()
+    for index in range(batch_size):
+        render(index)
+    return (time.perf_counter() - started) / batch_size * 1_000_000
+
+
+def main(batch_sizes: list) -> None:
+    """Print the per message render cost of every strategy for every batch size."""
+    email_templates.compile_all()
+    strategies = (
+        ("inline f-string (plain only)", render_fstring),
+        ("compiled templates", render_compiled),
+        ("recompiled per message", render_uncached),
+    )
+    for batch_size in batch_sizes:
+        print(f"batch of {batch_size} messages")
+        for name, render in strategies:
+            print(f"  {name:<30} {measure(render, batch_size):10.1f} us/message")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1000, 5000, 10000])
+    args = parser.parse_args()
+    main(args.batch_sizes)
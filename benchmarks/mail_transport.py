@@ -0,0 +1,113 @@
+"""Benchmark the SMTP transport against a local SMTP sink.
+
+Compares the previous transport, which opened a blocking ``smtplib`` connection and logged in for
+every email, with the pooled asynchronous ``SMTPMail``. The ``SpoolMail`` transport, which needs no
+server, is measured as the upper bound of the pipeline and checked with ``SpoolReader``.
+
+Usage:
+    python -m benchmarks.mail_transport --messages 500 --concurrency 10 --latency 0.005
+"""
+
+import argparse
+import asyncio
+import logging
+import smtplib
+import tempfile
+import time
+
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.config.mailer.base import BaseMail
+from azra_store_lmi_api.config.mailer.pool import close_smtp_pools
+from azra_store_lmi_api.config.mailer.smtp import SMTPMail
+from azra_store_lmi_api.config.mailer.spool import SpoolMail, SpoolReader
+from benchmarks.smtp_sink import SMTPSink
+
+
+def build_message(index: int) -> dict:
+    """Build the message dictionary sent by every benchmark run."""
+    return {
+        "from_": ("AZRA Bills Admin", "admin@example.com"),
+        "to": [f"store-{index}@example.com"],
+        "cc": None,
+        "bcc": None,
+        "subject": "Benchmark",
+        "content": {"plain": "Your order is ready for pickup."},
+        "attachments": {},
+    }
+
+
+async def send_blocking(port: int, messages: int, concurrency: int) -> None:
+    """Send every message over a new blocking connection, like the previous transport."""
+    mail = BaseMail()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _send(index: int) -> None:
+        async with semaphore:
+            email = await mail._build_email(build_message(index))
+            with smtplib.SMTP("127.0.0.1", port) as server:
+                server.ehlo()
+                server.login("user", "password")
+                server.send_message(email)
+
+    await asyncio.gather(*(_send(index) for index in range(messages)))
+
+
+async def send_pooled(port: int, messages: int, concurrency: int) -> None:
+    """Send every message through the pooled asynchronous transport."""
+    mail = SMTPMail(
+        hostname="127.0.0.1", port=port, username="user", password="password", use_ssl=False
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def _send(index: int) -> None:
+        async with semaphore:
+            await mail.send(build_message(index))
+
+    await asyncio.gather(*(_send(index) for index in range(messages)))
+    await close_smtp_pools()
+
+
+async def send_spooled(messages: int, concurrency: int) -> None:
+    """Send every message to a temporary spool and check they can all be found by recipient."""
+    with tempfile.TemporaryDirectory() as path:
+        mail = SpoolMail(path)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _send(index: int) -> None:
+            async with semaphore:
+                await mail.send(build_message(index))
+
+        await asyncio.gather(*(_send(index) for index in range(messages)))
+        reader = SpoolReader(path)
+        assert len(reader) == messages
+        assert all(reader.count(f"store-{index}@example.com") == 1 for index in range(messages))
+
+
+async def main(messages: int, concurrency: int, latency: float) -> None:
+    """Run both transports against a fresh sink and print the results."""
+    for name, runner in (("blocking smtplib", send_blocking), ("pooled aiosmtplib", send_pooled)):
+        sink = SMTPSink(latency=latency)
+        port = sink.start()
+        started = time.perf_counter()
+        await runner(port, messages, concurrency)
+        elapsed = time.perf_counter() - started
+        sink.stop()
+        print(
+            f"{name:<20} {messages} messages in {elapsed:.3f}s "
+            f"({messages / elapsed:.1f} msg/s, {sink.connections} connections)"
+        )
+    started = time.perf_counter()
+    await send_spooled(messages, concurrency)
+    elapsed = time.perf_counter() - started
+    name = "spool file"
+    print(f"{name:<20} {messages} messages in {elapsed:.3f}s ({messages / elapsed:.1f} msg/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.002, help="Seconds per SMTP reply")
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+    asyncio.run(main(args.messages, args.concurrency, args.latency))
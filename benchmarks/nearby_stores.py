@@ -0,0 +1,161 @@
+"""Benchmark the in-process spatial index of the store locations against a linear scan.
+
+Generates stores clustered around cities, as branches are, with a few spread over the country,
+builds the KD-tree of ``store_locations`` and times searches from random points near the cities:
+the nearest stores, the stores within a radius, and the nearest stores offering a service. Every
+search is also answered by computing the distance of every store, as a query without a spatial
+index does, and both answers are checked to be the same stores.
+
+Usage:
+    python -m benchmarks.nearby_stores --stores 50000 --searches 2000
+"""
+
+import argparse
+import heapq
+import random
+import statistics
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+from azra_store_lmi_api.apps.admin.models.store import StoreServiceEnum, StoreSubServiceEnum
+from azra_store_lmi_api.apps.admin.store_locations import (
+    StoreLocationIndex,
+    _distance,
+    _squared_chord,
+    _to_point,
+)
+from azra_store_lmi_api.apps.admin.store_search import (
+    ServiceMatcher,
+    service_mask,
+    service_matcher,
+)
+
+# The latitude and longitude of the cities the stores are clustered around.
+CITIES = [
+    (9.93, 76.27),
+    (13.08, 80.27),
+    (12.97, 77.59),
+    (19.08, 72.88),
+    (28.61, 77.21),
+    (22.57, 88.36),
+    (17.39, 78.49),
+    (23.02, 72.57),
+]
+
+# The name, limit, radius in kilometers, and services of the searches.
+SEARCHES: List[Tuple[str, int, Optional[float], List[int]]] = [
+    ("10 nearest", 10, None, []),
+    ("within 5 km, up to 100", 100, 5.0, []),
+    ("10 nearest wholesale", 10, None, [StoreServiceEnum.SELLING_WHOLESALE.value]),
+]
+
+Store = Tuple[str, float, float, List[int], List[int]]
+
+
+def build_stores(count: int, randomizer: random.Random) -> List[Store]:
+    """Build the rows of the stores, nine in ten of them within about 20 km of a city."""
+    services = [
+        value for value in StoreServiceEnum.values() if value != StoreServiceEnum.ALL.value
+    ]
+    stores = []
+    for index in range(count):
+        if randomizer.random() < 0.9:
+            latitude, longitude = randomizer.choice(CITIES)
+            latitude += randomizer.gauss(0, 0.1)
+            longitude += randomizer.gauss(0, 0.1)
+        else:
+            latitude, longitude = randomizer.uniform(8, 30), randomizer.uniform(70, 90)
+        stores.append(
+            (
+                f"STORE{index:021d}",
+                latitude,
+                longitude,
+                randomizer.sample(services, randomizer.randint(1, 2)),
+                randomizer.sample(StoreSubServiceEnum.values(), randomizer.randint(1, 6)),
+            )
+        )
+    return stores
+
+
+def scan(
+    stores: List[Store],
+    latitude: float,
+    longitude: float,
+    limit: int,
+    radius: Optional[float],
+    matcher: Optional[ServiceMatcher],
+) -> List[str]:
+    """Returns the ids of the nearest stores, computing the distance of every store."""
+    query_x, query_y, query_z = _to_point(latitude, longitude)
+    maximum = 4.0 if radius is None else _squared_chord(radius)
+    candidates = []
+    for store_id, store_latitude, store_longitude, services, sub_services in stores:
+        if matcher is not None and not matcher(
+            service_mask(services), service_mask(sub_services, sub_services=True)
+        ):
+            continue
+        x, y, z = _to_point(store_latitude, store_longitude)
+        squared_chord = (x - query_x) ** 2 + (y - query_y) ** 2 + (z - query_z) ** 2
+        if squared_chord <= maximum:
+            candidates.append((_distance(squared_chord), store_id))
+    return [store_id for _, store_id in heapq.nsmallest(limit, candidates)]
+
+
+def timed(function: Callable[[], List[Any]]) -> Tuple[float, List[Any]]:
+    """Returns the seconds a call took, and its result."""
+    started = time.perf_counter()
+    result = function()
+    return time.perf_counter() - started, result
+
+
+def report(name: str, seconds: List[float], scan_seconds: List[float], found: int) -> None:
+    """Print the latencies of a search, with the index and with a scan."""
+    seconds, scan_seconds = sorted(seconds), sorted(scan_seconds)
+    p99 = seconds[int(len(seconds) * 0.99) - 1]
+    print(
+        f"{name:<26} {found / len(seconds):7.1f} {statistics.median(seconds) * 1000:9.3f} "
+        f"{p99 * 1000:9.3f} {statistics.median(scan_seconds) * 1000:9.1f} "
+        f"{statistics.median(scan_seconds) / statistics.median(seconds):9.0f}x"
+    )
+
+
+def main(stores: int, searches: int, scans: int, seed: int) -> None:
+    """Print the time to build the index and the latencies of the searches."""
+    randomizer = random.Random(seed)
+    rows = build_stores(stores, randomizer)
+    started = time.perf_counter()
+    index = StoreLocationIndex("benchmark", rows)
+    print(f"{len(index)} stores indexed in {time.perf_counter() - started:.2f}s")
+    points = [
+        (latitude + randomizer.gauss(0, 0.1), longitude + randomizer.gauss(0, 0.1))
+        for latitude, longitude in (randomizer.choice(CITIES) for _ in range(searches))
+    ]
+    print(
+        f"{'search':<26} {'stores':>7} {'p50 ms':>9} {'p99 ms':>9} {'scan ms':>9} {'speedup':>10}"
+    )
+    for name, limit, radius, services in SEARCHES:
+        matcher = service_matcher(services, [])
+        seconds, scan_seconds, found = [], [], 0
+        for number, (latitude, longitude) in enumerate(points):
+            elapsed, nearest = timed(
+                lambda: index.nearest(latitude, longitude, limit, radius, matcher)
+            )
+            seconds.append(elapsed)
+            found += len(nearest)
+            if number < scans:
+                elapsed, expected = timed(
+                    lambda: scan(rows, latitude, longitude, limit, radius, matcher)
+                )
+                scan_seconds.append(elapsed)
+                assert {store.store_id for store in nearest} == set(expected), (name, number)
+        report(name, seconds, scan_seconds, found)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stores", type=int, default=50000)
+    parser.add_argument("--searches", type=int, default=2000)
+    parser.add_argument("--scans", type=int, default=20, help="Searches also answered by a scan")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.stores, args.searches, args.scans, args.seed)
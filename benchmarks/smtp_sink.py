@@ -0,0 +1,107 @@
+"""A minimal local SMTP sink used by the mail benchmarks.
+
+The sink accepts EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP and QUIT and discards every message. An
+optional per-command latency simulates the network round trips of a remote provider, which is what
+makes reconnecting for every email expensive.
+
+The sink runs its own event loop in a background thread, so a client that blocks its loop (like a
+plain ``smtplib`` call) does not also block the server.
+"""
+
+import asyncio
+import threading
+from typing import Optional
+
+
+class SMTPSink:
+    """A local SMTP server that accepts and discards every message.
+
+    Attributes:
+        host (str): The interface to listen on.
+        port (int): The port to listen on, 0 picks a free port.
+        latency (float): Seconds to wait before answering each command.
+        connections (int): The number of connections accepted so far.
+        messages (int): The number of messages accepted so far.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+        """Initialize the sink.
+
+        Args:
+            host (str): The interface to listen on. Defaults to 127.0.0.1.
+            port (int): The port to listen on, 0 picks a free port. Defaults to 0.
+            latency (float): Seconds to wait before answering each command. Defaults to 0.
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.connections = 0
+        self.messages = 0
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    async def _reply(self, writer: asyncio.StreamWriter, line: str) -> None:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        writer.write(f"{line}\r\n".encode())
+        await writer.drain()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        await self._reply(writer, "220 sink ESMTP ready")
+        try:
+            while line := await reader.readline():
+                command = line.decode(errors="ignore").strip().upper()
+                if command.startswith("EHLO"):
+                    writer.write(b"250-sink\r\n250-AUTH PLAIN LOGIN\r\n")
+                    await self._reply(writer, "250 8BITMIME")
+                elif command.startswith("AUTH"):
+                    await self._reply(writer, "235 2.7.0 Authentication successful")
+                elif command == "DATA":
+                    await self._reply(writer, "354 End data with <CR><LF>.<CR><LF>")
+                    while (await reader.readline()) not in (b".\r\n", b""):
+                        pass
+                    self.messages += 1
+                    await self._reply(writer, "250 OK: queued")
+                elif command == "QUIT":
+                    await self._reply(writer, "221 Bye")
+                    break
+                else:
+                    await self._reply(writer, "250 OK")
+        except asyncio.CancelledError:
+            pass
+        finally:
+            writer.close()
+
+    def start(self) -> int:
+        """Start listening in a background thread.
+
+        Returns:
+            int: The port the sink is listening on.
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        self._server = asyncio.run_coroutine_threadsafe(
+            asyncio.start_server(self._handle, self.host, self.port), self._loop
+        ).result()
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def _cancel_handlers(self) -> None:
+        handlers = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in handlers:
+            task.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+
+    def stop(self) -> None:
+        """Stop listening and shut the background loop down."""
+        if self._server is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+            asyncio.run_coroutine_threadsafe(self._server.wait_closed(), self._loop).result()
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._cancel_handlers(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
@@ -0,0 +1,292 @@
+"""Benchmark the compiled store calendar against querying the holidays for every question.
+
+Creates the store and holiday tables in a scratch schema and fills it with synthetic stores, each
+with a few holidays of its own over a year, some of them partial days, and the public holidays of
+the year. Then answers the questions of the calendar endpoints: whether a store is open at a time,
+the closures of a page of stores over a month, and the stores closed on a day. Each is answered by
+the compiled calendar of ``store_calendar``, and by the queries of the holidays an endpoint without
+it would run, and both answers are checked to be the same. The scratch schema is dropped at the
+end.
+
+Without Redis the versions of the months are unknown, and the calendar compiles every month it
+reads, so the benchmark keeps the calendar compiled once, as a process does while the versions of
+the months it holds are current, and reports the time to compile a month apart.
+
+Usage:
+    python -m benchmarks.store_calendar --stores 5000 --questions 2000
+"""
+
+import argparse
+import asyncio
+import datetime
+import random
+import statistics
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from sqlalchemy import and_, insert, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from azra_store_lmi_api.apps.admin.models import Holiday, SAASAdmin, Store
+from azra_store_lmi_api.apps.admin.models.holiday import HolidayType
+from azra_store_lmi_api.apps.admin.store_calendar import (
+    StoreCalendar,
+    StoreCalendarCache,
+    _closure,
+    _merge,
+    to_seconds,
+)
+from azra_store_lmi_api.config.settings import settings
+from azra_store_lmi_api.models import BaseModal
+
+SCHEMA = "bench_store_calendar"
+
+TABLES = [model.__table__ for model in (SAASAdmin, Store, Holiday)]
+
+YEAR = 2027
+
+PUBLIC_HOLIDAYS = [(1, 26), (5, 1), (8, 15), (10, 2), (12, 25)]
+
+PAGE = 50
+
+
+def build_holidays(store_ids: List[str], randomizer: random.Random) -> List[Dict]:
+    """Build the rows of the holidays: about a dozen of every store, a fifth of them partial, and
+    the public holidays, recorded for the first store."""
+    holidays = [
+        {
+            "store_id": store_ids[0],
+            "date": datetime.date(YEAR, month, day),
+            "type": HolidayType.PUBLIC_HOLIDAY.value,
+            "reason": "Public holiday",
+        }
+        for month, day in PUBLIC_HOLIDAYS
+    ]
+    for store_id in store_ids:
+        for _ in range(randomizer.randint(6, 18)):
+            holiday = {
+                "store_id": store_id,
+                "date": datetime.date(YEAR, 1, 1)
+                + datetime.timedelta(days=randomizer.randrange(365)),
+                "type": HolidayType.STORE_HOLIDAY.value,
+                "reason": "Store holiday",
+                "from_time": None,
+                "to_time": None,
+            }
+            if randomizer.random() < 0.2:
+                hour = randomizer.randint(8, 16)
+                holiday["from_time"] = datetime.time(hour)
+                holiday["to_time"] = datetime.time(hour + randomizer.randint(1, 4))
+            holidays.append(holiday)
+    return holidays
+
+
+async def populate(connection: AsyncConnection, count: int, randomizer: random.Random) -> None:
+    """Create the tables in the scratch schema, first in the search path of the connection, and
+    insert the synthetic stores and holidays."""
+    await connection.execute(text(f'CREATE SCHEMA "{SCHEMA}"'))
+    await connection.execute(text(f'SET search_path TO "{SCHEMA}"'))
+    await connection.run_sync(
+        lambda sync: BaseModal.metadata.create_all(sync, tables=TABLES, checkfirst=False)
+    )
+    await connection.execute(
+        insert(SAASAdmin),
+        [
+            {
+                "id": 1,
+                "first_name": "Bench",
+                "last_name": "Admin",
+                "email": "bench@example.com",
+                "username": "bench",
+                "phone_number": "9876543210",
+                "password": "-",
+                "is_active": True,
+            }
+        ],
+    )
+    store_ids = [f"BENCH{index:021d}" for index in range(count)]
+    await connection.execute(
+        insert(Store),
+        [
+            {
+                "id": store_id,
+                "created_by_id": 1,
+                "name": f"Store {index}",
+                "unique_indentifier": f"bench_{index}",
+                "is_main_store": False,
+                "status": 20,
+                "path": store_id,
+            }
+            for index, store_id in enumerate(store_ids)
+        ],
+    )
+    await connection.execute(insert(Holiday), build_holidays(store_ids, randomizer))
+    await connection.commit()
+    await connection.execute(text(f'ANALYZE "{SCHEMA}"."holidays"'))
+    await connection.commit()
+
+
+def _closures(rows: List[Tuple[Any, ...]]) -> List[Tuple[int, int]]:
+    """Returns the merged closures of holiday rows of date, start and end time."""
+    return _merge(_closure(day, from_time, to_time) for day, from_time, to_time in rows)
+
+
+def _store_holidays(store_ids: List[str]) -> Any:
+    """Returns the condition of the holidays closing stores: their own and the public ones."""
+    return or_(Holiday.store_id.in_(store_ids), Holiday.type == HolidayType.PUBLIC_HOLIDAY.value)
+
+
+async def query_is_open(session: AsyncSession, store_id: str, at: datetime.datetime) -> bool:
+    """Returns whether a store is open, querying the holidays of the day."""
+    rows = await session.execute(
+        select(Holiday.date, Holiday.from_time, Holiday.to_time).where(
+            Holiday.date == at.date(), _store_holidays([store_id])
+        )
+    )
+    second = to_seconds(at)
+    return not any(start <= second < end for start, end in _closures(rows.all()))
+
+
+async def query_range(
+    session: AsyncSession, store_ids: List[str], start: datetime.date, end: datetime.date
+) -> Dict[str, List[Tuple[int, int]]]:
+    """Returns the closures of stores over a range, querying their holidays."""
+    rows = await session.execute(
+        select(Holiday.store_id, Holiday.type, Holiday.date, Holiday.from_time, Holiday.to_time)
+        .where(Holiday.date.between(start, end), _store_holidays(store_ids))
+        .order_by(Holiday.date)
+    )
+    public, own = [], {store_id: [] for store_id in store_ids}
+    for store_id, holiday_type, *holiday in rows.all():
+        if holiday_type == HolidayType.PUBLIC_HOLIDAY.value:
+            public.append(holiday)
+        elif store_id in own:
+            own[store_id].append(holiday)
+    return {store_id: _closures(public + holidays) for store_id, holidays in own.items()}
+
+
+async def query_closed(session: AsyncSession, day: datetime.date) -> Dict[str, int]:
+    """Returns the number of closures of every store closed on a day by its own holidays."""
+    rows = await session.execute(
+        select(Holiday.store_id, Holiday.date, Holiday.from_time, Holiday.to_time).where(
+            and_(Holiday.date == day, Holiday.type != HolidayType.PUBLIC_HOLIDAY.value)
+        )
+    )
+    closed: Dict[str, List[Tuple[Any, ...]]] = {}
+    for store_id, *holiday in rows.all():
+        closed.setdefault(store_id, []).append(holiday)
+    return {store_id: len(_closures(holidays)) for store_id, holidays in closed.items()}
+
+
+async def timed(function: Callable[[], Awaitable[Any]]) -> Tuple[float, Any]:
+    """Returns the seconds a call took, and its result."""
+    started = time.perf_counter()
+    result = await function()
+    return time.perf_counter() - started, result
+
+
+def report(name: str, seconds: List[float], query_seconds: List[float]) -> None:
+    """Print the median latencies of a question, with the calendar and with queries."""
+    median, query_median = statistics.median(seconds), statistics.median(query_seconds)
+    print(
+        f"{name:<28} {median * 1000:10.3f} {query_median * 1000:10.3f} "
+        f"{query_median / median:9.0f}x"
+    )
+
+
+async def run(session: AsyncSession, stores: int, questions: int, seed: int) -> None:
+    """Print the time to compile the calendar and the latencies of the questions."""
+    randomizer = random.Random(seed)
+    store_ids = [f"BENCH{index:021d}" for index in range(stores)]
+    start, end = datetime.date(YEAR, 1, 1), datetime.date(YEAR, 12, 31)
+    cache = StoreCalendarCache(size=12)
+    started = time.perf_counter()
+    months = [
+        await cache._compile(session, datetime.date(YEAR, month, 1), None)
+        for month in range(1, 13)
+    ]
+    print(f"12 months compiled in {time.perf_counter() - started:.2f}s")
+    year = StoreCalendar(start, end, months)
+
+    def calendar(first: datetime.date, last: datetime.date) -> StoreCalendar:
+        return StoreCalendar(first, last, months[first.month - 1 : last.month])
+
+    days = [start + datetime.timedelta(days=randomizer.randrange(365)) for _ in range(questions)]
+    print(f"{'question':<28} {'calendar ms':>10} {'query ms':>10} {'speedup':>10}")
+
+    seconds, query_seconds = [], []
+    for day in days:
+        store_id = randomizer.choice(store_ids)
+        at = datetime.datetime.combine(day, datetime.time(randomizer.randint(8, 19), 30))
+
+        async def compiled() -> bool:
+            return calendar(day, day).closure_at(store_id, at) is None
+
+        elapsed, is_open = await timed(compiled)
+        seconds.append(elapsed)
+        elapsed, expected = await timed(lambda: query_is_open(session, store_id, at))
+        query_seconds.append(elapsed)
+        assert is_open == expected, (store_id, at)
+    report("is open at a time", seconds, query_seconds)
+
+    seconds, query_seconds = [], []
+    for month in range(1, 13):
+        first = datetime.date(YEAR, month, 1)
+        last = (first + datetime.timedelta(days=32)).replace(day=1) - datetime.timedelta(days=1)
+        for _ in range(max(1, questions // 120)):
+            page = randomizer.sample(store_ids, min(PAGE, stores))
+
+            async def compiled() -> Dict[str, List[Tuple[int, int]]]:
+                month_calendar = calendar(first, last)
+                return {store_id: month_calendar.closures(store_id) for store_id in page}
+
+            elapsed, closures = await timed(compiled)
+            seconds.append(elapsed)
+            elapsed, expected = await timed(lambda: query_range(session, page, first, last))
+            query_seconds.append(elapsed)
+            assert closures == expected, first
+    report(f"{PAGE} stores over a month", seconds, query_seconds)
+
+    seconds, query_seconds = [], []
+    for day in days[: max(1, questions // 10)]:
+
+        async def compiled() -> Dict[str, int]:
+            return {
+                store_id: len(closures)
+                for store_id, closures in calendar(day, day).closed_on(day).items()
+            }
+
+        elapsed, closed = await timed(compiled)
+        seconds.append(elapsed)
+        elapsed, expected = await timed(lambda: query_closed(session, day))
+        query_seconds.append(elapsed)
+        assert closed == expected, day
+    report("stores closed on a day", seconds, query_seconds)
+    print(f"{len(year.public())} public holidays, {sum(map(len, months))} store months")
+
+
+async def main(stores: int, questions: int, seed: int) -> None:
+    """Populate the scratch schema, run the questions, and drop the schema."""
+    engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+    async with engine.connect() as connection:
+        try:
+            started = time.perf_counter()
+            await populate(connection, stores, random.Random(seed))
+            print(f"{stores} stores created in {time.perf_counter() - started:.1f}s")
+            async with AsyncSession(bind=connection) as session:
+                await run(session, stores, questions, seed)
+        finally:
+            await connection.rollback()
+            await connection.execute(text(f'DROP SCHEMA IF EXISTS "{SCHEMA}" CASCADE'))
+            await connection.commit()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stores", type=int, default=5000)
+    parser.add_argument("--questions", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(main(args.stores, args.questions, args.seed))
@@ -0,0 +1,242 @@
+"""Benchmark the store search by services with and without the GIN indexes of the service arrays.
+
+Creates the store tables in a scratch schema and fills it with synthetic stores, each offering one
+or two services, all of them for a few, and one to six sub-services. Then runs the queries of the
+search endpoint, the count and the first page, for a few typical filters: first with the GIN
+indexes of the service arrays, then without them, which scans and unnests the arrays of every
+store. The scratch schema is dropped at the end.
+
+Usage:
+    python -m benchmarks.store_search --stores 100000
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Dict, List, Tuple
+
+from sqlalchemy import Connection, Engine, create_engine, func, insert, select, text
+from sqlalchemy.pool import NullPool
+
+from azra_store_lmi_api.apps.admin.models import (
+    City,
+    Country,
+    SAASAdmin,
+    State,
+    Store,
+    StoreDetail,
+)
+from azra_store_lmi_api.apps.admin.models.store import StoreServiceEnum, StoreSubServiceEnum
+from azra_store_lmi_api.apps.admin.store_search import service_filters
+from azra_store_lmi_api.config.settings import settings
+from azra_store_lmi_api.models import BaseModal
+
+SCHEMA = "bench_store_search"
+
+TABLES = [model.__table__ for model in (SAASAdmin, Country, State, City, Store, StoreDetail)]
+
+GIN_INDEXES = ["ix_store_details_services", "ix_store_details_sub_services"]
+
+S, SUB = StoreServiceEnum, StoreSubServiceEnum
+
+# The name, services, sub-services and whether all of them must match, of the searches.
+SEARCHES: List[Tuple[str, List[int], List[int], bool]] = [
+    (
+        "laundry, dry cleaning and home delivery",
+        [S.LAUNDRY.value],
+        [SUB.DRY_CLEANING.value, SUB.HOME_DELIVERY.value],
+        True,
+    ),
+    (
+        "cut piece, cutting, labeling, sorting",
+        [S.CUT_PIECE_CENTER.value],
+        [SUB.FABRIC_CUTTING.value, SUB.CUSTOM_LABELING.value, SUB.FABRIC_SORTING.value],
+        True,
+    ),
+    (
+        "gift wrapping or personal shopper",
+        [],
+        [SUB.GIFT_WRAPPING.value, SUB.PERSONAL_SHOPPER.value],
+        False,
+    ),
+    ("wholesale", [S.SELLING_WHOLESALE.value], [], True),
+]
+
+
+def build_stores(count: int, seed: int) -> Tuple[List[Dict], List[Dict]]:
+    """Build the rows of synthetic stores and of their details."""
+    randomizer = random.Random(seed)
+    services = [S.LAUNDRY.value, S.SELLING_WHOLESALE.value, S.SELLING_RETAIL.value]
+    services.append(S.CUT_PIECE_CENTER.value)
+    sub_services = SUB.values()
+    stores, details = [], []
+    for index in range(count):
+        store_id = f"BENCH{index:021d}"
+        stores.append(
+            {
+                "id": store_id,
+                "created_by_id": 1,
+                "name": f"Store {index}",
+                "unique_indentifier": f"bench_{index}",
+                "is_main_store": False,
+                "status": 20,
+                "path": store_id,
+            }
+        )
+        offered = (
+            [S.ALL.value]
+            if randomizer.random() < 0.02
+            else randomizer.sample(services, randomizer.randint(1, 2))
+        )
+        details.append(
+            {
+                "store_id": store_id,
+                "country_id": 1,
+                "state_id": 1,
+                "city_id": 1,
+                "address": f"{index} Main Street",
+                "postal_code": "682001",
+                "logo": "logo.png",
+                "cover_iamge": "cover.png",
+                "services": offered,
+                "sub_services": randomizer.sample(sub_services, randomizer.randint(1, 6)),
+            }
+        )
+    return stores, details
+
+
+def populate(connection: Connection, count: int, seed: int) -> None:
+    """Create the tables in the scratch schema, first in the search path of the connection, and
+    insert the synthetic stores."""
+    connection.execute(text(f'CREATE SCHEMA "{SCHEMA}"'))
+    connection.execute(text(f'SET search_path TO "{SCHEMA}"'))
+    BaseModal.metadata.create_all(connection, tables=TABLES, checkfirst=False)
+    connection.execute(
+        insert(SAASAdmin),
+        [
+            {
+                "id": 1,
+                "first_name": "Bench",
+                "last_name": "Admin",
+                "email": "bench@example.com",
+                "username": "bench",
+                "phone_number": "9876543210",
+                "password": "-",
+                "is_active": True,
+            }
+        ],
+    )
+    connection.execute(
+        insert(Country),
+        [
+            {
+                "id": 1,
+                "name": "India",
+                "numeric_code": "356",
+                "phone_code": "91",
+                "capital": "New Delhi",
+                "currency": "INR",
+                "currency_name": "Indian rupee",
+                "currency_symbol": "₹",
+                "region": "Asia",
+                "region_id": 3,
+                "subregion": "Southern Asia",
+                "subregion_id": 14,
+            }
+        ],
+    )
+    connection.execute(
+        insert(State),
+        [{"id": 1, "country_id": 1, "name": "Kerala", "state_code": "KL", "type": "state"}],
+    )
+    connection.execute(insert(City), [{"id": 1, "state_id": 1, "name": "Kochi"}])
+    stores, details = build_stores(count, seed)
+    connection.execute(insert(Store), stores)
+    connection.execute(insert(StoreDetail), details)
+    connection.commit()
+
+
+def vacuum(engine: Engine) -> None:
+    """Vacuum the store tables as autovacuum would after the load, which flushes the pending
+    entries of the GIN indexes, and sets the visibility map the index only scans rely on."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for table in ("stores", "store_details"):
+            connection.execute(text(f'VACUUM ANALYZE "{SCHEMA}"."{table}"'))
+
+
+def search(
+    connection: Connection, services: List[int], sub_services: List[int], match_all: bool
+) -> Tuple[float, int, str]:
+    """Run the count and first page queries of a search, and return the seconds they took, the
+    number of matches, and the scan of the store details in the plan of the count."""
+    matches = (
+        select(Store.id)
+        .join(StoreDetail, StoreDetail.store_id == Store.id)
+        .where(*service_filters(services, sub_services, match_all=match_all))
+    )
+    count_query = select(func.count()).select_from(matches.subquery())
+    page_query = matches.order_by(Store.created_at.desc(), Store.id).limit(10)
+    started = time.perf_counter()
+    total = connection.scalar(count_query)
+    connection.execute(page_query).all()
+    seconds = time.perf_counter() - started
+    compiled = count_query.compile(connection, compile_kwargs={"literal_binds": True})
+    plan = connection.scalar(text(f"EXPLAIN (FORMAT JSON) {compiled}"))
+    return seconds, total, _details_scan(plan[0]["Plan"])
+
+
+def _details_scan(node: Dict) -> str:
+    """Returns the type of the scan of the store details in a plan."""
+    if node.get("Relation Name") == "store_details":
+        return node["Node Type"]
+    for child in node.get("Plans", []):
+        scan = _details_scan(child)
+        if scan:
+            return scan
+    return ""
+
+
+def run_searches(connection: Connection, repeats: int, label: str) -> Dict[str, float]:
+    """Print the median duration of every search after a warm up run, and return them by name."""
+    medians = {}
+    for name, services, sub_services, match_all in SEARCHES:
+        search(connection, services, sub_services, match_all)
+        runs = [search(connection, services, sub_services, match_all) for _ in range(repeats)]
+        medians[name] = statistics.median(seconds for seconds, _, _ in runs)
+        _, total, scan = runs[0]
+        print(f"{label:<8} {name:<42} {total:8} {medians[name] * 1000:9.2f}  {scan}")
+    return medians
+
+
+def main(stores: int, repeats: int, seed: int) -> None:
+    """Print the duration of the searches with and without the GIN indexes."""
+    engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+    with engine.connect() as connection:
+        try:
+            started = time.perf_counter()
+            populate(connection, stores, seed)
+            vacuum(engine)
+            print(f"{stores} stores created in {time.perf_counter() - started:.1f}s")
+            print(f"{'':<8} {'search':<42} {'matches':>8} {'median ms':>9}  scan")
+            indexed = run_searches(connection, repeats, "gin")
+            for index in GIN_INDEXES:
+                connection.execute(text(f'DROP INDEX "{index}"'))
+            connection.commit()
+            scanned = run_searches(connection, repeats, "no index")
+            for name in indexed:
+                print(f"{name:<51} {scanned[name] / indexed[name]:9.1f}x faster with gin")
+        finally:
+            connection.rollback()
+            connection.execute(text(f'DROP SCHEMA IF EXISTS "{SCHEMA}" CASCADE'))
+            connection.commit()
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--stores", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    main(args.stores, args.repeats, args.seed)
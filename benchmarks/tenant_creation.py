@@ -0,0 +1,250 @@
+"""Benchmark the creation of tenant schemas by cloning the template against replaying migrations.
+
+Generates a migration history of the given length in a temporary directory, whose revisions
+create tables with serial and identity keys, foreign keys, indexes and check constraints, add
+columns, create enum types, views, functions and triggers, and insert seed rows. The template
+schema is migrated to head, then every tenant schema is created twice: by replaying the history,
+and by cloning the template. The catalog of a replayed and a cloned schema are compared, so the
+clone is checked to create the same objects, with the same names, and the same rows.
+
+The replays are timed twice: in this process, and with the alembic command as provisioning runs
+them, which adds the start of the interpreter and the import of the application.
+
+Usage:
+    python -m benchmarks.tenant_creation --revisions 60 --tenants 5
+"""
+
+import argparse
+import asyncio
+import logging
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from alembic import command
+from sqlalchemy import Connection, create_engine, text
+from sqlalchemy.pool import NullPool
+
+from azra_store_lmi_api.config.database import async_engine, get_db_context
+from azra_store_lmi_api.config.logger.app import logger
+from azra_store_lmi_api.config.settings import settings
+from azra_store_lmi_api.config.tenancy.template import clone_schema
+from azra_store_lmi_api.config.tenant_migrations import _PROJECT_ROOT, alembic_config
+
+TEMPLATE = "bench_template"
+
+REVISION = '''"""Benchmark revision {index}."""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "bench{index:04d}"
+down_revision = {down_revision!r}
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+{body}
+'''
+
+# The upgrade bodies, cycled over the revisions, formatted with the index of the revision and of
+# the table created by the last revision of the cycle.
+BODIES = [
+    """    op.create_table(
+        "item_{index}",
+        sa.Column("id", sa.Integer, primary_key=True),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("price", sa.Numeric(10, 2), server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.CheckConstraint("price >= 0", name="ck_item_{index}_price"),
+    )
+    op.create_index("ix_item_{index}_name", "item_{index}", ["name"])""",
+    """    op.add_column("item_{table}", sa.Column("code", sa.String(20), server_default="none"))
+    op.create_unique_constraint("uq_item_{table}_code_name", "item_{table}", ["code", "name"])""",
+    """    op.create_table(
+        "order_{index}",
+        sa.Column("id", sa.BigInteger, sa.Identity(), primary_key=True),
+        sa.Column("item_id", sa.Integer, sa.ForeignKey("item_{table}.id", name="fk_{index}")),
+        sa.Column("state", sa.Enum("open", "paid", "void", name="state_{index}")),
+        sa.Column("quantity", sa.Integer, nullable=False),
+        sa.Column("total", sa.Integer, sa.Computed("quantity * 2")),
+    )""",
+    """    op.execute(
+        "INSERT INTO item_{table} (name, price) "
+        "SELECT 'item ' || g, g FROM generate_series(1, 50) g"
+    )
+    op.execute(
+        "INSERT INTO order_{order} (item_id, state, quantity) "
+        "SELECT id, 'open', 1 FROM item_{table}"
+    )""",
+    """    op.execute(
+        "CREATE VIEW open_orders_{index} AS SELECT o.id, i.name FROM order_{order} o "
+        "JOIN item_{table} i ON i.id = o.item_id WHERE o.state = 'open'"
+    )""",
+    """    op.execute(
+        "CREATE FUNCTION touch_{index}() RETURNS trigger LANGUAGE plpgsql AS "
+        "$$ BEGIN NEW.quantity := greatest(NEW.quantity, 1); RETURN NEW; END $$"
+    )
+    op.execute(
+        "CREATE TRIGGER touch_{index} BEFORE INSERT ON order_{order} "
+        "FOR EACH ROW EXECUTE FUNCTION touch_{index}()"
+    )""",
+]
+
+
+def write_revisions(directory: Path, count: int) -> None:
+    """Write a linear history of revisions, cycling over the bodies."""
+    for index in range(count):
+        cycle = index - index % len(BODIES)
+        body = BODIES[index % len(BODIES)].format(index=index, table=cycle, order=cycle + 2)
+        down_revision = f"bench{index - 1:04d}" if index else None
+        (directory / f"bench{index:04d}.py").write_text(
+            REVISION.format(index=index, down_revision=down_revision, body=body)
+        )
+
+
+def replay(connection: Connection, versions: Path, schema: str) -> float:
+    """Create a schema and replay the migrations in it, and return the seconds it took."""
+    started = time.perf_counter()
+    connection.execute(text(f'CREATE SCHEMA "{schema}"'))
+    connection.execute(text(f'SET search_path TO "{schema}"'))
+    connection.commit()
+    connection.dialect.default_schema_name = schema
+    config = alembic_config()
+    config.set_main_option("version_locations", str(versions))
+    config.set_main_option("version_path_separator", "os")
+    config.attributes.update(connection=connection, configure_logger=False)
+    with connection.begin():
+        command.upgrade(config, "head")
+    return time.perf_counter() - started
+
+
+def replay_command(connection: Connection, ini: Path, schema: str) -> float:
+    """Create a schema and replay the migrations in it with the alembic command, and return the
+    seconds it took."""
+    started = time.perf_counter()
+    connection.execute(text(f'CREATE SCHEMA "{schema}"'))
+    connection.commit()
+    subprocess.run(
+        [sys.executable, "-m", "alembic", "-c", ini, "-x", f"tenant={schema}", "upgrade", "head"],
+        cwd=_PROJECT_ROOT,
+        check=True,
+        capture_output=True,
+    )
+    return time.perf_counter() - started
+
+
+async def clone(schema: str) -> float:
+    """Clone the template into a schema, and return the seconds it took."""
+    started = time.perf_counter()
+    async with get_db_context() as session:
+        await clone_schema(session, TEMPLATE, schema)
+        await session.commit()
+    return time.perf_counter() - started
+
+
+def fingerprint(connection: Connection, schema: str) -> Dict[str, List]:
+    """Returns the objects and row counts of a schema, without its name."""
+    connection.execute(text("SET search_path TO pg_catalog"))
+    queries = {
+        "columns": """SELECT c.relname, a.attname, format_type(a.atttypid, a.atttypmod),
+            a.attnotnull, a.attidentity, a.attgenerated, pg_get_expr(d.adbin, d.adrelid)
+            FROM pg_attribute a JOIN pg_class c ON c.oid = a.attrelid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            LEFT JOIN pg_attrdef d ON d.adrelid = c.oid AND d.adnum = a.attnum
+            WHERE n.nspname = :schema AND a.attnum > 0 AND NOT a.attisdropped""",
+        "constraints": """SELECT co.conname, pg_get_constraintdef(co.oid) FROM pg_constraint co
+            JOIN pg_namespace n ON n.oid = co.connamespace WHERE n.nspname = :schema""",
+        "indexes": """SELECT indexname, indexdef FROM pg_indexes WHERE schemaname = :schema""",
+        "relations": """SELECT c.relname, c.relkind FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace WHERE n.nspname = :schema""",
+        "views": """SELECT c.relname, pg_get_viewdef(c.oid) FROM pg_class c
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = :schema AND c.relkind IN ('v', 'm')""",
+        "triggers": """SELECT pg_get_triggerdef(t.oid) FROM pg_trigger t
+            JOIN pg_class c ON c.oid = t.tgrelid JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = :schema AND NOT t.tgisinternal""",
+        "types": """SELECT t.typname, e.enumlabel FROM pg_enum e
+            JOIN pg_type t ON t.oid = e.enumtypid JOIN pg_namespace n ON n.oid = t.typnamespace
+            WHERE n.nspname = :schema""",
+    }
+    result = {}
+    for name, query in queries.items():
+        rows = connection.execute(text(query), {"schema": schema}).all()
+        result[name] = sorted(
+            tuple(str(value).replace(schema, "<schema>") for value in row) for row in rows
+        )
+    tables = [row[0] for row in result["relations"] if row[1] == "r"]
+    result["rows"] = [
+        (table, connection.scalar(text(f'SELECT count(*) FROM "{schema}"."{table}"')))
+        for table in tables
+    ]
+    sequences = [row[0] for row in result["relations"] if row[1] == "S"]
+    result["sequences"] = [
+        (sequence, connection.scalar(text(f'SELECT last_value FROM "{schema}"."{sequence}"')))
+        for sequence in sequences
+    ]
+    connection.rollback()
+    return result
+
+
+def report(name: str, seconds: List[float], clone_seconds: List[float]) -> None:
+    """Print the mean and extremes of the durations of a method in milliseconds, and how many
+    times slower than the clone it is."""
+    mean = statistics.mean(seconds)
+    print(
+        f"{name:<16} {mean * 1000:10.1f} {min(seconds) * 1000:10.1f} "
+        f"{max(seconds) * 1000:10.1f} {mean / statistics.mean(clone_seconds):7.1f}x"
+    )
+
+
+async def main(revisions: int, tenants: int) -> None:
+    """Print the time to create tenant schemas by replay and by clone."""
+    replays = [f"bench_replay_{index}" for index in range(tenants)]
+    commands = [f"bench_command_{index}" for index in range(tenants)]
+    clones = [f"bench_clone_{index}" for index in range(tenants)]
+    engine = create_engine(settings.DATABASE_URL, poolclass=NullPool)
+    with tempfile.TemporaryDirectory() as directory, engine.connect() as connection:
+        versions = Path(directory)
+        write_revisions(versions, revisions)
+        ini = versions / "alembic.ini"
+        ini.write_text(
+            (_PROJECT_ROOT / "alembic.ini")
+            .read_text()
+            .replace("[alembic]", f"[alembic]\nversion_locations = {versions}", 1)
+            .replace("version_path_separator = os  #", "version_path_separator = os\n#", 1)
+        )
+        try:
+            template_seconds = replay(connection, versions, TEMPLATE)
+            print(f"{revisions} revisions, template migrated in {template_seconds:.2f}s")
+            replay_seconds = [replay(connection, versions, schema) for schema in replays]
+            command_seconds = [replay_command(connection, ini, schema) for schema in commands]
+            clone_seconds = [await clone(schema) for schema in clones]
+            print(f"{'':<16} {'mean ms':>10} {'min ms':>10} {'max ms':>10} {'slower':>8}")
+            report("replay", replay_seconds, clone_seconds)
+            report("replay (alembic)", command_seconds, clone_seconds)
+            report("clone", clone_seconds, clone_seconds)
+            identical = fingerprint(connection, replays[0]) == fingerprint(connection, clones[0])
+            print(f"replayed and cloned schemas identical: {identical}")
+        finally:
+            connection.rollback()
+            for schema in [TEMPLATE, *replays, *commands, *clones]:
+                connection.execute(text(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE'))
+            connection.commit()
+    engine.dispose()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--revisions", type=int, default=60)
+    parser.add_argument("--tenants", type=int, default=5)
+    args = parser.parse_args()
+    logger.setLevel(logging.WARNING)
+    logging.getLogger("alembic").setLevel(logging.WARNING)
+    asyncio.run(main(args.revisions, args.tenants))
@@ -1,8 +1,24 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.openapi.docs import get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
 
+from azra_store_lmi_api.apps.admin.reference_data import reference_data
 from azra_store_lmi_api.apps.admin.routes import admin_app
+from azra_store_lmi_api.apps.admin.store_locations import store_locations
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load the reference data and the store locations when the application starts, and keep
+    them up to date until it stops."""
+    await reference_data.start()
+    await store_locations.start()
+    yield
+    await store_locations.stop()
+    await reference_data.stop()
+
 
 app = FastAPI(
     title="AZRA Store LMI API",
@@ -22,6 +38,7 @@ app = FastAPI(
     docs_url=None,  # Disable default Swagger UI
     redoc_url=None,  # Disable ReDoc
     openapi_url=None,  # Disable default OpenAPI JSON endpoint
+    lifespan=lifespan,
 )
 
 